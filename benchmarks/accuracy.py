@@ -0,0 +1,287 @@
+"""
+Accuracy-regression harness.
+
+Compares the fast calculation paths against a high-precision reference and
+fails if any of the documented relative error bounds (ACCURACY_BOUNDS) is
+exceeded. The harness is layered:
+
+    1. Fermi-Dirac kernels: every FD integral order/approach and the inverse
+       FD integral of order 1/2 vs tight-tolerance adaptive quadrature
+       (and root finding for the inverse).
+    2. Sheet (2D) mobility: random samples of (composition, n_2d, T,
+       rms_roughness, corr_len, n_dis, f_dis) with the default and a loose
+       integration tolerance vs a tight integration tolerance, per mechanism.
+    3. 3D mobility: random samples of (n_3d, T, m*) for every FD integration
+       approach and inverse FD method vs the 'num' approach with tight
+       integration tolerance. The reference uses the minimax inverse FD, which
+       is validated against root finding in layer 1.
+
+Run (offline, well under a minute):
+    python -m benchmarks.accuracy [--samples-2d 100] [--samples-3d 12] [--seed 0]
+
+The exit status is 1 if any bound is exceeded. When a new fast path is added,
+add its configuration to the corresponding *_PATHS dict and its bound to
+ACCURACY_BOUNDS.
+"""
+import sys
+import argparse
+import warnings
+import numpy as np
+import scipy.integrate as integrate
+import scipy.optimize as optimize
+import scipy.special as special
+from mobilitypy import Mobility2DCarrier, Mobility3DCarrier
+from mobilitypy.src import _FermiDiracInt
+
+## ============================================================================
+# Documented maximum relative errors. Keys: (path, mechanism). The mechanism
+# '*' is the default of the path.
+ACCURACY_BOUNDS = {
+    # Fermi-Dirac kernels
+    ('FD_zero/analytic', '*'): 1e-13,
+    ('FD_m_one_half/minimax_piecewise', '*'): 1e-13,
+    ('FD_one_half/minimax_piecewise', '*'): 1e-13,
+    ('FD_one/minimax_piecewise', '*'): 1e-13,
+    ('FD_one/polylog', '*'): 1e-12,
+    ('FD_one/num', '*'): 1e-7,
+    ('FD_two/num', '*'): 1e-7,
+    ('inverse_FD_one_half/minimax_piecewise', '*'): 1e-12,
+    ('inverse_FD_one_half/JD_approx', '*'): 2e-2,
+    # Sheet mobility
+    # scipy default epsabs=1.49e-8 limits the small (weak) scattering rate
+    # integrals, e.g. IFR at low density, to ~1e-7 relative error.
+    ('sheet_v1/default_tolerance', '*'): 1e-6,
+    ('sheet_v2/default_tolerance', '*'): 1e-6,
+    ('sheet_v2/loose_tolerance', '*'): 1e-5,
+    ('sheet_v1/fixed_node', '*'): 1e-10,
+    ('sheet_v2/fixed_node', '*'): 1e-10,
+    # 3D mobility
+    ('3d/minimax_piecewise', '*'): 1e-6,
+    ('3d/polylog', '*'): 1e-6,
+    ('3d/num', '*'): 1e-6,
+    ('3d/JD_approx', '*'): 2e-2,
+    }
+
+SHEET_EFFECTS = dict(alloy_disordered_effect=True, interface_roughness_effect=True,
+                     dislocation_effect=True, deformation_potential_effect=True,
+                     piezoelectric_effect=True, acoustic_phonon_effect=True,
+                     polar_optical_phonon_effect=True)
+
+MOBILITY_3D_EFFECTS = dict(alloy_disordered_effect=True, td_dislocation_chg_effect=True,
+                           td_dislocation_strain_effect=True, piezoelectric_effect=True,
+                           acoustic_phonon_effect=True, polar_optical_phonon_effect=True,
+                           ionized_impurity_effect=True)
+
+# Validity domain of the approximations: maximum reduced Fermi energy 
+# eta = E_f/k_BT. The Joyce-Dixon approximation is valid up to n/N_c ~ 8.5.
+VALIDITY_MAX_ETA = {'inverse_FD_one_half/JD_approx': 5.0, '3d/JD_approx': 5.0}
+
+REFERENCE_TOLERANCE = dict(epsabs=0, epsrel=1e-12, limit=500)
+
+# path: (calculate_sheet_mobility keywords, integration tolerance, integration backend)
+SHEET_PATHS = {'sheet_v1/default_tolerance': ({'mobility_model': 'v1'}, {}, 'quad'),
+               'sheet_v2/default_tolerance': ({'mobility_model': 'v2'}, {}, 'quad'),
+               'sheet_v2/loose_tolerance': ({'mobility_model': 'v2'}, dict(epsabs=0, epsrel=1e-6), 'quad'),
+               'sheet_v1/fixed_node': ({'mobility_model': 'v1'}, {}, 'fixed_node'),
+               'sheet_v2/fixed_node': ({'mobility_model': 'v2'}, {}, 'fixed_node')}
+
+# path: (calculate_3D_mobility keywords, integration tolerance)
+MOBILITY_3D_PATHS = {
+    '3d/minimax_piecewise': ({'FermiDirac_integration_approach': 'minimax_piecewise'}, {}),
+    '3d/polylog': ({'FermiDirac_integration_approach': 'polylog'}, {}),
+    '3d/num': ({'FermiDirac_integration_approach': 'num'}, {}),
+    '3d/JD_approx': ({'inverse_half_FD_method': 'JD_approx'}, {})}
+
+MOBILITY_3D_REFERENCE = {'FermiDirac_integration_approach': 'num',
+                         'inverse_half_FD_method': 'minimax_piecewise'}
+
+## ============================================================================
+def reference_FD_integral(order:str, eta:float):
+    """
+    Tight-tolerance quadrature of the Fermi-Dirac integral in the normalization
+    used by _FermiDiracInt._cal_Fermi_Dirac_integral: the half-integer orders
+    (Fukushima) are normalized by 1/Gamma(j+1), order 'two' by 1/2 and the
+    orders 'zero' and 'one' are not normalized. The half-integer orders use
+    x = t^2 to remove the x^(-1/2) singularity.
+    """
+    upper = max(eta, 0.0) + 60.0
+    points = [eta] if 0 < eta < upper else None
+    if order in ['m_one_half', 'one_half']:
+        power = 0 if order == 'm_one_half' else 2
+        func = lambda t: 2.0 * t**power * special.expit(eta-t*t)
+        upper, points = np.sqrt(upper), (None if points is None else [np.sqrt(eta)])
+        scale = 1.0/special.gamma(0.5 if order == 'm_one_half' else 1.5)
+    else:
+        power = {'zero': 0, 'one': 1, 'two': 2}[order]
+        func = lambda x: x**power * special.expit(eta-x)
+        scale = 0.5 if order == 'two' else 1.0
+    return scale * integrate.quad(func, 0, upper, points=points, epsabs=0, epsrel=1e-13,
+                                  limit=500)[0]
+
+def reference_inverse_FD_one_half(y:float):
+    """
+    eta such that reference (normalized) F_1/2(eta) = y (root finding).
+    """
+    lower = np.log(y) - 5.0
+    upper = max(10.0, (2.0*y)**(2/3) + 10.0)
+    return optimize.brentq(lambda eta: reference_FD_integral('one_half', eta) - y,
+                           lower, upper, xtol=1e-14, rtol=4*np.finfo(float).eps)
+
+def relative_error(value, reference):
+    """
+    |value - reference|/|reference|. NaN in both is not an error; NaN in
+    only one of them is an infinite error.
+    """
+    value, reference = np.asarray(value, dtype=float), np.asarray(reference, dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        err = np.abs(value - reference)/np.abs(reference)
+    err = np.where(value == reference, 0.0, err)
+    both_nan = np.isnan(value) & np.isnan(reference)
+    err = np.where(both_nan, 0.0, err)
+    return np.where(np.isnan(err), np.inf, err)
+
+## ============================================================================
+def check_FD_kernels(eta_samples):
+    """
+    Layer 1: Fermi-Dirac kernels. Returns {(path, mechanism): rel errors}.
+    """
+    errors = {}
+    kernels = {'zero': ['analytic'], 'm_one_half': ['minimax_piecewise'],
+               'one_half': ['minimax_piecewise'], 'one': ['minimax_piecewise', 'polylog', 'num'],
+               'two': ['num']}
+    for order, approaches in kernels.items():
+        reference = np.array([reference_FD_integral(order, eta) for eta in eta_samples])
+        for approach in approaches:
+            value = _FermiDiracInt._cal_Fermi_Dirac_integral(
+                eta_samples, FD_order=order,
+                FD_int_approach='minimax_piecewise' if approach == 'analytic' else approach)
+            errors[(f'FD_{order}/{approach}', 'FD')] = relative_error(value, reference)
+
+    # Inverse: relative error of the reconstructed carrier density.
+    y_samples = np.array([reference_FD_integral('one_half', eta) for eta in eta_samples])
+    eta_reference = np.array([reference_inverse_FD_one_half(y) for y in y_samples])
+    errors[('inverse_FD_one_half/root_finding', 'eta')] = \
+        np.abs(eta_reference - eta_samples)/np.maximum(np.abs(eta_samples), 1.0)
+    # n_d/N_3d = 183.5079199049476*n_d/(m*T)^(3/2) = Gamma(3/2)*y. Use m*T = 1.
+    for method in ['minimax_piecewise', 'JD_approx']:
+        eta_f = _FermiDiracInt._cal_eta_from_inv_FD(special.gamma(1.5)*y_samples/183.5079199049476, 
+                                                    1.0, T=1.0, method=method)
+        y_fast = np.array([reference_FD_integral('one_half', eta) for eta in eta_f])
+        in_domain = eta_samples <= VALIDITY_MAX_ETA.get(f'inverse_FD_one_half/{method}', np.inf)
+        errors[(f'inverse_FD_one_half/{method}', 'n')] = relative_error(y_fast, y_samples)[in_domain]
+    return errors
+
+def check_sheet_mobility(n_samples:int, rng):
+    """
+    Layer 2: Sheet mobility. Returns {(path, mechanism): rel errors}.
+    """
+    samples = {'comp': rng.uniform(0, 1, n_samples), 'n_2d': 10**rng.uniform(-0.5, 1.5, n_samples),
+               'T': rng.uniform(50, 600, n_samples), 'rms_roughness': rng.uniform(0.05, 0.5, n_samples),
+               'corr_len': rng.uniform(0.5, 5, n_samples), 'n_dis': 10**rng.uniform(-1, 2, n_samples),
+               'f_dis': rng.uniform(0.05, 1, n_samples)}
+    values = {}
+    for ii in range(n_samples):
+        mob = Mobility2DCarrier(compositions=samples['comp'][ii:ii+1])
+        params = {key: samples[key][ii] for key in samples if key != 'comp'}
+        for path, (kwargs, tolerance, backend) in SHEET_PATHS.items():
+            for name, tol, backend_ in [(path, tolerance, backend),
+                                        (f'{path}@reference', REFERENCE_TOLERANCE, 'quad')]:
+                mob.set_integration_tolerance(**tol)
+                mob.set_integration_backend(backend_)
+                res = mob.calculate_sheet_mobility(**params, **SHEET_EFFECTS, **kwargs,
+                                                   return_dataframe=False)
+                values.setdefault(name, []).append(res)
+    errors = {}
+    for path in SHEET_PATHS:
+        fast, ref = values[path], values[f'{path}@reference']
+        for mechanism in fast[0].columns:
+            if mechanism == 'comp': continue
+            errors[(path, mechanism)] = relative_error([res[mechanism][0] for res in fast],
+                                                       [res[mechanism][0] for res in ref])
+    return errors
+
+def check_3d_mobility(n_samples:int, rng, n_points:int=25):
+    """
+    Layer 3: 3D mobility. n_samples (T, m*, composition) combinations, each
+    with n_points carrier densities. Returns {(path, mechanism): rel errors}.
+    """
+    errors = {}
+    n_3d = np.logspace(-3, 2, n_points)
+    for _ in range(n_samples):
+        T, m_star, comp = rng.uniform(50, 600), rng.uniform(0.1, 0.5), rng.uniform(0.05, 0.95)
+        mob = Mobility3DCarrier(compositions=comp,
+                                use_mat_params={'AlN': {'carrier_effective_mass': m_star},
+                                                'GaN': {'carrier_effective_mass': m_star}})
+        eta_f = _FermiDiracInt._cal_eta_from_inv_FD(n_3d, m_star, T=T, method='minimax_piecewise')
+        mob.set_integration_tolerance(**REFERENCE_TOLERANCE)
+        ref = mob.calculate_3D_mobility(n_3d=n_3d, T=T, **MOBILITY_3D_EFFECTS,
+                                        **MOBILITY_3D_REFERENCE, return_dataframe=False)
+        for path, (kwargs, tolerance) in MOBILITY_3D_PATHS.items():
+            mob.set_integration_tolerance(**tolerance)
+            res = mob.calculate_3D_mobility(n_3d=n_3d, T=T, **MOBILITY_3D_EFFECTS, **kwargs,
+                                            return_dataframe=False)
+            in_domain = eta_f <= VALIDITY_MAX_ETA.get(path, np.inf)
+            for mechanism in res.columns:
+                err = relative_error(res[mechanism], ref[mechanism])[in_domain]
+                errors[(path, mechanism)] = np.concatenate([errors.get((path, mechanism), []), err])
+    return errors
+
+## ============================================================================
+def get_bound(path:str, mechanism:str):
+    return ACCURACY_BOUNDS.get((path, mechanism), ACCURACY_BOUNDS.get((path, '*')))
+
+def summarize(errors):
+    """
+    Returns list of (path, mechanism, n, max, p50, p95, p99, bound, passed).
+    """
+    rows = []
+    for (path, mechanism), err in errors.items():
+        err = np.asarray(err, dtype=float)
+        bound = get_bound(path, mechanism)
+        p50, p95, p99 = np.percentile(err, [50, 95, 99])
+        passed = True if bound is None else bool(np.max(err) <= bound)
+        rows.append((path, mechanism, len(err), np.max(err), p50, p95, p99, bound, passed))
+    return rows
+
+def print_summary(rows):
+    header = (f'{"path":<40}{"mechanism":<16}{"n":>6}{"max":>11}{"p50":>11}{"p95":>11}'
+              f'{"p99":>11}{"bound":>11}  status')
+    print(header)
+    print('-'*len(header))
+    for path, mechanism, n, emax, p50, p95, p99, bound, passed in rows:
+        bound_txt = '-' if bound is None else f'{bound:.1e}'
+        print(f'{path:<40}{mechanism:<16}{n:>6}{emax:>11.2e}{p50:>11.2e}{p95:>11.2e}'
+              f'{p99:>11.2e}{bound_txt:>11}  {"ok" if passed else "FAIL"}')
+
+def run(samples_2d:int=100, samples_3d:int=12, seed:int=0):
+    """
+    Run all the layers. Returns the summary rows.
+    """
+    rng = np.random.default_rng(seed)
+    errors = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        errors.update(check_FD_kernels(np.concatenate([np.linspace(-40, 60, 201),
+                                                       rng.uniform(-40, 60, 100)])))
+        errors.update(check_sheet_mobility(samples_2d, rng))
+        errors.update(check_3d_mobility(samples_3d, rng))
+    return summarize(errors)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='mobilitypy accuracy-regression harness')
+    parser.add_argument('--samples-2d', type=int, default=100, help='Number of sheet mobility samples.')
+    parser.add_argument('--samples-3d', type=int, default=12,
+                        help='Number of (T, m*, composition) samples of 3D mobility.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    args = parser.parse_args(argv)
+    rows = run(samples_2d=args.samples_2d, samples_3d=args.samples_3d, seed=args.seed)
+    print_summary(rows)
+    failed = [row for row in rows if not row[-1]]
+    if failed:
+        print(f'\n{len(failed)} accuracy bound(s) exceeded.')
+        return 1
+    print('\nAll accuracy bounds satisfied.')
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
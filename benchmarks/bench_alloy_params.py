@@ -0,0 +1,22 @@
+"""
+Alloy parameter interpolation benchmarks.
+"""
+import numpy as np
+from mobilitypy import AlloyParams
+
+## ============================================================================
+class AlloyParameters:
+    """
+    AlloyParams.get_alloy_params vs number of compositions.
+    """
+    params = ([1, 101, 10001], [False, True])
+    param_names = ['n_compositions', 'use_mat_params']
+
+    def setup(self, n_compositions, use_mat_params):
+        self.compositions = np.linspace(0, 1, n_compositions)
+        self.alloy_params = AlloyParams()
+
+    def time_get_alloy_params(self, n_compositions, use_mat_params):
+        self.alloy_params.get_alloy_params(compositions=self.compositions,
+                                           use_mat_params={'AlN': {'mass_density': 3000}}
+                                           if use_mat_params else None)
@@ -0,0 +1,57 @@
+"""
+Fermi-Dirac integral benchmarks.
+"""
+import numpy as np
+from mobilitypy.src import _FermiDiracInt
+
+## ============================================================================
+class FermiDiracIntegrals:
+    """
+    _FermiDiracInt._cal_Fermi_Dirac_integral for each order and method.
+    Combinations that are not implemented are skipped.
+    """
+    params = (['zero', 'one', 'm_one_half', 'one_half', 'two'],
+              ['minimax_piecewise', 'num', 'polylog'], [1, 100, 10000])
+    param_names = ['FD_order', 'FD_int_approach', 'n_points']
+
+    def setup(self, FD_order, FD_int_approach, n_points):
+        self.eta_f = np.linspace(-10, 40, n_points)
+        try:
+            _FermiDiracInt._cal_Fermi_Dirac_integral(self.eta_f[:1], FD_order=FD_order,
+                                                     FD_int_approach=FD_int_approach)
+        except ValueError:
+            raise NotImplementedError # asv skips the benchmark
+
+    def time_cal_Fermi_Dirac_integral(self, FD_order, FD_int_approach, n_points):
+        _FermiDiracInt._cal_Fermi_Dirac_integral(self.eta_f, FD_order=FD_order,
+                                                 FD_int_approach=FD_int_approach)
+
+class InverseFermiDiracIntegral:
+    """
+    Scaled Fermi energy from inverse Fermi-Dirac integral of order 1/2.
+    """
+    params = (['JD_approx', 'minimax_piecewise'], [1, 100, 10000])
+    param_names = ['method', 'n_points']
+
+    def setup(self, method, n_points):
+        self.n_3d = np.logspace(-4, 2, n_points)
+
+    def time_cal_eta_from_inv_FD(self, method, n_points):
+        _FermiDiracInt._cal_eta_from_inv_FD(self.n_3d, 0.3, T=300, method=method)
+
+class DislocationFDIntegrals:
+    """
+    Numerical Fermi-Dirac integrals of the dislocation scattering.
+    """
+    params = ([1, 100, 1000],)
+    param_names = ['n_points']
+
+    def setup(self, n_points):
+        self.eta_f = np.linspace(-10, 40, n_points)
+        self.B = np.linspace(0.1, 10, n_points)
+
+    def time_FD_dis_chg_Integration(self, n_points):
+        _FermiDiracInt._FD_dis_chg_Integration(self.eta_f, self.B)
+
+    def time_FD_dis_str_Integration(self, n_points):
+        _FermiDiracInt._FD_dis_str_Integration(self.eta_f, self.B)
@@ -0,0 +1,35 @@
+"""
+Import time benchmarks (airspeed velocity, https://asv.readthedocs.io).
+
+The timeraw_* benchmarks run in a fresh interpreter, so the full import cost
+is measured on every sample.
+"""
+import subprocess
+import sys
+
+## ============================================================================
+def timeraw_import_mobilitypy():
+    return "import mobilitypy"
+
+def timeraw_import_mobility_classes():
+    return "from mobilitypy import Mobility2DCarrier, Mobility3DCarrier"
+
+def timeraw_import_plottings():
+    return "from mobilitypy import Plottings, PlotQuasi3DFuns"
+
+_heavy_modules = ('matplotlib', 'pandas', 'scipy.stats', 'numba', 'http.server', 'asyncio')
+
+def track_heavy_modules_on_import():
+    """
+    Number of plotting/dataframe/statistics/JIT/service modules (matplotlib,
+    pandas, scipy.stats, numba, http.server, asyncio) loaded by 'import 
+    mobilitypy'. They are imported on first use only. Should stay 0: the 
+    benchmark fails otherwise.
+    """
+    code = ("import sys, mobilitypy; "
+            f"print(' '.join(mod for mod in {_heavy_modules!r} if mod in sys.modules))")
+    imported = subprocess.check_output([sys.executable, '-c', code], text=True).split()
+    if imported:
+        raise AssertionError(f"'import mobilitypy' imports {', '.join(imported)}.")
+    return len(imported)
+track_heavy_modules_on_import.unit = 'modules'
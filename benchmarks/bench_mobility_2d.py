@@ -0,0 +1,59 @@
+"""
+2D carrier gas (sheet) mobility benchmarks.
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+from .common import SHEET_MOBILITY_EFFECTS
+
+## ============================================================================
+class SheetMobilityScaling:
+    """
+    calculate_sheet_mobility vs number of compositions, carrier densities and
+    temperatures. One call per (density, temperature) pair.
+    """
+    params = ([5, 21, 101], [1, 3], [1, 3])
+    param_names = ['n_compositions', 'n_densities', 'n_temperatures']
+    timeout = 300
+
+    def setup(self, n_compositions, n_densities, n_temperatures):
+        self.mobility = Mobility2DCarrier(compositions=np.linspace(0, 1, n_compositions))
+        self.densities = np.linspace(5, 20, n_densities)
+        self.temperatures = np.linspace(100, 500, n_temperatures)
+
+    def time_calculate_sheet_mobility(self, n_compositions, n_densities, n_temperatures):
+        for n_2d in self.densities:
+            for T in self.temperatures:
+                self.mobility.calculate_sheet_mobility(n_2d=n_2d, T=T, return_sc_rates=True,
+                                                       **SHEET_MOBILITY_EFFECTS)
+
+class SheetMobilityMechanisms:
+    """
+    calculate_sheet_mobility for each scattering mechanism separately.
+    """
+    params = (['alloy_disordered_effect', 'interface_roughness_effect', 'dislocation_effect',
+               'deformation_potential_effect', 'piezoelectric_effect', 
+               'polar_optical_phonon_effect'], ['v1', 'v2'])
+    param_names = ['mechanism', 'mobility_model']
+
+    def setup(self, mechanism, mobility_model):
+        self.mobility = Mobility2DCarrier(compositions=np.linspace(0, 1, 21))
+
+    def time_calculate_sheet_mobility(self, mechanism, mobility_model):
+        self.mobility.calculate_sheet_mobility(n_2d=10, mobility_model=mobility_model,
+                                               **{mechanism: True})
+
+class SheetMobilityPostprocessing:
+    """
+    Sheet resistance and figure-of-merit calculations.
+    """
+    def setup(self):
+        self.mobility = Mobility2DCarrier(compositions=np.linspace(0, 1, 101))
+        self.n_2d = np.linspace(5, 20, 101)
+        self.mu = self.mobility.calculate_sheet_mobility(n_2d=self.n_2d,
+                                                         **SHEET_MOBILITY_EFFECTS)['TOT'].to_numpy()
+
+    def time_calculate_sheet_resitance(self):
+        self.mobility.calculate_sheet_resitance(self.n_2d, self.mu)
+
+    def time_calculate_figure_of_merit(self):
+        self.mobility.calculate_figure_of_merit(self.n_2d, self.mu, T_corect_bandgap=True)
@@ -0,0 +1,65 @@
+"""
+3D carrier gas mobility benchmarks.
+"""
+import numpy as np
+from mobilitypy import Mobility3DCarrier
+from .common import MOBILITY_3D_EFFECTS, carrier_density_profile
+
+## ============================================================================
+class Mobility3DScaling:
+    """
+    calculate_3D_mobility vs carrier density profile length for each 
+    carrier_degeneracy_limit and FermiDirac_integration_approach.
+    """
+    params = ([10, 100, 1000], ['general', 'degenerate', 'nondegenerate'],
+              ['minimax_piecewise', 'num', 'polylog'])
+    param_names = ['profile_length', 'carrier_degeneracy_limit', 
+                   'FermiDirac_integration_approach']
+    timeout = 300
+
+    def setup(self, profile_length, carrier_degeneracy_limit, FermiDirac_integration_approach):
+        self.mobility = Mobility3DCarrier(compositions=0.5)
+        _, self.n_3d = carrier_density_profile(profile_length)
+
+    def time_calculate_3D_mobility(self, profile_length, carrier_degeneracy_limit, 
+                                   FermiDirac_integration_approach):
+        self.mobility.calculate_3D_mobility(n_3d=self.n_3d, 
+                                            carrier_degeneracy_limit=carrier_degeneracy_limit,
+                                            FermiDirac_integration_approach=FermiDirac_integration_approach,
+                                            **MOBILITY_3D_EFFECTS)
+
+class ElectronicProperties3D:
+    """
+    calculate_elec_props_from_3DEC vs profile length and inverse FD method.
+    """
+    params = ([10, 100, 1000], ['JD_approx', 'minimax_piecewise'], [False, True])
+    param_names = ['profile_length', 'inverse_half_FD_method', 'return_dis_ints']
+
+    def setup(self, profile_length, inverse_half_FD_method, return_dis_ints):
+        self.mobility = Mobility3DCarrier(compositions=0.5)
+        _, self.n_3d = carrier_density_profile(profile_length)
+
+    def time_calculate_elec_props_from_3DEC(self, profile_length, inverse_half_FD_method, 
+                                            return_dis_ints):
+        self.mobility.calculate_elec_props_from_3DEC(self.n_3d, 
+                                                     inverse_half_FD_method=inverse_half_FD_method,
+                                                     return_dis_ints=return_dis_ints)
+
+class EffectiveProperties3DEC:
+    """
+    calculate_3DEC_props for a single mobility array and for all mobility
+    contributions (dataframe).
+    """
+    params = ([100, 1000, 10000], ['array', 'dataframe'])
+    param_names = ['profile_length', 'mobility_input']
+
+    def setup(self, profile_length, mobility_input):
+        self.mobility = Mobility3DCarrier(compositions=0.5)
+        self.position, self.n_3d = carrier_density_profile(profile_length)
+        mu_df = self.mobility.calculate_3D_mobility(n_3d=self.n_3d, alloy_disordered_effect=True,
+                                                    acoustic_phonon_effect=True,
+                                                    polar_optical_phonon_effect=True)
+        self.mu = mu_df['mu_TOT'].to_numpy() if mobility_input == 'array' else mu_df
+
+    def time_calculate_3DEC_props(self, profile_length, mobility_input):
+        self.mobility.calculate_3DEC_props(self.n_3d, self.mu, self.position)
@@ -0,0 +1,44 @@
+"""
+Plotting helper benchmarks. The figures are neither shown nor saved.
+"""
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+from mobilitypy import Mobility2DCarrier, Plottings, PlotQuasi3DFuns
+from .common import SHEET_MOBILITY_EFFECTS
+
+## ============================================================================
+class PlottingHelpers:
+    def setup(self):
+        self.mobility_df = Mobility2DCarrier(compositions=np.linspace(0, 1, 101))\
+            .calculate_sheet_mobility(n_2d=10, **SHEET_MOBILITY_EFFECTS)
+        self.data2plot = self.mobility_df[['comp', 'TOT']].to_numpy(dtype=float)
+        self.plottings = Plottings()
+        rng = np.random.default_rng(0)
+        self.xx, self.yy = rng.random(500), rng.random(500)
+        self.zz = np.exp(self.xx + self.yy)
+        self.quasi3d = PlotQuasi3DFuns()
+
+    def teardown(self):
+        plt.close('all')
+
+    def time_plot_2d_carrier_mobilities(self):
+        self.plottings.plot_2d_carrier_mobilities(self.mobility_df, savefig=False, show_plot=False)
+        plt.close('all')
+
+    def time_plot_2d(self):
+        self.plottings.plot_2d(self.data2plot, savefig=False, show_plot=False)
+        plt.close('all')
+
+    def time_InterPolation(self):
+        self.quasi3d.InterPolation(self.xx, self.yy, self.zz, interpolation_points=50)
+
+    def time_Plotq3D_scatter(self):
+        self.quasi3d.Plotq3D(self.xx, self.yy, self.zz, plot_scatter=True, show_plot=False)
+        plt.close('all')
+
+    def time_Plotq3D_contour(self):
+        self.quasi3d.Plotq3D(self.xx, self.yy, self.zz, plot_scatter=False, plot_controur=True,
+                             show_plot=False)
+        plt.close('all')
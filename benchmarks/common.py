@@ -0,0 +1,30 @@
+"""
+Shared inputs for the benchmarks.
+"""
+import numpy as np
+
+## ============================================================================
+SHEET_MOBILITY_EFFECTS = dict(alloy_disordered_effect=True,
+                              interface_roughness_effect=True,
+                              dislocation_effect=True,
+                              deformation_potential_effect=True,
+                              piezoelectric_effect=True,
+                              acoustic_phonon_effect=True,
+                              polar_optical_phonon_effect=True)
+
+MOBILITY_3D_EFFECTS = dict(alloy_disordered_effect=True,
+                           td_dislocation_chg_effect=True,
+                           td_dislocation_strain_effect=True,
+                           piezoelectric_effect=True,
+                           acoustic_phonon_effect=True,
+                           polar_optical_phonon_effect=True,
+                           ionized_impurity_effect=True)
+
+def carrier_density_profile(n_points:int):
+    """
+    Gaussian-like 3D carrier density profile (unit: 1e18 cm^-3) over 
+    position (unit: nm).
+    """
+    position = np.linspace(0, 50, n_points)
+    n_3d = 10.0*np.exp(-((position-25.0)/8.0)**2) + 1e-3
+    return position, n_3d
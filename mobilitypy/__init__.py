@@ -3,9 +3,33 @@ try:
 except ImportError:
     __version__ = "d0.0.0"
 
-from .mobility import DataBase, AlloyParams, Mobility2DCarrier, Mobility3DCarrier, Plottings
-from .utilities._quasi3d_plot_fns import PlotQuasi3DFuns
+from .mobility import DataBase, AlloyParams, Mobility2DCarrier, Mobility3DCarrier
+from .mobility import MobilityResults, ResultStore, SheetMobilityEvaluator, MobilitySurrogate
+from .mobility import DesignSampler
+from .src import profile, ProfileReport, register_figure_of_merit
 
 ## ==============================================================================
 __all__ = ['DataBase', 'AlloyParams', 'Mobility2DCarrier', 'Mobility3DCarrier', 
-           'Plottings', 'PlotQuasi3DFuns']
+           'Plottings', 'PlotQuasi3DFuns', 'MobilityResults',
+           'ResultStore', 'SheetMobilityEvaluator', 'MobilitySurrogate', 'DesignSampler', 
+           'profile', 'ProfileReport', 'register_figure_of_merit', 'MobilityService',
+           'shutdown_executors']
+
+# The plotting classes pull in matplotlib, MobilityService http.server and 
+# shutdown_executors the pools. They are imported lazily on first access, so 
+# that the numerical engines import with numpy/scipy only.
+_lazy_imports = {'Plottings': '.plotting', 
+                 'PlotQuasi3DFuns': '.utilities._quasi3d_plot_fns',
+                 'MobilityService': '.src._mobility_service',
+                 'shutdown_executors': '.src._async_jobs'}
+
+def __getattr__(name):
+    if name in _lazy_imports:
+        import importlib
+        value = getattr(importlib.import_module(_lazy_imports[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
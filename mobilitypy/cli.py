@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Command line interface of mobilitypy.
+
+    mobilitypy run sweep.toml --workers 8 --chunk-size 4096 --output results
+
+runs the sweep specification (TOML, YAML or JSON; see the documentation of
+mobilitypy.src._batch_runner for the format) and writes the results chunk by
+chunk to a ResultStore directory. Re-running the same command resumes from the
+missing chunks. Load the results using ResultStore(<output>).load().
+
+    mobilitypy serve --port 8765 --surrogate hemt=hemt_surrogate.npz
+
+runs the local HTTP/JSON mobility query service (see MobilityService).
+"""
+import os
+import sys
+import argparse
+from .src._batch_runner import _BatchRunner, load_sweep_spec
+from .src._result_store import ResultStore
+from .src._logging import _configure_print_log
+
+## ============================================================================
+def _print_progress(n_done, n_chunks, n_calculated, n_rows, elapsed_time):
+    rate = n_rows/elapsed_time if elapsed_time > 0 else 0.0
+    eta = elapsed_time/n_calculated*(n_chunks - n_done)
+    print(f'[{n_done}/{n_chunks}] {100*n_done/n_chunks:5.1f}% | {n_rows} rows in {elapsed_time:.1f} s '
+          f'({rate:.0f} rows/s) | ETA {eta:.0f} s', file=sys.stderr, flush=True)
+
+def _run(args):
+    spec = load_sweep_spec(args.spec)
+    run, output = spec.setdefault('run', {}), spec.setdefault('output', {})
+    if args.workers is not None: run['workers'] = args.workers
+    if args.chunk_size is not None: run['chunk_size'] = args.chunk_size
+    if args.output is not None: output['dir'] = args.output
+    if args.format is not None: output['format'] = args.format
+    store_dir = output.get('dir', os.path.splitext(os.path.basename(args.spec))[0] + '_results')
+    runner = _BatchRunner(spec)
+    store = ResultStore(store_dir, file_format=output.get('format', 'npz'))
+    _configure_print_log(args.print_log)
+    n_calculated = runner.run(store, progress=None if args.quiet else _print_progress)
+    if not args.quiet:
+        print(f'Completed {runner.n_chunks} chunks ({n_calculated} in this run). '
+              f'Results: {store.store_dir}', file=sys.stderr)
+    return 0
+
+def _serve(args):
+    surrogates = {}
+    for item in args.surrogate:
+        name, _, file_path = item.partition('=')
+        if not file_path:
+            raise ValueError(f'Surrogate should be given as name=file.npz. Got {item}.')
+        surrogates[name] = file_path
+    from .src._mobility_service import MobilityService # http.server only for serve
+    _configure_print_log(args.print_log or 'low')
+    service = MobilityService(host=args.host, port=args.port, batch_window=args.batch_window*1e-3,
+                              max_batch_rows=args.max_batch_rows, surrogates=surrogates,
+                              disk_cache_dir=args.disk_cache_dir)
+    service.serve_forever()
+    return 0
+
+def main(argv=None):
+    """
+    This function is the entry point of the 'mobilitypy' command.
+
+    Parameters
+    ----------
+    argv : list of str, optional
+        The command line arguments. The default is None, i.e. sys.argv[1:].
+
+    Returns
+    -------
+    int
+        Exit status.
+
+    """
+    parser = argparse.ArgumentParser(prog='mobilitypy', description='mobilitypy: mobility calculations in semiconductors.')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+    run_parser = subparsers.add_parser('run', help='Run a sweep specification file (TOML, YAML or JSON).')
+    run_parser.add_argument('spec', help='The sweep specification file.')
+    run_parser.add_argument('-w', '--workers', type=int, default=None,
+                            help='Number of worker processes (overrides [run] workers).')
+    run_parser.add_argument('-c', '--chunk-size', type=int, default=None,
+                            help='Rows (grid) or design points (design) per chunk (overrides [run] chunk_size).')
+    run_parser.add_argument('-o', '--output', default=None,
+                            help='Result store directory (overrides [output] dir).')
+    run_parser.add_argument('-f', '--format', default=None, choices=['npz', 'parquet', 'feather'],
+                            help='File format of the chunks (overrides [output] format).')
+    run_parser.add_argument('-q', '--quiet', action='store_true', help='Do not print the progress.')
+    run_parser.add_argument('--print-log', default=None, choices=['low', 'medium', 'high'],
+                            help='Print the engine log messages.')
+    run_parser.set_defaults(function=_run)
+    serve_parser = subparsers.add_parser('serve', help='Run the local HTTP/JSON mobility query service.')
+    serve_parser.add_argument('--host', default='127.0.0.1', help='Host address (default: 127.0.0.1).')
+    serve_parser.add_argument('--port', type=int, default=8765, help='Port (default: 8765).')
+    serve_parser.add_argument('--batch-window', type=float, default=5.0,
+                              help='Coalescing window of the concurrent requests in ms (default: 5).')
+    serve_parser.add_argument('--max-batch-rows', type=int, default=65536,
+                              help='Maximum number of points of a coalesced engine call (default: 65536).')
+    serve_parser.add_argument('--surrogate', action='append', default=[], metavar='NAME=FILE',
+                              help='Serve a saved MobilitySurrogate at /v1/surrogate/NAME (repeatable).')
+    serve_parser.add_argument('--disk-cache-dir', default=None, help='Enable the disk cache in this directory.')
+    serve_parser.add_argument('--print-log', default=None, choices=['low', 'medium', 'high'],
+                              help='Print the log messages (default: low).')
+    serve_parser.set_defaults(function=_serve)
+    args = parser.parse_args(argv)
+    try:
+        return args.function(args)
+    except (ValueError, ImportError, OSError) as error:
+        print(f'mobilitypy: error: {error}', file=sys.stderr)
+        return 1
+    except KeyboardInterrupt:
+        print('mobilitypy: interrupted. Re-run the same command to resume.', file=sys.stderr)
+        return 130
+
+if __name__ == '__main__':
+    sys.exit(main())
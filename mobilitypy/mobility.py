@@ -1,6 +1,10 @@
 from .src import _DataBase, _AlloyParams, _FermiDiracInt, _MobilityCarrier
-from .src import _Mobility2DCarrier, _Mobility3DCarrier
-from .utilities import _plot_mobilities
+from .src import _Mobility2DCarrier, _Mobility3DCarrier, MobilityResults
+from .src import ResultStore, SheetMobilityEvaluator, MobilitySurrogate, _SheetMobilitySurrogateBuilder
+from .src import DesignSampler
+from .src import _SheetMobilityFit, _MonteCarloUncertainty, _SobolSensitivity
+from .src import _FigureOfMeritOptimizer, _ParetoFrontExplorer
+import os
 import numpy as np
 
 ## ==============================================================================
@@ -200,7 +204,11 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
             Carrier density below eps_n_2d will be considered as zero. 
             The default is 1e-8 == 1e4 cm^-2.
         print_log : string, optional => ['high','medium','low', None]
-            Determines the level of log to be printed. The default is None.
+            Determines the level of log to be printed (of this carrier only). The
+            diagnostics are sent to the 'mobilitypy' logger and printed to stdout 
+            unless logging is configured otherwise. 'low': one summary line per calculation,
+            'medium': + per composition and mechanism lines, 'high': + material
+            and derived parameters ('mobilitypy.params' logger). The default is None.
 
         Returns
         -------
@@ -214,7 +222,107 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
                                   print_log=print_log, eps_n=eps_n_2d)
         _Mobility2DCarrier.__init__(self)
         
-    def calculate_sheet_mobility(self, n_2d=10, rms_roughness=0.1, corr_len=1,  
+    def enable_disk_cache(self, cache_dir=None, max_size_mb:float=512):
+        """
+        This function enables the opt-in persistent disk cache for the mobility 
+        calculations (calculate_sheet_mobility). Repeated calls with identical inputs 
+        return the results from the cache.
+        
+        The cache key is a hash of the input arrays, all effect flags, the mobility
+        model, the alloy parameters, the material database snapshot and the package
+        version. The material database snapshot is hashed once here; call 
+        enable_disk_cache again after editing the material database in place. 
+        The cache size is limited and least recently used entries are 
+        evicted. The cache directory can be shared between processes.
+
+        Parameters
+        ----------
+        cache_dir : str/path, optional
+            The cache directory. If None, '~/.cache/mobilitypy' is used.
+            The default is None.
+        max_size_mb : float, optional (unit: MB)
+            Maximum size of the cache. The default is 512 MB.
+
+        Returns
+        -------
+        cache : disk cache instance
+            The cache. Use cache.clear() to remove all the entries.
+
+        """
+        return self._enable_disk_cache(cache_dir=cache_dir, max_size_mb=max_size_mb)
+    
+    def disable_disk_cache(self):
+        """
+        This function disables the disk cache. The cache files are kept.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._disable_disk_cache()
+        return
+    
+    def set_integration_tolerance(self, epsabs:float=None, epsrel:float=None, limit:int=None):
+        """
+        This function sets the error tolerances of the numerical integrations
+        (scattering integrals of interface roughness, dislocation, deformation potential and piezoelectric scattering). Looser tolerances are faster. Use return_errors=True to 
+        check that the numerical error estimates of all the points stay within 
+        the required tolerance.
+
+        Parameters
+        ----------
+        epsabs : float, optional
+            Absolute error tolerance. If None, the scipy default (1.49e-8) is used.
+            The default is None.
+        epsrel : float, optional
+            Relative error tolerance. If None, the scipy default (1.49e-8) is used.
+            The default is None.
+        limit : int, optional
+            Maximum number of subintervals of the adaptive quadrature. If None, 
+            the scipy default is used. The default is None.
+
+        Returns
+        -------
+        dict
+            The integration options in use.
+
+        """
+        return self._set_integration_tolerance(epsabs=epsabs, epsrel=epsrel, limit=limit)
+
+    def set_integration_backend(self, backend:str='quad', n_nodes:int=64):
+        """
+        This function sets the integration backend of the scattering integrals
+        (interface roughness, dislocation, deformation potential and piezoelectric
+        scattering) of the sheet mobility.
+
+        'quad' : adaptive scipy quad per composition (default). The tolerances
+            are set by set_integration_tolerance().
+        'fixed_node' : Gauss-Legendre quadrature (n_nodes nodes, substitution
+            x = sin(theta)) of all the compositions at once. If numba is installed,
+            the kernels are JIT compiled into parallel loops and cached on disk
+            (first call compiles). Otherwise, numpy broadcasting is used.
+            The error estimate (return_errors=True) is the difference to the
+            n_nodes/2 rule, which is conservative. With 64 nodes the results agree
+            with 'quad' to ~1e-12 relative.
+        Set the environment variable MOBILITYPY_DISABLE_JIT=1 to disable numba.
+
+        Parameters
+        ----------
+        backend : str ['quad', 'fixed_node'], optional
+            The integration backend. The default is 'quad'.
+        n_nodes : int, optional
+            Number of quadrature nodes of the 'fixed_node' backend. The default is 64.
+
+        Returns
+        -------
+        dict
+            The integration backend in use.
+
+        """
+        return self._set_integration_backend(backend=backend, n_nodes=n_nodes)
+
+    def calculate_sheet_mobility(self, n_2d=10, rms_roughness=0.1, corr_len=1,
                                  n_dis=1, f_dis=0.1, T=300, 
                                  alloy_disordered_effect:bool=False,
                                  interface_roughness_effect:bool=False,
@@ -226,7 +334,11 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
                                  total_mobility:bool=True,
                                  calculate_total_mobility_only:bool=False,
                                  return_sc_rates:bool=False,
-                                 mobility_model='v2'):
+                                 mobility_model='v2',
+                                 return_errors:bool=False,
+                                 collect_diagnostics:bool=False,
+                                 jacobian_params=None,
+                                 return_dataframe:bool=True):
         """
         This function calculates the sheet mobility from different scattering contributions.
         The mobility models are implemented based on the following references.
@@ -324,12 +436,42 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
             'v2':
                 Here, the dislocation scattering includes scattering from threading edge dislocation
                 charge line plus scattering from strain field from threading edge dislocations.
+        return_errors : bool, optional
+            Return the absolute numerical (quadrature) error estimates of the mobilities in
+            '<mechanism>_err' columns (unit: cm^2 V^-1 S^-1), e.g. 'IFR_err'. The errors of AP
+            and TOT are propagated from the individual contributions. Closed-form contributions
+            (AD, POP) have zero numerical error. See set_integration_tolerance().
+            The default is False.
+        collect_diagnostics : bool, optional
+            Collect a compact diagnostics table (MobilityResults; one row per composition) 
+            in results.attrs['diagnostics'] with columns: comp, n_2d (10^12 cm^-2), 
+            k_F (1e6 cm^-1), b (1e6 cm^-1), q_TF_by_2k_F, k_pop (1e6 cm^-1) and the relative
+            quadrature error estimates '<mechanism>_rel_err' of the integrated mechanisms. 
+            Cheaper than print_log for large sweeps. The default is False.
+        jacobian_params : list of str, optional
+            Also calculate the derivatives of the mobilities with respect to these inputs,
+            in the same pass: 'comp', 'n_2d', 'rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T'
+            or alloy parameter names (e.g. 'carrier_effective_mass', see get_alloy_params()).
+            The derivatives are calculated with the complex-step (forward-mode) method
+            through the scattering rates and the fixed-node quadrature of the scattering
+            integrals, i.e. without finite difference errors. The n_2d derivative is with 
+            respect to the carrier density of the same composition. Alloy parameter 
+            derivatives keep the other (also derived) alloy parameters fixed, 'comp' 
+            derivatives include the composition dependence of all alloy parameters.
+            The default is None.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults (contiguous float64 columns; use .to_pandas() or .to_numpy()
+            to convert). The default is True.
 
         Returns
         -------
-        pandas dataframe with compositions and mobility (unit: cm^2 V^-1 S^-1) columns.
+        pandas dataframe (or MobilityResults) with compositions and mobility (unit: cm^2 V^-1 S^-1) columns.
             Total (or individual contributions) sheet mobility. If return_sc_rates=True,
             then scattering rates (10^12 s^-1) and m_star_by_e (10^-12 V.m^-2.s^2) are also returned.
+            If return_errors=True, the mobility error estimates are also returned.
+            If jacobian_params is given, the derivatives (unit: cm^2 V^-1 S^-1 per parameter
+            unit) are returned in 'd<mechanism>/d<parameter>' columns, e.g. 'dTOT/dT'.
 
         """
 
@@ -343,9 +485,766 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
         self.only_total_mobility = calculate_total_mobility_only
         self.total_mobility_=total_mobility
         self.mobility_model_=mobility_model
-        return self._calculate_sheet_mobility(n_2d=n_2d, rms_roughness=rms_roughness, 
-                                              corr_len=corr_len, n_dis=n_dis, f_dis=f_dis, 
-                                              T=T, return_sc_rates=return_sc_rates)
+        call_args = {'n_2d': n_2d, 'rms_roughness': rms_roughness, 'corr_len': corr_len,
+                     'n_dis': n_dis, 'f_dis': f_dis, 'T': T, 'return_sc_rates': return_sc_rates,
+                     'return_errors': return_errors, 'collect_diagnostics': collect_diagnostics,
+                     'jacobian_params': jacobian_params}
+        effect_flags = self._effect_flags(locals(), 'total_mobility', 
+                                          'calculate_total_mobility_only')
+        mobility = self._cached_call('calculate_sheet_mobility', {**call_args, **effect_flags},
+                                     lambda: self._calculate_sheet_mobility(**call_args))
+        return mobility.to_pandas() if return_dataframe else mobility
+
+    def submit_sheet_mobility(self, executor='thread', chunk_size:int=None, **kwargs):
+        """
+        This function runs calculate_sheet_mobility() in a managed thread or process
+        pool and returns immediately. The compositions are split into chunks, every
+        chunk is one job of the pool, so independent calculations overlap and a
+        cancelled calculation stops after the running chunks.
+
+        Example:
+            future = mob.submit_sheet_mobility(n_2d=10, alloy_disordered_effect=True)
+            ...
+            mu = future.result()   # or future.cancel()
+
+        Parameters
+        ----------
+        executor : str or concurrent.futures.Executor, optional [options: 'thread', 'process']
+            'thread': shared thread pool. 'process': shared process pool (the carrier
+            is pickled to the spawned workers, i.e. scripts need the 
+            if __name__ == '__main__': guard). Or a user executor. The default is 'thread'.
+        chunk_size : int, optional
+            Number of compositions per job. The default is None, i.e. two jobs per
+            worker of the pool.
+        **kwargs : 
+            The inputs of calculate_sheet_mobility().
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the calculate_sheet_mobility() results (pandas dataframe or 
+            MobilityResults).
+
+        """
+        from .src._async_jobs import _submit
+        return _submit(self, 'calculate_sheet_mobility', kwargs, executor=executor, chunk_size=chunk_size)
+
+    async def calculate_sheet_mobility_async(self, executor='thread', chunk_size:int=None, **kwargs):
+        """
+        This function is the asyncio counterpart of calculate_sheet_mobility(): the
+        calculation runs in the pool (see submit_sheet_mobility()) while the event 
+        loop stays responsive. Cancelling the task cancels the calculation. 
+
+        Example:
+            mu_300K, mu_400K = await asyncio.gather(mob.calculate_sheet_mobility_async(T=300),
+                                                    mob.calculate_sheet_mobility_async(T=400))
+
+        Parameters and returns are same as in submit_sheet_mobility() and 
+        calculate_sheet_mobility().
+        """
+        import asyncio
+        return await asyncio.wrap_future(self.submit_sheet_mobility(executor=executor, chunk_size=chunk_size,
+                                                                    **kwargs))
+    def sheet_mobility_evaluator(self, alloy_disordered_effect:bool=False,
+                                 interface_roughness_effect:bool=False,
+                                 dislocation_effect:bool=False,
+                                 deformation_potential_effect:bool=False, 
+                                 piezoelectric_effect:bool=False,
+                                 acoustic_phonon_effect:bool=False,
+                                 polar_optical_phonon_effect:bool=False,
+                                 total_mobility:bool=True,
+                                 calculate_total_mobility_only:bool=False,
+                                 mobility_model='v2'):
+        """
+        This function returns a stateful sheet mobility evaluator for repeated 
+        calculations where only some inputs change between the calls (e.g. fitting
+        n_dis, rms_roughness or T). The evaluator caches the scattering rates per
+        mechanism and recomputes only the mechanisms that depend on the changed
+        inputs:
+            AD         : n_2d
+            IFR        : n_2d, rms_roughness, corr_len
+            DIS        : n_2d, n_dis, f_dis
+            DIS_Strain : n_2d, n_dis
+            POP, DP, PE: n_2d, T
+        
+        Example:
+            evaluator = mob.sheet_mobility_evaluator(interface_roughness_effect=True,
+                                                     dislocation_effect=True)
+            mu = evaluator.evaluate(n_2d=10, n_dis=1)
+            mu = evaluator.evaluate(n_2d=10, n_dis=2) # only DIS, DIS_Strain recomputed
+
+        Parameters
+        ----------
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+
+        Returns
+        -------
+        SheetMobilityEvaluator
+            Use evaluator.evaluate(n_2d=..., rms_roughness=..., corr_len=..., 
+            n_dis=..., f_dis=..., T=...) to calculate the sheet mobility. The 
+            inputs can be scalars or 1D arrays (one value per composition).
+
+        """
+        return SheetMobilityEvaluator(self, alloy_disordered_effect=alloy_disordered_effect,
+                                      interface_roughness_effect=interface_roughness_effect,
+                                      dislocation_effect=dislocation_effect,
+                                      deformation_potential_effect=deformation_potential_effect,
+                                      piezoelectric_effect=piezoelectric_effect,
+                                      acoustic_phonon_effect=acoustic_phonon_effect,
+                                      polar_optical_phonon_effect=polar_optical_phonon_effect,
+                                      total_mobility=total_mobility,
+                                      calculate_total_mobility_only=calculate_total_mobility_only,
+                                      mobility_model=mobility_model)
+
+    def rescale(self, results, return_dataframe:bool=True, **new_params):
+        """
+        This function recalculates the sheet mobilities for new values of the 
+        parameters that enter the scattering rates only as prefactors, from results
+        calculated with return_sc_rates=True. This is pure array arithmetic (no 
+        integration), so dislocation or roughness scans are almost free.
+            IFR           ~ rms_roughness^2
+            DIS           ~ n_dis * f_dis^2
+            DIS_Strain    ~ n_dis
+            AD            ~ sc_potential^2 (alloy scattering potential)
+            DP, PE, AP    ~ T
+        The total mobility is updated using Matthiessen's rule. Rescaling T is not
+        possible if polar optical phonon scattering is included (non-linear in T).
+        
+        Example:
+            mu = mob.calculate_sheet_mobility(n_2d=10, dislocation_effect=True, 
+                                              interface_roughness_effect=True,
+                                              return_sc_rates=True)
+            mu_scan = mob.rescale(mu, n_dis=np.logspace(-2, 2, 50))
+
+        Parameters
+        ----------
+        results : pandas dataframe or MobilityResults
+            Results of calculate_sheet_mobility(..., return_sc_rates=True).
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+        **new_params : float or 1D float array
+            New values of rms_roughness (nm), n_dis (10^8 cm^-2), f_dis, T (K) 
+            and/or sc_potential (eV, same for all compositions). Arrays should have 
+            same length K; the results are then repeated for every value 
+            (K blocks of rows) and the new parameters are added as columns.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults) 
+            Rescaled mobilities (and scattering rates, error estimates if present).
+
+        """
+        if not isinstance(results, MobilityResults):
+            results = MobilityResults.from_pandas(results, attrs=results.attrs)
+        rescaled = self._rescale_sheet_mobility(results, **new_params)
+        return rescaled.to_pandas() if return_dataframe else rescaled
+
+    def build_surrogate(self, param_ranges:dict, mechanism:str='TOT',
+                        fixed_params:dict=None, log_scale=('n_2d', 'n_dis'),
+                        target_rel_error:float=1e-3, n_holdout:int=64,
+                        max_nodes_per_param:int=65, max_grid_points:int=20000,
+                        seed=0, alloy_disordered_effect:bool=False,
+                        interface_roughness_effect:bool=False,
+                        dislocation_effect:bool=False,
+                        deformation_potential_effect:bool=False,
+                        piezoelectric_effect:bool=False,
+                        acoustic_phonon_effect:bool=False,
+                        polar_optical_phonon_effect:bool=False,
+                        mobility_model='v2'):
+        """
+        This function builds a fast surrogate model of the sheet mobility over the
+        requested parameter ranges, e.g. for device simulations that need the
+        mobility millions of times inside a solver loop.
+
+        log(mobility) is interpolated with tensor-product Chebyshev polynomials
+        on nested Chebyshev-Lobatto grids. The parameter with the largest trailing
+        Chebyshev coefficients is refined (n -> 2n-1 nodes, all previous samples
+        are reused) until the maximum relative error on n_holdout random held-out
+        points is below target_rel_error. The reached error is stored in
+        surrogate.max_rel_error (surrogate.metadata has the details). The
+        material parameters, strain and integration settings of this instance
+        are used.
+
+        Example:
+            surrogate = mob.build_surrogate({'comp': (0.1, 0.5), 'n_2d': (1, 20),
+                                             'T': (200, 500)},
+                                            interface_roughness_effect=True,
+                                            acoustic_phonon_effect=True,
+                                            polar_optical_phonon_effect=True)
+            mu = surrogate(comp=0.3, n_2d=np.linspace(1, 20, 1000), T=300)
+            surrogate.save('mu_surrogate.npz')
+            surrogate = MobilitySurrogate.load('mu_surrogate.npz')
+
+        Parameters
+        ----------
+        param_ranges : dict
+            (lower, upper) ranges of the surrogate parameters. Any of 'comp', 'n_2d',
+            'rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T' (units as in
+            calculate_sheet_mobility()).
+        mechanism : str, optional
+            Mobility column to interpolate, e.g. 'TOT', 'IFR'. The default is 'TOT'.
+        fixed_params : dict, optional
+            Values of the other parameters. Missing parameters take the defaults of
+            calculate_sheet_mobility(). If 'comp' is not in param_ranges, the
+            composition is taken from fixed_params or from this instance (should
+            have a single composition). The default is None.
+        log_scale : tuple of str, optional
+            Parameters that are interpolated in log10 scale.
+            The default is ('n_2d', 'n_dis').
+        target_rel_error : float, optional
+            Target maximum relative error on the held-out points. The default is 1e-3.
+        n_holdout : int, optional
+            Number of random held-out points. The default is 64.
+        max_nodes_per_param : int, optional
+            Maximum number of nodes per parameter. The default is 65.
+        max_grid_points : int, optional
+            Maximum number of grid points (physics evaluations). If the target is
+            not reached within the limits, a warning is logged and the best
+            surrogate is returned (surrogate.metadata['converged'] is False).
+            The default is 20000.
+        seed : int, optional
+            Seed of the held-out points. The default is 0.
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+
+        Returns
+        -------
+        MobilitySurrogate
+            Picklable callable surrogate(comp=..., n_2d=..., ...) -> mobility
+            (cm^2 V^-1 S^-1). NaN outside the parameter ranges.
+
+        """
+        effect_flags = self._effect_flags(locals())
+        builder = _SheetMobilitySurrogateBuilder(self, param_ranges, mechanism=mechanism,
+                                                 fixed_params=fixed_params,
+                                                 sheet_mobility_kwargs=effect_flags,
+                                                 log_scale=log_scale,
+                                                 target_rel_error=target_rel_error,
+                                                 n_holdout=n_holdout,
+                                                 max_nodes_per_param=max_nodes_per_param,
+                                                 max_grid_points=max_grid_points, seed=seed)
+        return builder.build()
+
+    def fit_sheet_mobility(self, n_2d, T, mobility, fit_params:dict, sigma=None,
+                           rms_roughness=0.1, corr_len=1, n_dis=1, f_dis=0.1,
+                           alloy_disordered_effect:bool=False,
+                           interface_roughness_effect:bool=False,
+                           dislocation_effect:bool=False,
+                           deformation_potential_effect:bool=False,
+                           piezoelectric_effect:bool=False,
+                           acoustic_phonon_effect:bool=False,
+                           polar_optical_phonon_effect:bool=False,
+                           mobility_model='v2', integration_backend:str='fixed_node',
+                           **least_squares_options):
+        """
+        This function fits the total sheet mobility to measured (e.g. Hall) mobilities
+        using bounded nonlinear least squares (scipy.optimize.least_squares).
+        The fit parameters can be rms_roughness, corr_len, n_dis, f_dis and 
+        material parameters of the alloy (names as in alloy_params_, e.g. 
+        'alloy_scattering_potential', 'CB_deformation_potential').
+        This instance should have a single composition.
+
+        The forward model calculates every T-dependent (phonon) rate only once.
+        rms_roughness, n_dis, f_dis and the material prefactors of AD, DP, PE and
+        DIS_Strain (alloy_scattering_potential, CB_deformation_potential, mass_density,
+        LA_phonon_velocity, electromechanical_coupling_const) rescale the cached rates
+        without any integration. corr_len recalculates the IFR integrals only.
+        Other material parameters recalculate all the rates.
+
+        Example:
+            fit = mob.fit_sheet_mobility(n_2d_meas, T_meas, mu_meas,
+                                         {'rms_roughness': (0.2, 0.01, 2),
+                                          'corr_len': (2, 0.1, 20), 'n_dis': 1},
+                                         interface_roughness_effect=True,
+                                         dislocation_effect=True,
+                                         acoustic_phonon_effect=True,
+                                         polar_optical_phonon_effect=True)
+            fit['params'], fit['uncertainties']
+
+        Parameters
+        ----------
+        n_2d : 1D float array (unit: 10^12 cm^-2)
+            Carrier densities of the measurements.
+        T : float or 1D float array (unit: K)
+            Temperatures of the measurements.
+        mobility : 1D float array (unit: cm^2 V^-1 S^-1)
+            Measured mobilities.
+        fit_params : dict
+            Fit parameters: initial value (bounds (0, inf)) or (initial, lower, upper).
+        sigma : float or 1D float array, optional
+            Absolute uncertainties of the measured mobilities. If None, relative
+            residuals are minimized and the covariance is scaled with the reduced 
+            chi^2. The default is None.
+        rms_roughness, corr_len, n_dis, f_dis : float, optional
+            Values of the parameters that are not fitted. Same as in 
+            calculate_sheet_mobility().
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+        integration_backend : str, optional
+            Integration backend of the forward model. See set_integration_backend().
+            The default is 'fixed_node'.
+        **least_squares_options : optional
+            Passed to scipy.optimize.least_squares (e.g. xtol, ftol, max_nfev).
+
+        Returns
+        -------
+        dict
+            'params', 'uncertainties' (1 sigma standard errors): dict of the fitted values.
+            'covariance': covariance matrix (order of 'param_names').
+            'chi2', 'residuals', 'success', 'message', 'n_evaluations'.
+            'mobility': MobilityResults with n_2d, T, mu_measured and mu_fit columns.
+
+        """
+        effect_flags = self._effect_flags(locals())
+        fixed_params = {'rms_roughness': rms_roughness, 'corr_len': corr_len,
+                        'n_dis': n_dis, 'f_dis': f_dis}
+        fitter = _SheetMobilityFit(self, n_2d, T, mobility, fit_params, sigma=sigma,
+                                   fixed_params=fixed_params, effect_flags=effect_flags,
+                                   integration_backend=integration_backend)
+        return fitter.fit(**least_squares_options)
+
+    def adaptive_sheet_mobility(self, sample_ranges:dict, n_2d=10, rms_roughness=0.1,
+                                corr_len=1, n_dis=1, f_dis=0.1, T=300,
+                                alloy_disordered_effect:bool=False,
+                                interface_roughness_effect:bool=False,
+                                dislocation_effect:bool=False,
+                                deformation_potential_effect:bool=False,
+                                piezoelectric_effect:bool=False,
+                                acoustic_phonon_effect:bool=False,
+                                polar_optical_phonon_effect:bool=False,
+                                total_mobility:bool=True,
+                                mobility_model='v2', columns=None,
+                                log_scale=('n_2d', 'n_dis'), n_initial:int=9,
+                                max_rel_change:float=0.05, curvature_tol:float=1e-3,
+                                max_points:int=2000, return_dataframe:bool=True):
+        """
+        This function calculates the sheet mobility curve (one sampled parameter) or 
+        map (two sampled parameters) on an adaptively refined grid. Starting from
+        n_initial equidistant points per parameter, an interval is bisected where the
+        relative change of any tracked mobility (see columns) exceeds max_rel_change 
+        or its curvature (deviation of log(mobility) from linear interpolation) exceeds
+        curvature_tol. Smooth regions get few points, sharp features get many, so far
+        fewer calculations are needed than on a fine uniform grid.
+
+        Example:
+            mu = mob.adaptive_sheet_mobility({'comp': (0, 1)}, n_2d=10,
+                                             alloy_disordered_effect=True,
+                                             acoustic_phonon_effect=True)
+            mu = mob.adaptive_sheet_mobility({'comp': (0, 1), 'T': (100, 600)}, ...)
+
+        Parameters
+        ----------
+        sample_ranges : dict
+            (lower, upper) ranges of the sampled parameters (one or two of 'comp',
+            'n_2d', 'rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T'). If 'comp'
+            is not sampled, this instance should have a single composition.
+        n_2d, rms_roughness, corr_len, n_dis, f_dis, T : float, optional
+            Values of the parameters that are not sampled. Same as in
+            calculate_sheet_mobility().
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+        columns : list of str, optional
+            Mobility columns that control the refinement, e.g. ['TOT', 'AD']. If None,
+            the total mobility ['TOT'] is used if total_mobility=True (the individual
+            mechanisms, e.g. alloy disorder near the binaries, may diverge at the range
+            ends and would refine there needlessly), otherwise all the calculated 
+            mobilities. The default is None.
+        log_scale : tuple of str, optional
+            Sampled parameters that are refined in log10 scale. 
+            The default is ('n_2d', 'n_dis').
+        n_initial : int, optional
+            Initial number of points per sampled parameter. The default is 9.
+        max_rel_change : float, optional
+            Maximum relative change of the mobilities between neighbour points.
+            The default is 0.05.
+        curvature_tol : float, optional
+            Maximum deviation of log(mobility) from the linear interpolation of 
+            the neighbour points. The default is 1e-3.
+        max_points : int, optional
+            Maximum number of grid points. The default is 2000.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            Mobilities (unit: cm^2 V^-1 S^-1) and the sampled parameter columns, 
+            sorted by the sampled parameters (C-order grid for two parameters).
+            attrs['grid_shape'] and attrs['n_evaluations'] give the grid size and 
+            the number of calculated points.
+
+        """
+        fixed_params = {'n_2d': n_2d, 'rms_roughness': rms_roughness, 'corr_len': corr_len,
+                        'n_dis': n_dis, 'f_dis': f_dis, 'T': T}
+        effect_flags = self._effect_flags(locals(), 'total_mobility')
+        if columns is None and total_mobility: columns = ['TOT']
+        mobility = self._adaptive_sample('calculate_sheet_mobility', 'n_2d', sample_ranges,
+                                         fixed_params, effect_flags, log_scale=log_scale,
+                                         columns=columns, n_initial=n_initial,
+                                         max_rel_change=max_rel_change,
+                                         curvature_tol=curvature_tol, max_points=max_points)
+        return mobility.to_pandas() if return_dataframe else mobility
+
+    def monte_carlo_uncertainty(self, distributions:dict, n_samples:int=1000, n_2d=10,
+                                rms_roughness=0.1, corr_len=1, n_dis=1, f_dis=0.1, T=300,
+                                alloy_disordered_effect:bool=False,
+                                interface_roughness_effect:bool=False,
+                                dislocation_effect:bool=False,
+                                deformation_potential_effect:bool=False,
+                                piezoelectric_effect:bool=False,
+                                acoustic_phonon_effect:bool=False,
+                                polar_optical_phonon_effect:bool=False,
+                                total_mobility:bool=True, mobility_model='v2',
+                                figure_of_merit:bool=True, quantiles=(0.025, 0.5, 0.975),
+                                chunk_size:int=256, seed=None, 
+                                integration_backend:str='fixed_node',
+                                return_dataframe:bool=True):
+        """
+        This function propagates the uncertainties of the material database parameters
+        (e.g. effective mass, alloy scattering potential, deformation potential, e_ij, 
+        C_ij, phonon energies) to the sheet mobilities (and LFOM) by Monte Carlo 
+        sampling. The samples are evaluated in chunks of chunk_size samples, each 
+        chunk in one call of the alloy parameter and mobility calculations. Only 
+        streaming summary statistics are kept, so 10^4-10^5 samples fit in memory.
+        The quantiles are estimated from per point histograms (2048 bins, log scale),
+        i.e. with ~0.1% relative resolution for typical mobility spreads.
+
+        Example:
+            from scipy import stats
+            mc = mob.monte_carlo_uncertainty(
+                    {'AlN': {'carrier_effective_mass': stats.norm(0.32, 0.02)},
+                     'GaN': {'CB_deformation_potential': stats.uniform(8, 2)}},
+                    n_samples=10000, n_2d=10, alloy_disordered_effect=True,
+                    acoustic_phonon_effect=True, polar_optical_phonon_effect=True)
+            mc['TOT_q0.025'], mc['TOT_q0.975'] # 95% band
+
+        Parameters
+        ----------
+        distributions : dict
+            {material: {parameter: distribution}}. material is one of the binaries
+            or the alloy name (bowing parameters, e.g. 'AlGaN'). The distribution
+            is a frozen scipy.stats distribution or a callable f(rng, size) 
+            returning the samples.
+        n_samples : int, optional
+            Number of Monte Carlo samples. The default is 1000.
+        n_2d, rms_roughness, corr_len, n_dis, f_dis, T : optional
+            Same as in calculate_sheet_mobility().
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+        figure_of_merit : bool, optional
+            Also sample the lateral figure-of-merit (column 'LFOM', unit: MW/cm^2, 
+            from the total mobility, see calculate_figure_of_merit()). 
+            Needs total_mobility=True. The default is True.
+        quantiles : tuple of float, optional
+            Reported quantiles. The default is (0.025, 0.5, 0.975).
+        chunk_size : int, optional
+            Number of samples per calculation call. The default is 256.
+        seed : int, optional
+            Random seed. Same seed and chunk_size reproduce the results. 
+            The default is None.
+        integration_backend : str, optional
+            Integration backend of the sampled calculations. See 
+            set_integration_backend(). The default is 'fixed_node'.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            One row per composition: 'comp', 'n_2d' and for every mobility (and LFOM)
+            column '<column>_mean', '<column>_std', '<column>_q<quantile>', e.g.
+            'TOT_mean', 'TOT_q0.975'. attrs has 'n_samples', 'quantiles' and 
+            'sampled_params' (MobilityResults only).
+
+        """
+        calculate_kwargs = self._effect_flags(locals(), 'rms_roughness', 'corr_len', 
+                                              'n_dis', 'f_dis', 'T', 'total_mobility')
+        if figure_of_merit and not total_mobility:
+            raise ValueError('figure_of_merit needs total_mobility=True.')
+        def postprocess(carrier, results, density):
+            if figure_of_merit:
+                results['LFOM'] = carrier._calculate_figure_of_merit(density, results['TOT'], 
+                                                                     temp=T, mode='LFOM')
+        carrier = self._carrier_at_compositions(self.comps_)
+        carrier._set_integration_backend(integration_backend, 
+                                         n_nodes=self.integration_backend_['n_nodes'])
+        sampler = _MonteCarloUncertainty(carrier, 'calculate_sheet_mobility', 'n_2d', n_2d,
+                                         distributions, calculate_kwargs, n_samples=n_samples,
+                                         chunk_size=chunk_size, quantiles=quantiles, seed=seed,
+                                         postprocess=postprocess)
+        mobility = sampler.run()
+        return mobility.to_pandas() if return_dataframe else mobility
+
+    def sobol_indices(self, param_ranges:dict, n_samples:int=1024, n_2d=10, 
+                      rms_roughness=0.1, corr_len=1, n_dis=1, f_dis=0.1, T=300,
+                      alloy_disordered_effect:bool=False,
+                      interface_roughness_effect:bool=False,
+                      dislocation_effect:bool=False,
+                      deformation_potential_effect:bool=False,
+                      piezoelectric_effect:bool=False,
+                      acoustic_phonon_effect:bool=False,
+                      polar_optical_phonon_effect:bool=False,
+                      total_mobility:bool=True, mobility_model='v2', log_scale=(),
+                      chunk_size:int=256, seed=None, integration_backend:str='fixed_node',
+                      return_dataframe:bool=True):
+        """
+        This function calculates the variance based global sensitivity indices 
+        (Sobol indices) of the sheet mobilities at every composition (and carrier 
+        density) point. The inputs in param_ranges are sampled independently and
+        uniformly (log-uniformly for log_scale) in their ranges; the others are 
+        fixed. 
+            First order index S1: fraction of the mobility variance caused by the
+                input alone.
+            Total order index ST: fraction of the mobility variance caused by the 
+                input including all its interactions with the other inputs.
+        The indices are estimated with Saltelli sampling (scrambled Sobol sequence)
+        with N(k+2) sheet mobility calculations per point (N: n_samples, k: number 
+        of inputs), evaluated in chunks of chunk_size*(k+2) samples per call. The
+        statistical error of the indices decreases ~1/N.
+
+        Example:
+            si = mob.sobol_indices({'rms_roughness': (0.1, 0.5), 'n_dis': (0.1, 10),
+                                    'AlGaN:alloy_scattering_potential': (0.5, 2)},
+                                   n_samples=2048, log_scale=['n_dis'], n_2d=10,
+                                   alloy_disordered_effect=True, dislocation_effect=True,
+                                   interface_roughness_effect=True)
+            si[['comp', 'TOT_S1_rms_roughness', 'TOT_ST_rms_roughness']]
+
+        Parameters
+        ----------
+        param_ranges : dict
+            {input: (low, high)}. Inputs: 'n_2d', 'rms_roughness', 'corr_len', 'n_dis',
+            'f_dis', 'T' or material database parameters '<material>:<parameter>', 
+            e.g. 'AlN:carrier_effective_mass', 'GaN:CB_deformation_potential' (the 
+            material is one of the binaries or the alloy name for the bowing parameters).
+        n_samples : int, optional
+            Number of base samples N (rounded up to a power of 2). The default is 1024.
+        n_2d, rms_roughness, corr_len, n_dis, f_dis, T : optional
+            Fixed values of the inputs that are not sampled. Same as in 
+            calculate_sheet_mobility().
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+        log_scale : sequence of str, optional
+            Inputs sampled uniformly in log scale (e.g. 'n_dis'). The default is ().
+        chunk_size : int, optional
+            Number of base samples per calculation call (rounded up to a power of 2).
+            The default is 256.
+        seed : int, optional
+            Seed of the Sobol sequence scrambling. Same seed reproduces the results.
+            The default is None.
+        integration_backend : str, optional
+            Integration backend of the sampled calculations. See 
+            set_integration_backend(). The default is 'fixed_node'.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            One row per point: 'comp', 'n_2d' (if not sampled) and for every mobility 
+            column and input '<column>_S1_<input>', '<column>_ST_<input>', e.g.
+            'TOT_ST_n_dis'. attrs has 'n_samples', 'n_evaluations' and 
+            'sampled_params' (MobilityResults only).
+
+        """
+        calculate_kwargs = self._effect_flags(locals(), 'rms_roughness', 'corr_len', 
+                                              'n_dis', 'f_dis', 'T', 'total_mobility')
+        carrier = self._carrier_at_compositions(self.comps_)
+        carrier._set_integration_backend(integration_backend, 
+                                         n_nodes=self.integration_backend_['n_nodes'])
+        analysis = _SobolSensitivity(carrier, 'calculate_sheet_mobility', 'n_2d', n_2d,
+                                     param_ranges, ('rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T'),
+                                     calculate_kwargs, n_samples=n_samples, log_scale=log_scale,
+                                     chunk_size=chunk_size, seed=seed)
+        indices = analysis.run()
+        return indices.to_pandas() if return_dataframe else indices
+
+    def design_sweep(self, param_ranges:dict, n_points:int=1024, method:str='sobol', 
+                     n_2d=10, rms_roughness=0.1, corr_len=1, n_dis=1, f_dis=0.1, T=300,
+                     alloy_disordered_effect:bool=False,
+                     interface_roughness_effect:bool=False,
+                     dislocation_effect:bool=False,
+                     deformation_potential_effect:bool=False,
+                     piezoelectric_effect:bool=False,
+                     acoustic_phonon_effect:bool=False,
+                     polar_optical_phonon_effect:bool=False,
+                     total_mobility:bool=True, mobility_model='v2', log_scale=(),
+                     seed:int=0, chunk_size:int=4096, store=None,
+                     integration_backend:str='fixed_node', return_dataframe:bool=True):
+        """
+        This function calculates the sheet mobilities at the points of a quasi-random 
+        or space-filling design of experiments (Sobol, Halton, Latin hypercube) over 
+        the input ranges. Unlike a full-factorial grid, the number of points does not 
+        grow exponentially with the number of inputs (e.g. a few thousand Sobol points
+        cover 7 inputs evenly). The design points are generated and calculated in
+        chunks of chunk_size points, every chunk in one call of the (row-wise) mobility 
+        calculation. With store, every chunk is saved to disk (see ResultStore) and 
+        restarting the same sweep (same inputs, seed and chunk_size) resumes from
+        the first missing chunk.
+
+        Example:
+            doe = mob.design_sweep({'comp': (0.5, 1), 'n_2d': (1, 20), 'T': (200, 500),
+                                    'rms_roughness': (0.1, 0.5), 'n_dis': (0.1, 10),
+                                    'f_dis': (0.05, 0.3), 'AlGaN:alloy_scattering_potential': (0.5, 2)},
+                                   n_points=4096, log_scale=['n_dis'], store='doe_store',
+                                   alloy_disordered_effect=True, interface_roughness_effect=True,
+                                   dislocation_effect=True, polar_optical_phonon_effect=True)
+
+        Parameters
+        ----------
+        param_ranges : dict
+            {input: (low, high)}. Inputs: 'comp', 'n_2d', 'rms_roughness', 'corr_len', 
+            'n_dis', 'f_dis', 'T' or material database parameters '<material>:<parameter>'
+            (see sobol_indices()). If 'comp' is not in the design, every design 
+            point is calculated at all the compositions of the instance.
+        n_points : int, optional
+            Number of design points. Powers of 2 for 'sobol'. The default is 1024.
+        method : str, optional [options: 'sobol', 'halton', 'lhs', 'random']
+            Design (see DesignSampler). The default is 'sobol'.
+        n_2d, rms_roughness, corr_len, n_dis, f_dis, T : optional
+            Fixed values of the inputs that are not in the design. Same as in 
+            calculate_sheet_mobility().
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+        log_scale : sequence of str, optional
+            Inputs sampled uniformly in log scale. The default is ().
+        seed : int, optional
+            Seed of the design. Same seed gives the same design. The default is 0.
+        chunk_size : int, optional
+            Number of design points per calculation call (and per stored chunk).
+            The default is 4096.
+        store : ResultStore or str/path, optional
+            Result store (or its directory) for the chunks. The default is None.
+        integration_backend : str, optional
+            Integration backend of the calculations. See set_integration_backend().
+            The default is 'fixed_node'.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            One row per design point (and composition): 'design_point' (index of the
+            design point), 'comp', 'n_2d', the other design inputs and the mobilities.
+
+        """
+        calculate_kwargs = self._effect_flags(locals(), 'rms_roughness', 'corr_len', 
+                                              'n_dis', 'f_dis', 'T', 'total_mobility')
+        design = DesignSampler(param_ranges, n_points=n_points, method=method, 
+                               log_scale=log_scale, seed=seed)
+        if store is not None and not isinstance(store, ResultStore): store = ResultStore(store)
+        carrier = self._carrier_at_compositions(self.comps_)
+        carrier._set_integration_backend(integration_backend, 
+                                         n_nodes=self.integration_backend_['n_nodes'])
+        mobility = carrier._design_sweep('calculate_sheet_mobility', 'n_2d', n_2d, design,
+                                         ('rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T'),
+                                         calculate_kwargs, chunk_size=chunk_size, store=store)
+        return mobility.to_pandas() if return_dataframe else mobility
+
+    def optimize_figure_of_merit(self, variable_ranges:dict, objective:str='LFOM', 
+                                 constraints:dict=None, n_2d=10, rms_roughness=0.1, 
+                                 corr_len=1, n_dis=1, f_dis=0.1, T=300,
+                                 alloy_disordered_effect:bool=False,
+                                 interface_roughness_effect:bool=False,
+                                 dislocation_effect:bool=False,
+                                 deformation_potential_effect:bool=False,
+                                 piezoelectric_effect:bool=False,
+                                 acoustic_phonon_effect:bool=False,
+                                 polar_optical_phonon_effect:bool=False,
+                                 mobility_model='v2', T_corect_bandgap:bool=False,
+                                 direct_bandgap:bool=True, n_coarse:int=64, n_starts:int=3,
+                                 xtol:float=1e-3, max_iter:int=200, seed:int=0,
+                                 integration_backend:str='fixed_node'):
+        """
+        This function finds the composition, carrier density (and/or temperature or
+        other sheet mobility inputs) that maximise the lateral figure-of-merit 
+        (LFOM, see calculate_figure_of_merit()) or minimise the sheet resistance 
+        (see calculate_sheet_resitance()) of the total sheet mobility, under 
+        constraints, e.g. a minimum bandgap or a maximum n_2d.
+        
+        The search starts with n_coarse quasi-random (Sobol) points over the
+        variable ranges and refines the n_starts best feasible points with a 
+        bounded compass search (the neighbours of all the starts are calculated 
+        in one vectorized call; the step is halved when the optimum is bracketed)
+        until the step is below xtol of the ranges. A 2 variable optimisation 
+        typically needs a few hundred mobility calculations, compared with ~10^6 
+        for a dense grid with the same resolution.
+
+        Example:
+            opt = mob.optimize_figure_of_merit({'comp': (0.5, 1), 'n_2d': (1, 20)},
+                                               constraints={'bandgap': (5, None)}, T=300,
+                                               alloy_disordered_effect=True,
+                                               interface_roughness_effect=True,
+                                               acoustic_phonon_effect=True,
+                                               polar_optical_phonon_effect=True)
+            opt['x'], opt['LFOM']
+
+        Parameters
+        ----------
+        variable_ranges : dict
+            {input: (low, high)} of the optimised inputs. Inputs: 'comp', 'n_2d', 
+            'rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T'. If 'comp' is not 
+            optimised, this instance should have a single composition.
+        objective : str, optional [options: 'LFOM', 'sheet_resistance']
+            Maximise LFOM (MW/cm^2) or minimise the sheet resistance (ohm/square).
+            The default is 'LFOM'.
+        constraints : dict, optional
+            {quantity: (low, high)}, None for no limit. Quantities: 'bandgap' (eV),
+            'mobility' (total mobility, cm^2 V^-1 s^-1), 'sheet_resistance', 'LFOM'
+            or the inputs (e.g. 'n_2d': (None, 15)). The default is None.
+        n_2d, rms_roughness, corr_len, n_dis, f_dis, T : optional
+            Fixed values of the inputs that are not optimised. Same as in 
+            calculate_sheet_mobility().
+        alloy_disordered_effect, ..., mobility_model : optional
+            Same as in calculate_sheet_mobility().
+        T_corect_bandgap, direct_bandgap : bool, optional
+            Same as in calculate_figure_of_merit() (direct_bandgap sets the 
+            critical electric field of the LFOM). T_corect_bandgap is also used 
+            for the bandgap constraint. The defaults are False and True.
+        n_coarse : int, optional
+            Number of coarse search points. The default is 64.
+        n_starts : int, optional
+            Number of refined coarse points (local optima). The default is 3.
+        xtol : float, optional
+            Final step relative to the variable ranges. The default is 1e-3.
+        max_iter : int, optional
+            Maximum number of refinement iterations. The default is 200.
+        seed : int, optional
+            Seed of the coarse points. The default is 0.
+        integration_backend : str, optional
+            Integration backend of the calculations. See set_integration_backend().
+            The default is 'fixed_node'.
+
+        Returns
+        -------
+        dict
+            'x': dict of the optimal inputs. 'value': the optimal objective.
+            'bandgap', 'mobility', 'sheet_resistance', 'LFOM' at the optimum.
+            'success', 'message', 'n_iterations', 'n_evaluations' (number of 
+            mobility calculations). 'evaluations': MobilityResults of all the 
+            calculated points (inputs, quantities and 'feasible').
+
+        """
+        effect_flags = self._effect_flags(locals())
+        fixed_inputs = {'n_2d': n_2d, 'rms_roughness': rms_roughness, 'corr_len': corr_len,
+                        'n_dis': n_dis, 'f_dis': f_dis, 'T': T}
+        carrier = self._carrier_at_compositions(self.comps_)
+        carrier._set_integration_backend(integration_backend, 
+                                         n_nodes=self.integration_backend_['n_nodes'])
+        optimizer = _FigureOfMeritOptimizer(carrier, variable_ranges, fixed_inputs, effect_flags,
+                                            objective=objective, constraints=constraints,
+                                            fom_options={'T_corect_bandgap': T_corect_bandgap,
+                                                         'direct_bandgap': direct_bandgap},
+                                            n_coarse=n_coarse, n_starts=n_starts, xtol=xtol,
+                                            max_iter=max_iter, seed=seed)
+        return optimizer.optimize()
+
     @staticmethod
     def sc_rate_2_mobility(mstar_by_e, scattering_rate):
         # Scattering rate to mobility calculation 
@@ -395,11 +1294,15 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
 
     def calculate_figure_of_merit(self, n_2d, mobility, temp:float=300,
                                    mode:str='LFOM', T_corect_bandgap:bool=False, 
-                                   direct_bandgap:bool=True, indirect_bandgap:bool=False):
+                                   direct_bandgap:bool=True, indirect_bandgap:bool=False,
+                                   comp=None):
         """
         This function calculates the figure-of-merit (FOM). Available FOMs are:
-            LFOM: Lateral figure-of-merit (LFOM = e*n_2d*mu*E_cr^2 ). Here, 
-                critical_electric_field is assumed related to bandgap following
+            LFOM: Lateral figure-of-merit (LFOM = e*n_2d*mu*E_cr^2, unit: MW/cm^2).
+            BFOM: Vertical (Baliga) figure-of-merit (BFOM = V_B^2/R_on,sp = 
+                eps_s*mu*E_cr^3/4, unit: MW/cm^2).
+            BHFFOM: Baliga high-frequency figure-of-merit (BHFFOM = mu*E_cr^2, unit: V/s).
+        Here, critical_electric_field is assumed related to bandgap following
                 Ref: J. L. Hudgins, G. S. Simin, E. Santi and M. A. Khan, 
                 "An assessment of wide bandgap semiconductors for power devices," 
                 in IEEE Transactions on Power Electronics, vol. 18, no. 3, pp. 907-914, 
@@ -407,16 +1310,23 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
         
                 direct_bandgap_critical_electric_field = 1.73e5*(bandgap_**2.5) # V/cm
                 indirect_bandgap_critical_electric_field = 2.38e5*(bandgap_**2) # V/cm
+        More FOMs can be added with mobilitypy.register_figure_of_merit().
+
+        The inputs are broadcasted. Without comp, the compositions of this instance
+        are along the first axis, e.g. a mobility map of shape (compositions, n_2d, T)
+        with n_2d of shape (1, n_2d, 1) and temp of shape (T,) gives the full FOM map
+        (temperature corrected bandgap with T_corect_bandgap=True) in one call. For
+        the rows of a sweep table see figure_of_merit_map().
 
         Parameters
         ----------
-        n_2d : 1D float array (unit: 10^12 cm^-2)
+        n_2d : float array (unit: 10^12 cm^-2)
             Array containing carrier density data.
-        mobility : 1D float array (unit: cm^2 V^-1 s^-1)
+        mobility : float array (unit: cm^2 V^-1 s^-1)
             Array containing mobility data.
-        temp : float, optional (unit: K)
+        temp : float or float array, optional (unit: K)
             Temperature for band gap correction. The default is 300K.
-        mode : str, optional (['LFOM'])
+        mode : str, optional (['LFOM', 'BFOM', 'BHFFOM'] or registered FOMs)
             The figure-of-merit name. The default is 'LFOM'.
         T_corect_bandgap : bool, optional
             Apply temperature correction to bandgap or not. The default is False.
@@ -424,17 +1334,145 @@ class Mobility2DCarrier(_MobilityCarrier, _Mobility2DCarrier):
             If the bandgap is direct bandgap or not. The default is True.
         indirect_bandgap : bool, optional
             If the bandgap is indirect bandgap or not. The default is False.
+        comp : float array, optional
+            Compositions of the data points (broadcastable with mobility), if 
+            they are not the compositions of this instance. The default is None.
 
         Returns
         -------
-        1D float array (unit: MW/cm^2)
+        float array (unit: MW/cm^2 for LFOM and BFOM)
             Figure-of-merit.
 
         """
         return self._calculate_figure_of_merit(n_2d, mobility, temp=temp, mode=mode,
                                                T_corect_bandgap=T_corect_bandgap,
                                                direct_bandgap=direct_bandgap, 
-                                               indirect_bandgap=indirect_bandgap)
+                                               indirect_bandgap=indirect_bandgap,
+                                               comp=comp)
+
+    def figure_of_merit_map(self, results, modes=('LFOM', 'BFOM', 'BHFFOM'), 
+                            mobility_column:str='TOT', n_2d=10, T=300,
+                            T_corect_bandgap:bool=False, direct_bandgap:bool=True,
+                            return_dataframe:bool=True):
+        """
+        This function calculates the sheet resistance and the figure-of-merits of 
+        all the rows of a mobility sweep (e.g. from calculate_sheet_mobility(), 
+        design_sweep() or ResultStore.load()) in one vectorized pass. The material
+        parameters are calculated once per unique composition, the (Varshni) 
+        bandgap temperature correction is applied per row.
+
+        Example:
+            mu = mob.design_sweep({'comp': (0.5, 1), 'n_2d': (1, 20), 'T': (200, 500)}, ...)
+            fom = mob.figure_of_merit_map(mu, T_corect_bandgap=True)
+
+        Parameters
+        ----------
+        results : pandas dataframe or MobilityResults
+            The sweep results with 'comp' and mobility_column columns, and 
+            optionally 'n_2d' and 'T' columns.
+        modes : sequence of str, optional
+            The figure-of-merits (see calculate_figure_of_merit()). 
+            The default is ('LFOM', 'BFOM', 'BHFFOM').
+        mobility_column : str, optional
+            The mobility column. The default is 'TOT'.
+        n_2d : float or float array, optional (unit: 10^12 cm^-2)
+            Carrier density if results has no 'n_2d' column. The default is 10.
+        T : float or float array, optional (unit: K)
+            Temperature if results has no 'T' column. The default is 300K.
+        T_corect_bandgap : bool, optional
+            Apply temperature correction to bandgap or not. The default is False.
+        direct_bandgap : bool, optional
+            If the bandgap is direct bandgap or not. The default is True.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            One row per results row: 'comp', 'n_2d', 'T', 'mobility', 'bandgap' (eV),
+            'critical_electric_field' (V/cm), 'sheet_resistance' (ohm/square) and 
+            the modes columns. The units of the modes are in attrs['units'] 
+            (MobilityResults only).
+
+        """
+        if not isinstance(results, MobilityResults): results = MobilityResults.from_pandas(results)
+        table = self._figure_of_merit_table(results['comp'], 
+                                            results['n_2d'] if 'n_2d' in results else n_2d,
+                                            results[mobility_column],
+                                            temp=results['T'] if 'T' in results else T, modes=modes,
+                                            T_corect_bandgap=T_corect_bandgap,
+                                            direct_bandgap=direct_bandgap)
+        return table.to_pandas() if return_dataframe else table
+
+    def pareto_front(self, results, objectives:dict=None, mobility_column:str='TOT',
+                     group_by=None, n_2d=10, T=300, T_corect_bandgap:bool=False,
+                     direct_bandgap:bool=True, return_dataframe:bool=True):
+        """
+        This function extracts the Pareto front (non-dominated set) of the design
+        objectives from mobility sweep results. The results can be given in chunks
+        (e.g. a ResultStore), only the current front is kept between the chunks.
+
+        Example:
+            mob.pareto_front(ResultStore('sweep'), objectives={'LFOM': 'max', 
+                             'sheet_resistance': 'min', 'bandgap': 'max',
+                             'thermal_stability': 'max'})
+
+        Parameters
+        ----------
+        results : pandas dataframe, MobilityResults, ResultStore or iterable of them
+            The sweep results with 'comp' and mobility_column columns, and 
+            optionally 'n_2d' and 'T' columns. A ResultStore is read chunk by chunk.
+        objectives : dict, optional
+            {objective: 'max' or 'min'}. The objectives are the results columns,
+            'bandgap', 'critical_electric_field', 'sheet_resistance', 'mobility',
+            the figure-of-merits (e.g. 'LFOM', 'BFOM', 'BHFFOM') and 'thermal_stability'.
+            With 'thermal_stability' the rows are grouped by the group_by inputs;
+            every group is one design point with the worst case of the objectives
+            over the temperatures and thermal_stability = min_T(mobility)/max_T(mobility).
+            A group should be within one chunk. The default is None, i.e. 
+            {'LFOM': 'max', 'sheet_resistance': 'min', 'bandgap': 'max'}.
+        mobility_column : str, optional
+            The mobility column. The default is 'TOT'.
+        group_by : sequence of str, optional
+            The input columns of a design point for the thermal stability. The 
+            default is None, i.e. all of 'comp', 'n_2d', 'rms_roughness', 'corr_len',
+            'n_dis', 'f_dis' and the material parameter columns in the results.
+        n_2d : float, optional (unit: 10^12 cm^-2)
+            Carrier density if results has no 'n_2d' column. The default is 10.
+        T : float, optional (unit: K)
+            Temperature if results has no 'T' column. The default is 300K.
+        T_corect_bandgap : bool, optional
+            Apply temperature correction to bandgap or not. The default is False.
+        direct_bandgap : bool, optional
+            If the bandgap is direct bandgap or not. The default is True.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            The non-dominated rows (groups) sorted by the first objective, best 
+            first. attrs has 'objectives', 'n_screened' and 'units'.
+
+        """
+        if objectives is None:
+            objectives = {'LFOM': 'max', 'sheet_resistance': 'min', 'bandgap': 'max'}
+        explorer = _ParetoFrontExplorer(self, objectives, mobility_column=mobility_column,
+                                        group_by=group_by, n_2d=n_2d, T=T,
+                                        T_corect_bandgap=T_corect_bandgap,
+                                        direct_bandgap=direct_bandgap)
+        if isinstance(results, (str, os.PathLike)): results = ResultStore(results)
+        if isinstance(results, ResultStore):
+            store = results
+            results = (store.read_chunk(chunk_id) for chunk_id in store.completed_chunks())
+        elif isinstance(results, MobilityResults) or hasattr(results, 'columns'):
+            results = [results]
+        for chunk in results:
+            explorer.update(chunk)
+        front = explorer.front()
+        return front.to_pandas() if return_dataframe else front
 
 #==============================================================================
 class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
@@ -495,7 +1533,11 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
             Carrier density below eps_n_3d will be considered as zero. 
             The default is 1e-14 1e18 cm^-2 == 1e4 cm^-2.
         print_log : string, optional => ['high','medium','low', None]
-            Determines the level of log to be printed. The default is None.
+            Determines the level of log to be printed (of this carrier only). The
+            diagnostics are sent to the 'mobilitypy' logger and printed to stdout 
+            unless logging is configured otherwise. 'low': one summary line per calculation,
+            'medium': + per composition and mechanism lines, 'high': + material
+            and derived parameters ('mobilitypy.params' logger). The default is None.
 
         Returns
         -------
@@ -509,6 +1551,75 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
                                   print_log=print_log, eps_n=eps_n_3d)
         _Mobility3DCarrier.__init__(self)
         
+    def enable_disk_cache(self, cache_dir=None, max_size_mb:float=512):
+        """
+        This function enables the opt-in persistent disk cache for the mobility 
+        calculations (calculate_3D_mobility and 
+        calculate_elec_props_from_3DEC). Repeated calls with identical inputs 
+        return the results from the cache.
+        
+        The cache key is a hash of the input arrays, all effect flags, the mobility
+        model, the alloy parameters, the material database snapshot and the package
+        version. The material database snapshot is hashed once here; call 
+        enable_disk_cache again after editing the material database in place. 
+        The cache size is limited and least recently used entries are 
+        evicted. The cache directory can be shared between processes.
+
+        Parameters
+        ----------
+        cache_dir : str/path, optional
+            The cache directory. If None, '~/.cache/mobilitypy' is used.
+            The default is None.
+        max_size_mb : float, optional (unit: MB)
+            Maximum size of the cache. The default is 512 MB.
+
+        Returns
+        -------
+        cache : disk cache instance
+            The cache. Use cache.clear() to remove all the entries.
+
+        """
+        return self._enable_disk_cache(cache_dir=cache_dir, max_size_mb=max_size_mb)
+    
+    def disable_disk_cache(self):
+        """
+        This function disables the disk cache. The cache files are kept.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._disable_disk_cache()
+        return
+    
+    def set_integration_tolerance(self, epsabs:float=None, epsrel:float=None, limit:int=None):
+        """
+        This function sets the error tolerances of the numerical integrations
+        (numerical Fermi-Dirac and dislocation integrals of calculate_3D_mobility). Looser tolerances are faster. Use return_errors=True to 
+        check that the numerical error estimates of all the points stay within 
+        the required tolerance.
+
+        Parameters
+        ----------
+        epsabs : float, optional
+            Absolute error tolerance. If None, the scipy default (1.49e-8) is used.
+            The default is None.
+        epsrel : float, optional
+            Relative error tolerance. If None, the scipy default (1.49e-8) is used.
+            The default is None.
+        limit : int, optional
+            Maximum number of subintervals of the adaptive quadrature. If None, 
+            the scipy default is used. The default is None.
+
+        Returns
+        -------
+        dict
+            The integration options in use.
+
+        """
+        return self._set_integration_tolerance(epsabs=epsabs, epsrel=epsrel, limit=limit)
+    
     def calculate_elec_props_from_3DEC(self, n_d, T:float=300, 
                                        inverse_half_FD_method:str='minimax_piecewise',
                                        return_dis_ints:bool=False):
@@ -573,13 +1684,15 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
         # Remove small values for the n_3d to avoid 0-division
         n_d_ = np.nan if (np.isscalar(n_d) and n_d < self.eps_n_3d) else\
             np.where(n_d < self.eps_n_3d, np.nan, n_d)   
-        return_vals = self._cal_elec_props_from_3DEC(n_d_, 
-                                                    self.alloy_params_.get('static_dielectric_constant'),
-                                                    self.alloy_params_.get('carrier_effective_mass'), 
-                                                    self.alloy_params_.get('PO_phonon_energy'),
-                                                    T,inv_half_FD_method=inverse_half_FD_method,
-                                                    return_dis_ints=return_dis_ints)
-        return return_vals
+        call_args = {'n_d': n_d_, 'T': T, 'inverse_half_FD_method': inverse_half_FD_method, 
+                     'return_dis_ints': return_dis_ints}
+        compute = lambda: self._cal_elec_props_from_3DEC(n_d_, 
+                                                         self.alloy_params_.get('static_dielectric_constant'),
+                                                         self.alloy_params_.get('carrier_effective_mass'), 
+                                                         self.alloy_params_.get('PO_phonon_energy'),
+                                                         T,inv_half_FD_method=inverse_half_FD_method,
+                                                         return_dis_ints=return_dis_ints)
+        return self._cached_call('calculate_elec_props_from_3DEC', call_args, compute)
     
     @staticmethod
     def calculate_FD_integrals(eta_f, FermiDirac_integration_order:str = 'zero', 
@@ -627,7 +1740,11 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
                               mobility_model_version:str='v1',
                               inverse_half_FD_method:str='minimax_piecewise',
                               FermiDirac_integration_approach:str='minimax_piecewise',
-                              carrier_degeneracy_limit:str='general'
+                              carrier_degeneracy_limit:str='general',
+                              return_errors:bool=False,
+                              collect_diagnostics:bool=False,
+                              jacobian_params=None,
+                              return_dataframe:bool=True
                               ):
         """
         This function calculates the mobility from different scattering contributions.
@@ -699,16 +1816,45 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
             is 'general'.
             NB: Degenerate and non-degenerate limits are only implemented for charge dislocation scattering.
             Contact developer to request for other scattering mechanisms.
+        return_errors : bool, optional
+            Return the absolute numerical (quadrature) error estimates of the mobilities in 
+            '<column>_err' columns (unit: cm^2 V^-1 S^-1), e.g. 'mu_DIS_TD_CHG_err'. The errors
+            of mu_TOT and mu_DIS_TD are propagated from the individual contributions. 
+            Analytical and approximation (minimax_piecewise, polylog) contributions have zero
+            numerical error. See set_integration_tolerance(). The default is False.
+        collect_diagnostics : bool, optional
+            Collect a compact diagnostics table (MobilityResults; one row per mobility point)
+            in results.attrs['diagnostics'] with columns: comp, n_3d (1e18 cm^-3), eta_f
+            (reduced Fermi energy) and the relative quadrature error estimates 
+            '<column>_rel_err' of the integrated mobilities. The default is False.
+        jacobian_params : list of str, optional
+            Also calculate the derivatives of the mobilities with respect to these inputs:
+            'comp', 'n_3d', 'n_dis', 'f_dis', 'n_ion_impurity', 'T' or alloy parameter names
+            (e.g. 'carrier_effective_mass', see get_alloy_params()). The n_dis, f_dis and 
+            n_ion_impurity derivatives are analytic (the mobilities are power laws of them).
+            The others are central differences of the vectorized calculation (relative
+            step 1e-5). The n_3d derivative is with respect to the carrier density of the
+            same point. Alloy parameter derivatives keep the other alloy parameters fixed.
+            The default is None.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe (pandas series if 
+            calculate_total_mobility_only=True, return_errors=False and jacobian_params=None). 
+            If False, the results are returned
+            as MobilityResults (contiguous float64 columns; use .to_pandas() or .to_numpy()
+            to convert). The default is True.
 
         Returns
         -------
-        Mobility: pandas dataframe of mobilities (unit: cm^2 V^-1 S^-1).
-            Total (or individual contributions) local carrier mobility.
+        Mobility: pandas dataframe (or MobilityResults) of mobilities (unit: cm^2 V^-1 S^-1).
+            Total (or individual contributions) local carrier mobility. If return_errors=True,
+            the mobility error estimates are also returned. If jacobian_params is given,
+            the derivatives (unit: cm^2 V^-1 S^-1 per parameter unit) are returned in 
+            'd<column>/d<parameter>' columns, e.g. 'dmu_TOT/dT'.
             
         """
-        if carrier_degeneracy_limit != 'general' and self.print_info is not None:
-            print('NB: Degenerate and non-degenerate limits are only implemented for dislocation scattering.')
-            print('Contact developer to request for other scattering mechanisms.')
+        if carrier_degeneracy_limit != 'general':
+            self.logger_.info('NB: Degenerate and non-degenerate limits are only implemented for dislocation scattering.\n'
+                              'Contact developer to request for other scattering mechanisms.')
         
         self.alloy_disordered_effect_=alloy_disordered_effect
         self.td_dislocation_chg_effect_=td_dislocation_chg_effect
@@ -723,8 +1869,325 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
         self.inverse_half_FD_method_ = inverse_half_FD_method 
         self.FD_int_approach_ = FermiDirac_integration_approach
         self.carrier_degenracy_limit_ = carrier_degeneracy_limit
-        return self._calculate_3d_mobility(n_3d=n_3d, n_dis=n_dis, n_ion_impurity=
-                                           n_ion_impurity, f_dis=f_dis, T=T)
+        call_args = {'n_3d': n_3d, 'n_dis': n_dis, 'n_ion_impurity': n_ion_impurity, 
+                     'f_dis': f_dis, 'T': T, 'return_errors': return_errors,
+                     'collect_diagnostics': collect_diagnostics, 'jacobian_params': jacobian_params}
+        effect_flags = self._effect_flags(locals(), 'calculate_total_mobility_only')
+        mobility = self._cached_call('calculate_3D_mobility', {**call_args, **effect_flags},
+                                     lambda: self._calculate_3d_mobility(**call_args))
+        if not return_dataframe: return mobility
+        if self.only_total_mobility and not return_errors and not jacobian_params: 
+            return mobility.to_pandas()['mu_TOT']
+        return mobility.to_pandas()
+
+    def submit_3D_mobility(self, executor='thread', chunk_size:int=None, **kwargs):
+        """
+        This function runs calculate_3D_mobility() in a managed thread or process
+        pool and returns immediately. See Mobility2DCarrier.submit_sheet_mobility()
+        for the details.
+
+        Parameters
+        ----------
+        executor : str or concurrent.futures.Executor, optional [options: 'thread', 'process']
+            The pool. The default is 'thread'.
+        chunk_size : int, optional
+            Number of compositions per job. The default is None, i.e. two jobs per
+            worker of the pool.
+        **kwargs : 
+            The inputs of calculate_3D_mobility().
+
+        Returns
+        -------
+        concurrent.futures.Future
+            Future of the calculate_3D_mobility() results (pandas dataframe or 
+            MobilityResults).
+
+        """
+        from .src._async_jobs import _submit
+        return _submit(self, 'calculate_3D_mobility', kwargs, executor=executor, chunk_size=chunk_size)
+
+    async def calculate_3D_mobility_async(self, executor='thread', chunk_size:int=None, **kwargs):
+        """
+        This function is the asyncio counterpart of calculate_3D_mobility(). See
+        Mobility2DCarrier.calculate_sheet_mobility_async() for the details.
+        """
+        import asyncio
+        return await asyncio.wrap_future(self.submit_3D_mobility(executor=executor, chunk_size=chunk_size,
+                                                                 **kwargs))
+
+    def adaptive_3D_mobility(self, sample_ranges:dict, n_3d=1, n_dis:float=1, f_dis:float=0.5,
+                             n_ion_impurity:float=1, T:float=300,
+                             alloy_disordered_effect:bool=False,
+                             td_dislocation_chg_effect:bool=False,
+                             td_dislocation_strain_effect:bool=False,
+                             piezoelectric_effect:bool=False,
+                             acoustic_phonon_effect:bool=False,
+                             polar_optical_phonon_effect:bool=False,
+                             ionized_impurity_effect:bool=False,
+                             total_mobility:bool=True,
+                             mobility_model_version:str='v1',
+                             inverse_half_FD_method:str='minimax_piecewise',
+                             FermiDirac_integration_approach:str='minimax_piecewise',
+                             carrier_degeneracy_limit:str='general', columns=None,
+                             log_scale=('n_3d', 'n_dis', 'n_ion_impurity'), n_initial:int=9,
+                             max_rel_change:float=0.05, curvature_tol:float=1e-3,
+                             max_points:int=2000, return_dataframe:bool=True):
+        """
+        This function calculates the 3D mobility curve (one sampled parameter) or 
+        map (two sampled parameters) on an adaptively refined grid. See
+        Mobility2DCarrier.adaptive_sheet_mobility() for the refinement criteria.
+
+        Example:
+            mu = mob.adaptive_3D_mobility({'n_3d': (1e-3, 1e2)}, T=300,
+                                          ionized_impurity_effect=True,
+                                          acoustic_phonon_effect=True)
+
+        Parameters
+        ----------
+        sample_ranges : dict
+            (lower, upper) ranges of the sampled parameters (one or two of 'comp',
+            'n_3d', 'n_dis', 'f_dis', 'n_ion_impurity', 'T'). If 'comp' is not 
+            sampled, this instance should have a single composition.
+        n_3d, n_dis, f_dis, n_ion_impurity, T : float, optional
+            Values of the parameters that are not sampled. Same as in
+            calculate_3D_mobility().
+        alloy_disordered_effect, ..., carrier_degeneracy_limit : optional
+            Same as in calculate_3D_mobility().
+        columns : list of str, optional
+            Mobility columns that control the refinement, e.g. ['mu_TOT', 'mu_ION_IMP']. 
+            If None, the total mobility ['mu_TOT'] is used if total_mobility=True,
+            otherwise all the calculated mobilities. The default is None.
+        log_scale : tuple of str, optional
+            Sampled parameters that are refined in log10 scale. 
+            The default is ('n_3d', 'n_dis', 'n_ion_impurity').
+        n_initial, max_rel_change, curvature_tol, max_points : optional
+            Same as in Mobility2DCarrier.adaptive_sheet_mobility().
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            Mobilities (unit: cm^2 V^-1 S^-1) and the sampled parameter columns, 
+            sorted by the sampled parameters (C-order grid for two parameters).
+            attrs['grid_shape'] and attrs['n_evaluations'] give the grid size and 
+            the number of calculated points.
+
+        """
+        fixed_params = {'n_3d': n_3d, 'n_dis': n_dis, 'f_dis': f_dis,
+                        'n_ion_impurity': n_ion_impurity, 'T': T}
+        effect_flags = self._effect_flags(locals())
+        if columns is None and total_mobility: columns = ['mu_TOT']
+        mobility = self._adaptive_sample('calculate_3D_mobility', 'n_3d', sample_ranges,
+                                         fixed_params, effect_flags, log_scale=log_scale,
+                                         columns=columns, n_initial=n_initial,
+                                         max_rel_change=max_rel_change,
+                                         curvature_tol=curvature_tol, max_points=max_points)
+        return mobility.to_pandas() if return_dataframe else mobility
+
+    def monte_carlo_uncertainty(self, distributions:dict, n_samples:int=1000, n_3d=1, 
+                                n_dis:float=1, f_dis:float=0.5, n_ion_impurity:float=1, 
+                                T:float=300,
+                                alloy_disordered_effect:bool=False,
+                                td_dislocation_chg_effect:bool=False,
+                                td_dislocation_strain_effect:bool=False,
+                                piezoelectric_effect:bool=False,
+                                acoustic_phonon_effect:bool=False,
+                                polar_optical_phonon_effect:bool=False,
+                                ionized_impurity_effect:bool=False,
+                                total_mobility:bool=True,
+                                mobility_model_version:str='v1',
+                                inverse_half_FD_method:str='minimax_piecewise',
+                                FermiDirac_integration_approach:str='minimax_piecewise',
+                                carrier_degeneracy_limit:str='general',
+                                quantiles=(0.025, 0.5, 0.975), chunk_size:int=256, 
+                                seed=None, return_dataframe:bool=True):
+        """
+        This function propagates the uncertainties of the material database parameters
+        to the 3D mobilities by Monte Carlo sampling. See 
+        Mobility2DCarrier.monte_carlo_uncertainty() for the details.
+
+        Example:
+            from scipy import stats
+            mc = mob.monte_carlo_uncertainty(
+                    {'GaN': {'carrier_effective_mass': stats.norm(0.2, 0.01)}},
+                    n_samples=10000, n_3d=np.logspace(-2, 2, 50), 
+                    ionized_impurity_effect=True, acoustic_phonon_effect=True)
+
+        Parameters
+        ----------
+        distributions : dict
+            {material: {parameter: distribution}}. See 
+            Mobility2DCarrier.monte_carlo_uncertainty().
+        n_samples : int, optional
+            Number of Monte Carlo samples. The default is 1000.
+        n_3d, n_dis, f_dis, n_ion_impurity, T : optional
+            Same as in calculate_3D_mobility().
+        alloy_disordered_effect, ..., carrier_degeneracy_limit : optional
+            Same as in calculate_3D_mobility().
+        quantiles : tuple of float, optional
+            Reported quantiles. The default is (0.025, 0.5, 0.975).
+        chunk_size : int, optional
+            Number of samples per calculation call. The default is 256.
+        seed : int, optional
+            Random seed. Same seed and chunk_size reproduce the results. 
+            The default is None.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            One row per point: 'comp', 'n_3d' and for every mobility column 
+            '<column>_mean', '<column>_std', '<column>_q<quantile>', e.g. 
+            'mu_TOT_mean', 'mu_TOT_q0.975'.
+
+        """
+        calculate_kwargs = self._effect_flags(locals(), 'n_dis', 'f_dis', 'n_ion_impurity', 'T')
+        sampler = _MonteCarloUncertainty(self, 'calculate_3D_mobility', 'n_3d', n_3d,
+                                         distributions, calculate_kwargs, n_samples=n_samples,
+                                         chunk_size=chunk_size, quantiles=quantiles, seed=seed)
+        mobility = sampler.run()
+        return mobility.to_pandas() if return_dataframe else mobility
+
+    def sobol_indices(self, param_ranges:dict, n_samples:int=1024, n_3d=1, 
+                      n_dis:float=1, f_dis:float=0.5, n_ion_impurity:float=1, T:float=300,
+                      alloy_disordered_effect:bool=False,
+                      td_dislocation_chg_effect:bool=False,
+                      td_dislocation_strain_effect:bool=False,
+                      piezoelectric_effect:bool=False,
+                      acoustic_phonon_effect:bool=False,
+                      polar_optical_phonon_effect:bool=False,
+                      ionized_impurity_effect:bool=False,
+                      total_mobility:bool=True,
+                      mobility_model_version:str='v1',
+                      inverse_half_FD_method:str='minimax_piecewise',
+                      FermiDirac_integration_approach:str='minimax_piecewise',
+                      carrier_degeneracy_limit:str='general', log_scale=(),
+                      chunk_size:int=256, seed=None, return_dataframe:bool=True):
+        """
+        This function calculates the variance based global sensitivity indices 
+        (first and total order Sobol indices) of the 3D mobilities at every 
+        composition (and carrier density) point. See 
+        Mobility2DCarrier.sobol_indices() for the details.
+
+        Example:
+            si = mob.sobol_indices({'n_ion_impurity': (0.1, 100), 'T': (250, 450),
+                                    'GaN:PO_phonon_energy': (0.088, 0.094)},
+                                   log_scale=['n_ion_impurity'], n_3d=1,
+                                   ionized_impurity_effect=True, polar_optical_phonon_effect=True)
+
+        Parameters
+        ----------
+        param_ranges : dict
+            {input: (low, high)}. Inputs: 'n_3d', 'n_dis', 'f_dis', 'n_ion_impurity', 
+            'T' or material database parameters '<material>:<parameter>'. See 
+            Mobility2DCarrier.sobol_indices().
+        n_samples : int, optional
+            Number of base samples N (rounded up to a power of 2). The default is 1024.
+        n_3d, n_dis, f_dis, n_ion_impurity, T : optional
+            Fixed values of the inputs that are not sampled. Same as in 
+            calculate_3D_mobility().
+        alloy_disordered_effect, ..., carrier_degeneracy_limit : optional
+            Same as in calculate_3D_mobility().
+        log_scale : sequence of str, optional
+            Inputs sampled uniformly in log scale. The default is ().
+        chunk_size : int, optional
+            Number of base samples per calculation call (rounded up to a power of 2).
+            The default is 256.
+        seed : int, optional
+            Seed of the Sobol sequence scrambling. The default is None.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            One row per point: 'comp', 'n_3d' (if not sampled) and for every mobility 
+            column and input '<column>_S1_<input>', '<column>_ST_<input>', e.g.
+            'mu_TOT_ST_T'.
+
+        """
+        calculate_kwargs = self._effect_flags(locals(), 'n_dis', 'f_dis', 'n_ion_impurity', 'T')
+        analysis = _SobolSensitivity(self, 'calculate_3D_mobility', 'n_3d', n_3d, param_ranges,
+                                     ('n_dis', 'f_dis', 'n_ion_impurity', 'T'), calculate_kwargs,
+                                     n_samples=n_samples, log_scale=log_scale,
+                                     chunk_size=chunk_size, seed=seed)
+        indices = analysis.run()
+        return indices.to_pandas() if return_dataframe else indices
+
+    def design_sweep(self, param_ranges:dict, n_points:int=1024, method:str='sobol', 
+                     n_3d=1, n_dis:float=1, f_dis:float=0.5, n_ion_impurity:float=1, 
+                     T:float=300,
+                     alloy_disordered_effect:bool=False,
+                     td_dislocation_chg_effect:bool=False,
+                     td_dislocation_strain_effect:bool=False,
+                     piezoelectric_effect:bool=False,
+                     acoustic_phonon_effect:bool=False,
+                     polar_optical_phonon_effect:bool=False,
+                     ionized_impurity_effect:bool=False,
+                     total_mobility:bool=True,
+                     mobility_model_version:str='v1',
+                     inverse_half_FD_method:str='minimax_piecewise',
+                     FermiDirac_integration_approach:str='minimax_piecewise',
+                     carrier_degeneracy_limit:str='general', log_scale=(),
+                     seed:int=0, chunk_size:int=4096, store=None, 
+                     return_dataframe:bool=True):
+        """
+        This function calculates the 3D mobilities at the points of a quasi-random 
+        or space-filling design of experiments (Sobol, Halton, Latin hypercube) over 
+        the input ranges. See Mobility2DCarrier.design_sweep() for the details.
+
+        Example:
+            doe = mob.design_sweep({'comp': (0, 1), 'n_3d': (0.01, 100), 'T': (200, 500)},
+                                   n_points=2048, method='lhs', log_scale=['n_3d'],
+                                   ionized_impurity_effect=True, polar_optical_phonon_effect=True)
+
+        Parameters
+        ----------
+        param_ranges : dict
+            {input: (low, high)}. Inputs: 'comp', 'n_3d', 'n_dis', 'f_dis', 
+            'n_ion_impurity', 'T' or material database parameters '<material>:<parameter>'.
+        n_points : int, optional
+            Number of design points. The default is 1024.
+        method : str, optional [options: 'sobol', 'halton', 'lhs', 'random']
+            Design (see DesignSampler). The default is 'sobol'.
+        n_3d, n_dis, f_dis, n_ion_impurity, T : optional
+            Fixed values of the inputs that are not in the design. Same as in 
+            calculate_3D_mobility().
+        alloy_disordered_effect, ..., carrier_degeneracy_limit : optional
+            Same as in calculate_3D_mobility().
+        log_scale : sequence of str, optional
+            Inputs sampled uniformly in log scale. The default is ().
+        seed : int, optional
+            Seed of the design. The default is 0.
+        chunk_size : int, optional
+            Number of design points per calculation call (and per stored chunk).
+            The default is 4096.
+        store : ResultStore or str/path, optional
+            Result store (or its directory) for the chunks. The default is None.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are returned
+            as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults)
+            One row per design point (and composition): 'design_point', 'comp', 'n_3d',
+            the other design inputs and the mobilities.
+
+        """
+        calculate_kwargs = self._effect_flags(locals(), 'n_dis', 'f_dis', 'n_ion_impurity', 'T')
+        design = DesignSampler(param_ranges, n_points=n_points, method=method, 
+                               log_scale=log_scale, seed=seed)
+        if store is not None and not isinstance(store, ResultStore): store = ResultStore(store)
+        mobility = self._design_sweep('calculate_3D_mobility', 'n_3d', n_3d, design,
+                                      ('n_dis', 'f_dis', 'n_ion_impurity', 'T'), calculate_kwargs,
+                                      chunk_size=chunk_size, store=store)
+        return mobility.to_pandas() if return_dataframe else mobility
     
     def calculate_3DEC_props(self, n_d, mu_d, position):
         """
@@ -734,8 +2197,8 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
         ----------
         n_d : 1d numpy array of float (unit: 1E18 cm^-3 )
             The position dependent carrier density distribution.
-        mu_d : 1d numpy array of float or pandas dataframe of mobilities as 
-               returned from calculate_3D_mobility() function (unit: cm^2.V^-1.s^-1 )
+        mu_d : 1d numpy array of float or pandas dataframe (or MobilityResults) of 
+               mobilities as returned from calculate_3D_mobility() function (unit: cm^2.V^-1.s^-1 )
             The position dependent carrier mobility(ies) distribution.
         position : 1d numpy array of float (unit: nm)
             The position array.
@@ -757,208 +2220,14 @@ class Mobility3DCarrier(_MobilityCarrier, _Mobility3DCarrier):
 
         """ 
         return self._3dec_props(n_d, mu_d, position, eps_n_3d=self.eps_n_3d,
-                                log_info=self.print_info)
+                                log_info=self.print_info, carrier_logger=self.logger_)
 
 #==============================================================================
-class Plottings(_plot_mobilities):  
-    """
-    Plotting class for mobilitypy.
-    """
-    def __init__(self, save_figure_dir='.'):
-        """
-        Intializing mobilitypy Plotting class.
-
-        Parameters
-        ----------
-        save_figure_dir : str, optional
-            Directory where to save the figure. The default is current directory.
-
-        """
-        self.save_figure_directory = save_figure_dir
-        _plot_mobilities.__init__(self, save_figure_dir=self.save_figure_directory)
-
-    def plot_2d(self, data2plot, fig=None, ax=None, save_file_name=None, CountFig=None, 
-                ymin=None, ymax=None, xmax=None, xmin=None, y_scale_log:bool=True, 
-                show_right_ticks:bool=False, title_text:str=None, yaxis_label:str='', 
-                xaxis_label:str='', color=None, color_map='viridis', ls_2d='-', 
-                show_legend:bool=False, show_colorbar:bool=False, colorbar_label:str=None, 
-                savefig:bool=True, vmin=None, vmax=None, show_plot:bool=True, **kwargs_savefig):  
-        """
-        This function plots 2d plot when providing corresponding x and y values as data2plot.
-
-        Parameters
-        ----------
-        data2plot : 2D numpy array
-            2D numpy array with first column as x and 2nd column as y.
-        fig : matplotlib.pyplot figure instance, optional
-            Figure instance to plot on. The default is None.
-        ax : matplotlib.pyplot axis, optional
-            Figure axis to plot on. If None, new figure will be created.
-            The default is None.
-        save_file_name : str, optional
-            Name of the figure file. If None, figure will be not saved. 
-            The default is None.
-        CountFig: int, optional
-            Figure count. The default is None.
-        ymin : float, optional
-            Minimum in y. The default is None.
-        ymax : float, optional
-            Maximum in y. The default is None.
-        xmin : float, optional
-            Minimum in x. The default is None.
-        xmax : float, optional
-            Maximum in x. The default is None.
-        y_scale_log : bool, optional
-            Use log scale for y-axis. The default is True.
-        show_right_ticks : bool, optional
-            Show ticks in the right axis of the figure. the default is False.
-        title_text : str, optional
-            Title of the figure. The default is None.
-        yaxis_label : str, optional
-            Y-axis label text. The default is ''.
-        xaxis_label : str, optional
-            x-axis label text. The default is ''.
-        color : str/color, optional
-            Color of plot. The default is 'gray'.
-        color_map: str/ matplotlib colormap
-            Colormap for plot. The default is viridis.
-        ls_2d : matplotlib line style, optional
-            Matplotlib line style. The default is '-'.
-        show_legend : bool, optional
-            If show legend or not. The default is True.
-        show_colorbar : bool, optional
-            Plot the colorbar in the figure or not. If fig=None, this is ignored.
-            The default is False.
-        colorbar_label : str, optional
-            Colorbar label. The default is None. If None, ignored.
-        vmin, vmax : float, optional
-            vmin and vmax define the data range that the colormap covers. 
-            By default, the colormap covers the complete value range of the supplied data.
-        show_plot : bool, optional
-            To show the plot when not saved. The default is True.
-        savefig : bool, optional
-            Save the plot or not. The default is True.
-        **kwargs_savefig : dict
-            The matplotlib keywords for savefig function.
-
-        Returns
-        -------
-        fig : matplotlib.pyplot.figure
-            Figure instance. If ax is not None previously generated/passed fig instance
-            will be returned. Return None, if no fig instance is inputed along with ax.
-        ax : Axis instance
-            Figure axis instance.
-        CountFig: int or None
-            Figure count.
-
-        """
-        return self._plot(data2plot, fig=fig, ax=ax, save_file_name=save_file_name, 
-                          CountFig=CountFig, ymin=ymin, ymax=ymax, xmax=xmax, xmin=xmin, 
-                          y_scale_log=y_scale_log, mode='plane_2d', yaxis_label=yaxis_label, 
-                          title_text=title_text, xaxis_label=xaxis_label, color=color, 
-                          show_right_ticks=show_right_ticks, show_legend=show_legend, 
-                          ls_2d=ls_2d, color_map=color_map, show_colorbar=show_colorbar, 
-                          colorbar_label=colorbar_label, savefig=savefig,
-                          vmin=vmin, vmax=vmax, show_plot=show_plot, **kwargs_savefig)
-    
-    def plot_2d_carrier_mobilities(self, mobility_dataframe, fig=None, ax=None, save_file_name=None, CountFig=None, ymin=None, 
-                                   ymax=None, xmax=None, xmin=None, y_scale_log:bool=True, mode:str= '2d_carrier_mobility',
-                                   title_text:str=None, mobility_model:str='v2', annotate_pos=(0,0), annotatetextoffset=(0,-20),
-                                   yaxis_label:str=r'$\mu$ ($\mathrm{cm}^2\mathrm{V}^{-1}\mathrm{s}^{-1}$)',
-                                   xaxis_label:str='Composition', color=None, color_map='viridis', show_legend:bool=False, 
-                                   show_right_ticks:bool=False, show_colorbar:bool=False, colorbar_label:str=None, 
-                                   savefig:bool=True, vmin=None, vmax=None, show_plot:bool=True, **kwargs_savefig):
-        """
-        This function plots different mobility values with compositions.
-
-        Parameters
-        ----------
-        mobility_dataframe : pandas dataframe or 2d array
-            Pandas dataframe retured from mobility calculations when mode is '2d_carrier_mobility'.
-        fig : matplotlib.pyplot figure instance, optional
-            Figure instance to plot on. The default is None.
-        ax : matplotlib.pyplot axis, optional
-            Figure axis to plot on. If None, new figure will be created.
-            The default is None.
-        save_file_name : str, optional
-            Name of the figure file. If None, figure will be not saved. 
-            The default is None.
-        CountFig: int, optional
-            Figure count. The default is None.
-        ymin : float, optional
-            Minimum in y. The default is None.
-        ymax : float, optional
-            Maximum in y. The default is None.
-        xmin : float, optional
-            Minimum in x. The default is None.
-        xmax : float, optional
-            Maximum in x. The default is None.
-        y_scale_log : bool, optional
-            Use log scale for y-axis. The default is True.
-        mode : str, optional
-            Which plotting mode to use. The options are 
-            '2d_carrier_mobility': To plot 2d mobility plots
-            'plane_2d': general 2d plots.
-        mobility_model :  str, optional [options: 'v1', 'v2']
-            Which mobility model used to generate results. The data structure is 
-            different for different mobility models. The default is 'v2'.
-        annotate_pos : tuple, optional
-            To add annotation at position on the plot. The default is (0,0).
-        annotatetextoffset : tuple, optional
-            To offset the annotated text from the annotate position. The default is (0, -20).
-        show_right_ticks : bool, optional
-            Show ticks in the right axis of the figure. the default is False.
-        title_text : str, optional
-            Title of the figure. The default is None.
-        yaxis_label : str, optional
-            Y-axis label text. The default is 'mu (cm^2V^-1s^-1)'.
-        xaxis_label : str, optional
-            x-axis label text. The default is 'Composition'.
-        color : str/color, optional
-            Color of plot. The default is 'gray'.
-        color_map: str/ matplotlib colormap
-            Colormap for plot. The default is viridis.
-        show_legend : bool, optional
-            If show legend or not. The default is True.
-        show_colorbar : bool, optional
-            Plot the colorbar in the figure or not. If fig=None, this is ignored.
-            The default is False.
-        colorbar_label : str, optional
-            Colorbar label. The default is None. If None, ignored.
-        vmin, vmax : float, optional
-            vmin and vmax define the data range that the colormap covers. 
-            By default, the colormap covers the complete value range of the supplied data.
-        show_plot : bool, optional
-            To show the plot when not saved. The default is True.
-        savefig : bool, optional
-            Save the plot or not. The default is True.
-        **kwargs_savefig : dict
-            The matplotlib keywords for savefig function.
-        
-        Raises
-        ------
-        ValueError
-            If plot mode is unknown.
-
-        Returns
-        -------
-        fig : matplotlib.pyplot.figure
-            Figure instance. If ax is not None previously generated/passed fig instance
-            will be returned. Return None, if no fig instance is inputed along with ax.
-        ax : Axis instance
-            Figure axis instance.
-        CountFig: int or None
-            Figure count.
-
-        """
-        return self._plot(mobility_dataframe, fig=fig, ax=ax, save_file_name=save_file_name, 
-                          CountFig=CountFig, ymin=ymin, ymax=ymax, xmax=xmax, xmin=xmin, 
-                          annotate_pos=annotate_pos, annotatetextoffset=annotatetextoffset,
-                          show_right_ticks=show_right_ticks,
-                          y_scale_log=y_scale_log, mode= mode, yaxis_label=yaxis_label, 
-                          title_text=title_text, xaxis_label=xaxis_label, color=color, 
-                          mobility_model=mobility_model, color_map=color_map, 
-                          show_legend=show_legend, show_colorbar=show_colorbar, 
-                          colorbar_label=colorbar_label, savefig=savefig,
-                          vmin=vmin, vmax=vmax, show_plot=show_plot, **kwargs_savefig)
-#==============================================================================
\ No newline at end of file
+def __getattr__(name):
+    # Plottings pulls in matplotlib. It is imported lazily so that the mobility
+    # classes import with numpy/scipy only.
+    if name == 'Plottings':
+        from .plotting import Plottings
+        return Plottings
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+#==============================================================================
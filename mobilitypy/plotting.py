@@ -0,0 +1,205 @@
+from .utilities import _plot_mobilities
+
+#==============================================================================
+class Plottings(_plot_mobilities):  
+    """
+    Plotting class for mobilitypy.
+    """
+    def __init__(self, save_figure_dir='.'):
+        """
+        Intializing mobilitypy Plotting class.
+
+        Parameters
+        ----------
+        save_figure_dir : str, optional
+            Directory where to save the figure. The default is current directory.
+
+        """
+        self.save_figure_directory = save_figure_dir
+        _plot_mobilities.__init__(self, save_figure_dir=self.save_figure_directory)
+
+    def plot_2d(self, data2plot, fig=None, ax=None, save_file_name=None, CountFig=None, 
+                ymin=None, ymax=None, xmax=None, xmin=None, y_scale_log:bool=True, 
+                show_right_ticks:bool=False, title_text:str=None, yaxis_label:str='', 
+                xaxis_label:str='', color=None, color_map='viridis', ls_2d='-', 
+                show_legend:bool=False, show_colorbar:bool=False, colorbar_label:str=None, 
+                savefig:bool=True, vmin=None, vmax=None, show_plot:bool=True, **kwargs_savefig):  
+        """
+        This function plots 2d plot when providing corresponding x and y values as data2plot.
+
+        Parameters
+        ----------
+        data2plot : 2D numpy array
+            2D numpy array with first column as x and 2nd column as y.
+        fig : matplotlib.pyplot figure instance, optional
+            Figure instance to plot on. The default is None.
+        ax : matplotlib.pyplot axis, optional
+            Figure axis to plot on. If None, new figure will be created.
+            The default is None.
+        save_file_name : str, optional
+            Name of the figure file. If None, figure will be not saved. 
+            The default is None.
+        CountFig: int, optional
+            Figure count. The default is None.
+        ymin : float, optional
+            Minimum in y. The default is None.
+        ymax : float, optional
+            Maximum in y. The default is None.
+        xmin : float, optional
+            Minimum in x. The default is None.
+        xmax : float, optional
+            Maximum in x. The default is None.
+        y_scale_log : bool, optional
+            Use log scale for y-axis. The default is True.
+        show_right_ticks : bool, optional
+            Show ticks in the right axis of the figure. the default is False.
+        title_text : str, optional
+            Title of the figure. The default is None.
+        yaxis_label : str, optional
+            Y-axis label text. The default is ''.
+        xaxis_label : str, optional
+            x-axis label text. The default is ''.
+        color : str/color, optional
+            Color of plot. The default is 'gray'.
+        color_map: str/ matplotlib colormap
+            Colormap for plot. The default is viridis.
+        ls_2d : matplotlib line style, optional
+            Matplotlib line style. The default is '-'.
+        show_legend : bool, optional
+            If show legend or not. The default is True.
+        show_colorbar : bool, optional
+            Plot the colorbar in the figure or not. If fig=None, this is ignored.
+            The default is False.
+        colorbar_label : str, optional
+            Colorbar label. The default is None. If None, ignored.
+        vmin, vmax : float, optional
+            vmin and vmax define the data range that the colormap covers. 
+            By default, the colormap covers the complete value range of the supplied data.
+        show_plot : bool, optional
+            To show the plot when not saved. The default is True.
+        savefig : bool, optional
+            Save the plot or not. The default is True.
+        **kwargs_savefig : dict
+            The matplotlib keywords for savefig function.
+
+        Returns
+        -------
+        fig : matplotlib.pyplot.figure
+            Figure instance. If ax is not None previously generated/passed fig instance
+            will be returned. Return None, if no fig instance is inputed along with ax.
+        ax : Axis instance
+            Figure axis instance.
+        CountFig: int or None
+            Figure count.
+
+        """
+        return self._plot(data2plot, fig=fig, ax=ax, save_file_name=save_file_name, 
+                          CountFig=CountFig, ymin=ymin, ymax=ymax, xmax=xmax, xmin=xmin, 
+                          y_scale_log=y_scale_log, mode='plane_2d', yaxis_label=yaxis_label, 
+                          title_text=title_text, xaxis_label=xaxis_label, color=color, 
+                          show_right_ticks=show_right_ticks, show_legend=show_legend, 
+                          ls_2d=ls_2d, color_map=color_map, show_colorbar=show_colorbar, 
+                          colorbar_label=colorbar_label, savefig=savefig,
+                          vmin=vmin, vmax=vmax, show_plot=show_plot, **kwargs_savefig)
+    
+    def plot_2d_carrier_mobilities(self, mobility_dataframe, fig=None, ax=None, save_file_name=None, CountFig=None, ymin=None, 
+                                   ymax=None, xmax=None, xmin=None, y_scale_log:bool=True, mode:str= '2d_carrier_mobility',
+                                   title_text:str=None, mobility_model:str='v2', annotate_pos=(0,0), annotatetextoffset=(0,-20),
+                                   yaxis_label:str=r'$\mu$ ($\mathrm{cm}^2\mathrm{V}^{-1}\mathrm{s}^{-1}$)',
+                                   xaxis_label:str='Composition', color=None, color_map='viridis', show_legend:bool=False, 
+                                   show_right_ticks:bool=False, show_colorbar:bool=False, colorbar_label:str=None, 
+                                   savefig:bool=True, vmin=None, vmax=None, show_plot:bool=True, **kwargs_savefig):
+        """
+        This function plots different mobility values with compositions.
+
+        Parameters
+        ----------
+        mobility_dataframe : pandas dataframe or 2d array
+            Pandas dataframe retured from mobility calculations when mode is '2d_carrier_mobility'.
+        fig : matplotlib.pyplot figure instance, optional
+            Figure instance to plot on. The default is None.
+        ax : matplotlib.pyplot axis, optional
+            Figure axis to plot on. If None, new figure will be created.
+            The default is None.
+        save_file_name : str, optional
+            Name of the figure file. If None, figure will be not saved. 
+            The default is None.
+        CountFig: int, optional
+            Figure count. The default is None.
+        ymin : float, optional
+            Minimum in y. The default is None.
+        ymax : float, optional
+            Maximum in y. The default is None.
+        xmin : float, optional
+            Minimum in x. The default is None.
+        xmax : float, optional
+            Maximum in x. The default is None.
+        y_scale_log : bool, optional
+            Use log scale for y-axis. The default is True.
+        mode : str, optional
+            Which plotting mode to use. The options are 
+            '2d_carrier_mobility': To plot 2d mobility plots
+            'plane_2d': general 2d plots.
+        mobility_model :  str, optional [options: 'v1', 'v2']
+            Which mobility model used to generate results. The data structure is 
+            different for different mobility models. The default is 'v2'.
+        annotate_pos : tuple, optional
+            To add annotation at position on the plot. The default is (0,0).
+        annotatetextoffset : tuple, optional
+            To offset the annotated text from the annotate position. The default is (0, -20).
+        show_right_ticks : bool, optional
+            Show ticks in the right axis of the figure. the default is False.
+        title_text : str, optional
+            Title of the figure. The default is None.
+        yaxis_label : str, optional
+            Y-axis label text. The default is 'mu (cm^2V^-1s^-1)'.
+        xaxis_label : str, optional
+            x-axis label text. The default is 'Composition'.
+        color : str/color, optional
+            Color of plot. The default is 'gray'.
+        color_map: str/ matplotlib colormap
+            Colormap for plot. The default is viridis.
+        show_legend : bool, optional
+            If show legend or not. The default is True.
+        show_colorbar : bool, optional
+            Plot the colorbar in the figure or not. If fig=None, this is ignored.
+            The default is False.
+        colorbar_label : str, optional
+            Colorbar label. The default is None. If None, ignored.
+        vmin, vmax : float, optional
+            vmin and vmax define the data range that the colormap covers. 
+            By default, the colormap covers the complete value range of the supplied data.
+        show_plot : bool, optional
+            To show the plot when not saved. The default is True.
+        savefig : bool, optional
+            Save the plot or not. The default is True.
+        **kwargs_savefig : dict
+            The matplotlib keywords for savefig function.
+        
+        Raises
+        ------
+        ValueError
+            If plot mode is unknown.
+
+        Returns
+        -------
+        fig : matplotlib.pyplot.figure
+            Figure instance. If ax is not None previously generated/passed fig instance
+            will be returned. Return None, if no fig instance is inputed along with ax.
+        ax : Axis instance
+            Figure axis instance.
+        CountFig: int or None
+            Figure count.
+
+        """
+        return self._plot(mobility_dataframe, fig=fig, ax=ax, save_file_name=save_file_name, 
+                          CountFig=CountFig, ymin=ymin, ymax=ymax, xmax=xmax, xmin=xmin, 
+                          annotate_pos=annotate_pos, annotatetextoffset=annotatetextoffset,
+                          show_right_ticks=show_right_ticks,
+                          y_scale_log=y_scale_log, mode= mode, yaxis_label=yaxis_label, 
+                          title_text=title_text, xaxis_label=xaxis_label, color=color, 
+                          mobility_model=mobility_model, color_map=color_map, 
+                          show_legend=show_legend, show_colorbar=show_colorbar, 
+                          colorbar_label=colorbar_label, savefig=savefig,
+                          vmin=vmin, vmax=vmax, show_plot=show_plot, **kwargs_savefig)
+#==============================================================================
\ No newline at end of file
@@ -6,16 +6,17 @@ Created on Wed Jan 21 11:50:49 2026
 @author: badal.mondal
 """
 
-import scipy.integrate as integrate
 import scipy.special as special
 import numpy as np
+from ._profiling import _profiled, _quad_vec
+from ._jit import JIT_ENABLED, njit, prange
 ## ============================================================================
         
 class _FermiDiracInt:   
     def __init__(self):
         pass
-    @classmethod
-    def _Fukushima_iFD_half(cls, nu: float) -> float: 
+    @staticmethod
+    def _Fukushima_iFD_half(nu: float) -> float: 
         '''
         Taken from github.com/scott-maddox/fdint
         
@@ -72,8 +73,8 @@ class _FermiDiracInt:
             y=np.sqrt(w)
         return y
     
-    @classmethod
-    def _Fukushima_FD_minus_one_half(cls, nu: float) -> float:
+    @staticmethod
+    def _Fukushima_FD_minus_one_half(nu: float) -> float:
         '''
         Double precision rational minimax approximation of Fermi-Dirac integral 
         of order k=-1/2
@@ -152,8 +153,8 @@ class _FermiDiracInt:
             +t*8.67667698791108582e-10))))))
         return 0.5641895835477563 * y # 1/(Gamma(1/2))*y
     
-    @classmethod
-    def _Fukushima_FD_one_half(cls, nu: float) -> float:
+    @staticmethod
+    def _Fukushima_FD_one_half(nu: float) -> float:
         '''
         Double precision rational minimax approximation of Fermi-Dirac integral 
         of order k=1/2
@@ -230,8 +231,8 @@ class _FermiDiracInt:
             /(6569.98472532829094e0+s*(280.706465851683809e0+s)))
         return 1.1283791670955126 * y # 1/(Gamma(3/2))*y
     
-    @classmethod
-    def _Fukushima_FD_one(cls, nu: float) -> float:
+    @staticmethod
+    def _Fukushima_FD_one(nu: float) -> float:
         '''
         Double precision rational minimax approximation of Fermi-Dirac integral 
         of order k=1
@@ -254,7 +255,7 @@ class _FermiDiracInt:
             +t*(322.901386168881348e0+t*(5.9897442965804548e0+t*0.00397641173774375092e0 \
             ))))/(88756.428323178025e0+t*(25002.3197546553836e0+t*(2389.06277237306633e0 \
             +t*(88.376214553692756e0+t)))))
-        elif(absnu <= 0.e0):
+        else: # absnu <= 0
             s=-0.5e0*absnu
             t=1.e0-s
             y=(145.488167182330098e0+t*(251.392824471576922e0+t*(56.6537141912783024e0 \
@@ -268,6 +269,19 @@ class _FermiDiracInt:
         return y
 
     @classmethod
+    def _map_scalar_kernel(cls, kernel_name:str, values):
+        """
+        Apply the scalar minimax kernel to all the elements of the array. 
+        With the JIT backend the compiled parallel (prange) loop is used,
+        otherwise np.vectorize.
+        """
+        if JIT_ENABLED:
+            values_ = np.asarray(values, dtype=float)
+            return _jit_kernel_maps[kernel_name](np.ascontiguousarray(values_).ravel()).reshape(values_.shape)
+        return np.vectorize(getattr(cls, kernel_name))(values)
+
+    @classmethod
+    @_profiled('inverse_FD_one_half')
     def _cal_eta_from_inv_FD(cls, n_d, m_star, T:float=300, method='JD_approx'):
         """
         Calculates scaled Fermi energy (E_f/kB.T) using inverse Fermi-Dirac integral
@@ -319,20 +333,22 @@ class _FermiDiracInt:
             if np.isscalar(n_by_N):
                 return cls._Fukushima_iFD_half(n_by_N)
             else:
-                # _Fukushima_iFD_half() is not vectorized. So vectorize the integrand function first.
-                vec_Fukushima_iFD_half = np.vectorize(cls._Fukushima_iFD_half)
-                return vec_Fukushima_iFD_half(n_by_N)
+                # _Fukushima_iFD_half() is not vectorized. 
+                return cls._map_scalar_kernel('_Fukushima_iFD_half', n_by_N)
         else:
             raise ValueError(f'Requested {method} method is not implemeted yet. Contact developer.')
     
     @classmethod
-    def _FD_dis_chg_Integration(cls, eta, B):
+    @_profiled('FD_dis_chg_integral')
+    def _FD_dis_chg_Integration(cls, eta, B, return_error:bool=False, **quad_options):
         """
         Use a numerically stable form: 1/(1+exp(x-eta)) = expit(eta-x)
         Numerial integration using scipy.integrate.quad over [0, inf)
+        If return_error=True, the absolute error estimate is also returned.
         """   
         _FD_func = lambda x, eta, B: (B+2.0*x)*np.sqrt(x+(x*x/B))*special.expit(eta-x)
-        return integrate.quad_vec(_FD_func, 0, np.inf, args=(eta,B), workers=1)[0]
+        return _quad_vec(_FD_func, 0, np.inf, args=(eta,B), workers=1, 
+                         return_error=return_error, **quad_options)
     
     @classmethod
     def _FD_dis_str_Integral(cls, x, eta, B):
@@ -343,16 +359,43 @@ class _FermiDiracInt:
         return (5.0-5.0*y-(x/(B+x))*y)*x*np.sqrt(x)*special.expit(eta-x)/B/(1-y)**2
     
     @classmethod
-    def _FD_dis_str_Integration(cls, eta_f, B):
-        return integrate.quad_vec(cls._FD_dis_str_Integral, 0, np.inf, args=(eta_f,B), workers=1)[0]
+    @_profiled('FD_dis_str_integral')
+    def _FD_dis_str_Integration(cls, eta_f, B, return_error:bool=False, **quad_options):
+        return _quad_vec(cls._FD_dis_str_Integral, 0, np.inf, args=(eta_f,B), workers=1,
+                         return_error=return_error, **quad_options)
         
+    @staticmethod
+    def _FD_integral_order_1_polylog(eta_f):
+        """
+        F1(eta) = -Li2(-x), x = e^eta. The direct form -spence(1+x) looses 
+        digits for eta << 0 (1+x -> 1). So:
+            eta < -2 : -Li2(-x) = sum_k (-1)^(k+1) x^k/k^2 (x < 0.136, 25 terms)
+            eta >= -2: Landen's identity -Li2(-x) = Li2(x/(1+x)) + ln(1+x)^2/2,
+                       Li2(z) = spence(1-z), 1-x/(1+x) = expit(-eta)
+        """
+        eta_ = np.asarray(eta_f, dtype=float)
+        x = np.exp(np.minimum(eta_, -2.0))
+        kk = np.arange(1, 26)
+        series = np.sum((-1.0)**(kk+1) * x[..., None]**kk / (kk*kk), axis=-1)
+        with np.errstate(invalid='ignore'):
+            landen = special.spence(special.expit(-eta_)) + 0.5*np.logaddexp(0, eta_)**2
+        value = np.where(eta_ < -2.0, series, landen)
+        return float(value) if np.isscalar(eta_f) else value
+
     @classmethod
-    def _FD_integral_order_1(cls, eta_f, FD_integration_approach:str='minimax_piecewise'):
+    @_profiled('FD_one')
+    def _FD_integral_order_1(cls, eta_f, FD_integration_approach:str='minimax_piecewise',
+                             return_error:bool=False, **quad_options):
         """
         Compute the integration numerically, using scipy.quad or dilogarithm approach
         using spence function, or Fukushima's 'minimax_piecewise'. 
         The default is 'minimax_piecewise' 
+        If return_error=True, the absolute quadrature error estimate is also 
+        returned (0 for the 'polylog' and 'minimax_piecewise' approaches).
         """
+        if return_error and FD_integration_approach != 'num':
+            value = cls._FD_integral_order_1(eta_f, FD_integration_approach=FD_integration_approach)
+            return value, np.zeros_like(value)
         if FD_integration_approach == 'num':
             """
             Integrand for F1(eta) = int_0_inf x/(1+exp(x-eta)) dx
@@ -360,22 +403,25 @@ class _FermiDiracInt:
             Numerial integration using scipy.integrate.quad over [0, inf)
             """
             _FD_func = lambda x, eta: x * special.expit(eta-x)
-            return integrate.quad_vec(_FD_func, 0, np.inf, workers=1, args=(eta_f,))[0]
+            return _quad_vec(_FD_func, 0, np.inf, workers=1, args=(eta_f,), 
+                             return_error=return_error, **quad_options)
         elif FD_integration_approach == 'polylog':
-            return (-1) * special.spence(1.0+np.exp(eta_f))
+            return cls._FD_integral_order_1_polylog(eta_f)
         else:
             if np.isscalar(eta_f):
                 return cls._Fukushima_FD_one(eta_f)
             else:
-                vec_FD1_Fukushima = np.vectorize(cls._Fukushima_FD_one)
-                return vec_FD1_Fukushima(eta_f)
+                return cls._map_scalar_kernel('_Fukushima_FD_one', eta_f)
             
     @classmethod
-    def _FD_integral_order_2(cls, eta_f, FD_integration_approach:str='minimax_piecewise'):
+    @_profiled('FD_two')
+    def _FD_integral_order_2(cls, eta_f, FD_integration_approach:str='minimax_piecewise',
+                             return_error:bool=False, **quad_options):
         """
         Compute the integration numerically, using scipy.quad or dilogarithm approach
         using spence function, or Fukushima's 'minimax_piecewise'. 
         The default is 'minimax_piecewise' 
+        If return_error=True, the absolute quadrature error estimate is also returned.
         """
         #if FD_integration_approach == 'num':
         """
@@ -383,9 +429,14 @@ class _FermiDiracInt:
         Numerial integration using scipy.integrate.quad over [0, inf)
         """
         _FD_func = lambda x, eta: x*x * special.expit(eta-x)
-        return 0.5 * integrate.quad_vec(_FD_func, 0, np.inf, workers=1, args=(eta_f,))[0]
+        if return_error:
+            value, abserr = _quad_vec(_FD_func, 0, np.inf, workers=1, args=(eta_f,), 
+                                      return_error=True, **quad_options)
+            return 0.5 * value, 0.5 * abserr
+        return 0.5 * _quad_vec(_FD_func, 0, np.inf, workers=1, args=(eta_f,), **quad_options)
             
     @classmethod
+    @_profiled('FD_m_one_half')
     def _FD_integral_order_m1h(cls, eta_f, FD_integration_approach:str='minimax_piecewise'):
         """
         Compute the integration numerically, using scipy.quad or dilogarithm approach
@@ -396,12 +447,12 @@ class _FermiDiracInt:
             if np.isscalar(eta_f):
                 return cls._Fukushima_FD_minus_one_half(eta_f)
             else:
-                vec_FDm1h_Fukushima = np.vectorize(cls._Fukushima_FD_minus_one_half)
-                return vec_FDm1h_Fukushima(eta_f)
+                return cls._map_scalar_kernel('_Fukushima_FD_minus_one_half', eta_f)
         else:
             raise ValueError(f'Only {FD_integration_approach} method is implemented for Fermi Diract -1/2 integral.')
     
     @classmethod
+    @_profiled('FD_one_half')
     def _FD_integral_order_1h(cls, eta_f, FD_integration_approach:str='minimax_piecewise'):
         """
         Compute the integration numerically, using scipy.quad or dilogarithm approach
@@ -412,14 +463,14 @@ class _FermiDiracInt:
             if np.isscalar(eta_f):
                 return cls._Fukushima_FD_one_half(eta_f)
             else:
-                vec_FD1h_Fukushima = np.vectorize(cls._Fukushima_FD_one_half)
-                return vec_FD1h_Fukushima(eta_f)
+                return cls._map_scalar_kernel('_Fukushima_FD_one_half', eta_f)
         else:
             raise ValueError(f'Only {FD_integration_approach} method is implemented for Fermi Diract 1/2 integral.')
             
     @classmethod
     def _cal_Fermi_Dirac_integral(cls, eta_f, FD_order:str = 'zero', 
-                                  FD_int_approach:str='minimax_piecewise'):
+                                  FD_int_approach:str='minimax_piecewise',
+                                  return_error:bool=False, quad_options:dict=None):
         """
         Calculates Fermi-Dirac integral.
         eta = E_f/(k_B.T)
@@ -441,13 +492,31 @@ class _FermiDiracInt:
             dilogarithm formulation is used.For FD_order=0, analytical solution 
             is used always.
             If minimax_piecewise: use Fukishima's minimax_piecewise approximation.
+        return_error : bool, optional
+            Return also the absolute numerical (quadrature) error estimate. The 
+            error is 0 for the analytical and approximation approaches. 
+            The default is False.
+        quad_options : dict, optional
+            scipy quad_vec options (epsabs, epsrel, limit) for the numerical 
+            integration. The default is None.
 
         Returns
         -------
         float
-            FD integral value.
+            FD integral value. (value, error) if return_error=True.
 
         """       
+        if quad_options is None: quad_options = {}
+        if FD_order == 'one':
+            return cls._FD_integral_order_1(eta_f, FD_integration_approach=FD_int_approach,
+                                            return_error=return_error, **quad_options)
+        elif FD_order == 'two':
+            return cls._FD_integral_order_2(eta_f, FD_integration_approach=FD_int_approach,
+                                            return_error=return_error, **quad_options)
+        if return_error:
+            value = cls._cal_Fermi_Dirac_integral(eta_f, FD_order=FD_order, 
+                                                  FD_int_approach=FD_int_approach)
+            return value, np.zeros_like(value)
         if FD_order == 'zero':
             # np.log1p(x) = log(1 + x)
             return np.log1p(np.exp(eta_f))
@@ -457,9 +526,42 @@ class _FermiDiracInt:
             return cls._FD_integral_order_m1h(eta_f, FD_integration_approach=FD_int_approach)
         elif FD_order == 'one_half':
             return cls._FD_integral_order_1h(eta_f, FD_integration_approach=FD_int_approach)
-        elif FD_order == 'one':
-            return cls._FD_integral_order_1(eta_f, FD_integration_approach=FD_int_approach)
-        elif FD_order == 'two':
-            return cls._FD_integral_order_2(eta_f, FD_integration_approach=FD_int_approach)
         else:
-            raise ValueError(f'{FD_order} FD integral is not implemented yet. Contact developer.')
\ No newline at end of file
+            raise ValueError(f'{FD_order} FD integral is not implemented yet. Contact developer.')
+
+## ============================================================================
+# JIT compiled parallel loops of the scalar minimax kernels (see _jit). Only 
+# used if numba is installed.
+_Fukushima_iFD_half_jit = njit()(_FermiDiracInt._Fukushima_iFD_half)
+_Fukushima_FD_minus_one_half_jit = njit()(_FermiDiracInt._Fukushima_FD_minus_one_half)
+_Fukushima_FD_one_half_jit = njit()(_FermiDiracInt._Fukushima_FD_one_half)
+_Fukushima_FD_one_jit = njit()(_FermiDiracInt._Fukushima_FD_one)
+
+@njit(parallel=True)
+def _Fukushima_iFD_half_map(nu):
+    out = np.empty(nu.shape[0])
+    for ii in prange(nu.shape[0]): out[ii] = _Fukushima_iFD_half_jit(nu[ii])
+    return out
+
+@njit(parallel=True)
+def _Fukushima_FD_minus_one_half_map(nu):
+    out = np.empty(nu.shape[0])
+    for ii in prange(nu.shape[0]): out[ii] = _Fukushima_FD_minus_one_half_jit(nu[ii])
+    return out
+
+@njit(parallel=True)
+def _Fukushima_FD_one_half_map(nu):
+    out = np.empty(nu.shape[0])
+    for ii in prange(nu.shape[0]): out[ii] = _Fukushima_FD_one_half_jit(nu[ii])
+    return out
+
+@njit(parallel=True)
+def _Fukushima_FD_one_map(nu):
+    out = np.empty(nu.shape[0])
+    for ii in prange(nu.shape[0]): out[ii] = _Fukushima_FD_one_jit(nu[ii])
+    return out
+
+_jit_kernel_maps = {'_Fukushima_iFD_half': _Fukushima_iFD_half_map,
+                    '_Fukushima_FD_minus_one_half': _Fukushima_FD_minus_one_half_map,
+                    '_Fukushima_FD_one_half': _Fukushima_FD_one_half_map,
+                    '_Fukushima_FD_one': _Fukushima_FD_one_map}
@@ -5,8 +5,24 @@ from ._Fermi_Dirac_integration import _FermiDiracInt
 from ._mobility_carrier_general import _MobilityCarrier
 from ._mobilities_2d_carrier import _Mobility2DCarrier
 from ._mobilities_3d_carrier import _Mobility3DCarrier
+from ._mobility_results import MobilityResults
+from ._result_store import ResultStore
+from ._sheet_mobility_evaluator import SheetMobilityEvaluator
+from ._mobility_surrogate import MobilitySurrogate, _SheetMobilitySurrogateBuilder
+from ._sheet_mobility_fit import _SheetMobilityFit
+from ._monte_carlo import _MonteCarloUncertainty
+from ._design_sampler import DesignSampler
+from ._sobol import _SobolSensitivity
+from ._figure_of_merit import register_figure_of_merit, figure_of_merit_registry
+from ._figure_of_merit_optimizer import _FigureOfMeritOptimizer
+from ._pareto import _ParetoFrontExplorer
+from ._profiling import profile, ProfileReport
 
 ## ==============================================================================
 __all__ = ['material_database', '_DataBase', '_AlloyParams', '_FermiDiracInt',
-           '_MobilityCarrier', '_Mobility2DCarrier', '_Mobility3DCarrier'
+           '_MobilityCarrier', '_Mobility2DCarrier', '_Mobility3DCarrier',
+           'MobilityResults', 'ResultStore', 'SheetMobilityEvaluator', 'MobilitySurrogate',
+           '_SheetMobilitySurrogateBuilder', '_SheetMobilityFit', '_MonteCarloUncertainty',
+           'DesignSampler', '_SobolSensitivity', '_FigureOfMeritOptimizer', '_ParetoFrontExplorer',
+           'register_figure_of_merit', 'figure_of_merit_registry', 'profile', 'ProfileReport'
            ]
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Adaptive sampling of the mobility curves (1D) and maps (2D).
+"""
+import numpy as np
+from ._mobility_results import MobilityResults
+from ._logging import logger
+
+## ============================================================================
+class _AdaptiveSampler:
+    '''
+    The functions in this class sample the mobility on an adaptively refined
+    tensor-product grid (a curve for one sampled parameter, a map for two).
+
+    Starting from n_initial equidistant grid lines per parameter (log10 scale
+    for the log_scale parameters), an interval of a parameter is bisected if
+    along any grid line and for any tracked mobility column
+        - the change of log(mobility) over the interval exceeds max_rel_change, or
+        - the deviation of log(mobility) at a neighbour node from the chord
+          (linear interpolation) exceeds curvature_tol.
+    Only the new grid points are calculated in each step. The refinement stops
+    when no interval is flagged, the intervals reach min_spacing or the grid
+    would exceed max_points.
+    '''
+    def __init__(self, evaluate, sample_ranges:dict, log_scale=(), columns=None,
+                 n_initial:int=9, max_rel_change:float=0.05, curvature_tol:float=1e-3,
+                 min_spacing:float=1e-4, max_points:int=2000):
+        """
+        Parameters
+        ----------
+        evaluate : callable
+            evaluate(points) -> MobilityResults, with points a dict of equal
+            length 1D arrays of the sampled parameters.
+        sample_ranges : dict
+            (lower, upper) ranges of the sampled parameters.
+        log_scale : tuple of str, optional
+            Sampled parameters that are refined in log10 scale. The default is ().
+        columns : list of str, optional
+            Mobility columns that control the refinement. If None, all the
+            mobility columns (except the error columns). The default is None.
+        n_initial, max_rel_change, curvature_tol, min_spacing, max_points : optional
+            See the class documentation. min_spacing is relative to the
+            (log10 scale) parameter range.
+        """
+        self.evaluate = evaluate
+        self.param_names = list(sample_ranges)
+        if not self.param_names:
+            raise ValueError('At least one parameter range is required for the adaptive sampling.')
+        self.log_scale = np.array([name in log_scale for name in self.param_names])
+        bounds = np.array([sorted(sample_ranges[name]) for name in self.param_names], dtype=float)
+        if np.any(bounds[:, 1] <= bounds[:, 0]):
+            raise ValueError('The parameter ranges should have upper bound > lower bound.')
+        if np.any(bounds[self.log_scale, 0] <= 0):
+            raise ValueError('Log scale parameters should have positive ranges.')
+        bounds[self.log_scale] = np.log10(bounds[self.log_scale])
+        self.bounds = bounds
+        self.columns = columns
+        self.n_initial = max(int(n_initial), 2)
+        self.max_rel_change = max_rel_change
+        self.curvature_tol = curvature_tol
+        self.min_spacing = min_spacing
+        self.max_points = max_points
+        self.n_evaluations = 0
+
+    def _physical(self, dim:int, t):
+        return 10**t if self.log_scale[dim] else t
+
+    def _evaluate_grid_points(self, lines, grid_indices):
+        points = {name: self._physical(dim, lines[dim][grid_indices[:, dim]])
+                  for dim, name in enumerate(self.param_names)}
+        self.n_evaluations += len(grid_indices)
+        return self.evaluate(points)
+
+    def _log_values(self, results):
+        columns = self.columns
+        if columns is None:
+            columns = [key for key in results.columns
+                       if key != 'comp' and not key.endswith('_err') and key not in self.param_names]
+        missing = [key for key in columns if key not in results]
+        if missing:
+            raise ValueError(f'Requested {missing} mobility columns are not calculated with the given effect flags.')
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log(np.column_stack([results[key] for key in columns]))
+
+    def _flag_intervals(self, lines, log_values, dim:int):
+        """
+        Flags of the intervals of the grid lines of parameter dim.
+        """
+        t = lines[dim]
+        values = np.moveaxis(log_values, dim, 0) # (n_dim, ..., n_columns)
+        finite = np.isfinite(values)
+        change = np.abs(np.diff(values, axis=0))
+        change[~(finite[1:] & finite[:-1])] = 0.0
+        change = change.reshape(len(t)-1, -1).max(axis=1) if change.size else np.zeros(len(t)-1)
+        flags = change > self.max_rel_change
+        if len(t) > 2:
+            weights = ((t[2:] - t[1:-1]) / (t[2:] - t[:-2])).reshape((-1,) + (1,)*(values.ndim-1))
+            chord = weights*values[:-2] + (1.0-weights)*values[2:]
+            deviation = np.abs(values[1:-1] - chord)
+            deviation[~(finite[:-2] & finite[1:-1] & finite[2:])] = 0.0
+            curved = deviation.reshape(len(t)-2, -1).max(axis=1) > self.curvature_tol
+            flags[:-1] |= curved
+            flags[1:] |= curved
+        wide = np.diff(t) > 2*self.min_spacing*(self.bounds[dim, 1] - self.bounds[dim, 0])
+        return flags & wide
+
+    def sample(self):
+        """
+        This function samples the mobility. See the class documentation.
+
+        Returns
+        -------
+        MobilityResults
+            The mobilities on the final grid (C-order over the sampled parameters)
+            with the sampled parameter columns. attrs has 'grid_shape' and
+            'n_evaluations'.
+
+        """
+        n_dims = len(self.param_names)
+        lines = [np.linspace(low, high, self.n_initial) for low, high in self.bounds]
+        shape = tuple(len(line) for line in lines)
+        results = self._evaluate_grid_points(lines, np.argwhere(np.ones(shape, dtype=bool)))
+        while True:
+            log_values = self._log_values(results).reshape(shape + (-1,))
+            flags = [self._flag_intervals(lines, log_values, dim) for dim in range(n_dims)]
+            new_lines = [np.sort(np.concatenate([line, 0.5*(line[:-1] + line[1:])[flag]]))
+                         for line, flag in zip(lines, flags)]
+            new_shape = tuple(len(line) for line in new_lines)
+            if new_shape == shape: break
+            if np.prod(new_shape) > self.max_points:
+                logger.warning('Adaptive sampling stopped at %s grid points (max_points=%d) before '
+                               'reaching the tolerances.', np.prod(shape), self.max_points)
+                break
+            # Old grid points keep their values, only the new ones are calculated
+            positions = [np.searchsorted(new_line, line) for new_line, line in zip(new_lines, lines)]
+            old_mask = np.zeros(new_shape, dtype=bool)
+            old_mask[np.ix_(*positions)] = True
+            new_results = self._evaluate_grid_points(new_lines, np.argwhere(~old_mask))
+            merged = MobilityResults._allocate(int(np.prod(new_shape)), results.columns)
+            for column in results.columns:
+                merged_column = merged[column].reshape(new_shape)
+                merged_column[np.ix_(*positions)] = results[column].reshape(shape)
+                merged_column[~old_mask] = new_results[column]
+            logger.info('Adaptive sampling: grid %s -> %s', shape, new_shape)
+            lines, shape, results = new_lines, new_shape, merged
+        grid = np.meshgrid(*lines, indexing='ij')
+        for dim, name in enumerate(self.param_names):
+            results[name] = self._physical(dim, grid[dim].ravel())
+        results.attrs.update({'grid_shape': list(shape), 'n_evaluations': self.n_evaluations})
+        return results
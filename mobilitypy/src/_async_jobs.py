@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Non-blocking mobility calculations: concurrent.futures futures and asyncio
+coroutines running the calculations in managed thread or process pools.
+"""
+import os
+import atexit
+import inspect
+import threading
+import multiprocessing
+import numpy as np
+from concurrent.futures import Future, Executor, ThreadPoolExecutor, ProcessPoolExecutor
+from ._mobility_results import MobilityResults
+
+## ============================================================================
+_executors = {}
+_executors_lock = threading.Lock()
+
+def get_executor(executor='thread', max_workers:int=None):
+    """
+    This function returns the managed pool of the mobility jobs. The pools are
+    created on the first use and shut down at exit.
+
+    Parameters
+    ----------
+    executor : str or concurrent.futures.Executor, optional [options: 'thread', 'process']
+        'thread': thread pool (shares the warm carriers, no pickling; the
+        numpy/numba parts run in parallel). 'process': process pool (full
+        parallelism, the carrier is pickled to the spawned workers, i.e. 
+        scripts need the if __name__ == '__main__': guard). An Executor is
+        returned as is. The default is 'thread'.
+    max_workers : int, optional
+        Number of workers of a new pool. The default is None, i.e. the number
+        of CPUs.
+
+    Returns
+    -------
+    concurrent.futures.Executor
+        The pool.
+
+    """
+    if isinstance(executor, Executor): return executor
+    if executor not in ('thread', 'process'):
+        raise ValueError(f'Requested {executor} executor is not implemented yet. Contact developer.')
+    with _executors_lock:
+        if executor not in _executors:
+            max_workers = max_workers or os.cpu_count() or 1
+            # Spawned workers: forking after the numba parallel kernels have 
+            # started their thread pool deadlocks the workers.
+            _executors[executor] = ThreadPoolExecutor(max_workers, thread_name_prefix='mobilitypy') \
+                if executor == 'thread' else \
+                ProcessPoolExecutor(max_workers, mp_context=multiprocessing.get_context('spawn'))
+        return _executors[executor]
+
+def shutdown_executors(wait:bool=True, cancel_futures:bool=True):
+    """
+    This function shuts down the managed pools (see get_executor()). The
+    pending jobs are cancelled unless cancel_futures is False.
+    """
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait, cancel_futures=cancel_futures)
+
+atexit.register(shutdown_executors, wait=False)
+
+def _evaluate(carrier, calculate_name:str, kwargs:dict, compositions=None):
+    if compositions is not None: carrier = carrier._carrier_at_compositions(compositions)
+    return getattr(carrier, calculate_name)(**kwargs, return_dataframe=False)
+
+def _as_input(value):
+    """
+    Numeric lists are the same inputs as arrays (split with the compositions).
+    """
+    if isinstance(value, (list, tuple)):
+        array = np.asarray(value)
+        if array.dtype.kind in 'iuf': return array
+    return value
+
+## ============================================================================
+class _ChunkedFuture(Future):
+    '''
+    Future of a mobility calculation split into composition chunks, every
+    chunk a separate job of the pool. cancel() cancels the chunks that have
+    not started (the running chunks finish, their results are discarded), so
+    a cancelled calculation releases the pool after at most one chunk per
+    worker. The result is the chunks concatenated in the composition order
+    (pandas dataframe if return_dataframe).
+    '''
+    def __init__(self, chunk_futures, return_dataframe:bool):
+        super().__init__()
+        self._chunk_futures = list(chunk_futures)
+        self._return_dataframe = return_dataframe
+        self._n_pending = len(self._chunk_futures)
+        self._lock = threading.RLock()
+        for future in self._chunk_futures:
+            future.add_done_callback(self._chunk_done)
+
+    def cancel(self):
+        for future in self._chunk_futures: future.cancel()
+        return super().cancel()
+
+    def _chunk_done(self, future):
+        # Reentrant: cancelling the other chunks runs their callbacks in this thread.
+        with self._lock:
+            self._n_pending -= 1
+            if self.done(): return
+            if not future.cancelled() and future.exception() is not None:
+                if self.set_running_or_notify_cancel(): self.set_exception(future.exception())
+                for other in self._chunk_futures: other.cancel()
+                return
+            if self._n_pending: return
+            if any(chunk.cancelled() for chunk in self._chunk_futures):
+                super().cancel()
+            elif self.set_running_or_notify_cancel():
+                results = [chunk.result() for chunk in self._chunk_futures]
+                results = results[0] if len(results) == 1 else MobilityResults.concatenate(results)
+                self.set_result(results.to_pandas() if self._return_dataframe else results)
+
+def _submit(carrier, calculate_name:str, kwargs:dict, executor='thread', chunk_size:int=None):
+    """
+    This function submits calculate_name(**kwargs) of carrier to the pool in
+    chunks of chunk_size compositions. The inputs that are arrays of the
+    compositions length are split with the compositions, the others are
+    passed to every chunk. Without per-composition splitting (e.g. inputs of
+    other lengths, diagnostics) the calculation is one job.
+    Returns _ChunkedFuture.
+    """
+    signature = inspect.signature(getattr(carrier, calculate_name))
+    signature.bind(**kwargs) # TypeError for unknown inputs, before anything is queued
+    return_dataframe = kwargs.pop('return_dataframe', signature.parameters['return_dataframe'].default)
+    pool = get_executor(executor)
+    kwargs = {name: _as_input(val) for name, val in kwargs.items()}
+    comps = np.asarray(carrier.comps_)
+    n_comps = len(comps)
+    splittable = not kwargs.get('collect_diagnostics', False) and \
+        all(np.ndim(val) == 0 or (np.ndim(val) == 1 and len(val) == n_comps)
+            for val in kwargs.values() if isinstance(val, (np.ndarray, int, float)))
+    if chunk_size is None:
+        n_workers = getattr(pool, '_max_workers', 1) or 1
+        chunk_size = int(np.ceil(n_comps/(2*n_workers)))
+    chunk_size = max(int(chunk_size), 1)
+    if not splittable: chunk_size = n_comps
+    # Every job calculates on its own carrier copy (set up in the worker): the
+    # calculate functions store the effect flags in the instance.
+    futures = []
+    for start in range(0, n_comps, chunk_size):
+        stop = min(start + chunk_size, n_comps)
+        chunk_kwargs = kwargs if chunk_size == n_comps else \
+            {name: val[start:stop] if isinstance(val, np.ndarray) and val.ndim == 1 else val
+             for name, val in kwargs.items()}
+        futures.append(pool.submit(_evaluate, carrier, calculate_name, chunk_kwargs, comps[start:stop]))
+    return _ChunkedFuture(futures, return_dataframe)
@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Batch runner of the mobility sweeps described by a sweep specification file
+(TOML, YAML or JSON). Used by the 'mobilitypy' command line interface.
+
+Example specification (TOML):
+
+    [carrier]
+    type = "2d"                       # "2d" (sheet mobility) or "3d"
+    binaries = ["AlN", "GaN"]
+    compositions = {start = 0.5, stop = 0.95, num = 10}
+    alloy_crystal_structure = "wz"
+
+    [inputs]                          # fixed inputs of the mobility method
+    rms_roughness = 0.3
+    corr_len = 3
+
+    [sweep.grid]                      # full-factorial grid (x compositions)
+    n_2d = [5, 10, 15]
+    T = {start = 200, stop = 500, num = 7}
+
+    # or a design of experiments (see DesignSampler):
+    # [sweep.design]
+    # method = "sobol"
+    # n_points = 65536
+    # param_ranges = {comp = [0.5, 1], n_2d = [1, 20], T = [200, 500]}
+    # log_scale = []
+    # seed = 0
+
+    [effects]
+    alloy_disordered_effect = true
+    interface_roughness_effect = true
+    polar_optical_phonon_effect = true
+
+    [model]                           # other options of the mobility method
+    mobility_model = "v2"
+    integration_backend = "fixed_node" # 2d only
+
+    [output]
+    dir = "sweep_results"
+    format = "npz"                    # "npz", "parquet" or "feather"
+
+    [run]
+    workers = 4
+    chunk_size = 4096
+
+A value is a number, a list of numbers or a range {start, stop, num, log}
+(log = true: logarithmically spaced between start and stop).
+"""
+import os
+import json
+import time
+import inspect
+import multiprocessing
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from ._mobility_results import MobilityResults
+from ._design_sampler import DesignSampler
+from ._logging import logger
+
+## ============================================================================
+def load_sweep_spec(spec_file):
+    """
+    This function reads a sweep specification file. The format is taken
+    from the file extension: .toml, .yaml/.yml (needs PyYAML) or .json.
+
+    Parameters
+    ----------
+    spec_file : str/path
+        The specification file.
+
+    Returns
+    -------
+    dict
+        The sweep specification.
+
+    """
+    spec_file = os.fspath(spec_file)
+    extension = os.path.splitext(spec_file)[1].lower()
+    if extension == '.toml':
+        import tomllib
+        with open(spec_file, 'rb') as f:
+            return tomllib.load(f)
+    if extension in ('.yaml', '.yml'):
+        try:
+            import yaml
+        except ImportError as error:
+            raise ImportError('YAML sweep specification needs PyYAML. Install it using '
+                              '"pip install pyyaml" or use TOML/JSON.') from error
+        with open(spec_file, 'r') as f:
+            return yaml.safe_load(f)
+    if extension == '.json':
+        with open(spec_file, 'r') as f:
+            return json.load(f)
+    raise ValueError(f'Requested {extension} specification file format is not implemented yet. Contact developer.')
+
+def _spec_values(value):
+    """
+    Values of a specification entry: number, list or {start, stop, num, log}.
+    """
+    if isinstance(value, dict):
+        unknown = [key for key in value if key not in ('start', 'stop', 'num', 'log')]
+        if unknown:
+            raise ValueError(f'Range specification keys {unknown} are not implemented yet. Contact developer.')
+        if value.get('log', False):
+            return np.logspace(np.log10(value['start']), np.log10(value['stop']), int(value['num']))
+        return np.linspace(value['start'], value['stop'], int(value['num']))
+    return np.atleast_1d(np.asarray(value, dtype=float)).ravel()
+
+def _calculate_options(carrier_class, calculate_name:str):
+    """
+    The options of the mobility method calculate_name that can be given in a
+    specification (all except the output shape options) and the numeric
+    inputs among them (e.g. 'n_2d', 'T'), which can be fixed or swept.
+    """
+    parameters = inspect.signature(getattr(carrier_class, calculate_name)).parameters
+    allowed = [name for name in parameters if name not in _excluded_options]
+    input_names = [name for name in allowed if isinstance(parameters[name].default, (int, float))
+                   and not isinstance(parameters[name].default, bool)]
+    return allowed, input_names
+
+_excluded_options = ('self', 'return_dataframe', 'return_errors', 'collect_diagnostics',
+                     'jacobian_params')
+
+## ============================================================================
+class _BatchRunner:
+    '''
+    The functions in this class run a sweep specification chunk by chunk in
+    the worker processes and write every completed chunk to a ResultStore.
+    Every chunk is calculated in one vectorized call of the mobility engine
+    (see _MobilityCarrier._calculate_at_points). The store keeps the
+    normalized specification, so restarting the same sweep skips the
+    completed chunks.
+
+    Grid sweeps: full-factorial product of the compositions and the grid
+    axes (last axis fastest), chunk_size rows per chunk. The flat row index
+    is decoded per chunk, so the grid is never materialised.
+    Design sweeps: chunk_size design points per chunk, every design point at
+    all the compositions (if 'comp' is not a design input).
+    '''
+    _carrier_types = {'2d': ('Mobility2DCarrier', 'calculate_sheet_mobility', 'n_2d'),
+                      '3d': ('Mobility3DCarrier', 'calculate_3D_mobility', 'n_3d')}
+    _sections = ('carrier', 'inputs', 'sweep', 'effects', 'model', 'output', 'run')
+
+    def __init__(self, spec:dict):
+        """
+        Parameters
+        ----------
+        spec : dict
+            The sweep specification (see load_sweep_spec()).
+        """
+        unknown = [key for key in spec if key not in self._sections]
+        if unknown:
+            raise ValueError(f'Specification sections {unknown} are not implemented yet. Contact developer.')
+        self.spec = spec
+        carrier_spec = dict(spec.get('carrier', {}))
+        carrier_type = str(carrier_spec.pop('type', '2d')).lower()
+        if carrier_type not in self._carrier_types:
+            raise ValueError(f'Requested {carrier_type} carrier is not implemented yet. Contact developer.')
+        self.carrier_type = carrier_type
+        self.class_name, self.calculate_name, self.density_name = self._carrier_types[carrier_type]
+        if 'compositions' in carrier_spec:
+            carrier_spec['compositions'] = _spec_values(carrier_spec['compositions'])
+        self.carrier_spec = carrier_spec
+        model = dict(spec.get('model', {}))
+        self.integration_backend = model.pop('integration_backend', None)
+        if self.integration_backend is not None and carrier_type != '2d':
+            raise ValueError('integration_backend is only available for the 2d carrier.')
+        self.inputs = {name: float(val) for name, val in spec.get('inputs', {}).items()}
+        self.calculate_kwargs = {**self.inputs, **spec.get('effects', {}), **model}
+        self._check_calculate_kwargs()
+        run = spec.get('run', {})
+        self.chunk_size = max(int(run.get('chunk_size', 4096)), 1)
+        self.workers = max(int(run.get('workers', 1)), 1)
+        self._carrier = None
+        self._setup_sweep(spec.get('sweep', {}))
+
+    def _carrier_class(self):
+        from .. import mobility
+        return getattr(mobility, self.class_name)
+
+    def _check_calculate_kwargs(self):
+        allowed, self.input_names = _calculate_options(self._carrier_class(), self.calculate_name)
+        unknown = [name for name in self.calculate_kwargs if name not in allowed]
+        if unknown:
+            raise ValueError(f'Requested {unknown} options of {self.calculate_name} are not implemented yet. Contact developer.')
+        unknown = [name for name in self.inputs if name not in self.input_names]
+        if unknown:
+            raise ValueError(f'{unknown} are not numeric inputs of {self.calculate_name}.')
+
+    def _check_sweep_inputs(self, names):
+        for name in names:
+            if name == 'comp' or ':' in name: continue
+            if name not in self.input_names:
+                raise ValueError(f'Requested sweep over {name} is not implemented yet. Contact developer.')
+
+    def _setup_sweep(self, sweep:dict):
+        if ('grid' in sweep) == ('design' in sweep):
+            raise ValueError("The sweep section should have either 'grid' or 'design'.")
+        comps = self.carrier_spec.get('compositions')
+        if 'grid' in sweep:
+            axes = {name: _spec_values(val) for name, val in sweep['grid'].items()}
+            self._check_sweep_inputs(axes)
+            if 'comp' not in axes:
+                if comps is None:
+                    raise ValueError("Give the carrier compositions or a 'comp' grid axis.")
+                axes = {'comp': comps, **axes}
+            self.axes = axes
+            self.design = None
+            self.n_rows = int(np.prod([len(val) for val in axes.values()]))
+            self.n_chunks = (self.n_rows + self.chunk_size - 1) // self.chunk_size
+        else:
+            design_spec = dict(sweep['design'])
+            if 'n_points' not in design_spec:
+                raise ValueError('The design needs n_points.')
+            self.design = DesignSampler(**design_spec)
+            self._check_sweep_inputs(self.design.param_names)
+            if 'comp' in self.design.param_names:
+                self.base_comps = None
+            elif comps is None:
+                raise ValueError("Give the carrier compositions or a 'comp' design range.")
+            else:
+                self.base_comps = np.asarray(comps, dtype=float)
+            self.axes = None
+            self.n_chunks = (self.design.n_points + self.chunk_size - 1) // self.chunk_size
+        for name in list(self.axes or []) + list(self.design.param_names if self.design else []):
+            self.calculate_kwargs.pop(name, None)
+
+    def sweep_spec(self):
+        """
+        The normalized specification saved in the store (resume check).
+        """
+        return {'carrier_type': self.carrier_type, 'carrier': self.carrier_spec,
+                'calculate_kwargs': self.calculate_kwargs,
+                'integration_backend': self.integration_backend,
+                'grid': self.axes, 'design': None if self.design is None else self.design.spec(),
+                'chunk_size': self.chunk_size}
+
+    def carrier(self):
+        """
+        The mobility instance of the specification (created once per process).
+        """
+        if self._carrier is None:
+            carrier_spec = dict(self.carrier_spec)
+            if self.axes is not None: carrier_spec['compositions'] = np.unique(self.axes['comp'])
+            elif self.base_comps is None: carrier_spec.pop('compositions', None)
+            self._carrier = self._carrier_class()(**carrier_spec)
+            if self.integration_backend is not None:
+                self._carrier.set_integration_backend(self.integration_backend)
+            self._carriers = {}
+        return self._carrier
+
+    def chunk_points(self, chunk_id:int):
+        """
+        This function returns the inputs (dict of 1D arrays) of the rows of a chunk.
+        """
+        start = chunk_id*self.chunk_size
+        if self.axes is not None:
+            stop = min(start + self.chunk_size, self.n_rows)
+            index = np.unravel_index(np.arange(start, stop), [len(val) for val in self.axes.values()])
+            return {name: val[ii] for (name, val), ii in zip(self.axes.items(), index)}
+        stop = min(start + self.chunk_size, self.design.n_points)
+        design_points = self.design.points(start, stop)
+        n_base = 1 if self.base_comps is None else len(self.base_comps)
+        points = {'design_point': np.repeat(np.arange(start, stop), n_base).astype(float)}
+        if self.base_comps is not None: points['comp'] = np.tile(self.base_comps, stop - start)
+        points.update({name: np.repeat(val, n_base) for name, val in design_points.items()})
+        return points
+
+    def evaluate_chunk(self, chunk_id:int):
+        """
+        This function calculates the mobilities of a chunk.
+
+        Returns
+        -------
+        dict
+            The input and the mobility columns of the chunk rows.
+
+        """
+        carrier = self.carrier()
+        points = self.chunk_points(chunk_id)
+        inputs = {name: val for name, val in points.items() if name != 'design_point'}
+        results = carrier._calculate_at_points(self.calculate_name, self.density_name, inputs,
+                                               carriers=self._carriers, **self.calculate_kwargs)
+        return {**points, **results.to_dict()}
+
+    def run(self, store, workers:int=None, progress=None):
+        """
+        This function runs the missing chunks of the sweep.
+
+        Parameters
+        ----------
+        store : ResultStore
+            The result store of the sweep.
+        workers : int, optional
+            Number of worker processes. 1 runs in the current process. The
+            default is None, i.e. the specification value.
+        progress : callable, optional
+            progress(n_done, n_chunks, n_calculated, n_rows, elapsed_time) is called
+            after every completed chunk (n_done includes the chunks of the earlier
+            runs, n_calculated and n_rows count this run). The default is None.
+
+        Returns
+        -------
+        int
+            Number of chunks calculated in this run.
+
+        """
+        workers = self.workers if workers is None else max(int(workers), 1)
+        store.set_sweep_spec(self.sweep_spec())
+        pending = [chunk_id for chunk_id in range(self.n_chunks) if not store.is_complete(chunk_id)]
+        n_done = self.n_chunks - len(pending)
+        n_calculated, n_rows, start_time = 0, 0, time.perf_counter()
+        logger.info('Sweep: %d chunks (%d completed earlier), %d worker(s)', self.n_chunks, n_done, workers)
+
+        def completed(chunk_id, columns):
+            nonlocal n_done, n_calculated, n_rows
+            parameters = {name: columns.pop(name) for name in list(columns)
+                          if name in ('design_point', 'comp') or name in self.input_names or ':' in name}
+            store.write_chunk(chunk_id, MobilityResults(columns), parameters=parameters)
+            n_done += 1
+            n_calculated += 1
+            n_rows += len(next(iter(parameters.values())))
+            if progress is not None: progress(n_done, self.n_chunks, n_calculated, n_rows,
+                                             time.perf_counter() - start_time)
+
+        if workers == 1 or len(pending) <= 1:
+            for chunk_id in pending:
+                completed(chunk_id, self.evaluate_chunk(chunk_id))
+            return len(pending)
+        # Spawned (not forked) workers: forking after the numba parallel kernels
+        # have started their (TBB) thread pool deadlocks the workers.
+        with ProcessPoolExecutor(max_workers=workers, initializer=_initialize_worker,
+                                 initargs=(self.spec,),
+                                 mp_context=multiprocessing.get_context('spawn')) as executor:
+            queue, running = iter(pending), {}
+            try:
+                while True:
+                    # Keep two chunks per worker in flight, the results are written as they arrive.
+                    while len(running) < 2*workers:
+                        chunk_id = next(queue, None)
+                        if chunk_id is None: break
+                        running[executor.submit(_evaluate_chunk, chunk_id)] = chunk_id
+                    if not running: break
+                    finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        completed(running.pop(future), future.result())
+            except BaseException:
+                for future in running: future.cancel()
+                raise
+        return len(pending)
+
+## ============================================================================
+_worker_runner = None
+
+def _initialize_worker(spec):
+    global _worker_runner
+    _worker_runner = _BatchRunner(spec)
+
+def _evaluate_chunk(chunk_id):
+    return _worker_runner.evaluate_chunk(chunk_id)
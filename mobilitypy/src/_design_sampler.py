@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Quasi-random and space-filling designs (Sobol, Halton, Latin hypercube) over
+named input ranges.
+"""
+import warnings
+import numpy as np
+from ._logging import logger
+
+## ============================================================================
+class DesignSampler:
+    '''
+    The functions in this class generate the points of a design of experiments
+    over named input ranges. The inputs are uniformly (or log-uniformly)
+    distributed in their ranges.
+
+    The designs are deterministic for the same seed: any slice of the point
+    stream [start, stop) is regenerated directly (Sobol and Halton sequences
+    are fast-forwarded to start, the Latin hypercube is generated once for all
+    n_points), so a design can be evaluated chunk by chunk and resumed.
+    '''
+    _methods = ('sobol', 'halton', 'lhs', 'random')
+
+    def __init__(self, param_ranges:dict, n_points:int=None, method:str='sobol',
+                 log_scale=(), seed:int=0, scramble:bool=True):
+        """
+        Initiation function of the class DesignSampler.
+
+        Parameters
+        ----------
+        param_ranges : dict
+            {input: (low, high)}, e.g. {'comp': (0.5, 1), 'n_2d': (1, 20)}.
+        n_points : int, optional
+            Total number of design points. Needed for 'lhs'. For 'sobol' powers of
+            2 keep the balance properties of the sequence. The default is None.
+        method : str, optional [options: 'sobol', 'halton', 'lhs', 'random']
+            'sobol': scrambled Sobol sequence, 'halton': scrambled Halton sequence,
+            'lhs': Latin hypercube (one point per 1/n_points interval of every input),
+            'random': pseudo-random uniform points. The default is 'sobol'.
+        log_scale : sequence of str, optional
+            Inputs sampled uniformly in log scale. The default is ().
+        seed : int, optional
+            Seed of the scrambling (random points). The same seed generates the
+            same design. The default is 0.
+        scramble : bool, optional
+            Scramble the Sobol/Halton sequences (and randomize the points within
+            the Latin hypercube cells). The default is True.
+
+        Returns
+        -------
+        None.
+
+        """
+        if method not in self._methods:
+            raise ValueError(f'Requested {method} design is not implemented yet. Contact developer.')
+        if method == 'lhs' and n_points is None:
+            raise ValueError('Latin hypercube design needs n_points.')
+        if not param_ranges:
+            raise ValueError('Give at least one input range for the design.')
+        self.param_names = list(param_ranges)
+        unknown = [name for name in log_scale if name not in param_ranges]
+        if unknown:
+            raise ValueError(f'log_scale inputs {unknown} are not in param_ranges.')
+        bounds = np.array([param_ranges[name] for name in self.param_names], dtype=float)
+        if bounds.shape != (len(self.param_names), 2) or np.any(bounds[:, 1] <= bounds[:, 0]):
+            raise ValueError('param_ranges should be {input: (low, high)} with low < high.')
+        self.log_scale = np.array([name in log_scale for name in self.param_names])
+        if np.any(bounds[self.log_scale] <= 0):
+            raise ValueError('log_scale inputs need positive ranges.')
+        self.bounds = bounds
+        log_bounds = np.log10(np.where(self.log_scale[:, None], bounds, 1.0))
+        self.lower = np.where(self.log_scale, log_bounds[:, 0], bounds[:, 0])
+        self.upper = np.where(self.log_scale, log_bounds[:, 1], bounds[:, 1])
+        self.n_points = None if n_points is None else int(n_points)
+        self.method = method
+        self.seed = seed
+        self.scramble = scramble
+        self._lhs_points = None
+        if method == 'sobol' and self.n_points is not None and self.n_points & (self.n_points - 1):
+            logger.info('Sobol design: n_points=%d is not a power of 2, the balance properties '
+                        'of the sequence are lost.', self.n_points)
+
+    def spec(self):
+        """
+        This function returns the JSON serializable specification of the design
+        (e.g. for ResultStore.set_sweep_spec()).
+        """
+        return {'method': self.method, 'param_ranges': dict(zip(self.param_names, self.bounds.tolist())),
+                'log_scale': [name for name, log in zip(self.param_names, self.log_scale) if log],
+                'n_points': self.n_points, 'seed': self.seed, 'scramble': self.scramble}
+
+    def unit_points(self, start:int=0, stop:int=None):
+        """
+        This function returns the points start..stop-1 of the design in the
+        unit hypercube (2D array (stop-start, number of inputs)).
+        """
+        stop = self.n_points if stop is None else stop
+        if stop is None:
+            raise ValueError('Give stop (or n_points) of the design points.')
+        if self.n_points is not None: stop = min(stop, self.n_points)
+        n, d = max(stop - start, 0), len(self.param_names)
+        if self.method == 'random':
+            # One 64 bit draw per coordinate: jump the stream to the start point
+            bit_generator = np.random.PCG64(self.seed)
+            bit_generator.advance(start*d)
+            return np.random.Generator(bit_generator).random((n, d))
+        from scipy.stats import qmc # scipy.stats is slow to import
+        if self.method == 'lhs':
+            if self._lhs_points is None:
+                self._lhs_points = qmc.LatinHypercube(d, scramble=self.scramble,
+                                                      seed=self.seed).random(self.n_points)
+            return self._lhs_points[start:stop]
+        engine = qmc.Sobol(d, scramble=self.scramble, seed=self.seed) if self.method == 'sobol' \
+            else qmc.Halton(d, scramble=self.scramble, seed=self.seed)
+        if start: engine.fast_forward(start)
+        with warnings.catch_warnings():
+            # Chunks of the sequence need not be powers of 2 (see __init__).
+            warnings.filterwarnings('ignore', message='The balance properties of Sobol')
+            return engine.random(n)
+
+    def scale(self, unit_points):
+        """
+        This function maps unit hypercube points (2D array) to the input ranges.
+        """
+        values = self.lower + np.asarray(unit_points, dtype=float)*(self.upper - self.lower)
+        values[:, self.log_scale] = 10**values[:, self.log_scale]
+        return values
+
+    def points(self, start:int=0, stop:int=None):
+        """
+        This function returns the points start..stop-1 of the design.
+
+        Parameters
+        ----------
+        start : int, optional
+            Index of the first point. The default is 0.
+        stop : int, optional
+            Index after the last point. The default is n_points.
+
+        Returns
+        -------
+        dict
+            {input: 1D float array of the values}.
+
+        """
+        values = self.scale(self.unit_points(start, stop))
+        return {name: np.ascontiguousarray(values[:, ii]) for ii, name in enumerate(self.param_names)}
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Content-addressed persistent disk cache for mobility evaluations.
+"""
+import os
+import json
+import pickle
+import hashlib
+import tempfile
+import numpy as np
+from .database import material_database
+
+## ============================================================================
+class _DiskCache:
+    '''
+    The functions in this class store/load the function return values on disk
+    keyed by a hash of the function inputs.
+
+    Writes are atomic (temporary file + os.replace), so the cache directory can
+    be shared between concurrent processes. The cache size is limited; when the
+    limit is exceeded the least recently used entries are evicted. Cache hits
+    update the file modification time, which is used as the LRU clock.
+
+    The material database digest is calculated once per cache instance (see 
+    _refresh_database_digest). The total cache size is tracked in memory; the 
+    cache directory is scanned only when the size limit is exceeded.
+    '''
+    _file_suffix = '.pkl'
+
+    def __init__(self, cache_dir=None, max_size_mb:float=512):
+        """
+        Initiation function of the class _DiskCache.
+
+        Parameters
+        ----------
+        cache_dir : str/path, optional
+            The cache directory. If None, '~/.cache/mobilitypy' is used.
+            The default is None.
+        max_size_mb : float, optional (unit: MB)
+            Maximum total size of the cache files. The default is 512 MB.
+
+        Returns
+        -------
+        None.
+
+        """
+        if cache_dir is None:
+            cache_dir = os.path.join(os.path.expanduser('~'), '.cache', 'mobilitypy')
+        self.cache_dir = os.fspath(cache_dir)
+        self.max_size_bytes = int(max_size_mb * 1024 * 1024)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._refresh_database_digest()
+        self._index_entries()
+
+    @staticmethod
+    def _package_version():
+        from .. import __version__
+        return __version__
+
+    @staticmethod
+    def _database_snapshot():
+        return json.dumps(material_database, sort_keys=True, default=str)
+
+    def _refresh_database_digest(self):
+        """
+        This function (re)calculates the digest of the material database snapshot
+        used in the cache keys. Call it after editing the material database in place.
+        """
+        self.database_digest_ = hashlib.blake2b(self._database_snapshot().encode(), 
+                                                digest_size=20).hexdigest()
+        return self.database_digest_
+
+    @classmethod
+    def _update_hash(cls, hasher, value):
+        """
+        Recursively feed the value to the hasher. Arrays are hashed by their
+        raw bytes (plus dtype and shape), so no formatting is involved.
+        """
+        if isinstance(value, np.ndarray) or isinstance(value, np.generic):
+            value = np.ascontiguousarray(value)
+            hasher.update(f'nd{value.dtype.str}{value.shape}'.encode())
+            hasher.update(value.tobytes())
+        elif isinstance(value, dict):
+            hasher.update(b'dict')
+            for key in sorted(value, key=str):
+                hasher.update(str(key).encode())
+                cls._update_hash(hasher, value[key])
+        elif isinstance(value, (list, tuple)):
+            hasher.update(f'seq{len(value)}'.encode())
+            for val in value:
+                cls._update_hash(hasher, val)
+        else:
+            hasher.update(f'{type(value).__name__}:{value!r}'.encode())
+        hasher.update(b'|')
+
+    def _make_key(self, func_name:str, *key_items):
+        """
+        Generate the cache key from the function name, the inputs, the material
+        database digest and the package version.
+        """
+        hasher = hashlib.blake2b(digest_size=20)
+        self._update_hash(hasher, [func_name, self._package_version(),
+                                   self.database_digest_, list(key_items)])
+        return hasher.hexdigest()
+
+    def _file_path(self, key:str):
+        return os.path.join(self.cache_dir, key[:2], f'{key}{self._file_suffix}')
+
+    def _get(self, key:str):
+        """
+        Returns
+        -------
+        (bool, object)
+            (True, cached value) if cache hit. Otherwise, (False, None).
+        """
+        file_path = self._file_path(key)
+        try:
+            with open(file_path, 'rb') as f:
+                value = pickle.load(f)
+        except FileNotFoundError:
+            return False, None
+        except (pickle.UnpicklingError, EOFError, AttributeError, ImportError):
+            # Corrupted or incompatible entry. Treat as a miss.
+            self._remove(file_path)
+            self._total_size -= self._index.pop(file_path, 0)
+            return False, None
+        try:
+            os.utime(file_path) # LRU clock
+        except OSError:
+            pass
+        return True, value
+
+    def _set(self, key:str, value):
+        file_path = self._file_path(key)
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(file_path), prefix='.tmp_')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path): self._remove(tmp_path)
+        try:
+            size = os.path.getsize(file_path)
+        except OSError: # Removed by other process
+            size = 0
+        self._total_size += size - self._index.get(file_path, 0)
+        self._index[file_path] = size
+        if self._total_size > self.max_size_bytes: self._evict()
+
+    @staticmethod
+    def _remove(file_path):
+        try:
+            os.remove(file_path)
+        except OSError:
+            pass
+
+    def _entries(self):
+        entries = []
+        for root, _, files in os.walk(self.cache_dir):
+            for file_name in files:
+                if not file_name.endswith(self._file_suffix) or file_name.startswith('.tmp_'):
+                    continue
+                try:
+                    stat = os.stat(os.path.join(root, file_name))
+                except OSError: # Removed by other process
+                    continue
+                entries.append((stat.st_mtime, stat.st_size, os.path.join(root, file_name)))
+        return entries
+
+    def _index_entries(self, entries=None):
+        """
+        Reset the in-memory size index from the cache directory entries.
+        """
+        if entries is None: entries = self._entries()
+        self._index = {file_path: size for _, size, file_path in entries}
+        self._total_size = sum(self._index.values())
+        return entries
+
+    def _evict(self):
+        """
+        Remove the least recently used entries until the total size is below
+        the size limit. The cache directory is rescanned, so the entries 
+        written by other processes are included.
+        """
+        entries = self._index_entries()
+        if self._total_size <= self.max_size_bytes: return
+        for _, size, file_path in sorted(entries):
+            self._remove(file_path)
+            self._total_size -= size
+            del self._index[file_path]
+            if self._total_size <= self.max_size_bytes: break
+
+    def clear(self):
+        """
+        Remove all the cache entries.
+        """
+        for _, _, file_path in self._entries():
+            self._remove(file_path)
+        self._index_entries(entries=[])
+
+    def size(self):
+        """
+        Total size of the cache entries in bytes.
+        """
+        return sum(entry[1] for entry in self._entries())
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Registry of the figure-of-merit (FOM) definitions.
+
+Every FOM is a function f(n_2d, mobility, bandgap, alloy_params, direct_bandgap)
+of broadcastable arrays:
+    n_2d (unit: 10^12 cm^-2), mobility (unit: cm^2 V^-1 s^-1),
+    bandgap (unit: eV; temperature corrected if requested),
+    alloy_params: dict of the alloy parameters (broadcastable with bandgap),
+    direct_bandgap: critical electric field model (see _critical_electric_field).
+
+The critical electric field follows J. L. Hudgins, G. S. Simin, E. Santi and
+M. A. Khan, "An assessment of wide bandgap semiconductors for power devices,"
+in IEEE Transactions on Power Electronics, vol. 18, no. 3, pp. 907-914,
+May 2003, doi: 10.1109/TPEL.2003.810840.
+"""
+from ._constants import eps_0
+
+## ============================================================================
+figure_of_merit_registry = {}
+
+def register_figure_of_merit(name:str, unit:str, description:str=''):
+    """
+    This function registers a figure-of-merit definition (decorator).
+
+    Example:
+        @register_figure_of_merit('mu_Ec', unit='V/s', description='mu*E_cr')
+        def mu_ec(n_2d, mobility, bandgap, alloy_params, direct_bandgap):
+            return mobility*_critical_electric_field(bandgap, direct_bandgap)
+
+    Parameters
+    ----------
+    name : str
+        Name (mode) of the figure-of-merit, e.g. 'LFOM'.
+    unit : str
+        Unit of the figure-of-merit.
+    description : str, optional
+        Short description. The default is ''.
+
+    Returns
+    -------
+    callable
+        The decorator.
+
+    """
+    def decorator(function):
+        figure_of_merit_registry[name] = {'function': function, 'unit': unit,
+                                          'description': description}
+        return function
+    return decorator
+
+def _critical_electric_field(bandgap, direct_bandgap:bool=True):
+    """
+    Critical electric field (unit: V/cm) from the bandgap (unit: eV).
+        direct bandgap: 1.73e5*(bandgap^2.5)
+        indirect bandgap: 2.38e5*(bandgap^2)
+    """
+    if direct_bandgap: return 1.73e5*bandgap**2.5
+    return 2.38e5*bandgap**2
+
+@register_figure_of_merit('LFOM', unit='MW/cm^2',
+                          description='Lateral (Huang) figure-of-merit e*n_2d*mu*E_cr^2')
+def _lateral_figure_of_merit(n_2d, mobility, bandgap, alloy_params, direct_bandgap):
+    #   LFOM = e*n_2d*mu*E_cr^2 = 1.602e-19 C * 1e12 cm^-2 * cm^2 V^-1 s^-1 * V^2cm^-2
+    #                           = 1.602e-13 MW/cm^2
+    if direct_bandgap:
+        # 1.73**2*e_charge*1e10*1e12*1e-6 =  0.0047951544478985995
+        e_times_e_cr_sqr_pre_fact = 0.0047951544478985995
+        e_cr_sqr_eg_pow = 5 # 2.5**2
+    else:
+        # 2.38**2*e_charge*1e10*1e12*1e-6 = 0.009075369325629598
+        e_times_e_cr_sqr_pre_fact = 0.009075369325629598
+        e_cr_sqr_eg_pow = 4 # 2**2
+    return e_times_e_cr_sqr_pre_fact * n_2d * mobility * bandgap**e_cr_sqr_eg_pow #MW/cm^2
+
+@register_figure_of_merit('BFOM', unit='MW/cm^2',
+                          description='Vertical (Baliga) figure-of-merit V_B^2/R_on,sp = eps*mu*E_cr^3/4')
+def _baliga_figure_of_merit(n_2d, mobility, bandgap, alloy_params, direct_bandgap):
+    # eps_0*1e-2: F/m -> F/cm; F.V^2.s^-1.cm^-2 = W/cm^2; 1e-6 W -> MW
+    eps_s = eps_0*1e-2*alloy_params['static_dielectric_constant']
+    return 0.25e-6*eps_s*mobility*_critical_electric_field(bandgap, direct_bandgap)**3
+
+@register_figure_of_merit('BHFFOM', unit='V/s',
+                          description='Baliga high-frequency figure-of-merit mu*E_cr^2')
+def _baliga_high_frequency_figure_of_merit(n_2d, mobility, bandgap, alloy_params, direct_bandgap):
+    return mobility*_critical_electric_field(bandgap, direct_bandgap)**2
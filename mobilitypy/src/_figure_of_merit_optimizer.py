@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Constrained optimisation of the lateral figure-of-merit (or the sheet
+resistance) over composition, carrier density, temperature and the other
+sheet mobility inputs.
+"""
+import itertools
+import numpy as np
+from ._mobility_results import MobilityResults
+from ._design_sampler import DesignSampler
+
+## ============================================================================
+class _FigureOfMeritOptimizer:
+    '''
+    The functions in this class maximise the lateral figure-of-merit (LFOM) or
+    minimise the sheet resistance of the 2DEG under box constraints on the
+    inputs and range constraints on the bandgap, mobility, sheet resistance and
+    LFOM.
+
+    The search has two stages, every stage point set is calculated in a single
+    vectorized call:
+        1. Coarse: n_coarse scrambled Sobol points over the input ranges.
+        2. Refinement: from the n_starts best feasible coarse points (at least
+           one coarse cell apart) a bounded compass (pattern) search. All the
+           3^d - 1 neighbours center +- h of the active starts are calculated
+           together. A better neighbour becomes the new center; if the center
+           is the best, the optimum is bracketed by center +- h and h is halved.
+           The search stops when h < xtol*(upper - lower) for all the inputs.
+    The bandgap and input constraints are checked before the mobility
+    calculation, i.e. infeasible points cost no mobility calculation.
+    '''
+    _objectives = {'LFOM': 1.0, 'sheet_resistance': -1.0} # maximise sign*objective
+    _quantities = ('bandgap', 'mobility', 'sheet_resistance', 'LFOM')
+
+    def __init__(self, carrier, variable_ranges:dict, fixed_inputs:dict, effect_flags:dict,
+                 objective:str='LFOM', constraints:dict=None, fom_options:dict=None,
+                 n_coarse:int=64, n_starts:int=3, xtol:float=1e-3, max_iter:int=200,
+                 seed:int=0):
+        if objective not in self._objectives:
+            raise ValueError(f'Unknown objective {objective}. The objective should be one of {list(self._objectives)}.')
+        unknown = [name for name in variable_ranges if name != 'comp' and name not in fixed_inputs]
+        if unknown:
+            raise ValueError(f'Unknown variables {unknown}. The variables should be in {["comp", *fixed_inputs]}.')
+        self.carrier = carrier
+        self.objective = objective
+        self.sign = self._objectives[objective]
+        self.param_names = list(variable_ranges)
+        self.fixed_inputs = {name: val for name, val in fixed_inputs.items() if name not in variable_ranges}
+        if 'comp' not in variable_ranges:
+            if len(carrier.comps_) != 1:
+                raise ValueError("Give the composition range ('comp') or use a single composition for the optimisation.")
+            self.fixed_inputs['comp'] = float(carrier.comps_[0])
+        self.effect_flags = effect_flags
+        self.fom_options = fom_options or {}
+        self.constraints = self._check_constraints(constraints or {})
+        self.lower, self.upper = self._bounds(variable_ranges)
+        self.n_coarse = int(n_coarse)
+        self.n_starts = max(int(n_starts), 1)
+        self.xtol = xtol
+        self.max_iter = max_iter
+        self.seed = seed
+        self._history = []
+        self.n_evaluations = 0
+
+    def _check_constraints(self, constraints:dict):
+        checked = {}
+        for name, limits in constraints.items():
+            if name not in self._quantities and name not in self.param_names and name not in self.fixed_inputs:
+                allowed = list(dict.fromkeys([*self._quantities, *self.param_names, *self.fixed_inputs]))
+                raise ValueError(f'Unknown constraint {name}. The constraints should be on {allowed}.')
+            low, high = limits
+            low, high = -np.inf if low is None else float(low), np.inf if high is None else float(high)
+            checked[name] = (low, high)
+            if name in self.fixed_inputs and not low <= self.fixed_inputs[name] <= high:
+                raise ValueError(f'The fixed {name} does not satisfy the constraint.')
+        return checked
+
+    def _bounds(self, variable_ranges:dict):
+        """
+        Variable ranges intersected with the input constraints.
+        """
+        bounds = np.array([variable_ranges[name] for name in self.param_names], dtype=float)
+        if bounds.shape != (len(self.param_names), 2):
+            raise ValueError('variable_ranges should be {input: (low, high)}.')
+        for ii, name in enumerate(self.param_names):
+            if name in self.constraints:
+                bounds[ii, 0] = max(bounds[ii, 0], self.constraints[name][0])
+                bounds[ii, 1] = min(bounds[ii, 1], self.constraints[name][1])
+        if np.any(bounds[:, 1] <= bounds[:, 0]):
+            raise ValueError('The variable ranges (intersected with the constraints) should have low < high.')
+        return bounds[:, 0], bounds[:, 1]
+
+    def _within(self, name, values):
+        low, high = self.constraints.get(name, (-np.inf, np.inf))
+        return (values >= low) & (values <= high)
+
+    def _evaluate(self, x):
+        """
+        The score (sign*objective, -inf for infeasible points) of the points x
+        (2D array (n_points, number of variables)). All the evaluated points are
+        kept in the history.
+        """
+        n_points = len(x)
+        inputs = {name: np.full(n_points, float(val)) for name, val in self.fixed_inputs.items()}
+        inputs.update({name: x[:, ii] for ii, name in enumerate(self.param_names)})
+        quantities = {name: np.full(n_points, np.nan) for name in self._quantities}
+        feasible = np.ones(n_points, dtype=bool)
+        if 'bandgap' in self.constraints:
+            carrier = self.carrier._carrier_at_compositions(inputs['comp'])
+            quantities['bandgap'] = np.array(self._bandgap(carrier, inputs['T']), dtype=float)
+            feasible &= self._within('bandgap', quantities['bandgap'])
+        members = np.flatnonzero(feasible)
+        if len(members):
+            carrier = self.carrier._carrier_at_compositions(inputs['comp'][members])
+            carrier.disk_cache_ = None
+            mobility = carrier.calculate_sheet_mobility(
+                **{name: val[members] for name, val in inputs.items() if name != 'comp'},
+                **self.effect_flags, total_mobility=True, return_dataframe=False)['TOT']
+            n_2d, temp = inputs['n_2d'][members], inputs['T'][members]
+            quantities['bandgap'][members] = self._bandgap(carrier, temp)
+            quantities['mobility'][members] = mobility
+            quantities['sheet_resistance'][members] = carrier._calculate_sheet_resitance(n_2d, mobility)
+            quantities['LFOM'][members] = carrier._calculate_figure_of_merit(n_2d, mobility, temp=temp,
+                                                                             mode='LFOM', **self.fom_options)
+            self.n_evaluations += len(members)
+        for name in ('mobility', 'sheet_resistance', 'LFOM'):
+            if name in self.constraints: feasible &= self._within(name, quantities[name])
+        score = np.where(feasible, self.sign*quantities[self.objective], -np.inf)
+        score = np.where(np.isnan(score), -np.inf, score)
+        self._history.append({**inputs, **quantities, 'feasible': feasible.astype(float)})
+        return score, quantities
+
+    def _bandgap(self, carrier, temp):
+        bandgap = carrier.alloy_params_.get('bandgap')
+        if self.fom_options.get('T_corect_bandgap'):
+            bandgap = carrier._apply_Varshni_T_correction_2_bandgap(
+                bandgap, temp=temp, bandgap_alpha=carrier.alloy_params_.get('bandgap_alpha'),
+                bandgap_beta=carrier.alloy_params_.get('bandgap_beta'))
+        return bandgap
+
+    def _starts(self, unit_points, score, cell):
+        """
+        The n_starts best feasible coarse points, at least one coarse cell apart.
+        """
+        starts = []
+        for ii in np.argsort(-score):
+            if not np.isfinite(score[ii]) or len(starts) == self.n_starts: break
+            if all(np.max(np.abs(unit_points[ii] - unit_points[jj])) >= cell for jj in starts):
+                starts.append(ii)
+        return starts
+
+    def optimize(self):
+        """
+        This function runs the coarse search and the refinement.
+
+        Returns
+        -------
+        dict
+            See Mobility2DCarrier.optimize_figure_of_merit().
+
+        """
+        d = len(self.param_names)
+        width = self.upper - self.lower
+        design = DesignSampler(dict(zip(self.param_names, zip(self.lower, self.upper))),
+                               n_points=self.n_coarse, seed=self.seed)
+        unit_points = design.unit_points()
+        score, quantities = self._evaluate(self.lower + unit_points*width)
+        cell = 1.0/np.ceil(self.n_coarse**(1.0/d))
+        starts = self._starts(unit_points, score, cell)
+        if not starts:
+            raise ValueError('No feasible point found in the coarse search. Relax the constraints '
+                             'or increase n_coarse.')
+        n_coarse_evaluations = self.n_evaluations
+        centers = unit_points[starts].copy()
+        best = score[starts].copy()
+        best_quantities = [{name: val[ii] for name, val in quantities.items()} for ii in starts]
+        step = np.full(len(starts), 0.5*cell)
+        offsets = np.array([offset for offset in itertools.product((-1, 0, 1), repeat=d) if any(offset)])
+        converged, n_iter = False, 0
+        while n_iter < self.max_iter:
+            active = np.flatnonzero(step >= self.xtol)
+            if not len(active):
+                converged = True
+                break
+            candidates = np.clip(centers[active, None, :] + offsets[None]*step[active, None, None], 0, 1)
+            candidate_score, quantities = self._evaluate(self.lower + candidates.reshape(-1, d)*width)
+            candidate_score = candidate_score.reshape(len(active), len(offsets))
+            for kk, ii in enumerate(active):
+                jj = np.argmax(candidate_score[kk])
+                if candidate_score[kk, jj] > best[ii]:
+                    best[ii], centers[ii] = candidate_score[kk, jj], candidates[kk, jj]
+                    best_quantities[ii] = {name: val[kk*len(offsets) + jj] for name, val in quantities.items()}
+                else:
+                    step[ii] *= 0.5
+            n_iter += 1
+        ii = np.argmax(best)
+        x = self.lower + centers[ii]*width
+        message = 'Converged (step < xtol).' if converged else 'Maximum number of iterations reached.'
+        self.carrier.logger_.info('Figure-of-merit optimisation: %s %d mobility evaluations (%d coarse)',
+                                  message, self.n_evaluations, n_coarse_evaluations)
+        evaluations = MobilityResults({name: np.concatenate([hh[name] for hh in self._history])
+                                       for name in self._history[0]})
+        return {'x': dict(zip(self.param_names, x.tolist())), 'objective': self.objective,
+                'value': float(best_quantities[ii][self.objective]),
+                **{name: float(val) for name, val in best_quantities[ii].items()},
+                'success': converged, 'message': message, 'n_iterations': n_iter,
+                'n_evaluations': self.n_evaluations, 'evaluations': evaluations}
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Optional Numba JIT backend.
+
+If numba is installed, the scalar kernels decorated with njit are compiled
+(parallel prange loops over points) and the compiled machine code is cached on
+disk (numba cache=True; next to the sources in __pycache__ or in
+NUMBA_CACHE_DIR), so the compile cost is paid once per machine. Without numba
+njit returns the plain python function and prange is range, i.e. the callers
+fall back transparently to the numpy implementations.
+
+numba itself (~0.2 s) is only imported at the first call of a decorated
+function, so 'import mobilitypy' does not pay for it. At that point all the
+decorated functions are turned into numba dispatchers and the module globals
+referring to them (and prange) are rebound, so that the compiled kernels can
+call each other.
+
+The OpenMP threading layer of numba is preferred over TBB (unless set by
+NUMBA_THREADING_LAYER or NUMBA_THREADING_LAYER_PRIORITY): with TBB, parallel
+kernels launched from other threads than the main thread (the thread pools of
+submit_*() and the query service) hang the interpreter exit. The process pools 
+spawn their workers, so the OpenMP layer not being fork-safe does not matter.
+
+Set the environment variable MOBILITYPY_DISABLE_JIT=1 to disable the JIT
+backend even if numba is installed.
+"""
+import os
+import logging
+import threading
+import functools
+import importlib.util
+
+NUMBA_AVAILABLE = importlib.util.find_spec('numba') is not None
+JIT_ENABLED = NUMBA_AVAILABLE and os.environ.get('MOBILITYPY_DISABLE_JIT', '0') in ('', '0')
+
+prange = range
+
+_lazy_functions = []
+_compile_lock = threading.Lock()
+
+class _LazyDispatcher:
+    '''
+    Placeholder of a numba dispatcher. The first call imports numba and
+    creates the dispatchers of all the decorated functions (see _create_dispatchers).
+    py_func is the python function, as for numba dispatchers.
+    '''
+    def __init__(self, func, parallel:bool):
+        functools.update_wrapper(self, func)
+        self.py_func = func
+        self.parallel = parallel
+        self.dispatcher = None
+
+    def __call__(self, *args):
+        if self.dispatcher is None: _create_dispatchers()
+        return self.dispatcher(*args)
+
+def _create_dispatchers():
+    with _compile_lock:
+        if all(lazy.dispatcher is not None for lazy in _lazy_functions): return
+        try:
+            import numba
+        except ImportError as exc: # installed, but broken
+            logging.getLogger('mobilitypy').warning('numba import failed (%s), the JIT kernels '
+                                                    'run as python functions.', exc)
+            for lazy in _lazy_functions: lazy.dispatcher = lazy.py_func
+            return
+        if not {'NUMBA_THREADING_LAYER', 'NUMBA_THREADING_LAYER_PRIORITY'} & set(os.environ):
+            numba.config.THREADING_LAYER_PRIORITY = ['omp', 'tbb', 'workqueue']
+        for lazy in _lazy_functions:
+            if lazy.dispatcher is None:
+                lazy.dispatcher = numba.njit(cache=True, parallel=lazy.parallel,
+                                             error_model='numpy')(lazy.py_func)
+        # numba resolves the called functions and prange from the module globals
+        # at compile time.
+        for module_globals in {id(lazy.py_func.__globals__): lazy.py_func.__globals__
+                               for lazy in _lazy_functions}.values():
+            for name, val in list(module_globals.items()):
+                if isinstance(val, _LazyDispatcher): module_globals[name] = val.dispatcher
+            if module_globals.get('prange') is range: module_globals['prange'] = numba.prange
+
+def njit(parallel:bool=False):
+    """
+    Decorator to compile the function with numba (nopython mode, disk cached,
+    numpy floating point error model) if the JIT backend is enabled. Otherwise,
+    the function is returned unchanged. numba is imported at the first call.
+    """
+    def decorator(func):
+        if not JIT_ENABLED: return func
+        lazy = _LazyDispatcher(func, parallel)
+        _lazy_functions.append(lazy)
+        return lazy
+    return decorator
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Logging of the engine diagnostics.
+
+All the diagnostics are sent to the 'mobilitypy' logger with lazy (%-style)
+formatting, so nothing is formatted unless the level is enabled. The material
+and derived parameter dumps go to the child logger 'mobilitypy.params'.
+
+print_log levels (per carrier, see _CarrierLogger; the global logger levels
+and handlers are only changed by the command line interface):
+    None     : the standard logging configuration decides. Use it to collect
+               the messages.
+    'low'    : INFO. One summary line per calculation.
+    'medium' : DEBUG. Additionally, per composition and per mechanism lines.
+    'high'   : DEBUG. Additionally, the material/derived parameter dumps.
+"""
+import sys
+import logging
+
+logger = logging.getLogger('mobilitypy')
+logger.addHandler(logging.NullHandler())
+params_logger = logging.getLogger('mobilitypy.params')
+
+_print_log_levels = {'low': (logging.INFO, logging.INFO),
+                     'medium': (logging.DEBUG, logging.INFO),
+                     'high': (logging.DEBUG, logging.DEBUG)}
+class _StdoutHandler(logging.StreamHandler):
+    '''
+    Stream handler writing to the current sys.stdout (like logging.lastResort
+    for sys.stderr), so that redirected stdout also receives the messages.
+    '''
+    def __init__(self):
+        logging.Handler.__init__(self)
+
+    @property
+    def stream(self):
+        return sys.stdout
+
+_stdout_handler = _StdoutHandler()
+_stdout_handler.setFormatter(logging.Formatter('%(message)s'))
+
+def _logging_configured():
+    """
+    True if the logging has been configured by the user (root logger has a
+    handler) or by _configure_print_log().
+    """
+    return bool(logging.getLogger().handlers) or \
+        any(not isinstance(handler, logging.NullHandler) for handler in logger.handlers)
+
+def _configure_print_log(print_log:str=None):
+    """
+    Set the 'mobilitypy' logger levels corresponding to print_log and print
+    the messages to stdout (plain message format) unless the logging has
+    already been configured by the user (root logger has a handler).
+    This changes the process-wide logging state: it is only used by the
+    command line interface. The carriers use _CarrierLogger.
+    """
+    if print_log is None: return
+    levels = _print_log_levels.get(print_log, _print_log_levels['medium'])
+    logger.setLevel(levels[0])
+    params_logger.setLevel(levels[1])
+    if not _logging_configured():
+        logger.addHandler(_stdout_handler)
+
+class _CarrierLogger(logging.LoggerAdapter):
+    '''
+    Logger of a carrier instance with the verbosity of its print_log. The
+    messages enabled by print_log are printed to stdout (plain message
+    format) unless the logging has been configured, then they are passed to
+    the handlers of the 'mobilitypy' logger. The messages enabled by the
+    logging configuration are logged as usual. No global logging state is
+    changed, i.e. the print_log of one carrier does not affect the others.
+    '''
+    def __init__(self, logger, print_log:str=None, params:bool=False):
+        super().__init__(logger, {})
+        self.print_log = print_log
+        self.level = None if print_log is None else \
+            _print_log_levels.get(print_log, _print_log_levels['medium'])[int(params)]
+
+    def isEnabledFor(self, level):
+        return (self.level is not None and level >= self.level) or self.logger.isEnabledFor(level)
+
+    def log(self, level, msg, *args, **kwargs):
+        if not self.isEnabledFor(level): return
+        exc_info = kwargs.get('exc_info')
+        if exc_info and not isinstance(exc_info, tuple): exc_info = sys.exc_info()
+        fn, lno, func, _ = self.logger.findCaller(stacklevel=2)
+        record = self.logger.makeRecord(self.logger.name, level, fn, lno, msg, args,
+                                        exc_info, func=func, extra=kwargs.get('extra'))
+        if self.level is not None and level >= self.level and not _logging_configured():
+            _stdout_handler.handle(record)
+        else:
+            self.logger.handle(record)
@@ -1,7 +1,10 @@
+import logging
 import numpy as np
-import pandas as pd
-import scipy.integrate as integrate
 from ._constants import *
+from ._mobility_results import MobilityResults
+from ._profiling import _profiled, _quad
+from ._sheet_kernels import _sc_integrals
+from ._figure_of_merit import figure_of_merit_registry, _critical_electric_field
 
 ## ==============================================================================
 class _Mobility2DCarrier:
@@ -34,10 +37,15 @@ class _Mobility2DCarrier:
 
         """
         self.eps_n_2d = self.eps_n
+        self.sc_integrals_ = None
+        self.complex_step_ = False
 
 #%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
+    @_profiled('sheet_mobility')
     def _calculate_sheet_mobility(self, n_2d=10, rms_roughness=0.1, corr_len=1, 
-                                  n_dis=1, f_dis=0.1, T=300, return_sc_rates:bool=False):
+                                  n_dis=1, f_dis=0.1, T=300, return_sc_rates:bool=False,
+                                  return_errors:bool=False, collect_diagnostics:bool=False,
+                                  jacobian_params=None):
         """
         This function calculates the sheet mobility from different scattering contributions.
         The mobility models are implemented based on the following references.
@@ -84,135 +92,491 @@ class _Mobility2DCarrier:
         T : float, optional (unit: K)
             Temperature at which mobility calculations will be done. 
             The default is 300K.
+            rms_roughness, corr_len, n_dis, f_dis and T can also be 1D arrays 
+            (one value per composition) for row-wise batch calculations.
         return_sc_rates : float, optional 
             Return the scattering rates values.The default is False.
+        return_errors : bool, optional
+            Return the absolute numerical error estimates of the mobilities 
+            (columns '<mechanism>_err'). The default is False.
+        collect_diagnostics : bool, optional
+            Collect the per composition diagnostics table (see _diagnostics_row())
+            in results.attrs['diagnostics']. The default is False.
+        jacobian_params : list of str, optional
+            Calculate the derivatives of the mobilities with respect to these
+            inputs (see _sheet_jacobian_row()). The default is None.
 
         Returns
         -------
-        pandas dataframe of compositions and mobilities (unit: cm^2 V^-1 S^-1)
+        MobilityResults of compositions and mobilities (unit: cm^2 V^-1 S^-1)
             Total (or individual contributions) sheet mobility. If return_sc_rates=True,
             then scattering rates (10^12 s^-1) and m_star_by_e (10^-12 V.m^-2.s^2) are also returned.
+            If return_errors=True, the mobility error estimates (cm^2 V^-1 S^-1) are also returned.
+            If jacobian_params is given, the derivatives are returned in 
+            'd<mechanism>/d<parameter>' columns.
 
         """
-        carrier_effective_mass = self.alloy_params_.get('carrier_effective_mass') 
-        static_dielectric_constant = self.alloy_params_.get('static_dielectric_constant') 
-        high_frequency_dielectric_constant = self.alloy_params_.get('high_frequency_dielectric_constant')
-        lattice_a = self.alloy_params_.get('lattice_a0') 
-        lattice_c = self.alloy_params_.get('lattice_c0') 
-        sc_potential = self.alloy_params_.get('alloy_scattering_potential') 
-        LA_velocity = self.alloy_params_.get('LA_phonon_velocity')
-        mass_densitty = self.alloy_params_.get('mass_density')
-        deformation_pot = self.alloy_params_.get('CB_deformation_potential')
-        electromech_coupling_sqr = self.alloy_params_.get('electromechanical_coupling_const')
-        POP_energy = self.alloy_params_.get('PO_phonon_energy')  
-        isotropic_Poisson_ratio = self.alloy_params_.get('isotropic_Poisson_ratio')   
-        n_ion_impurity = 0 # not implemented yet. 
-
         if isinstance(n_2d, int) or isinstance(n_2d, float):
             n_2d = [n_2d] * len(self.comps_)
+        jacobian_params = self._check_jacobian_params(jacobian_params, self._sheet_jacobian_inputs)
         
-        mobility = {}
-        for ii in range(len(self.comps_)):
-            #print(n_2d[ii])
-            mobility[ii] = {'comp': f'{self.comps_[ii]:.3f}'}
-            self._set_params(carrier_effective_mass[ii], static_dielectric_constant[ii], 
-                             high_frequency_dielectric_constant[ii],
-                             lattice_c[ii], lattice_a[ii], sc_potential[ii], self.comps_[ii],
-                             n_2d[ii], rms_roughness, corr_len, n_dis, f_dis, n_ion_impurity, 
-                             T, electromech_coupling_sqr[ii], deformation_pot[ii], 
-                             mass_densitty[ii], LA_velocity[ii], POP_energy[ii],
-                             isotropic_Poisson_ratio[ii])
-            self._print_database_params()
-            # mobility unit: cm^2 V^-1 S^-1
-            if self.print_info is not None: print(f'- Composition: {self.comps_[ii]:.5f}')
-            
-            if return_sc_rates: mobility[ii]['m_star_by_e'] = self.m_star_by_e_
-                
-            total_inv_sc = 0
-            if self.only_total_mobility:
-                if self.print_info is not None: print('\t-- Calculating only total mobility')
-                
-                if self.alloy_disordered_effect_: total_inv_sc += self._inv_tau_ado()                   
-                if self.interface_roughness_effect_: total_inv_sc += self._inv_tau_ifr()                   
-                if self.dislocation_effect_: total_inv_sc += self._inv_tau_dis()
-                if self.polar_optical_phonon_effect_: total_inv_sc += self._inv_tau_pop()
-                if self.acoustic_phonon_effect_: # 1/tau_AP = 1/tau_DP + 1/tau_PE
-                    total_inv_sc = total_inv_sc + self._inv_tau_pe()+self._inv_tau_dp()
-                else:
-                    if self.deformation_potential_effect_: total_inv_sc += self._inv_tau_dp()
-                    if self.piezoelectric_effect_: total_inv_sc += self._inv_tau_pe()
-                mobility[ii]['TOT'] = self._mobility_calculator(total_inv_sc) 
-                if return_sc_rates: mobility[ii]['TOT_sc'] = total_inv_sc
+        mechanisms = self._sheet_mobility_mechanisms()
+        sc_rates = MobilityResults._allocate(len(self.comps_), mechanisms)
+        sc_rates_err = MobilityResults._allocate(len(self.comps_), mechanisms)
+        m_star_by_e = np.empty(len(self.comps_))
+        diagnostics = [] if collect_diagnostics else None
+        jacobian = MobilityResults._allocate(len(self.comps_), [f'd{mechanism}/d{param}' 
+                                                                for param in jacobian_params
+                                                                for mechanism in mechanisms])
+        self.logger_.info('Sheet mobility (%s model): %d compositions, mechanisms: %s', 
+                          self.mobility_model_, len(self.comps_), mechanisms)
+        sheet_inputs = {'rms_roughness': rms_roughness, 'corr_len': corr_len, 
+                        'n_dis': n_dis, 'f_dis': f_dis, 'T': T}
+        # Inputs given per composition (row-wise batch calculations)
+        row_inputs = {key: np.broadcast_to(np.asarray(val, dtype=float), (len(self.comps_),))
+                      for key, val in sheet_inputs.items() if np.ndim(val)}
+        def composition_inputs(ii):
+            if not row_inputs: return sheet_inputs
+            return dict(sheet_inputs, **{key: val[ii] for key, val in row_inputs.items()})
+        def set_params(ii):
+            self._set_composition_params(self.alloy_params_, ii, self.comps_[ii], n_2d[ii], 
+                                         **composition_inputs(ii))
+        # Alloy parameters at the complex-step compositions (see _sheet_jacobian_row())
+        complex_alloy_params = self._carrier_at_compositions(
+            self.comps_ + 1j*self._complex_step).alloy_params_ if 'comp' in jacobian_params else None
+        if self.integration_backend_['backend'] == 'fixed_node':
+            self._precompute_sc_integrals(set_params)
+        try:
+            for ii in range(len(self.comps_)):
+                set_params(ii)
+                self.comp_index_ = ii
+                self._log_database_params()
+                self.logger_.debug('- Composition: %.5f', self.comps_[ii])
+                m_star_by_e[ii] = self.m_star_by_e_
+                # scattering rates unit: 10^12 s^-1
+                inv_sc, inv_sc_err = self._sheet_sc_rates(mechanisms)
+                for mechanism in mechanisms:
+                    sc_rates[mechanism][ii] = inv_sc[mechanism]
+                    sc_rates_err[mechanism][ii] = inv_sc_err[mechanism]
+                if collect_diagnostics: diagnostics.append(self._diagnostics_row())
+                if jacobian_params:
+                    row = self._sheet_jacobian_row(ii, mechanisms, jacobian_params, 
+                                                   dict(composition_inputs(ii), comp=self.comps_[ii], n_2d=n_2d[ii]), 
+                                                   complex_alloy_params)
+                    for key, val in row.items(): jacobian[key][ii] = val
+                self.logger_.debug('='*72)
+        finally:
+            self.sc_integrals_ = None # precomputed fixed-node integrals
+            self.complex_step_ = False
+        mobility = self._sheet_mobility_from_sc_rates(sc_rates, m_star_by_e, 
+                                                      return_sc_rates=return_sc_rates,
+                                                      sc_rates_err=sc_rates_err if return_errors else None)
+        for key in jacobian.columns: mobility[key] = jacobian[key]
+        if collect_diagnostics: 
+            mobility.attrs['diagnostics'] = self._diagnostics_table(diagnostics)
+        if return_sc_rates: 
+            mobility.attrs['sc_params'] = self._sc_params(rms_roughness, n_dis, f_dis, T)
+        return mobility
+
+    _sheet_jacobian_inputs = ('comp', 'n_2d', 'rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T')
+    _effect_flag_names = ('alloy_disordered_effect', 'interface_roughness_effect', 
+                          'dislocation_effect', 'deformation_potential_effect', 
+                          'piezoelectric_effect', 'acoustic_phonon_effect', 
+                          'polar_optical_phonon_effect', 'mobility_model')
+    _complex_step = 1e-20
+
+    def _set_composition_params(self, alloy_params, ii, comp, n_2d, rms_roughness, corr_len, 
+                                n_dis, f_dis, T, step_param:str=None, step=0):
+        """
+        This function sets the parameters of the ii-th composition. alloy_params 
+        are the alloy parameters (arrays over the compositions). step is added 
+        to the alloy parameter step_param (complex-step derivatives).
+        """
+        def param(name):
+            value = alloy_params[name][ii]
+            return value + step if name == step_param else value
+        n_ion_impurity = 0 # not implemented yet. 
+        self._set_params(param('carrier_effective_mass'), param('static_dielectric_constant'), 
+                         param('high_frequency_dielectric_constant'),
+                         param('lattice_c0'), param('lattice_a0'), param('alloy_scattering_potential'),
+                         comp, n_2d, rms_roughness, corr_len, n_dis, f_dis, n_ion_impurity, 
+                         T, param('electromechanical_coupling_const'), param('CB_deformation_potential'), 
+                         param('mass_density'), param('LA_phonon_velocity'), param('PO_phonon_energy'),
+                         param('isotropic_Poisson_ratio'))
+
+    def _sheet_jacobian_row(self, ii, mechanisms, jacobian_params, inputs:dict, 
+                            complex_alloy_params:dict=None):
+        """
+        This function calculates the derivatives of the mobilities of the ii-th
+        composition with the complex-step method (forward-mode differentiation):
+            d mu/d p = Im(mu(p + i*h))/h,  h = 1e-20*|p|
+        The scattering rates are evaluated with complex parameters through the same
+        rate expressions, and the scattering integrals with the fixed-node quadrature
+        (see _sheet_kernels). There is no subtractive cancellation, so the derivatives
+        are accurate to the quadrature accuracy. 
+        
+        n_2d is the carrier density of the composition itself. The derivatives with 
+        respect to the alloy parameters (e.g. 'carrier_effective_mass') are partial 
+        derivatives: the derived parameters (electromechanical_coupling_const, 
+        isotropic_Poisson_ratio) are kept fixed. The 'comp' derivatives are total 
+        derivatives through the alloy interpolation (complex_alloy_params are the 
+        alloy parameters at comps + i*h) including the pseudomorphic strain.
+
+        Parameters
+        ----------
+        ii : int
+            Composition index.
+        mechanisms : list of str
+            Scattering mechanisms as returned from _sheet_mobility_mechanisms().
+        jacobian_params : list of str
+            Inputs for the derivatives.
+        inputs : dict
+            comp, n_2d, rms_roughness, corr_len, n_dis, f_dis and T of the composition.
+        complex_alloy_params : dict, optional
+            Alloy parameters at the complex-step compositions. Needed for 'comp'.
+
+        Returns
+        -------
+        dict
+            'd<mechanism>/d<parameter>' and derivative (cm^2 V^-1 S^-1 per parameter unit) pairs.
+
+        """
+        row = {}
+        self.complex_step_ = True
+        for param in jacobian_params:
+            stepped, alloy_params, step_param, step = dict(inputs), self.alloy_params_, None, 0
+            if param == 'comp':
+                h = self._complex_step
+                stepped['comp'] = inputs['comp'] + 1j*h
+                alloy_params = complex_alloy_params
+            elif param in inputs:
+                h = self._complex_step*(abs(inputs[param]) or 1.0)
+                stepped[param] = inputs[param] + 1j*h
             else:
-                if self.alloy_disordered_effect_:
-                    if self.print_info is not None: print('\t-- Calculating alloy-disordered mobility')
-                    inv_sc = self._inv_tau_ado()
-                    total_inv_sc += inv_sc
-                    mobility[ii]['AD'] = self._mobility_calculator(inv_sc)
-                    if return_sc_rates: mobility[ii]['AD_sc'] = inv_sc
-                    
-                if self.interface_roughness_effect_:
-                    if self.print_info is not None: print('\t-- Calculating interface roughness effect mobility')
-                    inv_sc = self._inv_tau_ifr()
-                    total_inv_sc += inv_sc
-                    mobility[ii]['IFR'] = self._mobility_calculator(inv_sc)
-                    if return_sc_rates: mobility[ii]['IFR_sc'] = inv_sc
-                    
-                if self.dislocation_effect_:
-                    if self.print_info is not None: print('\t-- Calculating dislocation effect mobility')
-                    inv_sc = self._inv_tau_dis()
-                    total_inv_sc += inv_sc
-                    mobility[ii]['DIS'] = self._mobility_calculator(inv_sc)
-                    if return_sc_rates: 
-                        mobility[ii]['DIS_sc'] = inv_sc
-                    if self.mobility_model_ == 'v2':
-                        inv_sc = self._inv_tau_dis_strain()
-                        total_inv_sc += inv_sc
-                        mobility[ii]['DIS_Strain'] = self._mobility_calculator(inv_sc)
-                        if return_sc_rates: 
-                            mobility[ii]['DIS_Strain_sc'] = inv_sc
-                    
-                if self.polar_optical_phonon_effect_:
-                    if self.print_info is not None: print('\t-- Calculating polar optical phonon effect mobility')
-                    inv_sc = self._inv_tau_pop()
-                    total_inv_sc += inv_sc
-                    mobility[ii]['POP'] = self._mobility_calculator(inv_sc)
-                    if return_sc_rates: mobility[ii]['POP_sc'] = inv_sc
- 
-                if self.acoustic_phonon_effect_:
-                    inv_sc_dp = self._inv_tau_dp()
-                    inv_sc_pe = self._inv_tau_pe()
-                    if self.print_info is not None: print('\t-- Calculating acoustic effect mobility')
-                    inv_sc = inv_sc_dp + inv_sc_pe
-                    total_inv_sc += inv_sc # 1/tau_AP = 1/tau_DP + 1/tau_PE
-                    mobility[ii]['AP'] = self._mobility_calculator(inv_sc)
-                    if return_sc_rates: mobility[ii]['AP_sc'] = inv_sc
-                else:
-                    if self.deformation_potential_effect_:
-                        inv_sc_dp = self._inv_tau_dp()
-                        total_inv_sc += inv_sc_dp
-                    if self.piezoelectric_effect_:
-                        total_inv_sc += inv_sc_pe
-                        inv_sc_pe = self._inv_tau_pe()
-                    
-                if self.deformation_potential_effect_:
-                    if self.print_info is not None: print('\t--- Calculating deformation potential effect mobility')
-                    mobility[ii]['DP'] = self._mobility_calculator(inv_sc_dp)
-                    if return_sc_rates: mobility[ii]['DP_sc'] = inv_sc_dp
-                    
-                if self.piezoelectric_effect_:
-                    if self.print_info is not None: print('\t--- Calculating piezoelectric phonon effect mobility')
-                    mobility[ii]['PE'] = self._mobility_calculator(inv_sc_pe)
-                    if return_sc_rates: mobility[ii]['PE_sc'] = inv_sc_pe
- 
-                if self.total_mobility_:
-                    if self.print_info is not None: print('\t-- Calculating total mobility')
-                    mobility[ii]['TOT'] = self._mobility_calculator(total_inv_sc)
-                    if return_sc_rates: mobility[ii]['TOT_sc'] = total_inv_sc
-                    
-            if self.print_info is not None: print(f'{"="*72}')
-        return pd.DataFrame.from_dict(mobility, orient='index')
+                h = self._complex_step*(abs(self.alloy_params_[param][ii]) or 1.0)
+                step_param, step = param, 1j*h
+            self._set_composition_params(alloy_params, ii, step_param=step_param, step=step, 
+                                         **stepped)
+            inv_sc, _ = self._sheet_sc_rates(mechanisms)
+            for mechanism in mechanisms:
+                mu = self._mobility_calculator(inv_sc[mechanism], m_star_by_e=self.m_star_by_e_)
+                row[f'd{mechanism}/d{param}'] = np.imag(mu)/h if inv_sc[mechanism] else np.nan
+        self.complex_step_ = False
+        return row
+
+    def _sc_params(self, rms_roughness, n_dis, f_dis, T):
+        """
+        This function returns the parameters that enter the scattering rates 
+        linearly (see _rescale_sheet_mobility()). Stored with the scattering rates.
+        """
+        return {'rms_roughness': rms_roughness, 'n_dis': n_dis, 'f_dis': f_dis, 'T': T,
+                'sc_potential': np.array(self.alloy_params_.get('alloy_scattering_potential'), 
+                                         dtype=float)}
+
+    def _rescale_sheet_mobility(self, results, **new_params):
+        """
+        This function rescales the scattering rates of sheet mobility results 
+        (calculated with return_sc_rates=True) to new values of the parameters 
+        that enter the scattering rates only as prefactors, and recalculates the 
+        mobilities. No integration is done.
+            IFR           ~ rms_roughness^2
+            DIS           ~ n_dis * f_dis^2
+            DIS_Strain    ~ n_dis
+            AD            ~ sc_potential^2
+            DP, PE (AP)   ~ T
+        POP depends on T non-linearly, so T can not be rescaled if POP is included.
+        TOT is updated by the changes of the individual rates (Matthiessen's rule).
+
+        Parameters
+        ----------
+        results : MobilityResults
+            Sheet mobility results with scattering rates ('<mechanism>_sc' columns,
+            'm_star_by_e') and results.attrs['sc_params'].
+        **new_params : float or 1D float array
+            New values of rms_roughness, n_dis, f_dis, T (unit: K) or sc_potential 
+            (unit: eV; same value for all compositions). Arrays should have same 
+            length K. Then the results are repeated for every value (K blocks of 
+            the input rows) and the new parameters are added as columns.
+
+        Returns
+        -------
+        MobilityResults
+            Rescaled results.
+
+        """
+        old_params = results.attrs.get('sc_params')
+        if old_params is None or 'm_star_by_e' not in results:
+            raise ValueError('Rescaling needs results calculated with return_sc_rates=True.')
+        for key in new_params:
+            if key not in old_params:
+                raise ValueError(f'Rescaling of {key} is not implemented yet. Contact developer.')
+        n_rows = len(results)
+        values = {key: np.atleast_1d(np.asarray(val, dtype=float)) for key, val in new_params.items()}
+        n_values = {len(val) for val in values.values() if len(val) > 1}
+        if len(n_values) > 1:
+            raise ValueError('All the rescaling parameter arrays should have same length.')
+        n_blocks = n_values.pop() if n_values else 1
+        old = {key: np.tile(np.broadcast_to(np.asarray(val, dtype=float), (n_rows,)), n_blocks)
+               for key, val in old_params.items()}
+        new = dict(old)
+        for key, val in values.items():
+            new[key] = np.repeat(np.broadcast_to(val, (n_blocks,)), n_rows)
+        ratio = {key: new[key]/old[key] for key in new_params}
+        with np.errstate(divide='ignore', invalid='ignore'):
+            factors = {'AD': ratio.get('sc_potential', 1.0)**2,
+                       'IFR': ratio.get('rms_roughness', 1.0)**2,
+                       'DIS': ratio.get('n_dis', 1.0)*ratio.get('f_dis', 1.0)**2,
+                       'DIS_Strain': ratio.get('n_dis', 1.0),
+                       'DP': ratio.get('T', 1.0), 'PE': ratio.get('T', 1.0), 
+                       'AP': ratio.get('T', 1.0), 'POP': 1.0}
+        mechanisms = [key[:-3] for key in results.keys() if key.endswith('_sc')]
+        if 'T' in new_params and 'POP' in mechanisms:
+            raise ValueError('POP scattering rate does not scale linearly with T. Recalculate the mobility.')
+        if mechanisms == ['TOT'] and new_params:
+            raise ValueError('Results with only total mobility can not be rescaled. '
+                             'Use calculate_total_mobility_only=False.')
+        
+        m_star_by_e = np.tile(results['m_star_by_e'], n_blocks)
+        rates, rates_err = {}, {}
+        for mechanism in mechanisms:
+            rates[mechanism] = np.tile(results[f'{mechanism}_sc'], n_blocks)
+            if f'{mechanism}_err' in results:
+                # |d rate|/rate = |d mu|/mu
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rel_err = np.tile(results[f'{mechanism}_err']/results[mechanism], n_blocks)
+                rates_err[mechanism] = np.where(rates[mechanism] != 0, rates[mechanism]*rel_err, 0.0)
+        # Contributions to TOT. AP contains DP and PE.
+        tot_parts = [key for key in ['AD', 'IFR', 'DIS', 'DIS_Strain', 'POP', 'DP', 'PE', 'AP']
+                     if key in rates and not ('AP' in rates and key in ['DP', 'PE'])]
+        new_rates, new_rates_err = {}, {}
+        for mechanism in mechanisms:
+            if mechanism == 'TOT': continue
+            new_rates[mechanism] = rates[mechanism]*factors[mechanism]
+            if mechanism in rates_err:
+                new_rates_err[mechanism] = rates_err[mechanism]*factors[mechanism]
+        if 'TOT' in rates:
+            new_rates['TOT'] = rates['TOT'] + sum(new_rates[key] - rates[key] for key in tot_parts)
+            if 'TOT' in rates_err:
+                new_rates_err['TOT'] = rates_err['TOT'] + sum(new_rates_err[key] - rates_err[key] 
+                                                              for key in tot_parts if key in rates_err)
         
+        rescaled = MobilityResults({'comp': np.tile(results['comp'], n_blocks)}, 
+                                   attrs={key: val for key, val in results.attrs.items()
+                                          if key != 'diagnostics'})
+        for key in new_params: rescaled[key] = new[key]
+        for key in results.keys():
+            if key == 'comp': continue
+            if key in new_rates:
+                rescaled[key] = self._mobility_calculator(new_rates[key], m_star_by_e=m_star_by_e)
+            elif key.endswith('_sc') and key[:-3] in new_rates:
+                rescaled[key] = new_rates[key[:-3]]
+            elif key.endswith('_err') and key[:-4] in new_rates_err:
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    rescaled[key] = rescaled[key[:-4]]*new_rates_err[key[:-4]]/new_rates[key[:-4]]
+            else:
+                rescaled[key] = np.tile(results[key], n_blocks)
+        rescaled.attrs['sc_params'] = new
+        return rescaled
+
+    def _sheet_mobility_mechanisms(self):
+        """
+        This function returns the ordered list of requested scattering mechanisms
+        (output column names) for the sheet mobility calculations.
+        """
+        if self.only_total_mobility: return ['TOT']
+        mechanisms = []
+        if self.alloy_disordered_effect_: mechanisms.append('AD')
+        if self.interface_roughness_effect_: mechanisms.append('IFR')
+        if self.dislocation_effect_:
+            mechanisms.append('DIS')
+            if self.mobility_model_ == 'v2': mechanisms.append('DIS_Strain')
+        if self.polar_optical_phonon_effect_: mechanisms.append('POP')
+        if self.acoustic_phonon_effect_: mechanisms.append('AP')
+        if self.deformation_potential_effect_: mechanisms.append('DP')
+        if self.piezoelectric_effect_: mechanisms.append('PE')
+        if self.total_mobility_: mechanisms.append('TOT')
+        return mechanisms
+
+    def _sheet_sc_rates(self, mechanisms):
+        """
+        This function calculates the scattering rates (unit: 10^12 s^-1) of the 
+        requested mechanisms for the currently set parameters (single composition).
+
+        Parameters
+        ----------
+        mechanisms : list of str
+            Scattering mechanisms as returned from _sheet_mobility_mechanisms().
+
+        Returns
+        -------
+        (dict, dict)
+            Scattering mechanism and scattering rate pairs, and scattering mechanism
+            and absolute numerical error estimate of the scattering rate pairs.
+
+        """
+        self.sc_rel_err_ = {}
+        inv_sc = {}
+        if self.only_total_mobility:
+            self.logger_.debug('\t-- Calculating only total mobility')
+            if self.alloy_disordered_effect_: inv_sc['AD'] = self._inv_tau_ado()                   
+            if self.interface_roughness_effect_: inv_sc['IFR'] = self._inv_tau_ifr()                   
+            if self.dislocation_effect_: 
+                inv_sc['DIS'] = self._inv_tau_dis()
+                if self.mobility_model_ == 'v2': inv_sc['DIS_Strain'] = self._inv_tau_dis_strain()
+            if self.polar_optical_phonon_effect_: inv_sc['POP'] = self._inv_tau_pop()
+            if self.acoustic_phonon_effect_: # 1/tau_AP = 1/tau_DP + 1/tau_PE
+                inv_sc['PE'] = self._inv_tau_pe()
+                inv_sc['DP'] = self._inv_tau_dp()
+            else:
+                if self.deformation_potential_effect_: inv_sc['DP'] = self._inv_tau_dp()
+                if self.piezoelectric_effect_: inv_sc['PE'] = self._inv_tau_pe()
+            inv_sc_err = self._sc_rates_errors(inv_sc)
+            total_inv_sc, total_inv_sc_err = 0, 0
+            for key in inv_sc: 
+                total_inv_sc += inv_sc[key]
+                total_inv_sc_err += inv_sc_err[key]
+            return {'TOT': total_inv_sc}, {'TOT': total_inv_sc_err}
+        
+        if 'AD' in mechanisms:
+            self.logger_.debug('\t-- Calculating alloy-disordered mobility')
+            inv_sc['AD'] = self._inv_tau_ado()
+        if 'IFR' in mechanisms:
+            self.logger_.debug('\t-- Calculating interface roughness effect mobility')
+            inv_sc['IFR'] = self._inv_tau_ifr()
+        if 'DIS' in mechanisms:
+            self.logger_.debug('\t-- Calculating dislocation effect mobility')
+            inv_sc['DIS'] = self._inv_tau_dis()
+        if 'DIS_Strain' in mechanisms:
+            inv_sc['DIS_Strain'] = self._inv_tau_dis_strain()
+        if 'POP' in mechanisms:
+            self.logger_.debug('\t-- Calculating polar optical phonon effect mobility')
+            inv_sc['POP'] = self._inv_tau_pop()
+        if self.acoustic_phonon_effect_ or self.deformation_potential_effect_:
+            self.logger_.debug('\t--- Calculating deformation potential effect mobility')
+            inv_sc['DP'] = self._inv_tau_dp()
+        if self.acoustic_phonon_effect_ or self.piezoelectric_effect_:
+            self.logger_.debug('\t--- Calculating piezoelectric phonon effect mobility')
+            inv_sc['PE'] = self._inv_tau_pe()
+        if 'AP' in mechanisms:
+            self.logger_.debug('\t-- Calculating acoustic effect mobility')
+            inv_sc['AP'] = inv_sc['DP'] + inv_sc['PE'] # 1/tau_AP = 1/tau_DP + 1/tau_PE
+        
+        inv_sc_err = self._sc_rates_errors(inv_sc)
+        if 'AP' in mechanisms:
+            inv_sc_err['AP'] = inv_sc_err['DP'] + inv_sc_err['PE']
+        
+        # Matthiessen's rule. AP already contains DP and PE. So, no double counting.
+        total_inv_sc, total_inv_sc_err = 0, 0
+        for key in ['AD', 'IFR', 'DIS', 'DIS_Strain', 'POP', 'DP', 'PE']:
+            if key in inv_sc: 
+                total_inv_sc += inv_sc[key]
+                total_inv_sc_err += inv_sc_err[key]
+        if 'TOT' in mechanisms:
+            self.logger_.debug('\t-- Calculating total mobility')
+            inv_sc['TOT'] = total_inv_sc
+            inv_sc_err['TOT'] = total_inv_sc_err
+        return {key: inv_sc[key] for key in mechanisms}, {key: inv_sc_err[key] for key in mechanisms}
+
+    def _sc_rates_errors(self, inv_sc):
+        """
+        This function returns the absolute numerical error estimates of the 
+        scattering rates. The rates are proportional to the integrals, so the
+        relative error of the rate is the relative quadrature error. Closed-form
+        rates have zero numerical error.
+        """
+        return {key: abs(val)*self.sc_rel_err_.get(key, 0.0) for key, val in inv_sc.items()}
+
+    def _integrated_sc_mechanisms(self):
+        """
+        This function returns the requested mechanisms that need numerical integration.
+        """
+        acoustic = self.acoustic_phonon_effect_
+        mechanisms = {'IFR': self.interface_roughness_effect_, 
+                      'DIS': self.dislocation_effect_,
+                      'DIS_Strain': self.dislocation_effect_ and self.mobility_model_ == 'v2',
+                      'DP': acoustic or self.deformation_potential_effect_, 
+                      'PE': acoustic or self.piezoelectric_effect_}
+        return [mechanism for mechanism, requested in mechanisms.items() if requested]
+
+    @_profiled('fixed_node_integrals')
+    def _precompute_sc_integrals(self, set_params):
+        """
+        This function calculates the scattering integrals of all the compositions 
+        at once with the fixed-node quadrature (see _sheet_kernels). set_params(ii)
+        sets the parameters of the ii-th composition.
+        """
+        n_comps = len(self.comps_)
+        b, k_F, q_TF_by_2k_F = np.empty(n_comps), np.empty(n_comps), np.empty(n_comps)
+        corr_len = np.empty(n_comps)
+        for ii in range(n_comps):
+            set_params(ii)
+            b[ii], k_F[ii], q_TF_by_2k_F[ii] = self.b_, self.k_F, self.q_TF_by_2k_F
+            corr_len[ii] = self.corr_len_
+        self.sc_integrals_ = {mechanism: _sc_integrals(mechanism, self.mobility_model_ == 'v1', 
+                                                       b, k_F, q_TF_by_2k_F, corr_len,
+                                                       n_nodes=self.integration_backend_['n_nodes'])
+                              for mechanism in self._integrated_sc_mechanisms()}
+
+    def _integrate_sc(self, mechanism:str, integrand):
+        """
+        This function integrates the scattering integrand over [0, 1] with the 
+        set integration tolerances (or the fixed-node quadrature) and stores the 
+        relative error estimate of the mechanism. The complex-step derivatives
+        (see _sheet_jacobian_row()) always use the fixed-node quadrature.
+        """
+        if self.complex_step_ or self.integration_backend_['backend'] == 'fixed_node':
+            if self.sc_integrals_ is not None and mechanism in self.sc_integrals_ \
+                and not self.complex_step_:
+                value, abserr = (arr[self.comp_index_] for arr in self.sc_integrals_[mechanism])
+            else:
+                value, abserr = (arr[0] for arr in 
+                                 _sc_integrals(mechanism, self.mobility_model_ == 'v1', [self.b_],
+                                               [self.k_F], [self.q_TF_by_2k_F], self.corr_len_,
+                                               n_nodes=self.integration_backend_['n_nodes']))
+        else:
+            value, abserr = _quad(integrand, 0, 1, return_error=True, **self.quad_options_)
+        self.sc_rel_err_[mechanism] = abs(abserr/value) if value else 0.0
+        return value
+
+    @_profiled('mobility_from_sc_rates')
+    def _sheet_mobility_from_sc_rates(self, sc_rates, m_star_by_e, return_sc_rates:bool=False,
+                                      sc_rates_err=None):
+        """
+        This function converts the scattering rates to the sheet mobilities and
+        collects them in the result columns.
+
+        Parameters
+        ----------
+        sc_rates : MobilityResults
+            Scattering rates (unit: 10^12 s^-1) of the scattering mechanisms.
+        m_star_by_e : 1D float array (unit: 10^-12 V.m^-2.s^2)
+            Carrier effective mass in m0 unit multiplied by m0/e.
+        return_sc_rates : bool, optional
+            Include the scattering rates in the results. The default is False.
+        sc_rates_err : MobilityResults, optional
+            Absolute error estimates of the scattering rates. If not None, the
+            mobility error estimates are included in the results. The default is None.
+
+        Returns
+        -------
+        MobilityResults
+            Compositions and mobilities (unit: cm^2 V^-1 S^-1). If return_sc_rates=True,
+            then scattering rates (10^12 s^-1) and m_star_by_e (10^-12 V.m^-2.s^2) are also returned.
+            If sc_rates_err is not None, mobility error estimates (cm^2 V^-1 S^-1) are also returned.
+
+        """
+        mobility = MobilityResults({'comp': self.comps_})
+        if return_sc_rates: mobility['m_star_by_e'] = m_star_by_e
+        for mechanism, inv_sc in sc_rates.items():
+            mobility[mechanism] = self._mobility_calculator(inv_sc, m_star_by_e=m_star_by_e)
+            if sc_rates_err is not None:
+                # mu ~ 1/rate => |d mu| = mu * |d rate|/rate
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    mobility[f'{mechanism}_err'] = mobility[mechanism]*sc_rates_err[mechanism]/inv_sc
+            if return_sc_rates: mobility[f'{mechanism}_sc'] = inv_sc
+        return mobility
+        
+    @_profiled('set_params')
     def _set_params(self, m_star, eps_s, eps_h, c_lattice, a_lattice, sc_potential, 
                     alloy_composition, n_2d, rms_roughness, corr_len, n_dis, f_dis, 
                     n_ion_impurity, T, K_square, E_D, mass_density, 
@@ -248,25 +612,56 @@ class _Mobility2DCarrier:
         # np.sqrt(2*e_mass*e_charge/h_bar**2)*1e-2 = 51.23167219674931 1e6 cm^-1
         self.k_pop = 51.23167219674931*np.sqrt(self.m_star_*self.E_pop) # 1e6 cm^-1
 
-    def _print_database_params(self):
+    def _log_database_params(self):
         """
-        This function prints the log of model descriptions.
+        This function logs the material and derived parameters of the current
+        composition to the 'mobilitypy.params' logger (debug level). 
 
         Returns
         -------
         None.
 
         """
-        if self.print_info == 'high':
-            print(f'- Composition={self.comp_:.5f}')
-            print(f'\t-- a={self.a_lp:.5f} nm | c={self.c_lp:.5f} nm | m*={self.m_star_:.5f} m0 | eps_s={self.eps_s_:.5f} eps0 | eps_h={self.eps_h_:.5f} eps0')
-            print(f'\t-- Mass density={self.mass_density_:.2f} | scattering potential={self.sc_potential_:.2f} eV | T={self.temp_:.1f} K')
-            print(f'\t-- Interface rms roughness={self.rms_roughness_:.3f} nm | correlation length={self.corr_len_:.3f} nm')
-            print(f'\t-- Dislocation density={self.n_dislocation_:.4f} nm^-2 | dislocation occupancy={self.f_dislocation_:.1f}')
-            print(f'\t-- Electromechanical coupling coefficient={self.K_sqr:.5f} | deformation potential={self.E_d:.5f}')
-            print(f'\t-- Longitudinal acoustic phonon velocity={self.v_LA:.2f} m/s | polar optical phonon energy={self.E_pop:.5f} eV')
-            print(f'\t-- Fermi wave vector={self.k_F} | b={self.b_}')
-            print('')
+        if not self.params_logger_.isEnabledFor(logging.DEBUG): return
+        self.params_logger_.debug(
+                  '- Composition=%.5f\n'
+                  '\t-- a=%.5f nm | c=%.5f nm | m*=%.5f m0 | eps_s=%.5f eps0 | eps_h=%.5f eps0\n'
+                  '\t-- Mass density=%.2f | scattering potential=%.2f eV | T=%.1f K\n'
+                  '\t-- Interface rms roughness=%.3f nm | correlation length=%.3f nm\n'
+                  '\t-- Dislocation density=%.4f nm^-2 | dislocation occupancy=%.1f\n'
+                  '\t-- Electromechanical coupling coefficient=%.5f | deformation potential=%.5f\n'
+                  '\t-- Longitudinal acoustic phonon velocity=%.2f m/s | polar optical phonon energy=%.5f eV\n'
+                  '\t-- Fermi wave vector=%s | b=%s\n',
+                  self.comp_, self.a_lp, self.c_lp, self.m_star_, self.eps_s_, self.eps_h_,
+                  self.mass_density_, self.sc_potential_, self.temp_, self.rms_roughness_, 
+                  self.corr_len_, self.n_dislocation_, self.f_dislocation_, self.K_sqr, self.E_d,
+                  self.v_LA, self.E_pop, self.k_F, self.b_)
+
+    def _diagnostics_row(self):
+        """
+        This function returns the diagnostics record of the current composition:
+        composition, carrier density (10^12 cm^-2), Fermi wave vector k_F (1e6 cm^-1),
+        Fang-Howard parameter b (1e6 cm^-1), q_TF/2k_F, POP wave vector k_pop 
+        (1e6 cm^-1) and the relative quadrature error estimates of the 
+        numerically integrated mechanisms ('<mechanism>_rel_err').
+        """
+        row = {'comp': self.comp_, 'n_2d': self.n_2d_, 'k_F': self.k_F, 'b': self.b_,
+               'q_TF_by_2k_F': self.q_TF_by_2k_F, 'k_pop': self.k_pop}
+        for mechanism, rel_err in self.sc_rel_err_.items():
+            row[f'{mechanism}_rel_err'] = rel_err
+        return row
+
+    @staticmethod
+    def _diagnostics_table(rows):
+        """
+        This function collects the diagnostics records in a MobilityResults table.
+        Missing entries are NaN.
+        """
+        columns = {}
+        for row in rows:
+            for key in row: columns.setdefault(key, None)
+        return MobilityResults({key: np.array([row.get(key, np.nan) for row in rows], dtype=float)
+                                for key in columns})
 
     def _form_factor(self, x, delta_2deg:bool=False, mode=None, numerator:bool=False):
         """
@@ -327,8 +722,9 @@ class _Mobility2DCarrier:
                 self._int_f_denomenator(x, mode='IRF'))
 
     def _inv_tau_ifr_int(self):
-        return integrate.quad(self._inv_tau_ifr_f, 0, 1)[0]
+        return self._integrate_sc('IFR', self._inv_tau_ifr_f)
 
+    @_profiled('IFR')
     def _inv_tau_ifr(self):
         # Since self.k_F propto sqrt(self.n_2d_); we must safe guard the scattering mechanism 
         # where division by either self.n_2d_ or self.k_F are done. 
@@ -336,7 +732,7 @@ class _Mobility2DCarrier:
         # term arrises in most scattering integration.
         # => this safe guard ensures we do not get any scattering in cases for
         # very low n_2d or no alloy scarring for pure binary systems.
-        if self.n_2d_ < self.eps_n_2d: return 0
+        if np.real(self.n_2d_) < self.eps_n_2d: return 0
         #*****************************************
         # (m0*e^4)/(8*h_bar^3*eps_0^2) * 1e-4 = 81.6046000430338 1e12 s^-1
         return 81.6046000430338 * self.m_star_by_eps_s_square \
@@ -350,8 +746,9 @@ class _Mobility2DCarrier:
                 /self._int_f_denomenator(x, mode='DIS')
 
     def _inv_tau_dis_int(self):
-        return integrate.quad(self._inv_tau_dis_f, 0, 1)[0]
+        return self._integrate_sc('DIS', self._inv_tau_dis_f)
 
+    @_profiled('DIS')
     def _inv_tau_dis(self):
         # Since self.k_F propto sqrt(self.n_2d_); we must safe guard the scattering mechanism 
         # where division by either self.n_2d_ or self.k_F are done. 
@@ -359,7 +756,7 @@ class _Mobility2DCarrier:
         # term arrises in most scattering integration.
         # => this safe guard ensures we do not get any scattering in cases for
         # very low n_2d or no alloy scarring for pure binary systems.
-        if self.n_2d_ < self.eps_n_2d: return 0
+        if np.real(self.n_2d_) < self.eps_n_2d: return 0
         #*****************************************
         # (m0*e^4)/(4*pi*h_bar^3*eps_0^2) * (1e8 / 1e6**4/ 1e-8**2) = 519511.0190323496 1e12 s^-1
         return 519511.0190323496 * self.m_star_by_eps_s_square \
@@ -372,8 +769,9 @@ class _Mobility2DCarrier:
                 /self._int_f_denomenator(x, mode='DIS')
 
     def _inv_tau_dis_strain_int(self):
-        return integrate.quad(self._inv_tau_dis_strain_f, 0, 1)[0]
+        return self._integrate_sc('DIS_Strain', self._inv_tau_dis_strain_f)
     
+    @_profiled('DIS_Strain')
     def _inv_tau_dis_strain(self):
         # Since self.k_F propto sqrt(self.n_2d_); we must safe guard the scattering mechanism 
         # where division by either self.n_2d_ or self.k_F are done. 
@@ -381,7 +779,7 @@ class _Mobility2DCarrier:
         # term arrises in most scattering integration.
         # => this safe guard ensures we do not get any scattering in cases for
         # very low n_2d or no alloy scarring for pure binary systems.
-        if self.n_2d_ < self.eps_n_2d: return 0
+        if np.real(self.n_2d_) < self.eps_n_2d: return 0
         #*****************************************
         #(e_mass*e_charge**2)/(2*pi_*h_bar**3)*1e-4*1e-20 = 0.003173229123349822 1e12 s^-1
         # Burger's vector b_e = a_lp
@@ -391,6 +789,7 @@ class _Mobility2DCarrier:
                 * self._inv_tau_dis_strain_int() / self.k_F**2 # 1e12 s^-1
 
     # ----------- alloy disordered -------------------
+    @_profiled('AD')
     def _inv_tau_ado(self):
         # Since self.k_F propto sqrt(self.n_2d_); we must safe guard the scattering mechanism 
         # where division by either self.n_2d_ or self.k_F are done. 
@@ -398,7 +797,8 @@ class _Mobility2DCarrier:
         # term arrises in most scattering integration.
         # => this safe guard ensures we do not get any scattering in cases for
         # very low n_2d or no ally scarring for pure binary systems.
-        if (self.comp_ < 1e-8) or (self.n_2d_ < self.eps_n_2d) or ((1-self.comp_)<1e-8): return 0
+        comp = np.real(self.comp_) # complex for the complex-step derivatives
+        if (comp < 1e-8) or (np.real(self.n_2d_) < self.eps_n_2d) or ((1-comp)<1e-8): return 0
         #*****************************************
         #(3*e_mass*e_charge**2)/(16*h_bar**3)*1e6*1e-8**3*1e-4 = 0.37383724882773683 1e12 s^-1
         return 0.37383724882773683 * self.m_star_ * self.omega_0_ad * self.sc_potential_**2 \
@@ -409,8 +809,9 @@ class _Mobility2DCarrier:
         return x**4/self._int_f_denomenator(x, mode='DP') 
 
     def _inv_tau_dp_int(self):
-        return integrate.quad(self._inv_tau_dp_f, 0, 1)[0]
+        return self._integrate_sc('DP', self._inv_tau_dp_f)
         
+    @_profiled('DP')
     def _inv_tau_dp(self):
         # Since self.k_F propto sqrt(self.n_2d_); we must safe guard the scattering mechanism 
         # where division by either self.n_2d_ or self.k_F are done. 
@@ -418,7 +819,7 @@ class _Mobility2DCarrier:
         # term arrises in most scattering integration.
         # => this safe guard ensures we do not get any scattering in cases for
         # very low n_2d or no ally scarring for pure binary systems.
-        if self.n_2d_ < self.eps_n_2d: return 0
+        if np.real(self.n_2d_) < self.eps_n_2d: return 0
         #*****************************************
         # 3*(e_mass*e_charge**2*k_B)/(4*pi_*h_bar**3)*1e6*1e2 = 6571673.423885714 1e12 s^-1
         return 6571673.423885714 * (self.m_star_*self.E_d*self.E_d*self.temp_ \
@@ -429,8 +830,9 @@ class _Mobility2DCarrier:
         return x**3*self._form_factor(x, mode='PE')/self._int_f_denomenator(x, mode='PE')
 
     def _inv_tau_pe_int(self):
-        return integrate.quad(self._inv_tau_pe_f, 0, 1)[0]
+        return self._integrate_sc('PE', self._inv_tau_pe_f)
         
+    @_profiled('PE')
     def _inv_tau_pe(self):
         # Since self.k_F propto sqrt(self.n_2d_); we must safe guard the scattering mechanism 
         # where division by either self.n_2d_ or self.k_F are done. 
@@ -438,13 +840,14 @@ class _Mobility2DCarrier:
         # term arrises in most scattering integration.
         # => this safe guard ensures we do not get any scattering in cases for
         # very low n_2d or no ally scarring for pure binary systems.
-        if self.n_2d_ < self.eps_n_2d: return 0
+        if np.real(self.n_2d_) < self.eps_n_2d: return 0
         #*****************************************
         # (e_mass*e_charge**2*k_B)/(pi_*eps_0*h_bar**3)*1e-2 * 1e-6 = 98.96143403667759 1e12 s^-1
         return 98.96143403667759 * (self.m_star_*self.K_sqr*self.temp_ \
                 *self._inv_tau_pe_int())/(self.eps_s_*self.k_F) # 1e12 s^-1
 
     # ----------- polar optical phonon -------------------
+    @_profiled('POP')
     def _inv_tau_pop(self):
         # Since self.k_F propto sqrt(self.n_2d_); we must safe guard the scattering mechanism 
         # where division by either self.n_2d_ or self.k_F are done. 
@@ -452,7 +855,7 @@ class _Mobility2DCarrier:
         # term arrises in most scattering integration.
         # => this safe guard ensures we do not get any scattering in cases for
         # very low n_2d or no ally scarring for pure binary systems.
-        if self.n_2d_ < self.eps_n_2d: return 0
+        if np.real(self.n_2d_) < self.eps_n_2d: return 0
         #*****************************************
         eps_star = 1/(1/self.eps_h_ - 1/self.eps_s_)
         fact_2 = np.sqrt(self.m_star_ * self.E_pop) * self._form_factor(None, mode='POP')/eps_star 
@@ -464,24 +867,34 @@ class _Mobility2DCarrier:
         return 35210.68196468214 * fact_2 * fact_3 
 
     # Scattering rate to mobility calculation
-    def _mobility_calculator(self, inverse_scattering):  
+    def _mobility_calculator(self, inverse_scattering, m_star_by_e=None):  
         """
         This function calculates the sheet mobility from different scattering contributions.
+        inverse_scattering can be a float or an array (then m_star_by_e should be 
+        an array of same shape). Zero scattering rate returns NaN mobility.
         """
         # 1e4 is unit conversion from m^2 to cm^2
         # self.m_star_by_e_ = 5.685630103565723 * self.m_star_ # 10^-12 V.m^-2.s^2
         # inverse_scattering is in 10^12 s^-1
-        return 1e4/(self.m_star_by_e_ * inverse_scattering) if inverse_scattering else np.nan # cm^2 V^-1 S^-1
+        if m_star_by_e is None: m_star_by_e = self.m_star_by_e_
+        if np.isscalar(inverse_scattering):
+            return 1e4/(m_star_by_e * inverse_scattering) if inverse_scattering else np.nan # cm^2 V^-1 S^-1
+        inverse_scattering = np.asarray(inverse_scattering, dtype=float)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(inverse_scattering != 0, 1e4/(m_star_by_e * inverse_scattering), np.nan) # cm^2 V^-1 S^-1
     
 #%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%%
     def _calculate_figure_of_merit(self, n_2d, mobility,  
                                    temp:float=300,  mode:str='LFOM', 
                                    T_corect_bandgap:bool=False,
                                    direct_bandgap:bool=True, 
-                                   indirect_bandgap:bool=False):
+                                   indirect_bandgap:bool=False, comp=None):
         """
-        This function calculates the figure-of-merit (FOM). Available FOMs are
-        LFOM: Lateral figure-of-merit
+        This function calculates the figure-of-merit (FOM). The available FOMs 
+        are in figure_of_merit_registry (see _figure_of_merit):
+        LFOM: Lateral figure-of-merit (e*n_2d*mu*E_cr^2, unit: MW/cm^2)
+        BFOM: Vertical (Baliga) figure-of-merit (eps*mu*E_cr^3/4, unit: MW/cm^2)
+        BHFFOM: Baliga high-frequency figure-of-merit (mu*E_cr^2, unit: V/s)
         
         Ref: J. L. Hudgins, G. S. Simin, E. Santi and M. A. Khan, 
         "An assessment of wide bandgap semiconductors for power devices," 
@@ -491,29 +904,21 @@ class _Mobility2DCarrier:
         direct_bandgap_critical_electric_field = 1.73e5*(bandgap_**2.5) # V/cm
         indirect_bandgap_critical_electric_field = 2.38e5*(bandgap_**2) # V/cm
         
-        Units:
-        bandgap_ => in eV.
-        temp => in K
-        n_2d => in 10^12 cm^-2
-        E_cr => in V/cm
-        e => 1.602176634e-19 C
-        mobility (mu) => cm^2 V^-1 s^-1
-        
-        
-        LFOM = e*n_2d*mu*E_cr^2 = 1.602e-19 C * 1e12 cm^-2 * cm^2 V^-1 s^-1 * V^2cm^-2
-                                = 1.602e-7 CVs^-1cm^-2
-                                = 1.602e-7 Wcm^-2    #1 watts = 1 coulombs*volt/second
-                                = 1.602e-13 MW/cm^2
+        n_2d, mobility and temp are broadcasted with the material parameters of
+        the compositions. Without comp, the compositions of the instance are
+        along the first axis (e.g. mobility map of shape (compositions, n_2d, T)).
+        With comp (array broadcastable with mobility), the material parameters 
+        are calculated at the (unique) compositions, e.g. for the rows of a sweep.
         
         Parameters
         ----------
-        n_2d : 1D float array (unit: 10^12 cm^-2)
+        n_2d : float array (unit: 10^12 cm^-2)
             Array containing carrier density data .
-        mobility : 1D float array (unit: cm^2 V^-1 s^-1)
+        mobility : float array (unit: cm^2 V^-1 s^-1)
             Array containing mobility data.
-        temp : float, optional (unit: K)
+        temp : float or float array, optional (unit: K)
             Temperature for band gap correction. The default is 300K.
-        mode : str, optional (['LFOM'])
+        mode : str, optional (see figure_of_merit_registry)
             The figure-of-merit name. The default is 'LFOM'.
         T_corect_bandgap : bool, optional
             Apply temperature correction to bandgap or not. The default is False.
@@ -521,29 +926,70 @@ class _Mobility2DCarrier:
             If the bandgap is direct bandgap or not. The default is True.
         indirect_bandgap : bool, optional
             If the bandgap is indirect bandgap or not. The default is False.
+        comp : float array, optional
+            Compositions of the data points. The default is None.
 
         Returns
         -------
-        1D float array (unit: MW/cm^2)
+        float array (unit: see figure_of_merit_registry)
             Figure-of-merit.
 
         """
-        assert mode in ['LFOM'], 'Requested mode is not implemented yet' 
-        bandgap_ = self.alloy_params_.get('bandgap')
-        bandgap_alpha_ = self.alloy_params_.get('bandgap_alpha')
-        bandgap_beta_ = self.alloy_params_.get('bandgap_beta')
+        if mode not in figure_of_merit_registry:
+            raise ValueError(f'Requested {mode} figure-of-merit is not implemented yet. Contact developer.')
+        bandgap_, alloy_params = self._figure_of_merit_params(np.ndim(mobility), temp=temp, 
+                                                              T_corect_bandgap=T_corect_bandgap,
+                                                              comp=comp)
+        return figure_of_merit_registry[mode]['function'](n_2d, mobility, bandgap_, alloy_params,
+                                                          direct_bandgap)
+
+    def _figure_of_merit_params(self, ndim:int, temp=300, T_corect_bandgap:bool=False, comp=None):
+        """
+        The (temperature corrected) bandgap and the alloy parameters of the 
+        compositions (instance compositions along the first of ndim axes, or
+        the compositions comp), broadcastable with the data arrays.
+        """
+        if comp is None:
+            alloy_params = self.alloy_params_
+            if ndim > 1:
+                alloy_params = {key: np.reshape(val, (-1,) + (1,)*(ndim-1)) if np.ndim(val) == 1 else val
+                                for key, val in alloy_params.items()}
+        else:
+            unique_comps, inverse = np.unique(np.ravel(comp).astype(float), return_inverse=True)
+            carrier = self._carrier_at_compositions(unique_comps)
+            alloy_params = {key: np.asarray(val)[inverse.ravel()].reshape(np.shape(comp)) 
+                            if np.ndim(val) == 1 else val
+                            for key, val in carrier.alloy_params_.items()}
+        bandgap_ = alloy_params.get('bandgap')
         if T_corect_bandgap:
             bandgap_ = self._apply_Varshni_T_correction_2_bandgap(bandgap_, temp=temp,
-                                                                  bandgap_alpha=bandgap_alpha_,
-                                                                  bandgap_beta=bandgap_beta_)
-        if mode == 'LFOM':  
-            if direct_bandgap:
-                # 1.73**2*e_charge*1e10*1e12*1e-6 =  0.0047951544478985995
-                e_times_e_cr_sqr_pre_fact = 0.0047951544478985995 
-                e_cr_sqr_eg_pow = 5 # 2.5**2
-            else: #elif indirect_bandgap:
-                # 2.38**2*e_charge*1e10*1e12*1e-6 = 0.009075369325629598
-                e_times_e_cr_sqr_pre_fact = 0.009075369325629598
-                e_cr_sqr_eg_pow = 4 # 2**2
-            return e_times_e_cr_sqr_pre_fact * n_2d * mobility \
-                    * bandgap_**e_cr_sqr_eg_pow #MW/cm^2
\ No newline at end of file
+                                                                  bandgap_alpha=alloy_params.get('bandgap_alpha'),
+                                                                  bandgap_beta=alloy_params.get('bandgap_beta'))
+        return bandgap_, alloy_params
+
+    def _figure_of_merit_table(self, comp, n_2d, mobility, temp=300, modes=('LFOM',),
+                               T_corect_bandgap:bool=False, direct_bandgap:bool=True):
+        """
+        This function calculates the sheet resistance and the figure-of-merits 
+        modes of data points (e.g. rows of a sweep) in one pass. comp, n_2d, 
+        mobility and temp are broadcasted. The material parameters are calculated
+        once per unique composition.
+        Returns MobilityResults with 'comp', 'n_2d', 'T', 'mobility', 'bandgap', 
+        'critical_electric_field', 'sheet_resistance' and the modes columns.
+        """
+        unknown = [mode for mode in modes if mode not in figure_of_merit_registry]
+        if unknown:
+            raise ValueError(f'Requested {unknown} figure-of-merit is not implemented yet. Contact developer.')
+        comp, n_2d, mobility, temp = [np.ravel(val) for val in np.broadcast_arrays(
+            *[np.asarray(val, dtype=float) for val in (comp, n_2d, mobility, temp)])]
+        bandgap_, alloy_params = self._figure_of_merit_params(1, temp=temp, T_corect_bandgap=T_corect_bandgap,
+                                                              comp=comp)
+        table = MobilityResults({'comp': comp, 'n_2d': n_2d, 'T': temp, 'mobility': mobility,
+                                 'bandgap': bandgap_,
+                                 'critical_electric_field': _critical_electric_field(bandgap_, direct_bandgap),
+                                 'sheet_resistance': self._calculate_sheet_resitance(n_2d, mobility)},
+                                attrs={'units': {mode: figure_of_merit_registry[mode]['unit'] for mode in modes}})
+        for mode in modes:
+            table[mode] = figure_of_merit_registry[mode]['function'](n_2d, mobility, bandgap_, alloy_params,
+                                                                     direct_bandgap)
+        return table
\ No newline at end of file
@@ -6,8 +6,10 @@ Created on Thu Dec  4 16:15:33 2025
 @author: badal.mondal
 """
 import numpy as np
-import pandas as pd
 from ._Fermi_Dirac_integration import _FermiDiracInt
+from ._mobility_results import MobilityResults
+from ._profiling import _profiled
+from ._logging import logger
 import scipy.integrate as integrate
 
 ## ============================================================================
@@ -20,6 +22,12 @@ class _Mobility3DCarrier:
     are corrected in our implementation. 
     
     '''
+    _effect_flag_names = ('alloy_disordered_effect', 'td_dislocation_chg_effect', 
+                          'td_dislocation_strain_effect', 'piezoelectric_effect', 
+                          'acoustic_phonon_effect', 'polar_optical_phonon_effect', 
+                          'ionized_impurity_effect', 'total_mobility', 
+                          'mobility_model_version', 'inverse_half_FD_method', 
+                          'FermiDirac_integration_approach', 'carrier_degeneracy_limit')
     
     def __init__(self):
         """
@@ -32,8 +40,10 @@ class _Mobility3DCarrier:
         """
         self.eps_n_3d = self.eps_n
         
+    @_profiled('mobility_3d')
     def _calculate_3d_mobility(self, n_3d=1, n_dis:float=1, f_dis:float=0.5, 
-                               n_ion_impurity:float=1, T:float=300):
+                               n_ion_impurity:float=1, T:float=300, return_errors:bool=False,
+                               collect_diagnostics:bool=False, jacobian_params=None):
         """
         This function calculates the sheet mobility from different scattering contributions.
         The mobility models are implemented based on the following references.
@@ -61,13 +71,26 @@ class _Mobility3DCarrier:
         T : float, optional (unit: K)
             Temperature at which mobility calculations will be done. 
             The default is 300K.
+        return_errors : bool, optional
+            Return the absolute numerical error estimates of the mobilities 
+            (columns '<column>_err'). The default is False.
+        collect_diagnostics : bool, optional
+            Collect the per point diagnostics table (see _diagnostics_table())
+            in results.attrs['diagnostics']. The default is False.
+        jacobian_params : list of str, optional
+            Calculate the derivatives of the mobilities with respect to these
+            inputs (see _jacobian_3d()). The default is None.
 
         Returns
         -------
-        pandas dataframe of compositions and mobilities (unit: cm^2 V^-1 S^-1).
-            Total (or individual contributions) sheet mobility. 
+        MobilityResults of mobilities (unit: cm^2 V^-1 S^-1).
+            Total (or individual contributions) sheet mobility. If return_errors=True,
+            the mobility error estimates (cm^2 V^-1 S^-1) are also returned.
+            If jacobian_params is given, the derivatives are returned in 
+            'd<column>/d<parameter>' columns.
 
         """      
+        jacobian_params = self._check_jacobian_params(jacobian_params, self._jacobian_inputs_3d)
         #======================================================================
         self._set_params_general(self.alloy_params_.get('carrier_effective_mass'), 
                                  self.alloy_params_.get('static_dielectric_constant'),
@@ -97,13 +120,16 @@ class _Mobility3DCarrier:
         if self.alloy_disordered_effect_ or self.acoustic_phonon_effect_:
             self._ln_1p_exp_xi() # Calculates the FD oth order integral
         #======================================================================
+        self.mu_rel_err_ = {} # Relative numerical errors of the mobilities
+        self.logger_.info('3D mobility (%s limit): %d compositions, %d carrier densities', 
+                          self.carrier_degenracy_limit_, len(self.comps_), np.size(self.n_3d_))
         mobility = {}
         if self.alloy_disordered_effect_:
-            if self.print_info is not None: print('\t-- Calculating alloy-disordered mobility')
+            self.logger_.debug('\t-- Calculating alloy-disordered mobility')
             mobility['mu_AD'] = self._alloy_disorder_mu()
                 
         if self.polar_optical_phonon_effect_:
-            if self.print_info is not None: print('\t-- Calculating polar optical phonon effect mobility')
+            self.logger_.debug('\t-- Calculating polar optical phonon effect mobility')
             # POP scattering does not depend on n_3d. For single comp and n_3d
             # array the return array shape would not match with other scattering 
             # mechanisms. This is to safe guard.
@@ -113,44 +139,217 @@ class _Mobility3DCarrier:
                 mobility['mu_POP'] = self._pop_mu()
 
         if self.acoustic_phonon_effect_:
-            if self.print_info is not None: print('\t-- Calculating acoustic phonon deformation potential effect mobility')
+            self.logger_.debug('\t-- Calculating acoustic phonon deformation potential effect mobility')
             mobility['mu_DP'] = self._ac_dp_mu()
             
         if self.piezoelectric_effect_:
-            if self.print_info is not None: print('\t--- Calculating piezoelectric phonon effect mobility')
-            mobility['mu_PE'] = self._mu_pz()
+            self.logger_.debug('\t--- Calculating piezoelectric phonon effect mobility')
+            # In non-degenerate limit PE scattering does not depend on n_3d. 
+            # Same safe guard as POP.
+            if (self.carrier_degenracy_limit_ == 'nondegenerate') and (not np.isscalar(self.n_3d_)) \
+                and (len(self.n_3d_) != len(self.comps_)):
+                mobility['mu_PE'] = np.repeat(self._mu_pz(), len(self.n_3d_))
+            else:
+                mobility['mu_PE'] = self._mu_pz()
             
         if self.ionized_impurity_effect_: 
-             if self.print_info is not None: print('\t-- Calculating ionized impurity limited mobility')
+             self.logger_.debug('\t-- Calculating ionized impurity limited mobility')
              mobility['mu_ION_IMP'] = self._ion_imp_mu()
 
         if self.td_dislocation_chg_effect_:
-            if self.print_info is not None: print('\t-- Calculating charge line dislocation effect mobility')
+            self.logger_.debug('\t-- Calculating charge line dislocation effect mobility')
             mobility['mu_DIS_TD_CHG'] = self._td_chg_dis_mu()
             
         if self.td_dislocation_strain_effect_: 
-            if self.print_info is not None: print('\t-- Calculating dislocation strain field effect mobility')
+            self.logger_.debug('\t-- Calculating dislocation strain field effect mobility')
             mobility['mu_DIS_TD_STR'] = self._td_str_dis_mu()
         #======================================================================
-        MuDataframe = pd.DataFrame.from_dict(mobility)
+        MuResults = MobilityResults(mobility)
+        MuErrors = {key: MuResults[key]*self.mu_rel_err_.get(key, 0.0) for key in MuResults} \
+            if return_errors else None
         #======================================================================
         if self.total_mobility_:
-            if self.print_info is not None: print('\t-- Calculating total mobility')
-            #print(list(MuDataframe.keys()))
-            MuDataframe['mu_TOT'] = 1/((1/MuDataframe).sum(axis=1, skipna=True, min_count=1))
+            self.logger_.debug('\t-- Calculating total mobility')
+            self._add_total_mobility(MuResults, 'mu_TOT', MuResults.columns, MuErrors)
         #======================================================================    
-        if self.print_info is not None: print(f'{"="*72}')
+        self.logger_.debug('='*72)
         #======================================================================
+        AllMuResults = MuResults
         if self.only_total_mobility:
-            return MuDataframe['mu_TOT']
+            MuResults = MuResults[['mu_TOT']]
         else:
             if self.td_dislocation_chg_effect_ and self.td_dislocation_strain_effect_:
                 # Postprocessing: total DIS
-                MuDataframe['mu_DIS_TD'] = 1/((1/MuDataframe[['mu_DIS_TD_CHG', 'mu_DIS_TD_STR']])
-                                              .sum(axis=1, skipna=True, min_count=1))              
-            return MuDataframe
+                self._add_total_mobility(MuResults, 'mu_DIS_TD', ['mu_DIS_TD_CHG', 'mu_DIS_TD_STR'],
+                                         MuErrors)
+        if collect_diagnostics:
+            diagnostics = self._diagnostics_table(len(MuResults))
+        if jacobian_params:
+            jacobian = self._jacobian_3d(AllMuResults, MuResults.columns, jacobian_params,
+                                         {'n_3d': n_3d, 'n_dis': n_dis, 'f_dis': f_dis, 
+                                          'n_ion_impurity': n_ion_impurity, 'T': T})
+        if return_errors:
+            MuResultsWithErrors = MobilityResults()
+            for key in MuResults:
+                MuResultsWithErrors[key] = MuResults[key]
+                MuResultsWithErrors[f'{key}_err'] = MuErrors[key]
+            MuResults = MuResultsWithErrors
+        if jacobian_params:
+            for key in jacobian: MuResults[key] = jacobian[key]
+        if collect_diagnostics:
+            MuResults.attrs['diagnostics'] = diagnostics
+        return MuResults
+
+    _jacobian_inputs_3d = ('comp', 'n_3d', 'n_dis', 'f_dis', 'n_ion_impurity', 'T')
+    # Exact power laws of the mobilities in the prefactor parameters (all degeneracy limits)
+    _jacobian_power_laws_3d = {'n_dis': {'mu_DIS_TD_CHG': -1, 'mu_DIS_TD_STR': -1},
+                               'f_dis': {'mu_DIS_TD_CHG': -2},
+                               'n_ion_impurity': {'mu_ION_IMP': -1}}
+    _fd_rel_step_3d = 1e-5
+
+    def _jacobian_3d(self, MuResults, columns, jacobian_params, inputs:dict):
+        """
+        This function calculates the derivatives of the mobility columns with 
+        respect to the inputs or alloy parameters.
+            - n_dis, f_dis and n_ion_impurity enter the mobilities only as power-law
+              prefactors. Their derivatives are analytic: d mu/d p = k*mu/p.
+            - The other parameters change the reduced Fermi energy and the Fermi-Dirac
+              integrals (approximations, polylog or quadrature). Their derivatives are
+              central differences of the (vectorized) mobility calculation with 
+              relative step _fd_rel_step_3d (absolute step for 'comp', one sided at 
+              the composition boundaries). One pass per step for all the points.
+        The derivatives of mu_TOT and mu_DIS_TD follow from the Matthiessen's rule:
+            d mu_TOT = mu_TOT^2 * sum(d mu_i/mu_i^2)
+        n_3d derivatives are with respect to the carrier density of the same point.
+        Alloy parameter derivatives keep the other alloy parameters fixed.
+
+        Parameters
+        ----------
+        MuResults : MobilityResults
+            All the mobility columns (including the individual contributions).
+        columns : list of str
+            The returned mobility columns.
+        jacobian_params : list of str
+            Inputs for the derivatives.
+        inputs : dict
+            n_3d, n_dis, f_dis, n_ion_impurity and T of the calculation.
+
+        Returns
+        -------
+        dict
+            'd<column>/d<parameter>' and derivative (cm^2 V^-1 S^-1 per parameter unit) pairs.
+
+        """
+        jacobian = {}
+        composites = {'mu_TOT': [key for key in MuResults.columns if key not in ['mu_TOT', 'mu_DIS_TD']],
+                      'mu_DIS_TD': ['mu_DIS_TD_CHG', 'mu_DIS_TD_STR']}
+        n_points = len(MuResults)
+        for param in jacobian_params:
+            if param in self._jacobian_power_laws_3d:
+                powers = self._jacobian_power_laws_3d[param]
+                derivative = {key: MuResults[key]*powers.get(key, 0)/inputs[param] 
+                              for key in MuResults.columns if key not in composites}
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    for key, parts in composites.items():
+                        if key not in columns: continue
+                        mu = self._sum_inverse_mobilities(MuResults.to_numpy(columns=parts))
+                        rel_sum = np.column_stack([derivative[part]/MuResults[part]**2 for part in parts])
+                        derivative[key] = mu**2*np.where(np.all(np.isnan(rel_sum), axis=1), 
+                                                         np.nan, np.nansum(rel_sum, axis=1))
+            else:
+                plus, minus, step = self._fd_mobilities_3d(param, inputs)
+                derivative = {key: (plus[key] - minus[key])/step for key in columns}
+            for key in columns:
+                jacobian[f'd{key}/d{param}'] = np.broadcast_to(derivative[key], n_points)
+        return jacobian
+
+    def _fd_mobilities_3d(self, param:str, inputs:dict):
+        """
+        This function returns the mobilities at the central difference points of 
+        param (see _jacobian_3d()) and the step sizes.
+        """
+        def calculate(carrier, **changed):
+            return carrier._calculate_3d_mobility(**dict(inputs, **changed))
+        h = self._fd_rel_step_3d
+        if param == 'comp':
+            comps_plus, comps_minus = np.minimum(self.comps_ + h, 1.0), np.maximum(self.comps_ - h, 0.0)
+            return (calculate(self._carrier_at_compositions(comps_plus)),
+                    calculate(self._carrier_at_compositions(comps_minus)), comps_plus - comps_minus)
+        # The steps are calculated on a copy of the carrier (as for 'comp'), so 
+        # that neither the perturbed alloy parameters nor the calculation state 
+        # (eta_f_, mu_rel_err_, ...) of this instance change.
+        carrier = self._carrier_at_compositions(self.comps_)
+        if param in inputs:
+            value = np.asarray(inputs[param], dtype=float)
+            step = h*np.where(value != 0, np.abs(value), 1.0)
+            return calculate(carrier, **{param: value + step}), calculate(carrier, **{param: value - step}), 2*step
+        value = carrier.alloy_params_[param]
+        step = h*np.where(value != 0, np.abs(value), 1.0)
+        carrier.alloy_params_[param] = value + step
+        plus = calculate(carrier)
+        carrier.alloy_params_[param] = value - step
+        minus = calculate(carrier)
+        return plus, minus, 2*step
+
+    def _diagnostics_table(self, n_points:int):
+        """
+        This function returns the diagnostics table of the last calculation: 
+        composition, carrier density (1e18 cm^-3), reduced Fermi energy eta_f
+        and the relative quadrature error estimates of the numerically integrated
+        mobilities ('<column>_rel_err'). One row per mobility point.
+        """
+        diagnostics = MobilityResults({'comp': np.broadcast_to(self.comps_, n_points),
+                                       'n_3d': np.broadcast_to(self.n_3d_, n_points),
+                                       'eta_f': np.broadcast_to(self.eta_f_, n_points)})
+        for key, rel_err in self.mu_rel_err_.items():
+            diagnostics[f'{key}_rel_err'] = np.broadcast_to(rel_err, n_points)
+        return diagnostics
         #======================================================================
     
+    def _add_total_mobility(self, MuResults, total_key:str, keys, MuErrors=None):
+        """
+        This function adds the Matthiessen's rule total mobility of the keys
+        columns to the results. If MuErrors is not None, the absolute error of
+        the total is also added to MuErrors using linear error propagation:
+            d mu_TOT = mu_TOT^2 * sum(d mu_i/mu_i^2)
+        """
+        MuResults[total_key] = self._sum_inverse_mobilities(MuResults.to_numpy(columns=keys))
+        if MuErrors is None: return
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rel_sum = np.column_stack([MuErrors[key]/MuResults[key]**2 for key in keys])
+            MuErrors[total_key] = MuResults[total_key]**2 * np.where(np.all(np.isnan(rel_sum), axis=1), 
+                                                                   np.nan, np.nansum(rel_sum, axis=1))
+        return
+
+    @staticmethod
+    def _relative_error(value, abserr):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.abs(abserr/value)
+    
+    @staticmethod
+    def _sum_inverse_mobilities(mobilities):
+        """
+        Matthiessen's rule: mu_TOT = 1/sum(1/mu_i). NaN contributions are skipped.
+        If all the contributions are NaN the total is NaN.
+
+        Parameters
+        ----------
+        mobilities : 2D float array of shape (points, contributions)
+            Mobilities of individual contributions.
+
+        Returns
+        -------
+        1D float array
+            Total mobility.
+
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            inv_mu = 1.0/mobilities
+            inv_mu_sum = np.where(np.all(np.isnan(inv_mu), axis=1), np.nan, 
+                                  np.nansum(inv_mu, axis=1))
+            return 1.0/inv_mu_sum
+    
+    @_profiled('FD_zero_factor')
     def _ln_1p_exp_xi(self):
         """
         Zeroth order FD integral.
@@ -159,6 +358,7 @@ class _Mobility3DCarrier:
         return 
     
     ## Alloy disordered limited mobility
+    @_profiled('AD')
     def _alloy_disorder_mu(self, eps_den = 1e-8):        
         demoninator_ = self.m_star_*self.sc_potential_*self.sc_potential_*self.omega_0_ad \
                        *self.n_3d_*self.comps_*(1.0-self.comps_)          
@@ -168,6 +368,7 @@ class _Mobility3DCarrier:
         return 21.16990563011839 * self.temp_ * self.F0_eta / demoninator_ # cm^2.V^-1.s^-1
     
     ## Polar optical phonon limited mobility
+    @_profiled('POP')
     def _pop_mu(self):
         eps_star = (self.eps_h_*self.eps_s_)/(self.eps_s_-self.eps_h_)
         # e_charge/k_B = 11604.518121550082
@@ -176,12 +377,14 @@ class _Mobility3DCarrier:
         return 0.1569266969277379 * eps_star * exp_fact / self.m_star_ / np.sqrt(self.m_star_*self.E_pop)
     
     ## Deformation potential acoustic phonon limited mobility
+    @_profiled('DP')
     def _ac_dp_mu(self):
         # 2*e_charge*h_bar/(3*pi_*e_mass*e_charge**2*1e20) = 1.53333002306295e-06 # cm^2V^-1s^-1
         numerator = self.mass_density_ * self.v_LA * self.v_LA * self.F0_eta * 1.53333002306295e-06
         return numerator / (self.n_3d_*self.m_star_*self.E_d*self.E_d)
     
     ## Piezoelectric phonon scattering limited mobility
+    @_profiled('PE')
     def _mu_pz(self):
         # 24*eps_0*e_mass*k_B**2/(h_bar**2*e_charge**2)*1e-24 = 0.00012925353328704564
         #xi_0 = 0.00012925353328704564*self.eps_s_*self.m_star_*self.temp_**2/self.n_3d_
@@ -192,11 +395,15 @@ class _Mobility3DCarrier:
             return 25.43338614569858*self.eps_s_/(np.sqrt(self.m_star_**3*self.temp_)*self.K_sqr) #cm^2V^-1s^-1
         else:
             # 16*k_B*eps_0/(3*pi_*h_bar*e_charge*1e18*1e2) = 0.12282713258060055 # cm^2V^-1s^-1K^-1
-            FD_1 = _FermiDiracInt._cal_Fermi_Dirac_integral(self.eta_f_, FD_order = 'one',
-                                                            FD_int_approach=self.FD_int_approach_)
+            FD_1, FD_1_err = _FermiDiracInt._cal_Fermi_Dirac_integral(self.eta_f_, FD_order = 'one',
+                                                                      FD_int_approach=self.FD_int_approach_,
+                                                                      return_error=True,
+                                                                      quad_options=self.quad_options_)
+            self.mu_rel_err_['mu_PE'] = self._relative_error(FD_1, FD_1_err)
             return self.temp_*self.eps_s_*FD_1*0.12282713258060055/(self.n_3d_*self.K_sqr*C_K0) #cm^2V^-1s^-1
     
     ## Dislocation limited mobility
+    @_profiled('DIS_factors')
     def _dis_facts(self):
         # Only minimax_piecewise method is implemented for Fermi Diract 1/2, -1/2 integral.
         F_m_1h = _FermiDiracInt._cal_Fermi_Dirac_integral(self.eta_f_, FD_order = 'm_one_half',
@@ -209,6 +416,7 @@ class _Mobility3DCarrier:
                            (self.m_star_*self.eps_s_*self.temp_*self.temp_)
         return
     
+    @_profiled('DIS_TD_CHG')
     def _td_chg_dis_mu(self): 
         if self.carrier_degenracy_limit_ == 'degenerate':
             #4k_F^2 lambda^2 = 4*3**(1/3)*h_bar**2*pi_**(8/3)*eps_0/e_charge**2/e_mass*1e8 = 0.051430964880517044
@@ -223,33 +431,44 @@ class _Mobility3DCarrier:
                     *np.sqrt(self.eps_s_*self.eps_s_*self.eps_s_*self.n_3d_/self.m_star_)\
                         / (self.n_dislocation_*self.f_dislocation_*self.f_dislocation_)
         else:  
-            I_eta = _FermiDiracInt._FD_dis_chg_Integration(self.eta_f_, self.dis_B_fact)  
+            I_eta, I_eta_err = _FermiDiracInt._FD_dis_chg_Integration(self.eta_f_, self.dis_B_fact,
+                                                                      return_error=True,
+                                                                      **self.quad_options_)
+            self.mu_rel_err_['mu_DIS_TD_CHG'] = self._relative_error(I_eta, I_eta_err)
             #8*np.sqrt(2)/pi_**2 * np.sqrt(e_mass*k_B**3)*eps_0/(e_charge*h_bar**2)*1e-28=0.027890781017309893
             return 0.027890781017309893*self.c_lp*self.c_lp*self.eps_s_\
                     *np.sqrt(self.m_star_*self.temp_*self.temp_*self.temp_)*self.F1hRatio*I_eta\
                         /(self.n_dislocation_*self.f_dislocation_*self.f_dislocation_)
                         
+    @_profiled('DIS_TD_STR')
     def _td_str_dis_mu(self): 
-        I_eta = _FermiDiracInt._FD_dis_str_Integration(self.eta_f_, self.dis_B_fact)     
+        I_eta, I_eta_err = _FermiDiracInt._FD_dis_str_Integration(self.eta_f_, self.dis_B_fact,
+                                                                  return_error=True, **self.quad_options_)
+        self.mu_rel_err_['mu_DIS_TD_STR'] = self._relative_error(I_eta, I_eta_err)
         poisson_part = (1.0-self.poisson_ratio)/(1.0-2.0*self.poisson_ratio)
         #e_charge*np.sqrt(2*k_B/e_mass)/(3*pi_*pi_*eps_0)*1e12= 3364750.021017146
         return 3364750.021017146*np.sqrt(self.temp_/self.m_star_)*poisson_part*poisson_part\
                 /(self.eps_s_*self.n_dislocation_*self.a_lp*self.a_lp*self.E_d*self.E_d)*self.F1hRatio*I_eta 
                 
+    @_profiled('ION_IMP')
     def _ion_imp_mu(self):
         # 24*eps_0*e_mass*k_B**2/(h_bar**2*e_charge**2)*1e-24 = 0.00012925353328704564
         xi_0 = 0.00012925353328704564*self.eps_s_*self.m_star_*self.temp_**2/self.n_3d_
         C_K0 = 1.0/(np.log(1.0+xi_0) - (xi_0/(1.0+xi_0)))
         #print(1+(1/(1+xi_0))-2/xi_0*np.log(1.0+xi_0))
         
-        FD_2 = _FermiDiracInt._cal_Fermi_Dirac_integral(self.eta_f_, FD_order = 'two',
-                                                        FD_int_approach=self.FD_int_approach_)
+        FD_2, FD_2_err = _FermiDiracInt._cal_Fermi_Dirac_integral(self.eta_f_, FD_order = 'two',
+                                                                  FD_int_approach=self.FD_int_approach_,
+                                                                  return_error=True,
+                                                                  quad_options=self.quad_options_)
+        self.mu_rel_err_['mu_ION_IMP'] = self._relative_error(FD_2, FD_2_err)
         
         # 128*e_mass*eps_0**2*k_B**3/(h_bar**3*e_charge**3)*1e-40 = 0.49875425045367205
         return 0.49875425045367205*self.m_star_*self.eps_s_*self.eps_s_*self.temp_**3*FD_2\
                 /(self.n_ion_imp*self.n_3d_*C_K0)
         
     @staticmethod
+    @_profiled('elec_props_3DEC')
     def _cal_elec_props_from_3DEC(n_3d, eps_s, m_star, pop_en, T, 
                                   inv_half_FD_method:str='minimax_piecewise',
                                   return_dis_ints:bool=False):
@@ -356,7 +575,9 @@ class _Mobility3DCarrier:
                 Fermi_wave_vector, _pop_wave_vector)
     
     @classmethod
-    def _3dec_props(cls, n_d, mu_d, position, eps_n_3d=1e-14, log_info=None):
+    @_profiled('props_3DEC')
+    def _3dec_props(cls, n_d, mu_d, position, eps_n_3d=1e-14, log_info=None,
+                    carrier_logger=None):
         """
         This function calculates the effective/average properies of a 3D carrier distribution.
 
@@ -364,15 +585,20 @@ class _Mobility3DCarrier:
         ----------
         n_d : 1d numpy array of float (unit: 1E18 cm^-3 )
             The position dependent carrier density distribution.
-        mu_d : 1d numpy array of float or pandas dataframe of mobilities as 
-               returned from calculate_3D_mobility() function (unit: cm^2.V^-1.s^-1 )
+        mu_d : 1d numpy array of float or pandas dataframe (or MobilityResults) of 
+               mobilities as returned from calculate_3D_mobility() function (unit: cm^2.V^-1.s^-1 )
         position : 1d numpy array of float (unit: nm)
             The position array.
         eps_n_3d : float, optional (unit: 1e18 cm^-2)
             Carrier density below eps_n_3d will be considered as zero. 
             The default is 1e-14 1e18 cm^-2 == 1e4 cm^-2.
         log_info : string, optional [options: 'high','medium','low', None]
-            Determines the level of log to be printed. The default is None.
+            Not used. Kept for backward compatibility. The properties of single 
+            mobility array are logged to the 'mobilitypy' logger (info level).
+            The default is None.
+        carrier_logger : logging.LoggerAdapter, optional
+            Logger of the calling carrier instance (logger_), so that its print_log
+            level applies. The default is None, i.e. the 'mobilitypy' logger.
 
         Returns
         -------
@@ -393,11 +619,11 @@ class _Mobility3DCarrier:
         n_d_ = 0 if (np.isscalar(n_d) and n_d < eps_n_3d) else np.where(n_d < eps_n_3d, 0, n_d)  
         IntegratedEdensity = integrate.trapezoid(n_d_, x=position) # 1e11 cm^-2
         
-        if isinstance(mu_d, pd.DataFrame):
+        if hasattr(mu_d, 'keys'): # pandas dataframe or MobilityResults
             average_mu, SheetResistance = {}, {}
-            for keys in mu_d:
+            for keys in mu_d.keys():
                 if keys.startswith('mu_'):
-                    mu_d_tmp = mu_d[keys].to_numpy(dtype=float)
+                    mu_d_tmp = np.array(mu_d[keys], dtype=float)
                     average_mu_ = cls._cal_mobility_averages(n_d_, mu_d_tmp, 
                                                              IntegratedEdensity, 
                                                              position)
@@ -407,10 +633,11 @@ class _Mobility3DCarrier:
         else:
             average_mu = cls._cal_mobility_averages(n_d_, mu_d, IntegratedEdensity, position)
             SheetResistance = cls._sheet_resistance(average_mu, IntegratedEdensity)
-            if log_info is not None:
-               print(f'\to ave_es = {IntegratedEdensity*1e-2:0.2f} x 1E13 cm^-2')
-               print(f'\to ave_mu = {average_mu[0]:.2f} ({average_mu[1]:.2f}) cm^2.V^-1.s^-1')
-               print(f'\to Rsh = {SheetResistance[0]:.2f} ({SheetResistance[1]:.2f}) Ohm/sq')
+            (logger if carrier_logger is None else carrier_logger).info(
+                '\to ave_es = %0.2f x 1E13 cm^-2\n'
+                '\to ave_mu = %.2f (%.2f) cm^2.V^-1.s^-1\n'
+                '\to Rsh = %.2f (%.2f) Ohm/sq', IntegratedEdensity*1e-2, 
+                average_mu[0], average_mu[1], SheetResistance[0], SheetResistance[1])
         return IntegratedEdensity*1e-2, average_mu, SheetResistance
     
     @staticmethod
@@ -6,8 +6,15 @@ Created on Thu Dec  4 15:41:33 2025
 @author: badal.mondal
 """
 
+import copy
 import numpy as np
+from .database import material_database
 from ._alloy_params import _AlloyParams
+from ._disk_cache import _DiskCache
+from ._profiling import _profiled
+from ._logging import _CarrierLogger, logger, params_logger
+from ._mobility_results import MobilityResults
+from ._adaptive_sampling import _AdaptiveSampler
 
 ## ============================================================================
 class _MobilityCarrier(_AlloyParams):
@@ -60,7 +67,10 @@ class _MobilityCarrier(_AlloyParams):
             kind. Will be ignored for alloy of type AxB1-x, AxByC1-x-y, AxByCzD1-x-y-z etc.
             The default is None. 
         print_log : string, optional => ['high','medium','low', None]
-            Determines the level of log to be printed. The default is None.
+            Determines the level of log to be printed (of this carrier only). The
+            diagnostics are sent to the 'mobilitypy' logger (see _logging). 'low': one summary line
+            per calculation, 'medium': + per composition and mechanism lines,
+            'high': + material and derived parameters. The default is None.
         eps_n : float, optional (unit: nm^-2 for 2DEG or 1e18 cm^-2 for 3DG)
             Carrier density below eps_n will be considered as zero. 
             For 2DEG: The default is 1e-10 nm^-2 == 1e4 cm^-2.
@@ -77,8 +87,17 @@ class _MobilityCarrier(_AlloyParams):
         
         self.print_info = print_log
         if self.print_info is not None: self.print_info = self.print_info.lower()
+        self.logger_ = _CarrierLogger(logger, self.print_info)
+        self.params_logger_ = _CarrierLogger(params_logger, self.print_info, params=True)
 
         self.eps_n = eps_n
+        self.disk_cache_ = None
+        self.quad_options_ = {}
+        self.integration_backend_ = {'backend': 'quad', 'n_nodes': 64}
+        # _get_alloy_params modifies use_mat_params, keep a copy for _carrier_at_compositions
+        self.alloy_setup_ = {'use_mat_params': copy.deepcopy(use_mat_params),
+                             'pseudomorphic_strain': pseudomorphic_strain,
+                             'substrate': substrate}
         _AlloyParams.__init__(self, compositions=compositions, binaries=binaries, 
                               alloy_crystal_structure=alloy_crystal_structure,
                               alloy_type=alloy_type)
@@ -86,6 +105,247 @@ class _MobilityCarrier(_AlloyParams):
         if pseudomorphic_strain: self._cal_pseudomorphic_strain(substrate)
         return
             
+    def _enable_disk_cache(self, cache_dir=None, max_size_mb:float=512):
+        """
+        This function enables the persistent disk cache for the mobility evaluations.
+        See _DiskCache for details.
+        """
+        self.disk_cache_ = _DiskCache(cache_dir=cache_dir, max_size_mb=max_size_mb)
+        return self.disk_cache_
+    
+    def _carrier_at_compositions(self, compositions, use_mat_params:dict=None):
+        """
+        This function returns a copy of the carrier (same binaries, material 
+        parameters, strain, integration and cache settings) for new compositions.
+        use_mat_params are applied on top of the material parameters of the carrier
+        (values can be arrays of the compositions length, e.g. Monte Carlo samples).
+        """
+        carrier = copy.copy(self)
+        compositions = np.asarray(compositions)
+        # complex compositions are used for the complex-step derivatives
+        carrier.comps_ = np.array(compositions, dtype=np.result_type(compositions, float), ndmin=1)
+        mat_params = copy.deepcopy(self.alloy_setup_['use_mat_params'])
+        if use_mat_params:
+            if mat_params is None: mat_params = {}
+            joined_name = ''.join(self.bins_) # alloy name alias, e.g. 'AlNGaN'
+            if joined_name in mat_params: mat_params[self.alloy_name] = mat_params.pop(joined_name)
+            for mat_name, params in use_mat_params.items():
+                if mat_name == joined_name: mat_name = self.alloy_name
+                mat_params.setdefault(mat_name, {}).update(params)
+        carrier._get_alloy_params(use_mat_params=mat_params)
+        if self.alloy_setup_['pseudomorphic_strain']:
+            carrier._cal_pseudomorphic_strain(self.alloy_setup_['substrate'])
+        return carrier
+    
+    def _check_material_param(self, name:str):
+        """
+        This function checks a material database parameter name of the form
+        '<material>:<parameter>' (e.g. 'AlN:carrier_effective_mass'). The material
+        is one of the binaries or the alloy (bowing parameters, e.g. 'AlGaN').
+        Returns (material, parameter).
+        """
+        material, _, param = name.partition(':')
+        material = material if material in self.bins_ else self._alloy_name_map.get(material, material)
+        if material not in self.bins_ and material != self.alloy_name:
+            raise ValueError(f'{material} is not a binary or the alloy of the carrier.')
+        if param not in material_database['GaN'] or param == 'comment': # We know one 'default' material in the database
+            raise ValueError(f'{material}:{param} is not a material database parameter.')
+        return material, param
+
+    def _calculate_at_points(self, calculate_name:str, density_name:str, points:dict,
+                             carriers:dict=None, **kwargs):
+        """
+        This function calculates the mobility at arbitrary points. points is a
+        dict of equal length 1D arrays of 'comp', the carrier density 
+        (density_name), the scalar inputs of the calculate function (e.g. 'T') and
+        the material database parameters ('<material>:<parameter>', see 
+        _check_material_param). All the points are calculated in one call (the 
+        mobility engines take one value of every input per composition). 
+        carriers caches the carriers per composition set (see 
+        _carrier_at_compositions) between the calls.
+        Returns MobilityResults (rows in the order of the points).
+        """
+        if carriers is None: carriers = {}
+        comps = np.ascontiguousarray(points['comp'], dtype=float)
+        if len(comps) == 0: return None
+        use_mat_params = {}
+        for name in points:
+            if ':' not in name: continue
+            material, param = self._check_material_param(name)
+            use_mat_params.setdefault(material, {})[param] = np.asarray(points[name], dtype=float)
+        if use_mat_params:
+            carrier = self._carrier_at_compositions(comps, use_mat_params=use_mat_params)
+            carrier.disk_cache_ = None # sampled parameters are not worth caching
+        else:
+            key = comps.tobytes()
+            if key not in carriers:
+                if len(carriers) > 64: carriers.clear()
+                carriers[key] = self._carrier_at_compositions(comps)
+            carrier = carriers[key]
+        inputs = {name: np.asarray(val, dtype=float) for name, val in points.items() 
+                  if name != 'comp' and ':' not in name}
+        return getattr(carrier, calculate_name)(**inputs, **kwargs, return_dataframe=False)
+
+    def _adaptive_sample(self, calculate_name:str, density_name:str, sample_ranges:dict,
+                         fixed_params:dict, calculate_kwargs:dict, **sampler_options):
+        """
+        This function samples calculate_name adaptively over sample_ranges
+        (see _AdaptiveSampler). The other inputs are fixed to fixed_params. If 
+        'comp' is not sampled, the carrier should have a single composition.
+        """
+        unknown = [name for name in sample_ranges if name != 'comp' and name not in fixed_params]
+        if unknown:
+            raise ValueError(f'Requested adaptive sampling of {unknown} is not implemented yet. Contact developer.')
+        fixed_params = {name: val for name, val in fixed_params.items() if name not in sample_ranges}
+        if 'comp' not in sample_ranges:
+            if len(self.comps_) != 1:
+                raise ValueError("Give the composition range ('comp') or use a single composition for the adaptive sampling.")
+            fixed_params['comp'] = self.comps_[0]
+        carriers = {}
+        def evaluate(points):
+            n_points = len(next(iter(points.values())))
+            params = {name: np.full(n_points, float(val)) for name, val in fixed_params.items()}
+            params.update(points)
+            return self._calculate_at_points(calculate_name, density_name, params,
+                                             carriers=carriers, **calculate_kwargs)
+        return _AdaptiveSampler(evaluate, sample_ranges, **sampler_options).sample()
+
+    def _design_sweep(self, calculate_name:str, density_name:str, density, design, 
+                      input_names, calculate_kwargs:dict, chunk_size:int=4096, store=None):
+        """
+        This function calculates the mobility at the points of design (DesignSampler)
+        in chunks of chunk_size design points, every chunk in one call (see 
+        _calculate_at_points). The inputs that are not in the design are fixed:
+        'comp' to the compositions of the carrier (every design point is calculated
+        at all the compositions), the carrier density to density (broadcasted with
+        the compositions) and the others to calculate_kwargs. If store (ResultStore)
+        is given, the chunks are written to the store and a restarted sweep resumes
+        from the first missing chunk.
+        Returns MobilityResults with 'design_point' (index of the design point), 
+        the inputs and the mobilities.
+        """
+        for name in design.param_names:
+            if ':' in name:
+                self._check_material_param(name)
+            elif name not in ('comp', density_name) and name not in input_names:
+                raise ValueError(f'Requested design over {name} is not implemented yet. Contact developer.')
+        if design.n_points is None:
+            raise ValueError('The design needs n_points.')
+        base = {}
+        if 'comp' not in design.param_names: base['comp'] = np.asarray(self.comps_, dtype=float)
+        if density_name not in design.param_names:
+            base['comp'], base[density_name] = np.broadcast_arrays(base.get('comp', 0.0), 
+                                                                   np.asarray(density, dtype=float))
+            if 'comp' in design.param_names: base.pop('comp')
+        base = {name: np.ravel(val) for name, val in base.items()}
+        n_base = len(next(iter(base.values()))) if base else 1
+        calculate_kwargs = {name: val for name, val in calculate_kwargs.items() 
+                            if name not in design.param_names}
+        chunk_size = max(int(chunk_size), 1)
+        n_chunks = (design.n_points + chunk_size - 1) // chunk_size
+        if store is not None:
+            store.set_sweep_spec({'calculate': calculate_name, 'design': design.spec(),
+                                  'chunk_size': chunk_size, 'base_points': base,
+                                  'calculate_kwargs': calculate_kwargs, 'binaries': self.bins_,
+                                  'use_mat_params': self.alloy_setup_['use_mat_params'],
+                                  'integration_backend': self.integration_backend_})
+        chunks = []
+        for chunk_id in range(n_chunks):
+            if store is not None and store.is_complete(chunk_id): continue
+            start, stop = chunk_id*chunk_size, min((chunk_id + 1)*chunk_size, design.n_points)
+            points = {name: np.tile(val, stop - start) for name, val in base.items()}
+            points.update({name: np.repeat(val, n_base) for name, val in design.points(start, stop).items()})
+            results = self._calculate_at_points(calculate_name, density_name, points, **calculate_kwargs)
+            parameters = {'design_point': np.repeat(np.arange(start, stop), n_base), **points}
+            if store is not None:
+                store.write_chunk(chunk_id, results, parameters=parameters)
+            else:
+                chunks.append(MobilityResults({**parameters, **results.to_dict()}))
+            self.logger_.info('Design sweep: chunk %d/%d completed', chunk_id + 1, n_chunks)
+        return store.load() if store is not None else MobilityResults.concatenate(chunks)
+
+    def _check_jacobian_params(self, jacobian_params, inputs):
+        """
+        This function checks the requested Jacobian parameters: the calculation
+        inputs or the alloy parameter names. Returns the list of parameters.
+        """
+        if jacobian_params is None: return []
+        if isinstance(jacobian_params, str): jacobian_params = [jacobian_params]
+        jacobian_params = list(dict.fromkeys(jacobian_params))
+        unknown = [name for name in jacobian_params 
+                   if name not in inputs and name not in self.alloy_params_]
+        if unknown:
+            raise ValueError(f'Requested derivatives with respect to {unknown} are not implemented yet. Contact developer.')
+        return jacobian_params
+
+    def _effect_flags(self, arguments:dict, *names):
+        """
+        This function collects the scattering effect flags and the mobility model
+        options (_effect_flag_names of the carrier) and the additional names from
+        the arguments of a calculate function (e.g. locals()).
+        """
+        return {name: arguments[name] for name in (*self._effect_flag_names, *names)}
+
+    def _disable_disk_cache(self):
+        self.disk_cache_ = None
+
+    def _set_integration_tolerance(self, epsabs:float=None, epsrel:float=None, limit:int=None):
+        """
+        This function sets the absolute/relative error tolerances and the 
+        maximum number of subintervals of the numerical (scipy quad, quad_vec) 
+        integrations. None resets to the scipy default.
+        """
+        self.quad_options_ = {key: val for key, val in 
+                              {'epsabs': epsabs, 'epsrel': epsrel, 'limit': limit}.items()
+                              if val is not None}
+        return self.quad_options_
+
+    def _set_integration_backend(self, backend:str='quad', n_nodes:int=64):
+        """
+        This function sets the integration backend of the sheet scattering
+        integrals: 'quad' (adaptive scipy quad) or 'fixed_node' (Gauss-Legendre
+        quadrature for all compositions at once, numba JIT compiled if installed).
+        """
+        if backend not in ['quad', 'fixed_node']:
+            raise ValueError(f'Requested {backend} integration backend is not implemented yet. Contact developer.')
+        self.integration_backend_ = {'backend': backend, 'n_nodes': int(n_nodes)}
+        return self.integration_backend_
+    
+    def _cached_call(self, func_name:str, call_args:dict, compute):
+        """
+        This function returns compute() from the disk cache if available. 
+        Otherwise, compute() is evaluated and stored in the cache. The cache key
+        covers func_name, call_args (input arrays and all effect flags), 
+        the compositions, the alloy parameters (includes use_mat_params and 
+        pseudomorphic strain updates), the integration tolerances and backend, the material
+        database digest (see _DiskCache) and the package version.
+
+        Parameters
+        ----------
+        func_name : str
+            Name of the cached function.
+        call_args : dict
+            All the inputs of the cached function.
+        compute : callable
+            Function without arguments that calculates the return value.
+
+        Returns
+        -------
+        object
+            The return value of compute().
+
+        """
+        if self.disk_cache_ is None: return compute()
+        key = self.disk_cache_._make_key(func_name, call_args, self.comps_, self.alloy_params_,
+                                         self.bins_, self.alloy_crys_type_, self.alloy_type_, 
+                                         self.eps_n, self.quad_options_, self.integration_backend_)
+        hit, value = self.disk_cache_._get(key)
+        if hit: return value
+        value = compute()
+        self.disk_cache_._set(key, value)
+        return value
+            
+    @_profiled('general_params')
     def _set_params_general(self, m_star, eps_s, eps_h, c_lattice, a_lattice, sc_potential, 
                             n_dis, f_dis, n_ion_impurity, mass_density, v_LA, E_pop, 
                             E_D, K_square, poisson_ratio, T):
@@ -107,7 +367,8 @@ class _MobilityCarrier(_AlloyParams):
         self.K_sqr = K_square
         self.E_d = E_D
         self.poisson_ratio = poisson_ratio
-        self.temp_ = T if T > 1e-8 else 1e-5 # Make sure zero divison does not happen when T=0 is choosen
+        # Make sure zero divison does not happen when T=0 is choosen
+        self.temp_ = (T if np.real(T) > 1e-8 else 1e-5) if np.ndim(T) == 0 else np.where(np.real(T) > 1e-8, T, 1e-5)
         self.omega_0_ad = self._cal_omega_0_ad(self.a_lp, self.a_lp, self.c_lp ) 
         # # m0 / e = 5.685630103565723*10^-12 V.m^-2.s^2
         self.m_star_by_e_ = 5.685630103565723 * self.m_star_ # 10^-12 V.m^-2.s^2
@@ -145,22 +406,25 @@ class _MobilityCarrier(_AlloyParams):
         """
         This functions applies Varshni's formula for temperature correction to band gap.
         Eg(T) = Eg(T=0) - [aT^2/(T+b)]
+        All the inputs are broadcasted, e.g. bandgap_0, bandgap_alpha and bandgap_beta
+        of shape (compositions, 1) and temp of shape (T,) give (compositions, T).
 
         Parameters
         ----------
-        bandgap_0 : 1D float array (unit: eV)
+        bandgap_0 : float array (unit: eV)
             Band gap values at 0K temperature.
-        temp : float, optional (unit: K)
+        temp : float or float array, optional (unit: K)
             Temperature in K. The default is 300K.
-        bandgap_alpha : float, optional (unit: eV/K)
+        bandgap_alpha : float or float array, optional (unit: eV/K)
             Temperature correction coefficient alpha. The default is 0.
-        bandgap_beta : float, optional (unit: K)
+        bandgap_beta : float or float array, optional (unit: K)
             Temperature correction coefficient beta. The default is 0.
 
         Returns
         -------
-        1D float array (unit: eV)
+        float array (unit: eV)
             The temperature corrected band gap values.
 
         """
+        temp = np.asarray(temp, dtype=float)
         return bandgap_0 - (bandgap_alpha*temp*temp/(temp+bandgap_beta))
\ No newline at end of file
@@ -0,0 +1,202 @@
+import numpy as np
+
+## ============================================================================
+class MobilityResults:
+    '''
+    NumPy-native container for mobility calculation results.
+
+    Every column is stored as a contiguous 1D float64 array of the same length
+    (one row per composition/carrier density point). The compositions stay
+    numeric. Conversion to pandas dataframe or 2D numpy array is done only on
+    demand using to_pandas() and to_numpy().
+
+    The column access follows the pandas dataframe style, e.g. results['TOT'],
+    results.keys(), 'TOT' in results, so the results can be passed to the
+    plotting functions directly.
+    '''
+    def __init__(self, columns:dict=None, attrs:dict=None):
+        """
+        Initiation function of the class MobilityResults.
+
+        Parameters
+        ----------
+        columns : dict, optional
+            Column name and 1D array (or scalar) pairs. Scalars are broadcasted
+            to the number of rows. The default is None.
+        attrs : dict, optional
+            Additional meta data of the results. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self._columns = {}
+        self._n_rows = None
+        self.attrs = {} if attrs is None else dict(attrs)
+        if columns is not None:
+            for key, values in columns.items():
+                self[key] = values
+
+    @classmethod
+    def _allocate(cls, n_rows:int, column_names, attrs:dict=None):
+        """
+        Allocate the NaN filled result columns.
+
+        Parameters
+        ----------
+        n_rows : int
+            Number of rows.
+        column_names : list of str
+            The column names.
+        attrs : dict, optional
+            Additional meta data of the results. The default is None.
+
+        Returns
+        -------
+        MobilityResults
+            Results with NaN filled columns.
+
+        """
+        results = cls(attrs=attrs)
+        results._n_rows = int(n_rows)
+        for key in column_names:
+            results._columns[key] = np.full(results._n_rows, np.nan)
+        return results
+
+    def __getitem__(self, key):
+        if isinstance(key, (list, tuple)):
+            return MobilityResults({kk: self._columns[kk] for kk in key}, attrs=self.attrs)
+        return self._columns[key]
+
+    def __setitem__(self, key, values):
+        values_ = np.ascontiguousarray(values, dtype=np.float64)
+        if values_.ndim == 0:
+            if self._n_rows is None: self._n_rows = 1
+            values_ = np.full(self._n_rows, float(values_))
+        elif values_.ndim != 1:
+            raise ValueError(f'Column {key} should be 1D array. Got {values_.ndim}D array.')
+        if self._n_rows is None:
+            self._n_rows = len(values_)
+        elif len(values_) != self._n_rows:
+            raise ValueError(f'Column {key} has {len(values_)} rows. Expected {self._n_rows} rows.')
+        self._columns[key] = values_
+
+    def __delitem__(self, key):
+        del self._columns[key]
+
+    def __contains__(self, key):
+        return key in self._columns
+
+    def __iter__(self):
+        return iter(self._columns)
+
+    def __len__(self):
+        return 0 if self._n_rows is None else self._n_rows
+
+    def __repr__(self):
+        return f'MobilityResults(rows={len(self)}, columns={self.columns})'
+
+    def keys(self):
+        return list(self._columns.keys())
+
+    def items(self):
+        return self._columns.items()
+
+    @property
+    def columns(self):
+        """
+        List of column names.
+        """
+        return list(self._columns.keys())
+
+    @property
+    def shape(self):
+        """
+        (number of rows, number of columns)
+        """
+        return (len(self), len(self._columns))
+
+    def copy(self):
+        """
+        Deep copy of the results.
+        """
+        return MobilityResults({key: val.copy() for key, val in self._columns.items()},
+                               attrs=self.attrs)
+
+    def to_numpy(self, columns=None):
+        """
+        Return the results as 2D float64 array.
+
+        Parameters
+        ----------
+        columns : list of str, optional
+            The columns to return in the same order. If None, all columns are
+            returned. The default is None.
+
+        Returns
+        -------
+        2D float array of shape (rows, columns)
+            Results array.
+
+        """
+        if columns is None: columns = self.columns
+        if len(columns) == 0: return np.empty((len(self), 0))
+        return np.column_stack([self._columns[key] for key in columns])
+
+    def to_dict(self):
+        """
+        Return the results as dictionary of column name and 1D array pairs.
+        """
+        return dict(self._columns)
+
+    def to_pandas(self):
+        """
+        Return the results as pandas dataframe. The meta data (attrs) is 
+        carried over to dataframe.attrs.
+
+        Returns
+        -------
+        pandas dataframe
+            Results dataframe.
+
+        """
+        import pandas as pd
+        dataframe = pd.DataFrame(self._columns)
+        dataframe.attrs.update(self.attrs)
+        return dataframe
+
+    @classmethod
+    def from_pandas(cls, dataframe, attrs:dict=None):
+        """
+        Create results from pandas dataframe (or series).
+        """
+        if hasattr(dataframe, 'to_frame'): dataframe = dataframe.to_frame()
+        return cls({key: dataframe[key].to_numpy(dtype=float) for key in dataframe.columns},
+                   attrs=attrs)
+
+    @classmethod
+    def concatenate(cls, results_list):
+        """
+        Concatenate the results row-wise. The column names should be same
+        for all the results.
+
+        Parameters
+        ----------
+        results_list : list of MobilityResults
+            The results to concatenate.
+
+        Returns
+        -------
+        MobilityResults
+            Concatenated results. Meta data is taken from the first results.
+
+        """
+        results_list = list(results_list)
+        if len(results_list) == 0: return cls()
+        columns = results_list[0].columns
+        for res in results_list[1:]:
+            if res.columns != columns:
+                raise ValueError('Can not concatenate results with different columns.')
+        return cls({key: np.concatenate([res[key] for res in results_list]) for key in columns},
+                   attrs=results_list[0].attrs)
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Local HTTP/JSON mobility query service (standard library only).
+
+Endpoints (JSON request and response bodies):
+
+    POST /v1/mobility
+        {"carrier": {"type": "2d", "binaries": ["AlN", "GaN"], ...},
+         "points": {"comp": [0.7, 0.8], "n_2d": 10, "T": [300, 400]},
+         "options": {"alloy_disordered_effect": true, ...}}
+        -> {"columns": {"comp": [...], ..., "TOT": [...]}, "coalesced_requests": 3}
+        carrier: type ('2d' or '3d'), the Mobility2DCarrier/Mobility3DCarrier
+        initialization options and, for '2d', 'integration_backend'.
+        points: 'comp', the numeric inputs of calculate_sheet_mobility()/
+        calculate_3D_mobility() and material parameters '<material>:<parameter>'
+        (scalars are broadcasted). options: the other options (effects, model).
+    POST /v1/surrogate/<name>
+        {"points": {"n_2d": [5, 10], "T": 300}} -> {"values": [...]}
+    GET /v1/health
+        -> {"status": "ok", "requests": ..., "engine_calls": ..., ...}
+
+Non-finite values are returned as null.
+"""
+import json
+import time
+import queue
+import threading
+import numpy as np
+from concurrent.futures import Future
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from ._batch_runner import _calculate_options
+from ._mobility_surrogate import MobilitySurrogate
+from ._logging import logger
+
+## ============================================================================
+def _json_column(values):
+    return [val if np.isfinite(val) else None for val in np.asarray(values, dtype=float).tolist()]
+
+def _request_points(points, allowed_names):
+    """
+    The points of a request as equal length 1D float arrays.
+    """
+    if not isinstance(points, dict) or not points:
+        raise ValueError("Give the 'points' of the request.")
+    unknown = [name for name in points if name not in allowed_names and ':' not in name]
+    if unknown:
+        raise ValueError(f'Requested {unknown} inputs are not implemented yet. Contact developer.')
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(val, dtype=float)) for val in points.values()])
+    return {name: np.ravel(val) for name, val in zip(points, arrays)}
+
+## ============================================================================
+class _CoalescingBatcher:
+    '''
+    The functions in this class coalesce the requests that arrive within
+    batch_window seconds into one vectorized engine call per group of
+    compatible requests (same model and options). A single engine thread
+    runs the calls, the requesting threads wait on their futures.
+    '''
+    def __init__(self, batch_window:float=0.005, max_batch_rows:int=65536):
+        self.batch_window = float(batch_window)
+        self.max_batch_rows = int(max_batch_rows)
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name='mobilitypy-batcher', daemon=True)
+        self.stats = {'requests': 0, 'engine_calls': 0, 'coalesced_requests': 0, 'rows': 0}
+        self._thread.start()
+
+    def submit(self, key, evaluate, points:dict):
+        """
+        This function queues points (dict of equal length 1D arrays) for
+        evaluate(points) -> dict of columns. Requests with the same key are
+        calculated together. Returns a Future of the request columns.
+        """
+        future = Future()
+        self._queue.put((key, evaluate, points, future))
+        return future
+
+    def close(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _collect(self, first):
+        batch, n_rows = [first], len(next(iter(first[2].values())))
+        deadline = time.monotonic() + self.batch_window
+        while n_rows < self.max_batch_rows:
+            timeout = deadline - time.monotonic()
+            if timeout <= 0: break
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None) # stop after this batch
+                break
+            batch.append(item)
+            n_rows += len(next(iter(item[2].values())))
+        return batch
+
+    def _loop(self):
+        while True:
+            first = self._queue.get()
+            if first is None: return
+            groups = {}
+            for item in self._collect(first):
+                if item[3].set_running_or_notify_cancel():
+                    groups.setdefault((item[0], tuple(sorted(item[2]))), []).append(item)
+            for requests in groups.values():
+                self._run_group(requests)
+
+    def _run_group(self, requests):
+        evaluate = requests[0][1]
+        names = list(requests[0][2])
+        points = {name: np.concatenate([item[2][name] for item in requests]) for name in names}
+        try:
+            columns = evaluate(points)
+        except Exception as error:
+            for item in requests: item[3].set_exception(error)
+            return
+        self.stats['requests'] += len(requests)
+        self.stats['engine_calls'] += 1
+        self.stats['rows'] += len(points[names[0]])
+        if len(requests) > 1: self.stats['coalesced_requests'] += len(requests)
+        start = 0
+        for item in requests:
+            stop = start + len(item[2][names[0]])
+            item[3].set_result(({name: val[start:stop] for name, val in columns.items()}, len(requests)))
+            start = stop
+
+## ============================================================================
+class MobilityService:
+    '''
+    Local HTTP/JSON service answering mobility queries from a warm process.
+
+    The carriers (material parameters, strain, integration backend, JIT
+    kernels, disk cache) are created once per carrier specification and kept,
+    the carriers of recently requested composition sets are cached, and the
+    surrogates are loaded once at the start. Concurrent small requests that
+    arrive within batch_window seconds are coalesced into one vectorized
+    engine call per compatible group (see _CoalescingBatcher).
+    Bind to localhost unless the network is trusted: there is no authentication.
+    '''
+    _carrier_types = {'2d': ('Mobility2DCarrier', 'calculate_sheet_mobility', 'n_2d'),
+                      '3d': ('Mobility3DCarrier', 'calculate_3D_mobility', 'n_3d')}
+
+    def __init__(self, host:str='127.0.0.1', port:int=8765, batch_window:float=0.005,
+                 max_batch_rows:int=65536, surrogates:dict=None, disk_cache_dir=None):
+        """
+        Initiation function of the class MobilityService.
+
+        Parameters
+        ----------
+        host : str, optional
+            Host address. The default is '127.0.0.1'.
+        port : int, optional
+            Port. 0 selects a free port (see url). The default is 8765.
+        batch_window : float, optional (unit: s)
+            Requests arriving within this time after the first waiting request
+            are coalesced into one engine call. The default is 0.005.
+        max_batch_rows : int, optional
+            Maximum number of points of a coalesced call. The default is 65536.
+        surrogates : dict, optional
+            {name: MobilitySurrogate or file path} served at /v1/surrogate/<name>.
+            The default is None.
+        disk_cache_dir : str/path, optional
+            Enable the disk cache of the carriers in this directory (see
+            enable_disk_cache()). The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.surrogates = {name: surrogate if isinstance(surrogate, MobilitySurrogate)
+                           else MobilitySurrogate.load(surrogate)
+                           for name, surrogate in (surrogates or {}).items()}
+        self.disk_cache_dir = disk_cache_dir
+        self._batcher = _CoalescingBatcher(batch_window=batch_window, max_batch_rows=max_batch_rows)
+        self._carriers = {}
+        self._carriers_lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        """
+        This function starts the service in a background thread (e.g. in a
+        notebook or a test). Returns the service.
+        """
+        self._thread = threading.Thread(target=self._server.serve_forever, name='mobilitypy-service',
+                                        daemon=True)
+        self._thread.start()
+        logger.info('Mobility service: listening on %s', self.url)
+        return self
+
+    def serve_forever(self):
+        """
+        This function runs the service in the current thread until shutdown()
+        (or KeyboardInterrupt).
+        """
+        logger.info('Mobility service: listening on %s', self.url)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self._batcher.close()
+
+    def shutdown(self):
+        """
+        This function stops the service.
+        """
+        self._server.shutdown()
+        if self._thread is not None:
+            self._thread.join()
+            self._server.server_close()
+            self._batcher.close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.shutdown()
+
+    def _model(self, carrier_spec:dict):
+        """
+        The warm model (carrier, method and option names) of a carrier specification.
+        """
+        key = json.dumps(carrier_spec, sort_keys=True)
+        with self._carriers_lock:
+            model = self._carriers.get(key)
+            if model is None:
+                from .. import mobility
+                carrier_spec = dict(carrier_spec)
+                carrier_type = str(carrier_spec.pop('type', '2d')).lower()
+                if carrier_type not in self._carrier_types:
+                    raise ValueError(f'Requested {carrier_type} carrier is not implemented yet. Contact developer.')
+                class_name, calculate_name, density_name = self._carrier_types[carrier_type]
+                integration_backend = carrier_spec.pop('integration_backend', None)
+                if 'compositions' in carrier_spec:
+                    carrier_spec['compositions'] = np.atleast_1d(np.asarray(carrier_spec['compositions'], dtype=float))
+                carrier = getattr(mobility, class_name)(**carrier_spec)
+                if integration_backend is not None: carrier.set_integration_backend(integration_backend)
+                if self.disk_cache_dir is not None: carrier.enable_disk_cache(self.disk_cache_dir)
+                allowed, input_names = _calculate_options(type(carrier), calculate_name)
+                model = {'key': key, 'carrier': carrier, 'calculate_name': calculate_name,
+                         'density_name': density_name, 'allowed': allowed,
+                         'input_names': input_names, 'carriers': {}}
+                self._carriers[key] = model
+        return model
+
+    def query_mobility(self, request:dict):
+        """
+        This function answers a /v1/mobility request (dict, see the module
+        documentation). The engine call may be shared with other requests.
+        Returns the response dict.
+        """
+        model = self._model(request.get('carrier', {}))
+        options = dict(request.get('options', {}))
+        unknown = [name for name in options if name not in model['allowed'] or name in model['input_names']]
+        if unknown:
+            raise ValueError(f'Requested {unknown} options are not implemented yet. Contact developer.')
+        points = _request_points(request.get('points'), ['comp', *model['input_names']])
+        if 'comp' not in points:
+            raise ValueError("Give the compositions ('comp') of the points.")
+        for name in points:
+            if ':' in name: model['carrier']._check_material_param(name)
+
+        def evaluate(batch_points):
+            results = model['carrier']._calculate_at_points(model['calculate_name'], model['density_name'],
+                                                             batch_points, carriers=model['carriers'],
+                                                             **options)
+            return {**batch_points, **results.to_dict()}
+
+        key = (model['key'], json.dumps(options, sort_keys=True))
+        columns, n_coalesced = self._batcher.submit(key, evaluate, points).result()
+        return {'columns': {name: _json_column(val) for name, val in columns.items()},
+                'coalesced_requests': n_coalesced}
+
+    def query_surrogate(self, name:str, request:dict):
+        """
+        This function answers a /v1/surrogate/<name> request.
+        """
+        surrogate = self.surrogates.get(name)
+        if surrogate is None:
+            raise KeyError(f'No surrogate {name}.')
+        points = _request_points(request.get('points'), surrogate.param_names)
+        key = ('surrogate', name)
+        columns, n_coalesced = self._batcher.submit(key, lambda pp: {'values': surrogate(**pp)}, points).result()
+        return {'values': _json_column(columns['values']), 'coalesced_requests': n_coalesced}
+
+    def health(self):
+        return {'status': 'ok', **self._batcher.stats, 'warm_carriers': len(self._carriers),
+                'surrogates': sorted(self.surrogates)}
+
+    def _handler_class(self):
+        service = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _send(self, status:int, body:dict):
+                data = json.dumps(body).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def do_GET(self):
+                if self.path.rstrip('/') == '/v1/health':
+                    self._send(200, service.health())
+                else:
+                    self._send(404, {'error': f'No endpoint {self.path}.'})
+
+            def do_POST(self):
+                try:
+                    length = int(self.headers.get('Content-Length', 0))
+                    request = json.loads(self.rfile.read(length) or b'{}')
+                    if self.path.rstrip('/') == '/v1/mobility':
+                        self._send(200, service.query_mobility(request))
+                    elif self.path.startswith('/v1/surrogate/'):
+                        self._send(200, service.query_surrogate(self.path[len('/v1/surrogate/'):].rstrip('/'),
+                                                                request))
+                    else:
+                        self._send(404, {'error': f'No endpoint {self.path}.'})
+                except KeyError as error:
+                    self._send(404, {'error': str(error.args[0])})
+                except (ValueError, TypeError) as error:
+                    self._send(400, {'error': str(error)})
+                except Exception as error:
+                    logger.exception('Mobility service: request failed')
+                    self._send(500, {'error': f'{type(error).__name__}: {error}'})
+
+            def log_message(self, format, *args):
+                logger.debug('Mobility service: ' + format, *args)
+
+        return _Handler
@@ -0,0 +1,410 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Chebyshev surrogate models of the sheet mobility.
+"""
+import os
+import json
+import numpy as np
+from ._logging import logger
+
+## ============================================================================
+class MobilitySurrogate:
+    '''
+    The functions in this class evaluate a tensor-product Chebyshev interpolant
+    of log(mobility) over a box of the parameters (e.g. comp, n_2d, T). The
+    interpolant is stored as the (truncated) list of its Chebyshev coefficients.
+    The evaluation contracts the coefficient tensor with the Chebyshev
+    polynomials of one parameter after the other (matrix products, no python
+    loop over points), i.e. ~(size of the coefficient tensor) flops per point.
+
+    The surrogate holds numpy arrays only. It is picklable and can be saved
+    to/loaded from a compressed .npz file (no pickle involved).
+
+    Points outside the parameter box return NaN (no extrapolation).
+    '''
+    sheet_parameters = ('comp', 'n_2d', 'rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T')
+
+    def __init__(self, param_names, lows, highs, log_scale, indices, coefficients,
+                 metadata:dict=None):
+        """
+        Initiation function of the class MobilitySurrogate.
+
+        Parameters
+        ----------
+        param_names : list of str
+            Names of the parameters (positional argument order of __call__).
+        lows, highs : 1D float array
+            Lower and upper bounds of the parameters.
+        log_scale : 1D bool array
+            Whether the parameter is interpolated in log10 scale.
+        indices : 2D int array (n_coefficients, n_parameters)
+            Chebyshev degrees of the coefficients.
+        coefficients : 1D float array
+            Chebyshev coefficients of log(mobility).
+        metadata : dict, optional
+            JSON serializable information (fixed parameters, effect flags,
+            held-out errors, ...). The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.param_names = list(param_names)
+        self.lows = np.asarray(lows, dtype=float)
+        self.highs = np.asarray(highs, dtype=float)
+        self.log_scale = np.asarray(log_scale, dtype=bool)
+        self.indices = np.asarray(indices, dtype=np.int64).reshape(-1, len(self.param_names))
+        self.coefficients = np.asarray(coefficients, dtype=float)
+        self.metadata = dict(metadata or {})
+        self._t_lows = np.where(self.log_scale, np.log10(self.lows), self.lows)
+        self._t_highs = np.where(self.log_scale, np.log10(self.highs), self.highs)
+        # Dense coefficient tensor (trimmed to the highest kept degrees) for evaluation
+        shape = tuple(self.indices.max(axis=0)+1) if len(self.indices) else (1,)*len(self.param_names)
+        self._coefficient_tensor = np.zeros(shape)
+        self._coefficient_tensor[tuple(self.indices.T)] = self.coefficients
+
+    def __getstate__(self):
+        return {'param_names': self.param_names, 'lows': self.lows, 'highs': self.highs,
+                'log_scale': self.log_scale, 'indices': self.indices,
+                'coefficients': self.coefficients, 'metadata': self.metadata}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def __repr__(self):
+        ranges = ', '.join(f'{name}=[{low:g}, {high:g}]' for name, low, high
+                           in zip(self.param_names, self.lows, self.highs))
+        return (f'MobilitySurrogate({ranges}; {len(self.coefficients)} coefficients, '
+                f"max_rel_error={self.metadata.get('max_rel_error', np.nan):.2e})")
+
+    @property
+    def max_rel_error(self):
+        """
+        Maximum relative error of the (truncated) surrogate on the held-out points
+        of the build.
+        """
+        return self.metadata.get('max_rel_error', np.nan)
+
+    def _scaled_coordinates(self, points):
+        """
+        Map the points (n_points, n_parameters) to [-1, 1]. Points outside the
+        box are marked invalid.
+        """
+        t_points = points.copy()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            t_points[:, self.log_scale] = np.log10(points[:, self.log_scale])
+        scaled = (2.0*t_points - (self._t_highs + self._t_lows)) / (self._t_highs - self._t_lows)
+        valid = np.all(np.abs(scaled) <= 1.0 + 1e-12, axis=1)
+        return np.clip(scaled, -1.0, 1.0), valid
+
+    @staticmethod
+    def _chebyshev_polynomials(x, max_degree:int):
+        """
+        Chebyshev polynomials T_0(x), ..., T_max_degree(x). Shape (n_points, max_degree+1).
+        """
+        polynomials = np.empty((len(x), max_degree+1))
+        polynomials[:, 0] = 1.0
+        if max_degree > 0: polynomials[:, 1] = x
+        for kk in range(2, max_degree+1):
+            polynomials[:, kk] = 2.0*x*polynomials[:, kk-1] - polynomials[:, kk-2]
+        return polynomials
+
+    def log_mobility(self, points, chunk_size:int=16384):
+        """
+        This function evaluates the interpolant of log(mobility).
+
+        Parameters
+        ----------
+        points : 2D float array (n_points, n_parameters)
+            Parameter values in the order of param_names.
+        chunk_size : int, optional
+            Number of points evaluated at once (limits the memory use).
+            The default is 16384.
+
+        Returns
+        -------
+        1D float array
+            log(mobility). NaN outside the parameter box.
+
+        """
+        points = np.atleast_2d(np.asarray(points, dtype=float))
+        scaled, valid = self._scaled_coordinates(points)
+        shape = self._coefficient_tensor.shape
+        result = np.empty(len(points))
+        for start in range(0, len(points), chunk_size):
+            x = scaled[start:start+chunk_size]
+            # contract the last parameter: (n, d_1*...*d_D-1)
+            values = self._chebyshev_polynomials(x[:, -1], shape[-1]-1) @ \
+                self._coefficient_tensor.reshape(-1, shape[-1]).T
+            for dim in range(len(shape)-2, -1, -1):
+                polynomials = self._chebyshev_polynomials(x[:, dim], shape[dim]-1)
+                values = (values.reshape(len(x), -1, shape[dim]) @ polynomials[:, :, None])[:, :, 0]
+            result[start:start+chunk_size] = values[:, 0]
+        result[~valid] = np.nan
+        return result
+
+    def __call__(self, *values, **params):
+        """
+        This function evaluates the surrogate mobility (unit: cm^2 V^-1 S^-1).
+        The parameters can be passed positionally (in the order of param_names)
+        or as keywords. Scalars and arrays are broadcast against each other.
+
+        Example:
+            mu = surrogate(comp=0.2, n_2d=np.linspace(1, 20, 100), T=300)
+
+        Returns
+        -------
+        float or float array
+            Mobility (broadcast shape of the inputs). NaN outside the parameter box.
+
+        """
+        if len(values) > len(self.param_names):
+            raise ValueError(f'Surrogate takes {len(self.param_names)} parameters {self.param_names}.')
+        params.update(zip(self.param_names, values))
+        missing = [name for name in self.param_names if name not in params]
+        unknown = [name for name in params if name not in self.param_names]
+        if missing or unknown:
+            raise ValueError(f'Surrogate parameters are {self.param_names}. '
+                             f'Missing: {missing}, unknown: {unknown}.')
+        arrays = np.broadcast_arrays(*[np.asarray(params[name], dtype=float)
+                                       for name in self.param_names])
+        shape = arrays[0].shape
+        points = np.column_stack([arr.ravel() for arr in arrays])
+        mobility = np.exp(self.log_mobility(points)).reshape(shape)
+        return mobility[()] if mobility.ndim == 0 else mobility
+
+    def save(self, file_path):
+        """
+        This function saves the surrogate to a compressed .npz file.
+
+        Parameters
+        ----------
+        file_path : str/path
+            File path.
+
+        Returns
+        -------
+        None.
+
+        """
+        file_path = os.fspath(file_path)
+        with open(file_path, 'wb') as f:
+            np.savez_compressed(f, param_names=np.array(self.param_names), lows=self.lows,
+                                highs=self.highs, log_scale=self.log_scale, indices=self.indices,
+                                coefficients=self.coefficients,
+                                metadata=np.array(json.dumps(self.metadata)))
+
+    @classmethod
+    def load(cls, file_path):
+        """
+        This function loads a surrogate saved with save().
+
+        Parameters
+        ----------
+        file_path : str/path
+            File path.
+
+        Returns
+        -------
+        MobilitySurrogate
+
+        """
+        with np.load(os.fspath(file_path), allow_pickle=False) as data:
+            return cls(param_names=[str(name) for name in data['param_names']],
+                       lows=data['lows'], highs=data['highs'], log_scale=data['log_scale'],
+                       indices=data['indices'], coefficients=data['coefficients'],
+                       metadata=json.loads(str(data['metadata'])))
+
+## ============================================================================
+class _SheetMobilitySurrogateBuilder:
+    '''
+    The functions in this class build a MobilitySurrogate of the sheet mobility
+    of a Mobility2DCarrier.
+
+    log(mobility) is sampled on tensor-product Chebyshev-Lobatto grids. The
+    grids are nested (n -> 2n-1 nodes), so refining a parameter reuses all the
+    previous samples. In each step the parameter with the largest trailing
+    Chebyshev coefficients is refined, until the maximum relative error on
+    random held-out points (not on the grid) is below the target. Finally,
+    the smallest coefficients are dropped as long as their summed magnitude
+    (a strict bound of the truncation error of log(mobility)) stays below
+    truncation_fraction of the target.
+    '''
+    def __init__(self, mobility_2d, param_ranges:dict, mechanism:str='TOT',
+                 fixed_params:dict=None, sheet_mobility_kwargs:dict=None,
+                 log_scale=None, target_rel_error:float=1e-3, n_holdout:int=64,
+                 initial_nodes:int=5, max_nodes_per_param:int=65,
+                 max_grid_points:int=20000, truncation_fraction:float=0.1, seed=0):
+        unknown = [name for name in param_ranges if name not in MobilitySurrogate.sheet_parameters]
+        if unknown:
+            raise ValueError(f'Requested surrogate parameters {unknown} are not implemented yet. Contact developer.')
+        if not param_ranges:
+            raise ValueError('At least one parameter range is required for the surrogate.')
+        self.mobility_2d = mobility_2d
+        self.param_names = list(param_ranges)
+        self.lows = np.array([min(param_ranges[name]) for name in self.param_names], dtype=float)
+        self.highs = np.array([max(param_ranges[name]) for name in self.param_names], dtype=float)
+        if np.any(self.highs <= self.lows):
+            raise ValueError('The parameter ranges should have upper bound > lower bound.')
+        if log_scale is None: log_scale = ('n_2d', 'n_dis')
+        self.log_scale = np.array([name in log_scale for name in self.param_names])
+        if np.any(self.lows[self.log_scale] <= 0):
+            raise ValueError('Log scale parameters should have positive ranges.')
+        self.mechanism = mechanism
+        self.fixed_params = self._fixed_params(fixed_params or {})
+        self.sheet_mobility_kwargs = dict(sheet_mobility_kwargs or {})
+        self.target_rel_error = target_rel_error
+        self.n_holdout = n_holdout
+        self.initial_nodes = initial_nodes
+        self.max_nodes_per_param = max_nodes_per_param
+        self.max_grid_points = max_grid_points
+        self.truncation_fraction = truncation_fraction
+        self.rng = np.random.default_rng(seed)
+        self._carriers = {}
+        self.n_evaluations = 0
+
+    def _fixed_params(self, fixed_params):
+        params = {'n_2d': 10, 'rms_roughness': 0.1, 'corr_len': 1, 'n_dis': 1, 'f_dis': 0.1, 'T': 300}
+        params.update(fixed_params)
+        params = {name: val for name, val in params.items() if name not in self.param_names}
+        if 'comp' not in self.param_names and 'comp' not in params:
+            comps = np.asarray(self.mobility_2d.comps_, dtype=float)
+            if len(comps) != 1:
+                raise ValueError("Give the composition range ('comp') or a fixed composition for the surrogate.")
+            params['comp'] = float(comps[0])
+        unknown = [name for name in params if name not in MobilitySurrogate.sheet_parameters]
+        if unknown:
+            raise ValueError(f'Requested fixed parameters {unknown} are not implemented yet. Contact developer.')
+        return {name: float(val) for name, val in params.items()}
+
+    ## ------------------------------------------------------------------------
+    def _to_physical(self, scaled):
+        """Map scaled coordinates in [-1, 1] (n_points, n_parameters) to the parameter values."""
+        t_lows = np.where(self.log_scale, np.log10(self.lows), self.lows)
+        t_highs = np.where(self.log_scale, np.log10(self.highs), self.highs)
+        points = 0.5*(t_highs + t_lows) + 0.5*(t_highs - t_lows)*scaled
+        points[:, self.log_scale] = 10**points[:, self.log_scale]
+        return points
+
+    def _evaluate_points(self, points):
+        """
+        This function calculates log(mobility) of the points (n_points, n_parameters)
+        with the physics engine (see _MobilityCarrier._calculate_at_points).
+        """
+        params = {name: np.full(len(points), val) for name, val in self.fixed_params.items()}
+        params.update({name: points[:, ii] for ii, name in enumerate(self.param_names)})
+        mobility = self.mobility_2d._calculate_at_points('calculate_sheet_mobility', 'n_2d', params,
+                                                         carriers=self._carriers,
+                                                         **self.sheet_mobility_kwargs)
+        if self.mechanism not in mobility:
+            raise ValueError(f'Requested {self.mechanism} mobility is not calculated with the given effect flags.')
+        log_mobility = np.log(mobility[self.mechanism])
+        self.n_evaluations += len(points)
+        if not np.all(np.isfinite(log_mobility)):
+            raise ValueError('The mobility is not positive and finite in the requested parameter ranges.')
+        return log_mobility
+
+    ## ------------------------------------------------------------------------
+    @staticmethod
+    def _lobatto_nodes(n_nodes:int):
+        return np.cos(np.pi*np.arange(n_nodes)/(n_nodes-1))
+
+    @staticmethod
+    def _dct_matrix(n_nodes:int):
+        """
+        Matrix of the values at the Chebyshev-Lobatto nodes to the Chebyshev
+        coefficients (discrete cosine transform type I).
+        """
+        jj = np.arange(n_nodes)
+        matrix = np.cos(np.pi*np.outer(jj, jj)/(n_nodes-1)) * 2.0/(n_nodes-1)
+        matrix[:, [0, -1]] *= 0.5
+        matrix[[0, -1], :] *= 0.5
+        return matrix
+
+    def _chebyshev_coefficients(self, values):
+        coefficients = values
+        for dim, n_nodes in enumerate(values.shape):
+            coefficients = np.moveaxis(np.tensordot(self._dct_matrix(n_nodes), coefficients,
+                                                    axes=([1], [dim])), 0, dim)
+        return coefficients
+
+    def _grid_values(self, shape, values=None, refined_dim=None):
+        """
+        log(mobility) on the tensor grid of the given shape. If values on the
+        coarser grid (refined_dim with (n+1)/2 nodes) are given, only the new
+        nodes are calculated.
+        """
+        nodes = [self._lobatto_nodes(n_nodes) for n_nodes in shape]
+        new_values = np.empty(shape)
+        if values is None:
+            mask = np.ones(shape, dtype=bool)
+        else:
+            old_slice = [slice(None)]*len(shape)
+            old_slice[refined_dim] = slice(None, None, 2)
+            new_values[tuple(old_slice)] = values
+            mask = np.ones(shape, dtype=bool)
+            mask[tuple(old_slice)] = False
+        grid_indices = np.argwhere(mask)
+        scaled = np.column_stack([nodes[dim][grid_indices[:, dim]] for dim in range(len(shape))])
+        new_values[mask] = self._evaluate_points(self._to_physical(scaled))
+        return new_values
+
+    def _truncate(self, coefficients, tolerance:float):
+        """
+        Drop the smallest coefficients while their summed magnitude is below tolerance.
+        """
+        flat = coefficients.ravel()
+        order = np.argsort(np.abs(flat))
+        dropped = np.cumsum(np.abs(flat[order])) <= tolerance
+        keep = np.sort(order[~dropped])
+        indices = np.column_stack(np.unravel_index(keep, coefficients.shape))
+        return indices, flat[keep], float(np.abs(flat[order[dropped]]).sum())
+
+    def _surrogate(self, coefficients, metadata):
+        truncation_tol = self.truncation_fraction*np.log1p(self.target_rel_error)
+        indices, kept, truncation_error = self._truncate(coefficients, truncation_tol)
+        metadata = dict(metadata, truncation_rel_error_bound=float(np.expm1(truncation_error)))
+        return MobilitySurrogate(self.param_names, self.lows, self.highs, self.log_scale,
+                                 indices, kept, metadata=metadata)
+
+    def build(self):
+        """
+        This function builds the surrogate. See the class documentation.
+
+        Returns
+        -------
+        MobilitySurrogate
+
+        """
+        n_dims = len(self.param_names)
+        holdout_points = self._to_physical(self.rng.uniform(-1, 1, (self.n_holdout, n_dims)))
+        holdout_values = self._evaluate_points(holdout_points)
+        shape = [self.initial_nodes]*n_dims
+        values = self._grid_values(shape)
+        metadata = {'mechanism': self.mechanism, 'fixed_params': self.fixed_params,
+                    'sheet_mobility_kwargs': self.sheet_mobility_kwargs,
+                    'target_rel_error': self.target_rel_error, 'n_holdout': self.n_holdout}
+        while True:
+            coefficients = self._chebyshev_coefficients(values)
+            surrogate = self._surrogate(coefficients, metadata)
+            holdout_error = float(np.max(np.abs(np.expm1(surrogate.log_mobility(holdout_points)
+                                                          - holdout_values))))
+            logger.info('Surrogate grid %s: held-out max relative error %.3e', tuple(shape), holdout_error)
+            tails = np.array([np.abs(np.take(coefficients, [-2, -1], axis=dim)).max() for dim in range(n_dims)])
+            refinable = [dim for dim in np.argsort(-tails)
+                         if 2*shape[dim]-1 <= self.max_nodes_per_param and
+                         np.prod(shape)//shape[dim]*(2*shape[dim]-1) <= self.max_grid_points]
+            if holdout_error <= self.target_rel_error or not refinable: break
+            dim = refinable[0]
+            shape[dim] = 2*shape[dim]-1
+            values = self._grid_values(shape, values=values, refined_dim=dim)
+        converged = holdout_error <= self.target_rel_error
+        if not converged:
+            logger.warning('Surrogate target relative error %.1e not reached (%.3e) within the grid limits.',
+                           self.target_rel_error, holdout_error)
+        surrogate.metadata.update({'grid_shape': list(shape), 'holdout_max_rel_error': holdout_error,
+                                   'max_rel_error': holdout_error, 'converged': converged,
+                                   'n_evaluations': self.n_evaluations})
+        return surrogate
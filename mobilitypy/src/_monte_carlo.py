@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Monte Carlo propagation of the material database parameter uncertainties to
+the mobilities, with streaming summary statistics.
+"""
+import numpy as np
+from ._mobility_results import MobilityResults
+
+## ============================================================================
+class _StreamingStatistics:
+    '''
+    The functions in this class accumulate the summary statistics of the samples
+    of n_points quantities chunk by chunk, without keeping the samples:
+        - count, mean and standard deviation (parallel/Chan update of the
+          mean and the sum of squared deviations),
+        - minimum and maximum,
+        - quantiles from a fixed size histogram per point (log10 scale if the
+          first chunk is positive). The histogram range is set from the first
+          chunk and doubled (merging bin pairs) whenever a later sample falls
+          outside. The quantile resolution is the bin width.
+    Non-finite samples are ignored.
+    '''
+    def __init__(self, n_points:int, n_bins:int=2048):
+        self.n_bins = n_bins + n_bins % 2 # even, for merging bin pairs
+        self.count = np.zeros(n_points)
+        self.mean = np.zeros(n_points)
+        self.m2 = np.zeros(n_points)
+        self.minimum = np.full(n_points, np.inf)
+        self.maximum = np.full(n_points, -np.inf)
+        self.log_scale = None
+        self.lower = None
+        self.width = None
+        self.counts = np.zeros((n_points, self.n_bins), dtype=np.int64)
+
+    def update(self, values):
+        """
+        Add the samples values (2D float array (n_samples, n_points)).
+        """
+        values = np.asarray(values, dtype=float)
+        valid = np.isfinite(values)
+        n = valid.sum(axis=0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            chunk_mean = np.where(valid, values, 0.0).sum(axis=0)/n
+            chunk_m2 = np.where(valid, (values - chunk_mean)**2, 0.0).sum(axis=0)
+            total = self.count + n
+            delta = chunk_mean - self.mean
+            has_new = n > 0
+            self.mean = np.where(has_new, self.mean + delta*n/total, self.mean)
+            self.m2 = np.where(has_new, self.m2 + chunk_m2 + delta**2*self.count*n/total, self.m2)
+        self.count = total
+        self.minimum = np.minimum(self.minimum, np.where(valid, values, np.inf).min(axis=0))
+        self.maximum = np.maximum(self.maximum, np.where(valid, values, -np.inf).max(axis=0))
+        self._update_histogram(values, valid)
+
+    def _transform(self, values):
+        if not self.log_scale: return values
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.log10(values)
+
+    def _update_histogram(self, values, valid):
+        if self.log_scale is None:
+            if not valid.any(): return
+            self.log_scale = bool(np.all(values[valid] > 0))
+        t = self._transform(values)
+        valid = valid & np.isfinite(t)
+        if self.lower is None:
+            lo = np.where(valid, t, np.inf).min(axis=0)
+            hi = np.where(valid, t, -np.inf).max(axis=0)
+            empty = ~np.isfinite(lo)
+            lo, hi = np.where(empty, 0.0, lo), np.where(empty, 0.0, hi)
+            pad = 0.25*(hi - lo) + 1e-9*np.maximum(np.maximum(np.abs(lo), np.abs(hi)), 1.0)
+            self.lower = lo - pad
+            self.width = (hi - lo + 2*pad)/self.n_bins
+        t_low = np.where(valid, t, np.inf).min(axis=0)
+        t_high = np.where(valid, t, -np.inf).max(axis=0)
+        self._extend_range(t_low, t_high)
+        n_points = len(self.count)
+        idx = np.clip(np.floor((t - self.lower)/self.width), 0, self.n_bins - 1)
+        flat = (idx + self.n_bins*np.arange(n_points))[valid].astype(np.int64)
+        self.counts += np.bincount(flat, minlength=n_points*self.n_bins).reshape(n_points, self.n_bins)
+
+    def _extend_range(self, t_low, t_high):
+        """
+        Doubles the histogram range of the points (merging bin pairs) until
+        [t_low, t_high] is inside.
+        """
+        half = self.n_bins//2
+        while True:
+            upper = self.lower + self.n_bins*self.width
+            right = t_high >= upper
+            left = (t_low < self.lower) & ~right
+            if not (right.any() or left.any()): return
+            for rows, shift in ((right, 0), (left, half)):
+                if not rows.any(): continue
+                merged = self.counts[rows, 0::2] + self.counts[rows, 1::2]
+                counts = np.zeros((rows.sum(), self.n_bins), dtype=np.int64)
+                counts[:, shift:shift+half] = merged
+                self.counts[rows] = counts
+            self.lower = np.where(left, self.lower - self.n_bins*self.width, self.lower)
+            self.width = np.where(right | left, 2*self.width, self.width)
+
+    def std(self):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(self.count > 1, np.sqrt(self.m2/(self.count - 1)), np.nan)
+
+    def quantile(self, q:float):
+        """
+        Quantile q (0 <= q <= 1) of the samples of every point (linear
+        interpolation within the histogram bin).
+        """
+        if self.lower is None: return np.full(len(self.count), np.nan)
+        cumulative = np.cumsum(self.counts, axis=1)
+        target = q*cumulative[:, -1]
+        k = np.argmax(cumulative >= target[:, None], axis=1)
+        rows = np.arange(len(k))
+        in_bin = self.counts[rows, k]
+        below = cumulative[rows, k] - in_bin
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fraction = np.where(in_bin > 0, (target - below)/in_bin, 0.0)
+        t = self.lower + (k + fraction)*self.width
+        value = 10**t if self.log_scale else t
+        value = np.clip(value, self.minimum, self.maximum)
+        return np.where(cumulative[:, -1] > 0, value, np.nan)
+
+## ============================================================================
+class _MonteCarloUncertainty:
+    '''
+    The functions in this class propagate the uncertainties of the material
+    database parameters to the mobilities by Monte Carlo sampling.
+
+    The samples are evaluated in chunks. For a chunk of m samples and n points
+    (compositions/carrier densities) a single carrier with m*n compositions is
+    set up, whose database parameters are arrays (every sample repeated n
+    times). The alloy parameters (interpolation, derived parameters, strain)
+    and the mobilities of all the samples are then calculated in one call of
+    the mobility engine. Only the streaming statistics (_StreamingStatistics)
+    are kept between the chunks, so the memory does not grow with the number
+    of samples.
+    '''
+    def __init__(self, carrier, calculate_name:str, density_name:str, density,
+                 distributions:dict, calculate_kwargs:dict, n_samples:int=1000,
+                 chunk_size:int=256, quantiles=(0.025, 0.5, 0.975), seed=None,
+                 postprocess=None, n_bins:int=2048):
+        """
+        Parameters
+        ----------
+        carrier : Mobility2DCarrier or Mobility3DCarrier
+            The mobility instance.
+        calculate_name : str
+            The mobility method of the carrier, e.g. 'calculate_sheet_mobility'.
+        density_name : str
+            Name of the carrier density input ('n_2d' or 'n_3d').
+        density : float or 1D float array
+            Carrier densities (broadcasted with the compositions).
+        distributions : dict
+            {material: {parameter: distribution}}. The material is one of the
+            binaries or the alloy (bowing parameters, e.g. 'AlGaN'), the parameter
+            a material database parameter. The distribution is a frozen
+            scipy.stats distribution (anything with rvs(size=, random_state=))
+            or a callable f(rng, size) returning the samples.
+        calculate_kwargs : dict
+            Other inputs and effect flags of the mobility method.
+        n_samples : int, optional
+            Number of Monte Carlo samples. The default is 1000.
+        chunk_size : int, optional
+            Number of samples evaluated in one call. The default is 256.
+        quantiles : tuple of float, optional
+            Reported quantiles. The default is (0.025, 0.5, 0.975).
+        seed : int or numpy Generator, optional
+            Seed of the random numbers. The results are reproducible for the
+            same seed and chunk_size. The default is None.
+        postprocess : callable, optional
+            postprocess(carrier, results, density) adds derived columns (e.g.
+            figure-of-merit) to the results of a chunk. The default is None.
+        n_bins : int, optional
+            Number of histogram bins of the quantile estimates. The default is 2048.
+        """
+        self.carrier = carrier
+        self.calculate_name = calculate_name
+        self.density_name = density_name
+        self.distributions = self._check_distributions(carrier, distributions)
+        self.calculate_kwargs = calculate_kwargs
+        self.n_samples = int(n_samples)
+        self.chunk_size = max(int(chunk_size), 1)
+        self.quantiles = tuple(float(q) for q in quantiles)
+        self.rng = np.random.default_rng(seed)
+        self.postprocess = postprocess
+        self.n_bins = n_bins
+        comps, density = np.broadcast_arrays(np.asarray(carrier.comps_, dtype=float),
+                                             np.asarray(density, dtype=float))
+        self.comps, self.density = comps.ravel(), density.ravel()
+
+    @staticmethod
+    def _check_distributions(carrier, distributions:dict):
+        checked = {}
+        for material, params in distributions.items():
+            for name, distribution in params.items():
+                mat_name, name = carrier._check_material_param(f'{material}:{name}')
+                if not (hasattr(distribution, 'rvs') or callable(distribution)):
+                    raise ValueError(f'Distribution of {mat_name}:{name} should be a frozen '
+                                     'scipy.stats distribution or a callable f(rng, size).')
+                checked.setdefault(mat_name, {})[name] = distribution
+        return checked
+
+    def _draw(self, n_samples:int):
+        samples = {}
+        for material, params in self.distributions.items():
+            for name, distribution in params.items():
+                if hasattr(distribution, 'rvs'):
+                    values = distribution.rvs(size=n_samples, random_state=self.rng)
+                else:
+                    values = distribution(self.rng, n_samples)
+                samples.setdefault(material, {})[name] = np.broadcast_to(
+                    np.asarray(values, dtype=float), (n_samples,))
+        return samples
+
+    def _evaluate_chunk(self, n_samples:int):
+        """
+        The mobilities (MobilityResults, sample-major rows) of n_samples new samples.
+        """
+        n_points = len(self.comps)
+        use_mat_params = {material: {name: np.repeat(values, n_points)
+                                     for name, values in params.items()}
+                          for material, params in self._draw(n_samples).items()}
+        batch = self.carrier._carrier_at_compositions(np.tile(self.comps, n_samples),
+                                                      use_mat_params=use_mat_params)
+        batch.disk_cache_ = None
+        density = np.tile(self.density, n_samples)
+        results = getattr(batch, self.calculate_name)(**{self.density_name: density},
+                                                      **self.calculate_kwargs,
+                                                      return_dataframe=False)
+        if self.postprocess is not None: self.postprocess(batch, results, density)
+        return results
+
+    def run(self):
+        """
+        This function runs the Monte Carlo sampling.
+
+        Returns
+        -------
+        MobilityResults
+            One row per point: 'comp', the carrier density and for every result
+            column '<column>_mean', '<column>_std' and '<column>_q<quantile>'
+            (e.g. 'TOT_q0.025'). attrs has 'n_samples', 'quantiles' and
+            'sampled_params'.
+
+        """
+        n_points = len(self.comps)
+        statistics = None
+        n_done = 0
+        while n_done < self.n_samples:
+            n_chunk = min(self.chunk_size, self.n_samples - n_done)
+            results = self._evaluate_chunk(n_chunk)
+            if statistics is None:
+                columns = [key for key in results.columns if key != 'comp']
+                statistics = {key: _StreamingStatistics(n_points, n_bins=self.n_bins) for key in columns}
+            for key, stats in statistics.items():
+                stats.update(results[key].reshape(n_chunk, n_points))
+            n_done += n_chunk
+            self.carrier.logger_.info('Monte Carlo: %d/%d samples', n_done, self.n_samples)
+        summary = MobilityResults({'comp': self.comps, self.density_name: self.density},
+                                  attrs={'n_samples': n_done, 'quantiles': list(self.quantiles),
+                                         'sampled_params': [f'{material}:{name}'
+                                                            for material, params in self.distributions.items()
+                                                            for name in params]})
+        for key, stats in (statistics or {}).items():
+            summary[f'{key}_mean'] = np.where(stats.count > 0, stats.mean, np.nan)
+            summary[f'{key}_std'] = stats.std()
+            for q in self.quantiles:
+                summary[f'{key}_q{q:g}'] = stats.quantile(q)
+        return summary
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Pareto-front (non-dominated set) screening of mobility sweeps over the device
+design objectives: figure-of-merits, sheet resistance, bandgap and thermal
+stability.
+"""
+import bisect
+import numpy as np
+from ._mobility_results import MobilityResults
+from ._figure_of_merit import figure_of_merit_registry
+
+## ============================================================================
+def _non_dominated_mask(values, n_pivots:int=32):
+    """
+    This function finds the non-dominated rows of values (2D array (N, k), all
+    the objectives are maximised). Row i dominates row j if values[i] >= values[j]
+    in all the objectives and the rows are not equal. Equal rows share their
+    status. Rows with non-finite values are never non-dominated.
+
+    The rows are sorted lexicographically (descending), so a row can only be
+    dominated by an earlier row:
+        k = 1: the maximum.
+        k = 2: running maximum of the 2nd objective (vectorized), O(N log N).
+        k = 3: sweep with a staircase of the non-dominated (2nd, 3rd) objective
+               pairs (binary search), O(N log N) (Kung et al., J. ACM 22, 469 (1975)).
+        k > 3: sweep against the current front, O(N*front size).
+    For k >= 3 the rows dominated by n_pivots rows with the largest (scaled)
+    objective sums are removed (vectorized) before the sweep.
+
+    Parameters
+    ----------
+    values : 2D float array
+        The objective values (rows: points, columns: objectives).
+    n_pivots : int, optional
+        Number of pivot rows of the pre-filter. The default is 32.
+
+    Returns
+    -------
+    1D bool array
+        True for the non-dominated rows.
+
+    """
+    values = np.asarray(values, dtype=float)
+    n, k = values.shape
+    mask = np.zeros(n, dtype=bool)
+    finite = np.flatnonzero(np.all(np.isfinite(values), axis=1))
+    if not len(finite) or not k: return mask
+    order = finite[np.lexsort(values[finite].T[::-1])[::-1]] # descending lexicographic
+    ordered = values[order]
+    duplicate = np.concatenate(([False], np.all(ordered[1:] == ordered[:-1], axis=1)))
+    group = np.cumsum(~duplicate) - 1
+    unique = ordered[~duplicate]
+    front = np.zeros(len(unique), dtype=bool)
+    if k == 1:
+        front[0] = True
+    elif k == 2:
+        best_before = np.maximum.accumulate(np.concatenate(([-np.inf], unique[:-1, 1])))
+        front = unique[:, 1] > best_before
+    else:
+        span = np.ptp(unique, axis=0)
+        score = ((unique - unique.min(axis=0))/np.where(span > 0, span, 1)).sum(axis=1)
+        candidates = np.arange(len(unique))
+        for pivot in np.argsort(-score)[:n_pivots]:
+            dominated = candidates != pivot
+            for jj in range(k):
+                dominated &= unique[candidates, jj] <= unique[pivot, jj]
+            candidates = candidates[~dominated]
+        if k == 3:
+            keys, heights = [], [] # 2nd objective ascending, 3rd objective descending
+            for ii, y, z in zip(candidates.tolist(), *unique[candidates, 1:].T.tolist()):
+                jj = bisect.bisect_left(keys, y)
+                if jj < len(keys) and heights[jj] >= z: continue
+                front[ii] = True
+                stop = bisect.bisect_right(keys, y)
+                start = stop
+                while start > 0 and heights[start - 1] <= z: start -= 1
+                keys[start:stop], heights[start:stop] = [y], [z]
+        else:
+            members = []
+            for ii in candidates:
+                if members and np.any(np.all(unique[members] >= unique[ii], axis=1)): continue
+                front[ii] = True
+                members.append(ii)
+    mask[order] = front[group]
+    return mask
+
+## ============================================================================
+class _ParetoFrontExplorer:
+    '''
+    The functions in this class extract the Pareto front of the design
+    objectives from mobility sweep results, chunk by chunk. Only the current
+    front is kept between the chunks: the front of a chunk is merged with the
+    front of the earlier chunks (a point dominated in the union is dominated in
+    the full sweep), so the memory needed is the chunk plus the front.
+
+    Objectives: any column of the sweep results, the figure-of-merit table
+    columns ('bandgap', 'critical_electric_field', 'sheet_resistance',
+    'mobility' and the registered figure-of-merits, e.g. 'LFOM') and
+    'thermal_stability'.
+
+    Thermal stability: the rows are grouped by the non-temperature inputs
+    (group_by). Every group becomes one design point with the worst case of
+    the objectives over its temperatures (minimum of the maximised and maximum
+    of the minimised objectives) and
+        thermal_stability = min_T(mobility)/max_T(mobility).
+    A group should not be split across chunks (e.g. temperature as the
+    innermost sweep axis and chunk sizes a multiple of the number of
+    temperatures).
+    '''
+    _senses = {'max': 1.0, 'min': -1.0}
+    _group_inputs = ('comp', 'n_2d', 'rms_roughness', 'corr_len', 'n_dis', 'f_dis')
+
+    def __init__(self, carrier, objectives:dict, mobility_column:str='TOT', group_by=None,
+                 n_2d=10, T=300, T_corect_bandgap:bool=False, direct_bandgap:bool=True):
+        """
+        Parameters
+        ----------
+        carrier : Mobility2DCarrier
+            The mobility instance (material parameters of the compositions).
+        objectives : dict
+            {objective: 'max' or 'min'}.
+        mobility_column : str, optional
+            The mobility column of the results. The default is 'TOT'.
+        group_by : sequence of str, optional
+            The input columns defining a design point for the thermal stability.
+            The default is None, i.e. the columns of ('comp', 'n_2d', 'rms_roughness',
+            'corr_len', 'n_dis', 'f_dis') and the material parameter columns
+            ('<material>:<parameter>') present in the results.
+        n_2d, T : float, optional
+            Carrier density (unit: 10^12 cm^-2) and temperature (unit: K) if the
+            results have no such columns. The defaults are 10 and 300.
+        T_corect_bandgap, direct_bandgap : bool, optional
+            See Mobility2DCarrier.calculate_figure_of_merit().
+        """
+        if not objectives:
+            raise ValueError('Give at least one objective for the Pareto front.')
+        for name, sense in objectives.items():
+            if sense not in self._senses:
+                raise ValueError(f"Objective {name} should be 'max' or 'min'. Got {sense}.")
+        self.carrier = carrier
+        self.objectives = dict(objectives)
+        self.mobility_column = mobility_column
+        self.group_by = group_by
+        self.n_2d, self.T = n_2d, T
+        self.fom_options = {'T_corect_bandgap': T_corect_bandgap, 'direct_bandgap': direct_bandgap}
+        self.modes = [name for name in objectives if name in figure_of_merit_registry]
+        self._front = None
+        self.n_screened = 0
+
+    def objective_table(self, results):
+        """
+        This function calculates the objectives of the results rows (or groups
+        for the thermal stability).
+
+        Parameters
+        ----------
+        results : MobilityResults or pandas dataframe
+            One chunk of the sweep results.
+
+        Returns
+        -------
+        MobilityResults
+            The results (or group) columns and the objective columns.
+
+        """
+        if not isinstance(results, MobilityResults): results = MobilityResults.from_pandas(results)
+        table = self.carrier._figure_of_merit_table(results['comp'],
+                                                    results['n_2d'] if 'n_2d' in results else self.n_2d,
+                                                    results[self.mobility_column],
+                                                    temp=results['T'] if 'T' in results else self.T,
+                                                    modes=self.modes, **self.fom_options)
+        for name, values in results.items():
+            if name not in table: table[name] = values
+        if 'thermal_stability' in self.objectives:
+            table = self._group_over_temperature(table)
+        unknown = [name for name in self.objectives if name not in table]
+        if unknown:
+            raise ValueError(f'Requested {unknown} objective is not implemented yet. Contact developer.')
+        return table
+
+    def _group_over_temperature(self, table):
+        group_by = self.group_by
+        if group_by is None:
+            group_by = [name for name in table.columns if name in self._group_inputs or ':' in name]
+        _, first, inverse = np.unique(table.to_numpy(list(group_by)), axis=0, return_index=True,
+                                      return_inverse=True)
+        inverse = np.ravel(inverse)
+        n_groups = len(first)
+        def reduce(values, ufunc, fill):
+            out = np.full(n_groups, fill)
+            ufunc.at(out, inverse, values)
+            return out
+        grouped = MobilityResults({name: table[name][first] for name in group_by})
+        grouped['T_min'] = reduce(table['T'], np.minimum, np.inf)
+        grouped['T_max'] = reduce(table['T'], np.maximum, -np.inf)
+        mobility = table['mobility']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            grouped['thermal_stability'] = reduce(mobility, np.minimum, np.inf)/reduce(mobility, np.maximum, -np.inf)
+        for name, sense in self.objectives.items():
+            if name == 'thermal_stability' or name in grouped: continue
+            if name not in table:
+                raise ValueError(f'Requested {name} objective is not implemented yet. Contact developer.')
+            grouped[name] = reduce(table[name], np.minimum, np.inf) if sense == 'max' \
+                else reduce(table[name], np.maximum, -np.inf)
+        return grouped
+
+    def update(self, results):
+        """
+        This function merges the Pareto front of a chunk of results with the
+        current front.
+        """
+        table = self.objective_table(results)
+        self.n_screened += len(table)
+        if self._front is not None:
+            table = MobilityResults.concatenate([self._front, table[self._front.columns]])
+        values = np.column_stack([self._senses[sense]*table[name] for name, sense in self.objectives.items()])
+        mask = _non_dominated_mask(values)
+        self._front = MobilityResults({name: val[mask] for name, val in table.items()})
+        self.carrier.logger_.info('Pareto front: %d points on the front of %d screened', len(self._front), self.n_screened)
+        return self
+
+    def front(self):
+        """
+        This function returns the current front (MobilityResults) sorted by the
+        first objective (best first).
+        """
+        if self._front is None:
+            raise ValueError('No results screened yet.')
+        name, sense = next(iter(self.objectives.items()))
+        order = np.argsort(-self._senses[sense]*self._front[name], kind='stable')
+        units = {name: figure_of_merit_registry[name]['unit'] for name in self.modes}
+        return MobilityResults({key: val[order] for key, val in self._front.items()},
+                               attrs={'objectives': self.objectives, 'n_screened': self.n_screened,
+                                      'units': units})
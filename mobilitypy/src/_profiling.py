@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Opt-in hot-path instrumentation of the mobility engines.
+"""
+import time
+import functools
+import contextlib
+import contextvars
+import scipy.integrate as integrate
+
+_active_report = contextvars.ContextVar('mobilitypy_profile_report', default=None)
+_null_stage = contextlib.nullcontext()
+
+## ============================================================================
+class ProfileReport:
+    '''
+    Structured report of the instrumented engine stages.
+
+    Every stage is identified by its path, e.g. 'sheet_mobility/IFR', i.e. the
+    nested stages are joined with '/'. For every stage the following counters
+    are collected:
+        calls        : number of calls of the stage.
+        wall_time    : inclusive wall time (unit: s).
+        quad_calls   : number of scipy quad/quad_vec calls inside the stage
+                       (excluding nested stages).
+        neval        : number of integrand evaluations of these quad calls.
+                       For quad_vec one evaluation is one vectorized call.
+        subdivisions : number of quadrature subintervals of these quad calls.
+    '''
+    _counters = ('calls', 'wall_time', 'quad_calls', 'neval', 'subdivisions')
+
+    def __init__(self):
+        self.stages = {}
+        self.wall_time = 0.0
+        self._stack = []
+
+    def _record(self, path:str, **counts):
+        stage = self.stages.get(path)
+        if stage is None:
+            stage = self.stages[path] = dict.fromkeys(self._counters, 0)
+        for key, val in counts.items():
+            stage[key] += val
+
+    @contextlib.contextmanager
+    def _stage(self, name:str):
+        self._stack.append(name)
+        path = '/'.join(self._stack)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(path, calls=1, wall_time=time.perf_counter()-start)
+            self._stack.pop()
+
+    def _record_quad(self, neval:int, subdivisions:int):
+        self._record('/'.join(self._stack) if self._stack else '<top>', quad_calls=1,
+                     neval=int(neval), subdivisions=int(subdivisions))
+
+    def to_dict(self, aggregate_by_name:bool=False):
+        """
+        Return the report as dictionary.
+
+        Parameters
+        ----------
+        aggregate_by_name : bool, optional
+            If True, the counters of the stages with same name (last part of
+            the path) are summed up, e.g. all 'IFR' stages irrespective of their
+            parent stages. The default is False.
+
+        Returns
+        -------
+        dict
+            Stage path (or name) and counters dictionary pairs.
+
+        """
+        if not aggregate_by_name:
+            return {path: dict(stage) for path, stage in self.stages.items()}
+        aggregated = {}
+        for path, stage in self.stages.items():
+            name = path.rsplit('/', 1)[-1]
+            agg = aggregated.setdefault(name, dict.fromkeys(self._counters, 0))
+            for key in self._counters: agg[key] += stage[key]
+        return aggregated
+
+    def to_pandas(self, aggregate_by_name:bool=False):
+        """
+        Return the report as pandas dataframe (one row per stage).
+        """
+        import pandas as pd
+        return pd.DataFrame.from_dict(self.to_dict(aggregate_by_name=aggregate_by_name),
+                                      orient='index', columns=list(self._counters))
+
+    def __str__(self):
+        header = f'{"stage":<44}{"calls":>8}{"time (s)":>12}{"quad":>8}{"neval":>10}{"subdiv":>8}'
+        lines = [header, '-'*len(header)]
+        for path, stage in self.stages.items():
+            lines.append(f'{path:<44}{stage["calls"]:>8}{stage["wall_time"]:>12.4g}'
+                         f'{stage["quad_calls"]:>8}{stage["neval"]:>10}{stage["subdivisions"]:>8}')
+        lines.append(f'Total wall time: {self.wall_time:.4g} s')
+        return '\n'.join(lines)
+
+    def __repr__(self):
+        return f'ProfileReport(stages={len(self.stages)}, wall_time={self.wall_time:.4g})'
+
+@contextlib.contextmanager
+def profile():
+    """
+    Context manager to collect the wall time, call counts, integrand evaluation
+    counts and quadrature subdivision counts of the engine stages (scattering
+    mechanisms, Fermi-Dirac integrals, parameter setup, ...) called inside the
+    context. The instrumentation is active only in the current thread (context).
+    Outside the context the instrumentation costs only a context variable lookup.
+
+    Example:
+        with mobilitypy.profile() as report:
+            mu = mob.calculate_sheet_mobility(n_2d=10, interface_roughness_effect=True)
+        print(report)
+
+    Yields
+    ------
+    ProfileReport
+        The report. Filled when the context exits.
+
+    """
+    report = ProfileReport()
+    token = _active_report.set(report)
+    start = time.perf_counter()
+    try:
+        yield report
+    finally:
+        report.wall_time = time.perf_counter() - start
+        _active_report.reset(token)
+
+def _stage(name:str):
+    """
+    Context manager for an instrumented stage. No-op if not profiling.
+    """
+    report = _active_report.get()
+    return _null_stage if report is None else report._stage(name)
+
+def _profiled(name:str):
+    """
+    Decorator for an instrumented stage. No-op if not profiling.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            report = _active_report.get()
+            if report is None: return func(*args, **kwargs)
+            with report._stage(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def _quad(func, a, b, return_error:bool=False, **kwargs):
+    """
+    scipy.integrate.quad returning the integral (and the absolute error
+    estimate if return_error=True). Integrand evaluation and subdivision counts
+    are recorded when profiling.
+    """
+    report = _active_report.get()
+    if report is None:
+        res = integrate.quad(func, a, b, **kwargs)
+    else:
+        res = integrate.quad(func, a, b, full_output=1, **kwargs)
+        report._record_quad(res[2]['neval'], res[2]['last'])
+    return (res[0], res[1]) if return_error else res[0]
+
+def _quad_vec(func, a, b, return_error:bool=False, **kwargs):
+    """
+    scipy.integrate.quad_vec returning the integral (and the absolute error
+    estimate if return_error=True). Integrand evaluation and subdivision counts
+    are recorded when profiling.
+    
+    NB: quad_vec estimates a single error norm (default: 2-norm) for the whole 
+    vector. This is an upper bound of the absolute error of every element.
+    """
+    report = _active_report.get()
+    if report is None:
+        res = integrate.quad_vec(func, a, b, **kwargs)
+    else:
+        res = integrate.quad_vec(func, a, b, full_output=True, **kwargs)
+        report._record_quad(res[2].neval, len(res[2].intervals))
+    return (res[0], res[1]) if return_error else res[0]
@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Columnar on-disk store for (long) mobility sweeps.
+"""
+import os
+import json
+import hashlib
+import itertools
+import tempfile
+import numpy as np
+from ._mobility_results import MobilityResults
+
+## ============================================================================
+class ResultStore:
+    '''
+    The functions in this class write the sweep results incrementally in chunks
+    to disk and resume the sweep from the first missing chunk.
+
+    Each chunk is saved as a separate columnar file (compressed .npz, or
+    Parquet/Feather when pyarrow is installed) containing the sweep parameters,
+    mechanism mobilities, scattering rates and m_star_by_e columns. The file
+    'index.json' in the store directory keeps the sweep specification and the
+    list of completed chunks. All the files are written atomically, so a killed
+    job never leaves a half written chunk behind.
+    '''
+    _file_formats = {'npz': '.npz', 'parquet': '.parquet', 'feather': '.feather'}
+    _index_file_name = 'index.json'
+
+    def __init__(self, store_dir, file_format:str='npz'):
+        """
+        Initiation function of the class ResultStore.
+
+        Parameters
+        ----------
+        store_dir : str/path
+            Directory where the chunks and the index are saved. Created if
+            does not exist.
+        file_format : str, optional [options: 'npz', 'parquet', 'feather']
+            File format of the chunks. 'parquet' and 'feather' need pyarrow.
+            If the store already exists, the format of the store is used.
+            The default is 'npz'.
+
+        Returns
+        -------
+        None.
+
+        """
+        self.store_dir = os.fspath(store_dir)
+        os.makedirs(self.store_dir, exist_ok=True)
+        self.index_ = self._read_index()
+        if self.index_ is None:
+            if file_format not in self._file_formats:
+                raise ValueError(f'Requested {file_format} file format is not implemented yet. Contact developer.')
+            self.index_ = {'file_format': file_format, 'sweep_hash': None,
+                           'sweep_spec': None, 'chunks': {}}
+        self.file_format = self.index_['file_format']
+        if self.file_format != 'npz': self._import_pyarrow()
+
+    @staticmethod
+    def _import_pyarrow():
+        try:
+            import pyarrow
+        except ImportError as err:
+            raise ImportError('pyarrow is required for parquet/feather result store. '
+                              "Install it using 'pip install pyarrow' or use file_format='npz'.") from err
+        return pyarrow
+
+    @staticmethod
+    def _json_default(obj):
+        if isinstance(obj, np.ndarray): return obj.tolist()
+        if isinstance(obj, np.generic): return obj.item()
+        raise TypeError(f'Object of type {type(obj).__name__} is not JSON serializable')
+
+    @classmethod
+    def _sweep_hash(cls, sweep_spec):
+        spec_json = json.dumps(sweep_spec, sort_keys=True, default=cls._json_default)
+        return hashlib.sha256(spec_json.encode()).hexdigest()
+
+    @staticmethod
+    def _atomic_write(file_path, write_fn, suffix=''):
+        """
+        Write to a temporary file in the same directory and rename it.
+        os.replace is atomic, so the file is either complete or absent.
+        """
+        dir_name = os.path.dirname(file_path)
+        fd, tmp_path = tempfile.mkstemp(dir=dir_name, prefix='.tmp_', suffix=suffix)
+        os.close(fd)
+        try:
+            write_fn(tmp_path)
+            os.replace(tmp_path, file_path)
+        finally:
+            if os.path.exists(tmp_path): os.remove(tmp_path)
+
+    def _read_index(self):
+        index_path = os.path.join(self.store_dir, self._index_file_name)
+        if not os.path.isfile(index_path): return None
+        with open(index_path, 'r') as f:
+            return json.load(f)
+
+    def _write_index(self):
+        def _write(tmp_path):
+            with open(tmp_path, 'w') as f:
+                json.dump(self.index_, f, indent=1, default=self._json_default)
+        self._atomic_write(os.path.join(self.store_dir, self._index_file_name), _write)
+
+    def _chunk_file_name(self, chunk_id:int):
+        return f'chunk_{chunk_id:06d}{self._file_formats.get(self.file_format)}'
+
+    def set_sweep_spec(self, sweep_spec):
+        """
+        Set the sweep specification of the store. If the store already contains
+        a different sweep, ValueError is raised. This makes sure that the resumed
+        sweep is the same sweep that was started.
+
+        Parameters
+        ----------
+        sweep_spec : dict
+            JSON serializable sweep specification (numpy arrays are allowed).
+
+        Returns
+        -------
+        None.
+
+        """
+        sweep_hash = self._sweep_hash(sweep_spec)
+        if self.index_['sweep_hash'] is None:
+            self.index_['sweep_hash'] = sweep_hash
+            self.index_['sweep_spec'] = json.loads(json.dumps(sweep_spec, default=self._json_default))
+            self._write_index()
+        elif self.index_['sweep_hash'] != sweep_hash:
+            raise ValueError(f'{self.store_dir} contains results of a different sweep. '
+                             'Use a new store directory for a new sweep.')
+
+    def completed_chunks(self):
+        """
+        Return the sorted list of completed chunk ids.
+        """
+        return sorted(int(chunk_id) for chunk_id in self.index_['chunks'])
+
+    def is_complete(self, chunk_id:int):
+        return str(chunk_id) in self.index_['chunks']
+
+    def write_chunk(self, chunk_id:int, results, parameters:dict=None):
+        """
+        Write one chunk of the results and mark it completed in the index.
+
+        Parameters
+        ----------
+        chunk_id : int
+            The chunk id.
+        results : MobilityResults or pandas dataframe
+            The results of the chunk.
+        parameters : dict, optional
+            Sweep parameters of the chunk. Scalars are broadcasted to the
+            number of rows. Saved as additional columns. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        if not isinstance(results, MobilityResults):
+            results = MobilityResults.from_pandas(results)
+        columns = {}
+        if parameters is not None:
+            for key, value in parameters.items():
+                columns[key] = np.broadcast_to(np.asarray(value, dtype=float), (len(results),))
+        columns.update(results.to_dict())
+        file_name = self._chunk_file_name(chunk_id)
+
+        if self.file_format == 'npz':
+            def _write(tmp_path):
+                with open(tmp_path, 'wb') as f:
+                    np.savez_compressed(f, **columns)
+        else:
+            pa = self._import_pyarrow()
+            table = pa.table({key: np.ascontiguousarray(val) for key, val in columns.items()})
+            if self.file_format == 'parquet':
+                import pyarrow.parquet as pq
+                _write = lambda tmp_path: pq.write_table(table, tmp_path)
+            else:
+                import pyarrow.feather as feather
+                _write = lambda tmp_path: feather.write_feather(table, tmp_path)
+        self._atomic_write(os.path.join(self.store_dir, file_name), _write)
+
+        self.index_['chunks'][str(chunk_id)] = {'file': file_name, 'rows': len(results)}
+        self._write_index()
+
+    def read_chunk(self, chunk_id:int):
+        """
+        Read one completed chunk.
+
+        Parameters
+        ----------
+        chunk_id : int
+            The chunk id.
+
+        Returns
+        -------
+        MobilityResults
+            The chunk results including the parameter columns.
+
+        """
+        chunk_info = self.index_['chunks'].get(str(chunk_id))
+        if chunk_info is None:
+            raise KeyError(f'Chunk {chunk_id} is not completed yet.')
+        file_path = os.path.join(self.store_dir, chunk_info['file'])
+        if self.file_format == 'npz':
+            with np.load(file_path) as data:
+                return MobilityResults({key: data[key] for key in data.files})
+        elif self.file_format == 'parquet':
+            import pyarrow.parquet as pq
+            table = pq.read_table(file_path)
+        else:
+            import pyarrow.feather as feather
+            table = feather.read_table(file_path)
+        return MobilityResults({key: table.column(key).to_numpy() for key in table.column_names})
+
+    def load(self):
+        """
+        Read all the completed chunks and concatenate them in chunk order.
+
+        Returns
+        -------
+        MobilityResults
+            Concatenated results.
+
+        """
+        return MobilityResults.concatenate([self.read_chunk(chunk_id)
+                                            for chunk_id in self.completed_chunks()])
+
+    @staticmethod
+    def parameter_grid(**parameter_values):
+        """
+        Create the list of parameter sets from the cartesian product of the
+        parameter values. E.g. parameter_grid(T=[100, 300], n_2d=[5, 10])
+        returns [{'T': 100, 'n_2d': 5}, {'T': 100, 'n_2d': 10}, ...].
+        """
+        keys = list(parameter_values.keys())
+        values = [np.atleast_1d(parameter_values[key]).tolist() for key in keys]
+        return [dict(zip(keys, combination)) for combination in itertools.product(*values)]
+
+    def run(self, evaluate, parameter_sets, chunk_size:int=1, sweep_spec:dict=None,
+            print_log:bool=False):
+        """
+        Run the sweep chunk by chunk. Completed chunks are skipped, so
+        restarting the same sweep resumes from the first missing chunk.
+
+        Parameters
+        ----------
+        evaluate : callable
+            evaluate(**parameter_set) should return the results (MobilityResults
+            or pandas dataframe) of one parameter set.
+            E.g. lambda **pp: mob.calculate_sheet_mobility(**pp, return_dataframe=False)
+        parameter_sets : list of dict
+            The parameter sets of the sweep. See parameter_grid().
+        chunk_size : int, optional
+            Number of parameter sets in one chunk. The default is 1.
+        sweep_spec : dict, optional
+            Additional sweep specification (e.g. effect flags, compositions) that
+            should be same when resuming. The default is None.
+        print_log : bool, optional
+            Print the progress. The default is False.
+
+        Returns
+        -------
+        MobilityResults
+            All the sweep results.
+
+        """
+        parameter_sets = list(parameter_sets)
+        self.set_sweep_spec({'parameter_sets': parameter_sets, 'chunk_size': chunk_size,
+                             'user_spec': sweep_spec})
+        n_chunks = (len(parameter_sets) + chunk_size - 1) // chunk_size
+        for chunk_id in range(n_chunks):
+            if self.is_complete(chunk_id): continue
+            chunk_results, chunk_params = [], []
+            for params in parameter_sets[chunk_id*chunk_size:(chunk_id+1)*chunk_size]:
+                results = evaluate(**params)
+                if not isinstance(results, MobilityResults):
+                    results = MobilityResults.from_pandas(results)
+                chunk_results.append(results)
+                chunk_params.append({key: np.broadcast_to(np.asarray(val, dtype=float), (len(results),))
+                                     for key, val in params.items()})
+            parameters = {key: np.concatenate([pp[key] for pp in chunk_params]) for key in chunk_params[0]}
+            self.write_chunk(chunk_id, MobilityResults.concatenate(chunk_results),
+                             parameters=parameters)
+            if print_log: print(f'- Chunk {chunk_id+1}/{n_chunks} completed.')
+        return self.load()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Fixed-node quadrature kernels of the sheet (2DEG) scattering integrals.
+
+The scattering integrals int_0^1 f(x)/sqrt(1-x^2) dx are transformed with
+x = sin(theta) to the smooth integrals int_0^(pi/2) f(sin(theta)) d(theta),
+which are evaluated with Gauss-Legendre quadrature for all the compositions at
+once. With numba (see _jit) the kernels are compiled into parallel (prange)
+loops over the compositions. Otherwise the same kernel is evaluated with numpy
+broadcasting.
+"""
+import numpy as np
+from ._jit import JIT_ENABLED, njit, prange
+
+# Integrand modes
+SC_INTEGRAL_MODES = {'IFR': 0, 'DIS': 1, 'DIS_Strain': 2, 'DP': 3, 'PE': 4}
+
+@njit()
+def _sc_integrand(mode, model_v1, b, k_F, q_TF_by_2k_F, corr_len, x):
+    """
+    Scattering integrand times sqrt(1-x^2) (see _Mobility2DCarrier._inv_tau_*_f),
+    including the Fang-Howard form factors (_Mobility2DCarrier._form_factor).
+    Works for scalars (numba) and numpy arrays (broadcasting).
+    """
+    # eta(u) = b/(b+2*k_f*u); F(eta) = eta^3; G(eta) = (2*eta^3 + 3*eta^2 + 3*eta) / 8
+    eta = b/(b + 2.0*k_F*x)
+    F_u_ = eta*eta*eta
+    G_u_ = eta*(eta*(2.0*eta+3.0)+3.0)/8.0
+    if mode == 0: # IFR
+        form_factor = G_u_
+        numerator = x**4 * np.exp(-(corr_len * k_F * 0.1 * x)**2)
+    elif mode == 1 or mode == 2: # DIS, DIS_Strain
+        if model_v1:
+            form_factor = 1.0 + 0.0*eta
+            numerator = 1.0 + 0.0*eta
+        else:
+            form_factor = G_u_
+            numerator = F_u_*F_u_
+        if mode == 2: numerator = numerator*x*x
+    else: # DP, PE
+        form_factor = F_u_ if model_v1 else G_u_
+        numerator = x**4 if mode == 3 else x**3*form_factor
+    denominator = x + q_TF_by_2k_F*form_factor
+    return numerator/(denominator*denominator)
+
+@njit(parallel=True)
+def _sc_integrals_jit(mode, model_v1, b, k_F, q_TF_by_2k_F, corr_len, x, w):
+    out = np.empty(b.shape[0])
+    for ii in prange(b.shape[0]):
+        acc = 0.0
+        for jj in range(x.shape[0]):
+            acc += w[jj]*_sc_integrand(mode, model_v1, b[ii], k_F[ii], q_TF_by_2k_F[ii],
+                                       corr_len[ii], x[jj])
+        out[ii] = acc
+    return out
+
+# The numpy kernel broadcasts the python integrand (also complex arrays, which
+# the compiled integrand can not type).
+_sc_integrand_numpy = getattr(_sc_integrand, 'py_func', _sc_integrand)
+
+def _sc_integrals_numpy(mode, model_v1, b, k_F, q_TF_by_2k_F, corr_len, x, w):
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        values = _sc_integrand_numpy(mode, model_v1, b[:, None], k_F[:, None],
+                               q_TF_by_2k_F[:, None], corr_len[:, None], x[None, :])
+    return values @ w
+
+_node_cache = {}
+
+def _gauss_nodes(n_nodes:int):
+    """
+    Gauss-Legendre nodes x = sin(theta) and weights for theta in [0, pi/2].
+    """
+    if n_nodes not in _node_cache:
+        t, w = np.polynomial.legendre.leggauss(n_nodes)
+        _node_cache[n_nodes] = (np.sin((t+1.0)*np.pi/4), w*np.pi/4)
+    return _node_cache[n_nodes]
+
+def _sc_integrals(mechanism:str, model_v1:bool, b, k_F, q_TF_by_2k_F, corr_len,
+                  n_nodes:int=64):
+    """
+    This function calculates the scattering integral of the mechanism for all
+    the points with n_nodes Gauss-Legendre quadrature.
+
+    Parameters
+    ----------
+    mechanism : str ['IFR', 'DIS', 'DIS_Strain', 'DP', 'PE']
+        The scattering mechanism.
+    model_v1 : bool
+        Use the form factors of the 'v1' mobility model.
+    b, k_F, q_TF_by_2k_F : 1D float (or complex) array
+        Fang-Howard parameter, Fermi wave vector (1e6 cm^-1) and q_TF/2k_F
+        of the points.
+    corr_len : float (or complex) or 1D array (unit: nm)
+        Correlation length of the interface roughness (of all or of every point).
+    n_nodes : int, optional
+        Number of quadrature nodes. The default is 64.
+
+    Returns
+    -------
+    (1D float array, 1D float array)
+        Integrals and the absolute error estimates |I(n_nodes) - I(n_nodes/2)|.
+        The error estimate is conservative (it is the error of the n_nodes/2 rule).
+
+    """
+    mode = SC_INTEGRAL_MODES[mechanism]
+    # Complex inputs (complex-step derivatives) are evaluated with the numpy kernel
+    dtype = np.result_type(np.asarray(b), np.asarray(k_F), np.asarray(q_TF_by_2k_F), 
+                           np.asarray(corr_len), float)
+    b = np.ascontiguousarray(b, dtype=dtype)
+    args = (b, np.ascontiguousarray(k_F, dtype=dtype), np.ascontiguousarray(q_TF_by_2k_F, dtype=dtype),
+            np.ascontiguousarray(np.broadcast_to(np.asarray(corr_len, dtype=dtype), b.shape)))
+    integrals = _sc_integrals_jit if JIT_ENABLED and dtype == float else _sc_integrals_numpy
+    value = integrals(mode, bool(model_v1), *args, *_gauss_nodes(n_nodes))
+    value_half = integrals(mode, bool(model_v1), *args, *_gauss_nodes(max(n_nodes//2, 1)))
+    return value, np.abs(value - value_half)
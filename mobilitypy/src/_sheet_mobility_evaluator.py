@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Stateful sheet mobility evaluator that recomputes only the invalidated
+scattering mechanisms.
+"""
+import numpy as np
+from ._mobility_results import MobilityResults
+from ._logging import logger
+
+## ============================================================================
+class SheetMobilityEvaluator:
+    '''
+    The functions in this class evaluate the sheet mobility of a Mobility2DCarrier
+    repeatedly, e.g. in interactive fitting, where typically only one input
+    changes between the calls.
+
+    The scattering rates of every mechanism are cached per composition together
+    with the inputs they depend on (mechanism_dependencies). On evaluate() only
+    the mechanisms whose inputs changed are recomputed. The AP and TOT rates are
+    re-summed (Matthiessen's rule) from the cached rates.
+
+    Changing the compositions, the integration tolerance/backend or the alloy 
+    parameters of the carrier invalidates all the mechanisms. Changes of the 
+    compositions and the integration tolerance/backend are detected automatically.
+    Use invalidate() after modifying the alloy parameters in place.
+    '''
+    # Inputs of the scattering rates (besides the composition, which is fixed).
+    mechanism_dependencies = {'AD': ('n_2d',),
+                              'IFR': ('n_2d', 'rms_roughness', 'corr_len'),
+                              'DIS': ('n_2d', 'n_dis', 'f_dis'),
+                              'DIS_Strain': ('n_2d', 'n_dis'),
+                              'POP': ('n_2d', 'T'),
+                              'DP': ('n_2d', 'T'),
+                              'PE': ('n_2d', 'T')}
+    _input_names = ('n_2d', 'rms_roughness', 'corr_len', 'n_dis', 'f_dis', 'T')
+    _rate_methods = {'AD': '_inv_tau_ado', 'IFR': '_inv_tau_ifr', 'DIS': '_inv_tau_dis',
+                     'DIS_Strain': '_inv_tau_dis_strain', 'POP': '_inv_tau_pop',
+                     'DP': '_inv_tau_dp', 'PE': '_inv_tau_pe'}
+
+    def __init__(self, mobility_2d, alloy_disordered_effect:bool=False,
+                 interface_roughness_effect:bool=False,
+                 dislocation_effect:bool=False,
+                 deformation_potential_effect:bool=False,
+                 piezoelectric_effect:bool=False,
+                 acoustic_phonon_effect:bool=False,
+                 polar_optical_phonon_effect:bool=False,
+                 total_mobility:bool=True,
+                 calculate_total_mobility_only:bool=False,
+                 mobility_model='v2'):
+        """
+        Initiation function of the class SheetMobilityEvaluator.
+
+        Parameters
+        ----------
+        mobility_2d : Mobility2DCarrier
+            The 2D carrier mobility instance.
+        alloy_disordered_effect, ..., mobility_model : optional
+            Effect flags and mobility model. Same as in
+            Mobility2DCarrier.calculate_sheet_mobility().
+
+        Returns
+        -------
+        None.
+
+        """
+        self.mobility_2d = mobility_2d
+        self.effect_flags_ = {'alloy_disordered_effect_': alloy_disordered_effect,
+                              'interface_roughness_effect_': interface_roughness_effect,
+                              'dislocation_effect_': dislocation_effect,
+                              'deformation_potential_effect_': deformation_potential_effect,
+                              'piezoelectric_effect_': piezoelectric_effect,
+                              'acoustic_phonon_effect_': acoustic_phonon_effect,
+                              'polar_optical_phonon_effect_': polar_optical_phonon_effect,
+                              'only_total_mobility': calculate_total_mobility_only,
+                              'total_mobility_': total_mobility,
+                              'mobility_model_': mobility_model}
+        self.base_mechanisms_ = self._base_mechanisms()
+        self.last_recomputed = []
+        self.invalidate()
+
+    def _base_mechanisms(self):
+        """
+        The mechanisms whose scattering rates are calculated (in the order of
+        Matthiessen's rule summation of _Mobility2DCarrier._sheet_sc_rates()).
+        """
+        flags = self.effect_flags_
+        mechanisms = []
+        if flags['alloy_disordered_effect_']: mechanisms.append('AD')
+        if flags['interface_roughness_effect_']: mechanisms.append('IFR')
+        if flags['dislocation_effect_']:
+            mechanisms.append('DIS')
+            if flags['mobility_model_'] == 'v2': mechanisms.append('DIS_Strain')
+        if flags['polar_optical_phonon_effect_']: mechanisms.append('POP')
+        acoustic_pe_first = flags['only_total_mobility'] and flags['acoustic_phonon_effect_']
+        phonon_mechanisms = ['PE', 'DP'] if acoustic_pe_first else ['DP', 'PE']
+        for mechanism in phonon_mechanisms:
+            if flags['acoustic_phonon_effect_'] or \
+                (mechanism == 'DP' and flags['deformation_potential_effect_']) or \
+                    (mechanism == 'PE' and flags['piezoelectric_effect_']):
+                mechanisms.append(mechanism)
+        return mechanisms
+
+    def invalidate(self, mechanisms=None):
+        """
+        Invalidate the cached scattering rates.
+
+        Parameters
+        ----------
+        mechanisms : list of str, optional
+            Mechanisms to invalidate. If None, all the mechanisms are invalidated.
+            The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        if mechanisms is None:
+            self.inputs_ = None
+            self.structure_key_ = None
+            self.sc_rates_ = {}
+            self.sc_rates_err_ = {}
+            self.m_star_by_e_ = None
+        else:
+            for mechanism in mechanisms:
+                self.sc_rates_.pop(mechanism, None)
+                self.sc_rates_err_.pop(mechanism, None)
+
+    def _structure_key(self):
+        mob = self.mobility_2d
+        return (np.asarray(mob.comps_, dtype=float).tobytes(),
+                tuple(sorted(mob.quad_options_.items())),
+                tuple(sorted(mob.integration_backend_.items())))
+
+    def _changed_inputs(self, inputs):
+        if self.inputs_ is None: return set(self._input_names)
+        return {name for name in self._input_names
+                if not np.array_equal(inputs[name], self.inputs_[name])}
+
+    def _set_engine_state(self):
+        for key, value in self.effect_flags_.items():
+            setattr(self.mobility_2d, key, value)
+
+    def evaluate(self, n_2d=10, rms_roughness=0.1, corr_len=1, n_dis=1, f_dis=0.1, T=300,
+                 return_sc_rates:bool=False, return_errors:bool=False,
+                 return_dataframe:bool=True):
+        """
+        This function calculates the sheet mobility. Only the mechanisms that
+        depend on changed inputs (with respect to the previous call) are recomputed.
+        The results are same as Mobility2DCarrier.calculate_sheet_mobility().
+
+        Parameters
+        ----------
+        n_2d, rms_roughness, corr_len, n_dis, f_dis, T : optional
+            Same as in Mobility2DCarrier.calculate_sheet_mobility(). They can be
+            1D arrays (one value per composition), e.g. for per point compositions 
+            and material parameters (carrier of the points, see 
+            _MobilityCarrier._carrier_at_compositions()).
+        return_sc_rates : bool, optional
+            Return the scattering rates values. The default is False.
+        return_errors : bool, optional
+            Return the absolute numerical error estimates of the mobilities.
+            The default is False.
+        return_dataframe : bool, optional
+            Return the results as pandas dataframe. If False, the results are
+            returned as MobilityResults. The default is True.
+
+        Returns
+        -------
+        pandas dataframe (or MobilityResults) with compositions and mobility (unit: cm^2 V^-1 S^-1) columns.
+            See Mobility2DCarrier.calculate_sheet_mobility().
+
+        """
+        self._update_rates(n_2d=n_2d, rms_roughness=rms_roughness, corr_len=corr_len,
+                           n_dis=n_dis, f_dis=f_dis, T=T)
+        mobility = self._assemble(return_sc_rates=return_sc_rates, return_errors=return_errors)
+        return mobility.to_pandas() if return_dataframe else mobility
+
+    def _update_rates(self, n_2d=10, rms_roughness=0.1, corr_len=1, n_dis=1, f_dis=0.1, T=300):
+        """
+        This function recalculates the invalidated scattering rates (sc_rates_,
+        sc_rates_err_, m_star_by_e_) for the inputs without assembling the results.
+        """
+        mob = self.mobility_2d
+        n_comps = len(mob.comps_)
+        inputs = {'n_2d': n_2d, 'rms_roughness': rms_roughness, 'corr_len': corr_len,
+                  'n_dis': n_dis, 'f_dis': f_dis, 'T': T}
+        # Inputs given per composition (row-wise batch calculations)
+        inputs = {name: np.broadcast_to(np.asarray(val, dtype=float), (n_comps,)).copy()
+                  if name == 'n_2d' or np.ndim(val) else val for name, val in inputs.items()}
+        structure_key = self._structure_key()
+        if structure_key != self.structure_key_: self.invalidate()
+        changed = self._changed_inputs(inputs)
+        recompute = [mechanism for mechanism in self.base_mechanisms_
+                     if mechanism not in self.sc_rates_ or
+                     changed.intersection(self.mechanism_dependencies[mechanism])]
+        self._set_engine_state()
+        if recompute or self.m_star_by_e_ is None: self._compute_rates(inputs, recompute)
+        logger.info('Sheet mobility evaluator: changed inputs %s, recomputed %s',
+                    sorted(changed), recompute)
+        self.inputs_ = inputs
+        self.structure_key_ = structure_key
+        self.last_recomputed = recompute
+
+    def _compute_rates(self, inputs, mechanisms):
+        """
+        This function calculates the scattering rates (unit: 10^12 s^-1) and
+        their absolute error estimates of the requested mechanisms for all the
+        compositions.
+        """
+        mob = self.mobility_2d
+        n_comps = len(mob.comps_)
+        rates = {mechanism: np.empty(n_comps) for mechanism in mechanisms}
+        rates_err = {mechanism: np.empty(n_comps) for mechanism in mechanisms}
+        m_star_by_e = np.empty(n_comps)
+        for ii in range(n_comps):
+            composition_inputs = {name: val[ii] if np.ndim(val) else val for name, val in inputs.items()}
+            mob._set_composition_params(mob.alloy_params_, ii, mob.comps_[ii], **composition_inputs)
+            m_star_by_e[ii] = mob.m_star_by_e_
+            mob.sc_rel_err_ = {}
+            for mechanism in mechanisms:
+                rate = getattr(mob, self._rate_methods[mechanism])()
+                rates[mechanism][ii] = rate
+                rates_err[mechanism][ii] = abs(rate)*mob.sc_rel_err_.get(mechanism, 0.0)
+        self.sc_rates_.update(rates)
+        self.sc_rates_err_.update(rates_err)
+        self.m_star_by_e_ = m_star_by_e
+
+    def _assemble(self, return_sc_rates:bool=False, return_errors:bool=False):
+        """
+        This function collects the requested mechanisms from the cached
+        scattering rates (AP and TOT by Matthiessen's rule) and converts them
+        to mobilities.
+        """
+        mob = self.mobility_2d
+        total, total_err = 0, 0
+        for mechanism in self.base_mechanisms_:
+            total = total + self.sc_rates_[mechanism]
+            total_err = total_err + self.sc_rates_err_[mechanism]
+        rates = dict(self.sc_rates_, TOT=total)
+        rates_err = dict(self.sc_rates_err_, TOT=total_err)
+        if 'DP' in rates and 'PE' in rates:
+            rates['AP'] = rates['DP'] + rates['PE'] # 1/tau_AP = 1/tau_DP + 1/tau_PE
+            rates_err['AP'] = rates_err['DP'] + rates_err['PE']
+        mechanisms = mob._sheet_mobility_mechanisms()
+        n_comps = len(mob.comps_)
+        sc_rates = MobilityResults({key: np.broadcast_to(rates[key], (n_comps,))
+                                    for key in mechanisms})
+        sc_rates_err = MobilityResults({key: np.broadcast_to(rates_err[key], (n_comps,))
+                                        for key in mechanisms}) if return_errors else None
+        mobility = mob._sheet_mobility_from_sc_rates(sc_rates, self.m_star_by_e_,
+                                                     return_sc_rates=return_sc_rates,
+                                                     sc_rates_err=sc_rates_err)
+        if return_sc_rates:
+            mobility.attrs['sc_params'] = mob._sc_params(self.inputs_['rms_roughness'], 
+                                                         self.inputs_['n_dis'],
+                                                         self.inputs_['f_dis'], self.inputs_['T'])
+        return mobility
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Bounded nonlinear least squares fitting of the sheet mobility to measured
+(Hall) mobility data.
+"""
+import numpy as np
+from scipy.optimize import least_squares
+from ._mobility_results import MobilityResults
+from ._sheet_mobility_evaluator import SheetMobilityEvaluator
+from ._logging import logger
+
+## ============================================================================
+class _SheetMobilityFit:
+    '''
+    The functions in this class fit the sheet mobility of a single composition
+    to measured mobilities at (n_2d, T) points.
+
+    The forward model reuses everything that does not change during the fit:
+        - The measurement points are grouped by T. Every group has its own
+          SheetMobilityEvaluator (compositions = measurement points), so the
+          T-dependent phonon rates (POP, DP, PE) are calculated only once.
+        - The parameters that enter the scattering rates only as prefactors
+          are applied by scaling the cached rates (no integration):
+              IFR ~ rms_roughness^2, DIS ~ n_dis*f_dis^2, DIS_Strain ~ n_dis,
+              AD ~ alloy_scattering_potential^2,
+              DP ~ CB_deformation_potential^2/(mass_density*LA_phonon_velocity^2),
+              DIS_Strain ~ CB_deformation_potential^2,
+              PE ~ electromechanical_coupling_const (K^2).
+        - corr_len changes only the IFR integral, i.e. only IFR is recalculated.
+        - Other material parameters invalidate all the rates (slow path).
+    '''
+    _prefactor_params = {'rms_roughness': {'IFR': 2},
+                         'n_dis': {'DIS': 1, 'DIS_Strain': 1},
+                         'f_dis': {'DIS': 2},
+                         'alloy_scattering_potential': {'AD': 2},
+                         'CB_deformation_potential': {'DP': 2, 'DIS_Strain': 2},
+                         'mass_density': {'DP': -1},
+                         'LA_phonon_velocity': {'DP': -2},
+                         'electromechanical_coupling_const': {'PE': 1}}
+    _sheet_params = ('rms_roughness', 'corr_len', 'n_dis', 'f_dis')
+
+    def __init__(self, mobility_2d, n_2d, T, mobility, fit_params:dict, sigma=None,
+                 fixed_params:dict=None, effect_flags:dict=None,
+                 integration_backend:str='fixed_node'):
+        if len(mobility_2d.comps_) != 1:
+            raise ValueError('Fitting needs a Mobility2DCarrier with a single composition.')
+        self.n_2d, self.T, self.mobility = np.broadcast_arrays(np.asarray(n_2d, dtype=float),
+                                                               np.asarray(T, dtype=float),
+                                                               np.asarray(mobility, dtype=float))
+        self.n_2d, self.T, self.mobility = self.n_2d.ravel(), self.T.ravel(), self.mobility.ravel()
+        self.sigma = None if sigma is None else \
+            np.broadcast_to(np.asarray(sigma, dtype=float), self.mobility.shape)
+        self.param_names = list(fit_params)
+        self.material_params = [name for name in self.param_names if name not in self._sheet_params]
+        unknown = [name for name in self.material_params if name not in mobility_2d.alloy_params_]
+        if unknown:
+            raise ValueError(f'Requested fitting of {unknown} is not implemented yet. Contact developer.')
+        self.initial, self.lower, self.upper = self._bounds(fit_params)
+        self.fixed_params = {'rms_roughness': 0.1, 'corr_len': 1, 'n_dis': 1, 'f_dis': 0.1}
+        self.fixed_params.update(fixed_params or {})
+        self.material_reference = {name: float(mobility_2d.alloy_params_[name][0])
+                                   for name in self._prefactor_params if name in mobility_2d.alloy_params_}
+        comp = mobility_2d.comps_[0]
+        self.groups = []
+        for temp in np.unique(self.T):
+            members = np.flatnonzero(self.T == temp)
+            carrier = mobility_2d._carrier_at_compositions(np.full(len(members), comp))
+            carrier._set_integration_backend(integration_backend)
+            carrier.disk_cache_ = None
+            self.groups.append((temp, members, carrier,
+                                SheetMobilityEvaluator(carrier, **(effect_flags or {}))))
+        self.base_mechanisms = self.groups[0][3].base_mechanisms_
+        self._rates_key = None
+        self.n_evaluations = 0
+
+    def _bounds(self, fit_params):
+        initial, lower, upper = [], [], []
+        for name in self.param_names:
+            value = fit_params[name]
+            if np.isscalar(value): value = (value, 0, np.inf)
+            if len(value) != 3:
+                raise ValueError(f'fit_params[{name!r}] should be initial value or (initial, lower, upper).')
+            initial.append(float(value[0])); lower.append(float(value[1])); upper.append(float(value[2]))
+        return np.array(initial), np.array(lower), np.array(upper)
+
+    def _params(self, x):
+        params = dict(self.fixed_params)
+        params.update(zip(self.param_names, x))
+        return params
+
+    def _base_rates(self, params):
+        """
+        The scattering rates (10^12 s^-1) of all the points with unit prefactor
+        parameters (rms_roughness = n_dis = f_dis = 1) and the reference material
+        prefactor parameters. Recalculated only if corr_len or the non-prefactor
+        material parameters change.
+        """
+        slow_params = {name: params[name] for name in self.material_params
+                       if name not in self._prefactor_params}
+        key = (params['corr_len'], tuple(slow_params.values()))
+        if key == self._rates_key: return self._rates
+        slow_changed = self._rates_key is None or key[1] != self._rates_key[1]
+        rates = {mechanism: np.empty(len(self.mobility)) for mechanism in self.base_mechanisms}
+        m_star_by_e = np.empty(len(self.mobility))
+        for temp, members, carrier, evaluator in self.groups:
+            if slow_params and slow_changed:
+                for name, value in slow_params.items(): carrier.alloy_params_[name][:] = value
+                evaluator.invalidate()
+            evaluator._update_rates(n_2d=self.n_2d[members], rms_roughness=1.0,
+                                    corr_len=params['corr_len'], n_dis=1.0, f_dis=1.0, T=temp)
+            for mechanism in self.base_mechanisms:
+                rates[mechanism][members] = evaluator.sc_rates_[mechanism]
+            m_star_by_e[members] = evaluator.m_star_by_e_
+        self._rates_key, self._rates = key, (rates, m_star_by_e)
+        return self._rates
+
+    def model(self, x):
+        """
+        This function calculates the total sheet mobility (cm^2 V^-1 S^-1) at the
+        measurement points for the fit parameter values x.
+        """
+        params = self._params(x)
+        rates, m_star_by_e = self._base_rates(params)
+        total = 0.0
+        for mechanism in self.base_mechanisms:
+            factor = 1.0
+            for name, powers in self._prefactor_params.items():
+                if mechanism not in powers: continue
+                if name in self._sheet_params:
+                    factor *= params[name]**powers[mechanism]
+                elif name in params:
+                    factor *= (params[name]/self.material_reference[name])**powers[mechanism]
+            total = total + factor*rates[mechanism]
+        self.n_evaluations += 1
+        return self.groups[0][2]._mobility_calculator(total, m_star_by_e)
+
+    def residuals(self, x):
+        scale = self.mobility if self.sigma is None else self.sigma
+        return (self.model(x) - self.mobility)/scale
+
+    def fit(self, **least_squares_options):
+        """
+        This function runs the bounded least squares fit (scipy.optimize.least_squares,
+        trust region reflective).
+
+        Returns
+        -------
+        dict
+            See Mobility2DCarrier.fit_sheet_mobility().
+
+        """
+        options = {'x_scale': 'jac'}
+        options.update(least_squares_options)
+        solution = least_squares(self.residuals, self.initial, bounds=(self.lower, self.upper),
+                                 **options)
+        n_data, n_params = len(self.mobility), len(self.param_names)
+        chi2 = float(np.sum(solution.fun**2))
+        # Covariance from the Jacobian at the solution. Without sigma the residuals
+        # are relative and the covariance is scaled with the reduced chi^2.
+        jac = solution.jac
+        covariance = np.linalg.pinv(jac.T @ jac)
+        if self.sigma is None:
+            covariance *= chi2/max(n_data - n_params, 1)
+        uncertainties = np.sqrt(np.diag(covariance))
+        model = self.model(solution.x)
+        logger.info('Sheet mobility fit: %s, chi2 = %.4g, %d model evaluations',
+                    solution.message, chi2, self.n_evaluations)
+        mobility = MobilityResults({'n_2d': self.n_2d, 'T': self.T, 'mu_measured': self.mobility,
+                                    'mu_fit': model})
+        return {'params': dict(zip(self.param_names, solution.x.tolist())),
+                'uncertainties': dict(zip(self.param_names, uncertainties.tolist())),
+                'covariance': covariance, 'param_names': self.param_names,
+                'chi2': chi2, 'residuals': solution.fun, 'mobility': mobility,
+                'success': bool(solution.success), 'message': solution.message,
+                'n_evaluations': self.n_evaluations}
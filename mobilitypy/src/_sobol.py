@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+Variance based global sensitivity analysis (Sobol indices) of the mobilities
+with respect to the model inputs and material database parameters.
+"""
+import numpy as np
+from ._mobility_results import MobilityResults
+from ._design_sampler import DesignSampler
+
+## ============================================================================
+class _SobolSensitivity:
+    '''
+    The functions in this class estimate the first order (S1) and total order
+    (ST) Sobol indices of the mobilities with respect to k inputs, uniformly
+    (or log-uniformly) distributed in the given ranges.
+
+    Saltelli sampling: two independent sample matrices A and B (N x k, scrambled
+    Sobol sequence of dimension 2k) and k matrices AB_i (A with column i from B),
+    i.e. N(k+2) model evaluations per point. Estimators (Saltelli et al. 2010,
+    Comput. Phys. Commun. 181, 259; Jansen 1999 for ST):
+        S1_i = mean(f(B)*(f(AB_i) - f(A)))/V
+        ST_i = mean((f(A) - f(AB_i))^2)/(2V)
+    with V the variance of f(A) and f(B). The values are shifted by the mean of
+    the first chunk before the accumulation (reduces the roundoff, does not
+    change the expectation values).
+
+    The base samples are evaluated in chunks. The (k+2)*chunk_size samples of all
+    the points (compositions/carrier densities) are calculated in a single call of
+    the mobility engine (see _MobilityCarrier._calculate_at_points). Only the
+    running sums are kept between the chunks. Samples with non-finite
+    mobilities are left out (per point and column).
+    '''
+    def __init__(self, carrier, calculate_name:str, density_name:str, density,
+                 param_ranges:dict, input_names, calculate_kwargs:dict,
+                 n_samples:int=1024, log_scale=(), chunk_size:int=256, seed=None):
+        """
+        Parameters
+        ----------
+        carrier : Mobility2DCarrier or Mobility3DCarrier
+            The mobility instance.
+        calculate_name : str
+            The mobility method of the carrier, e.g. 'calculate_sheet_mobility'.
+        density_name : str
+            Name of the carrier density input ('n_2d' or 'n_3d').
+        density : float or 1D float array
+            Carrier densities (broadcasted with the compositions). Not used if
+            the density is one of the sampled inputs.
+        param_ranges : dict
+            {input: (low, high)}. The input is the carrier density, one of
+            input_names or a material database parameter '<material>:<parameter>'
+            (e.g. 'AlN:carrier_effective_mass', 'AlGaN:alloy_scattering_potential'
+            for bowing parameters).
+        input_names : sequence of str
+            The scalar inputs of the mobility method that can be sampled.
+        calculate_kwargs : dict
+            Other inputs and effect flags of the mobility method. The sampled
+            inputs are removed.
+        n_samples : int, optional
+            Number of base samples N (rounded up to a power of 2). The default is 1024.
+        log_scale : sequence of str, optional
+            Inputs sampled log-uniformly. The default is ().
+        chunk_size : int, optional
+            Number of base samples evaluated in one call (rounded up to a
+            power of 2). The default is 256.
+        seed : int or numpy Generator, optional
+            Seed of the Sobol sequence scrambling. The default is None.
+        """
+        self.carrier = carrier
+        self.calculate_name = calculate_name
+        self.density_name = density_name
+        self.param_names = list(param_ranges)
+        for name in self.param_names:
+            if ':' in name:
+                carrier._check_material_param(name)
+            elif name != density_name and name not in input_names:
+                raise ValueError(f'Requested sensitivity to {name} is not implemented yet. Contact developer.')
+        self.design = DesignSampler(param_ranges, log_scale=log_scale) # ranges -> values
+        self.calculate_kwargs = {name: val for name, val in calculate_kwargs.items()
+                                 if name not in param_ranges}
+        self.n_samples = 1 << max(int(np.ceil(np.log2(max(n_samples, 2)))), 1)
+        self.chunk_size = min(1 << max(int(np.ceil(np.log2(max(chunk_size, 1)))), 0), self.n_samples)
+        from scipy.stats import qmc # scipy.stats is slow to import
+        self.sampler = qmc.Sobol(2*len(self.param_names), scramble=True, seed=seed)
+        comps = np.asarray(carrier.comps_, dtype=float)
+        if density_name in param_ranges:
+            self.comps, self.density = comps.ravel(), None
+        else:
+            comps, density = np.broadcast_arrays(comps, np.asarray(density, dtype=float))
+            self.comps, self.density = comps.ravel(), density.ravel()
+
+    def _evaluate(self, samples):
+        """
+        The mobilities (MobilityResults, sample-major rows) of the unit cube
+        samples (2D array (n_samples, k)) at all the points.
+        """
+        n_points, n_samples = len(self.comps), len(samples)
+        values = self.design.scale(samples)
+        points = {'comp': np.tile(self.comps, n_samples)}
+        if self.density is not None: points[self.density_name] = np.tile(self.density, n_samples)
+        for ii, name in enumerate(self.param_names):
+            points[name] = np.repeat(values[:, ii], n_points)
+        return self.carrier._calculate_at_points(self.calculate_name, self.density_name, points,
+                                                 **self.calculate_kwargs)
+
+    def run(self):
+        """
+        This function evaluates the Saltelli samples and estimates the indices.
+
+        Returns
+        -------
+        MobilityResults
+            One row per point: 'comp', the carrier density (if not sampled) and
+            for every result column c and input p, '<c>_S1_<p>' and '<c>_ST_<p>'
+            (e.g. 'TOT_S1_rms_roughness'). attrs has 'n_samples' (N),
+            'n_evaluations' (N(k+2) per point) and 'sampled_params'.
+
+        """
+        k, n_points = len(self.param_names), len(self.comps)
+        sums = None
+        n_done = 0
+        while n_done < self.n_samples:
+            base = self.sampler.random(self.chunk_size)
+            A, B = base[:, :k], base[:, k:]
+            AB = np.repeat(A[None], k, axis=0)
+            AB[np.arange(k), :, np.arange(k)] = B.T
+            results = self._evaluate(np.concatenate([A, B, AB.reshape(-1, k)]))
+            if sums is None:
+                columns = [key for key in results.columns if key != 'comp']
+                sums = {key: None for key in columns}
+            for key in sums:
+                f = results[key].reshape(k + 2, self.chunk_size, n_points)
+                sums[key] = self._accumulate(sums[key], f[0], f[1], f[2:])
+            n_done += self.chunk_size
+            self.carrier.logger_.info('Sobol indices: %d/%d base samples', n_done, self.n_samples)
+        summary = MobilityResults({'comp': self.comps},
+                                  attrs={'n_samples': n_done, 'n_evaluations': n_done*(k + 2),
+                                         'sampled_params': self.param_names})
+        if self.density is not None: summary[self.density_name] = self.density
+        for key, acc in sums.items():
+            with np.errstate(divide='ignore', invalid='ignore'):
+                count = acc['count']
+                variance = acc['sum_sq']/(2*count) - (acc['sum']/(2*count))**2
+                for ii, name in enumerate(self.param_names):
+                    summary[f'{key}_S1_{name}'] = acc['first'][ii]/count/variance
+                    summary[f'{key}_ST_{name}'] = acc['total'][ii]/(2*count)/variance
+        return summary
+
+    @staticmethod
+    def _accumulate(acc, fA, fB, fAB):
+        """
+        Adds the sums of a chunk. fA, fB: (n_samples, n_points), fAB:
+        (k, n_samples, n_points).
+        """
+        valid = np.isfinite(fA) & np.isfinite(fB) & np.all(np.isfinite(fAB), axis=0)
+        if acc is None:
+            with np.errstate(invalid='ignore'):
+                shift = np.nanmean(np.where(valid, 0.5*(fA + fB), np.nan), axis=0)
+            acc = {'shift': np.where(np.isfinite(shift), shift, 0.0), 'count': 0, 'sum': 0.0,
+                   'sum_sq': 0.0, 'first': 0.0, 'total': 0.0}
+        fA, fB = np.where(valid, fA - acc['shift'], 0.0), np.where(valid, fB - acc['shift'], 0.0)
+        fAB = np.where(valid, fAB - acc['shift'], 0.0)
+        acc['count'] = acc['count'] + valid.sum(axis=0)
+        acc['sum'] = acc['sum'] + (fA + fB).sum(axis=0)
+        acc['sum_sq'] = acc['sum_sq'] + (fA**2 + fB**2).sum(axis=0)
+        acc['first'] = acc['first'] + (fB*(fAB - fA)).sum(axis=1)
+        acc['total'] = acc['total'] + ((fA - fAB)**2).sum(axis=1)
+        return acc
@@ -1,4 +1,9 @@
-from ._plot_fns import _plot_mobilities
-
 ## ==============================================================================
-__all__ = ['_plot_mobilities']
\ No newline at end of file
+__all__ = ['_plot_mobilities']
+
+def __getattr__(name):
+    # The plotting modules pull in matplotlib. They are imported lazily on first access.
+    if name == '_plot_mobilities':
+        from ._plot_fns import _plot_mobilities
+        return _plot_mobilities
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
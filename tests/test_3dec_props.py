@@ -0,0 +1,23 @@
+"""
+Effective properties of a 3D carrier distribution.
+"""
+import logging
+import numpy as np
+from mobilitypy import Mobility3DCarrier
+
+def test_3dec_props_array_and_table(capsys, monkeypatch):
+    monkeypatch.setattr(logging.getLogger(), 'handlers', [])
+    mob = Mobility3DCarrier(compositions=0.5, print_log='low')
+    position = np.linspace(0, 10, 21)
+    n_3d = 1 + np.sin(np.pi*position/10)
+    mobility = mob.calculate_3D_mobility(n_3d=n_3d, alloy_disordered_effect=True,
+                                         ionized_impurity_effect=True)
+    capsys.readouterr()
+    density, average_mu, sheet_resistance = mob.calculate_3DEC_props(
+        n_3d, mobility['mu_TOT'].to_numpy(), position)
+    assert 'ave_mu' in capsys.readouterr().out
+    table_density, table_mu, table_resistance = mob.calculate_3DEC_props(n_3d, mobility, position)
+    assert density == table_density
+    np.testing.assert_allclose(average_mu, table_mu['mu_TOT'], rtol=1e-14)
+    np.testing.assert_allclose(sheet_resistance, table_resistance['mu_TOT'], rtol=1e-14)
+    np.testing.assert_allclose(density, np.trapezoid(n_3d, position)*1e-2, rtol=1e-14)
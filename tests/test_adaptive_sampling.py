@@ -0,0 +1,20 @@
+"""
+Adaptive sampling refines on the total mobility by default.
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+
+EFFECTS = dict(n_2d=10, alloy_disordered_effect=True, acoustic_phonon_effect=True,
+               interface_roughness_effect=True, polar_optical_phonon_effect=True,
+               return_dataframe=False)
+
+def test_default_columns_total_mobility():
+    mob = Mobility2DCarrier(compositions=np.array([0.5]))
+    default = mob.adaptive_sheet_mobility({'comp': (0, 1)}, **EFFECTS)
+    total = mob.adaptive_sheet_mobility({'comp': (0, 1)}, columns=['TOT'], **EFFECTS)
+    assert default.attrs['n_evaluations'] == total.attrs['n_evaluations']
+    np.testing.assert_array_equal(default['TOT'], total['TOT'])
+    # The alloy disorder mobility diverges at the binaries
+    every = mob.adaptive_sheet_mobility({'comp': (0, 1)}, columns=['AD', 'IFR', 'POP', 'AP', 'TOT'],
+                                        **EFFECTS)
+    assert default.attrs['n_evaluations'] < every.attrs['n_evaluations']
@@ -0,0 +1,61 @@
+"""
+Future-returning and asyncio mobility calculations.
+"""
+import sys
+import asyncio
+import threading
+import subprocess
+import numpy as np
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from mobilitypy import Mobility2DCarrier, Mobility3DCarrier
+
+COMPS = np.linspace(0.5, 0.95, 12)
+KWARGS = dict(n_2d=np.linspace(5, 15, 12), alloy_disordered_effect=True,
+              interface_roughness_effect=True, polar_optical_phonon_effect=True)
+
+@pytest.mark.parametrize('executor', ['thread', 'process'])
+def test_submit_sheet_mobility_equals_direct(executor):
+    mob = Mobility2DCarrier(compositions=COMPS)
+    reference = mob.calculate_sheet_mobility(**KWARGS)
+    future = mob.submit_sheet_mobility(executor=executor, chunk_size=5, **KWARGS)
+    np.testing.assert_array_equal(future.result(timeout=120), reference)
+    results = mob.submit_sheet_mobility(**KWARGS, return_dataframe=False).result(timeout=120)
+    np.testing.assert_array_equal(results['TOT'], reference['TOT'])
+
+def test_chunked_future_cancel():
+    mob = Mobility2DCarrier(compositions=COMPS)
+    release = threading.Event()
+    with ThreadPoolExecutor(1) as executor:
+        blocker = executor.submit(release.wait) # the chunks stay queued
+        future = mob.submit_sheet_mobility(executor=executor, chunk_size=3, **KWARGS)
+        assert len(future._chunk_futures) == 4
+        assert future.cancel() and future.cancelled()
+        assert all(chunk.cancelled() for chunk in future._chunk_futures)
+        release.set()
+    assert blocker.done()
+    with pytest.raises(TypeError):
+        mob.submit_sheet_mobility(not_an_input=1)
+
+def test_async_gather():
+    mob = Mobility2DCarrier(compositions=COMPS)
+    mob3d = Mobility3DCarrier(compositions=np.array([0.2, 0.4, 0.6]))
+    kwargs_3d = dict(n_3d=np.array([1., 2, 3]), polar_optical_phonon_effect=True)
+    async def main():
+        return await asyncio.gather(*[mob.calculate_sheet_mobility_async(T=T, **KWARGS)
+                                      for T in (200, 300, 400)],
+                                    mob3d.calculate_3D_mobility_async(**kwargs_3d))
+    *results, results_3d = asyncio.run(main())
+    for T, result in zip((200, 300, 400), results):
+        np.testing.assert_array_equal(result, mob.calculate_sheet_mobility(T=T, **KWARGS))
+    np.testing.assert_array_equal(results_3d, mob3d.calculate_3D_mobility(**kwargs_3d))
+
+def test_async_jobs_imported_on_first_use():
+    code = ('import sys, numpy, mobilitypy; print(*[name in sys.modules for name in '
+            '("asyncio", "mobilitypy.src._async_jobs")]); '
+            'mob = mobilitypy.Mobility2DCarrier(compositions=numpy.array([0.3])); '
+            'mob.submit_sheet_mobility(n_2d=10).result(); '
+            'print("mobilitypy.src._async_jobs" in sys.modules)')
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, 
+                         check=True, timeout=120)
+    assert out.stdout.split() == ['False', 'False', 'True']
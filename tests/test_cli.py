@@ -0,0 +1,68 @@
+"""
+'mobilitypy run': sweep specification files, chunked result store and resume.
+"""
+import json
+import numpy as np
+from mobilitypy import Mobility2DCarrier, ResultStore
+from mobilitypy.cli import main
+from mobilitypy.src._batch_runner import _BatchRunner
+
+SPEC = {'carrier': {'type': '2d', 'compositions': [0.2, 0.5]},
+        'inputs': {'rms_roughness': 0.3},
+        'sweep': {'grid': {'n_2d': [5, 10], 'T': {'start': 300, 'stop': 400, 'num': 2}}},
+        'effects': {'interface_roughness_effect': True, 'alloy_disordered_effect': True},
+        'run': {'workers': 1, 'chunk_size': 2}}
+
+def _spec_file(tmp_path):
+    spec_file = tmp_path / 'sweep.json'
+    spec_file.write_text(json.dumps(SPEC))
+    return str(spec_file)
+
+def _sorted_rows(results):
+    order = np.lexsort((results['n_2d'], results['T'], results['comp']))
+    return {key: results[key][order] for key in ('comp', 'n_2d', 'T', 'TOT')}
+
+def _reference():
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.5]))
+    rows = {'comp': [], 'n_2d': [], 'T': [], 'TOT': []}
+    for n_2d in [5., 10.]:
+        for T in [300., 400.]:
+            mu = mob.calculate_sheet_mobility(n_2d=n_2d, T=T, rms_roughness=0.3,
+                                              **SPEC['effects'], return_dataframe=False)
+            rows['comp'].extend(mu['comp']); rows['TOT'].extend(mu['TOT'])
+            rows['n_2d'].extend([n_2d]*2); rows['T'].extend([T]*2)
+    return _sorted_rows({key: np.array(val) for key, val in rows.items()})
+
+def test_cli_run_resume(tmp_path, monkeypatch):
+    spec_file, store_dir = _spec_file(tmp_path), str(tmp_path / 'store')
+    evaluate_chunk = _BatchRunner.evaluate_chunk
+    calls = []
+    def interrupted(self, chunk_id):
+        calls.append(chunk_id)
+        if len(calls) == 3: raise KeyboardInterrupt
+        return evaluate_chunk(self, chunk_id)
+    monkeypatch.setattr(_BatchRunner, 'evaluate_chunk', interrupted)
+    assert main(['run', spec_file, '-o', store_dir, '-q']) == 130
+    assert ResultStore(store_dir).completed_chunks() == [0, 1]
+    calls.clear()
+    monkeypatch.setattr(_BatchRunner, 'evaluate_chunk', lambda self, chunk_id:
+                        calls.append(chunk_id) or evaluate_chunk(self, chunk_id))
+    assert main(['run', spec_file, '-o', store_dir, '-q']) == 0
+    assert calls == [2, 3] # only the missing chunks
+    results = _sorted_rows(ResultStore(store_dir).load())
+    for key, val in _reference().items():
+        np.testing.assert_allclose(results[key], val, rtol=1e-12, err_msg=key)
+
+def test_cli_run_workers(tmp_path):
+    spec_file = _spec_file(tmp_path)
+    assert main(['run', spec_file, '-o', str(tmp_path / 'store'), '-w', '2', '-q']) == 0
+    results = _sorted_rows(ResultStore(str(tmp_path / 'store')).load())
+    np.testing.assert_allclose(results['TOT'], _reference()['TOT'], rtol=1e-12)
+
+def test_cli_changed_spec(tmp_path, capsys):
+    spec_file, store_dir = _spec_file(tmp_path), str(tmp_path / 'store')
+    assert main(['run', spec_file, '-o', store_dir, '-q']) == 0
+    spec = dict(SPEC, inputs={'rms_roughness': 0.4})
+    (tmp_path / 'sweep.json').write_text(json.dumps(spec))
+    assert main(['run', spec_file, '-o', store_dir, '-q']) == 1
+    assert 'different sweep' in capsys.readouterr().err
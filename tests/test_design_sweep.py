@@ -0,0 +1,44 @@
+"""
+Design of experiments sweeps of the sheet mobility.
+"""
+import numpy as np
+import pytest
+from mobilitypy import Mobility2DCarrier, DesignSampler
+
+EFFECTS = dict(alloy_disordered_effect=True, interface_roughness_effect=True,
+               dislocation_effect=True, polar_optical_phonon_effect=True)
+
+@pytest.mark.parametrize('method', ['sobol', 'halton', 'lhs', 'random'])
+def test_design_sampler_ranges_and_chunks(method):
+    design = DesignSampler({'a': (0, 1), 'b': (1, 100)}, n_points=64, method=method,
+                           log_scale=['b'], seed=4)
+    points = design.points()
+    assert points['a'].min() >= 0 and points['a'].max() <= 1
+    assert points['b'].min() >= 1 and points['b'].max() <= 100
+    np.testing.assert_array_equal(np.concatenate([design.points(0, 20)['b'], 
+                                                  design.points(20, 64)['b']]), points['b'])
+
+def test_design_sweep_rows_match_direct_calculation():
+    mob = Mobility2DCarrier(compositions=np.array([0.3, 0.7]))
+    sweep = mob.design_sweep({'comp': (0.5, 1), 'n_2d': (1, 20), 'T': (200, 500),
+                              'n_dis': (0.1, 10), 'AlGaN:alloy_scattering_potential': (0.5, 2)},
+                             n_points=64, log_scale=['n_dis'], chunk_size=16, **EFFECTS)
+    assert len(sweep) == 64
+    np.testing.assert_array_equal(sweep['design_point'], np.arange(64))
+    for row in (sweep.iloc[3], sweep.iloc[42]):
+        potential = row['AlGaN:alloy_scattering_potential']
+        mob_row = Mobility2DCarrier(compositions=row['comp'], use_mat_params={
+            'AlGaN': {'alloy_scattering_potential': potential}})
+        mob_row.set_integration_backend('fixed_node')
+        reference = mob_row.calculate_sheet_mobility(n_2d=row['n_2d'], T=row['T'], 
+                                                     n_dis=row['n_dis'], **EFFECTS)
+        np.testing.assert_allclose(row['TOT'], reference['TOT'].iloc[0], rtol=1e-10)
+
+def test_design_sweep_resume(tmp_path):
+    mob = Mobility2DCarrier(compositions=0.3)
+    kwargs = dict(n_points=40, chunk_size=16, store=tmp_path/'store', **EFFECTS)
+    first = mob.design_sweep({'T': (200, 500)}, **kwargs)
+    resumed = mob.design_sweep({'T': (200, 500)}, **kwargs)
+    np.testing.assert_array_equal(resumed, first)
+    with pytest.raises(ValueError):
+        mob.design_sweep({'T': (200, 400)}, **kwargs)
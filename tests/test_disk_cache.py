@@ -0,0 +1,84 @@
+"""
+Opt-in disk cache of the mobility calculations: hits and LRU eviction.
+"""
+import os
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+from mobilitypy.src._disk_cache import _DiskCache
+
+EFFECTS = dict(interface_roughness_effect=True, alloy_disordered_effect=True)
+
+def _counting_carrier(monkeypatch, cache_dir):
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    mob.enable_disk_cache(cache_dir)
+    calls = []
+    calculate = mob._calculate_sheet_mobility
+    def counting(**kwargs):
+        calls.append(kwargs)
+        return calculate(**kwargs)
+    monkeypatch.setattr(mob, '_calculate_sheet_mobility', counting)
+    return mob, calls
+
+def test_disk_cache_hit(tmp_path, monkeypatch):
+    mob, calls = _counting_carrier(monkeypatch, tmp_path)
+    first = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    second = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    assert len(calls) == 1
+    np.testing.assert_array_equal(first, second)
+    # Shared between instances (and processes) through the directory
+    other, other_calls = _counting_carrier(monkeypatch, tmp_path)
+    np.testing.assert_array_equal(other.calculate_sheet_mobility(n_2d=10, **EFFECTS), first)
+    assert not other_calls
+
+def test_disk_cache_key_covers_inputs(tmp_path, monkeypatch):
+    mob, calls = _counting_carrier(monkeypatch, tmp_path)
+    mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    mob.calculate_sheet_mobility(n_2d=11, **EFFECTS)
+    mob.calculate_sheet_mobility(n_2d=10, interface_roughness_effect=True)
+    mob.alloy_params_['alloy_scattering_potential'] = 1.5*mob.alloy_params_['alloy_scattering_potential']
+    mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    mob.set_integration_backend('fixed_node')
+    mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    assert len(calls) == 5
+
+def test_disk_cache_eviction(tmp_path):
+    cache = _DiskCache(tmp_path, max_size_mb=0.05)
+    value = np.zeros(2000) # ~16 kB per entry
+    keys = [cache._make_key('test', ii) for ii in range(8)]
+    for ii, key in enumerate(keys):
+        cache._set(key, value + ii)
+        os.utime(cache._file_path(key), (ii, ii)) # deterministic LRU clock
+    assert cache.size() <= cache.max_size_bytes
+    hits = [cache._get(key)[0] for key in keys]
+    assert hits[-1] and not hits[0]
+    assert hits == sorted(hits) # the least recently used entries are evicted
+    hit, cached = cache._get(keys[-1])
+    np.testing.assert_array_equal(cached, value + 7)
+    cache.clear()
+    assert cache.size() == 0
+
+def test_disk_cache_database_digest_reused(tmp_path, monkeypatch):
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    cache = mob.enable_disk_cache(tmp_path)
+    snapshots = []
+    snapshot = _DiskCache._database_snapshot
+    monkeypatch.setattr(_DiskCache, '_database_snapshot',
+                        staticmethod(lambda: snapshots.append(1) or snapshot()))
+    for n_2d in (10, 11, 10):
+        mob.calculate_sheet_mobility(n_2d=n_2d, **EFFECTS)
+    assert not snapshots
+    digest = cache.database_digest_
+    assert cache._refresh_database_digest() == digest and len(snapshots) == 1
+
+def test_disk_cache_scans_only_over_budget(tmp_path, monkeypatch):
+    cache = _DiskCache(tmp_path, max_size_mb=0.05)
+    walks = []
+    walk = os.walk
+    monkeypatch.setattr(os, 'walk', lambda *args, **kwargs: walks.append(1) or walk(*args, **kwargs))
+    value = np.zeros(2000) # ~16 kB per entry
+    for ii in range(3):
+        cache._set(cache._make_key('test', ii), value + ii)
+    assert not walks
+    cache._set(cache._make_key('test', 3), value)
+    assert walks and cache.size() <= cache.max_size_bytes
+    assert cache._total_size == cache.size()
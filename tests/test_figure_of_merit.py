@@ -0,0 +1,42 @@
+"""
+Figure-of-merit registry and vectorized figure-of-merit maps.
+"""
+import numpy as np
+import pytest
+from mobilitypy import Mobility2DCarrier, register_figure_of_merit
+
+EFFECTS = dict(alloy_disordered_effect=True, polar_optical_phonon_effect=True)
+
+def test_figure_of_merit_broadcasting():
+    comps, n_2d, T = np.linspace(0.1, 0.9, 5), np.array([5, 10, 15.]), np.array([200, 300, 400.])
+    mob = Mobility2DCarrier(compositions=comps)
+    mobility = np.random.default_rng(0).uniform(100, 1000, (5, 3, 3))
+    fom = mob.calculate_figure_of_merit(n_2d[None, :, None], mobility, temp=T, 
+                                        T_corect_bandgap=True)
+    for jj in range(3):
+        for kk in range(3):
+            np.testing.assert_allclose(fom[:, jj, kk], mob.calculate_figure_of_merit(
+                np.full(5, n_2d[jj]), mobility[:, jj, kk], temp=T[kk], T_corect_bandgap=True),
+                rtol=1e-12)
+
+def test_figure_of_merit_map():
+    mob = Mobility2DCarrier(compositions=np.linspace(0.1, 0.9, 5))
+    mobility = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    table = mob.figure_of_merit_map(mobility)
+    for mode in ('LFOM', 'BFOM', 'BHFFOM'):
+        np.testing.assert_allclose(table[mode], mob.calculate_figure_of_merit(
+            10, mobility['TOT'].to_numpy(), mode=mode), rtol=1e-12)
+    np.testing.assert_allclose(table['sheet_resistance'], mob.calculate_sheet_resitance(
+        10, mobility['TOT'].to_numpy()), rtol=1e-12)
+
+def test_register_figure_of_merit():
+    @register_figure_of_merit('test_mu_Eg', unit='V/s')
+    def mobility_bandgap(n_2d, mobility, bandgap, alloy_params, direct_bandgap):
+        return mobility*bandgap
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    mobility = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    table = mob.figure_of_merit_map(mobility, modes=['test_mu_Eg'], return_dataframe=False)
+    np.testing.assert_allclose(table['test_mu_Eg'], table['mobility']*table['bandgap'])
+    assert table.attrs['units']['test_mu_Eg'] == 'V/s'
+    with pytest.raises(ValueError):
+        mob.calculate_figure_of_merit(10, mobility['TOT'].to_numpy(), mode='not_a_fom')
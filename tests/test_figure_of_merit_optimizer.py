@@ -0,0 +1,58 @@
+"""
+Constrained figure-of-merit optimisation.
+"""
+import numpy as np
+import pytest
+from mobilitypy import Mobility2DCarrier
+
+EFFECTS = dict(alloy_disordered_effect=True, interface_roughness_effect=True,
+               acoustic_phonon_effect=True, polar_optical_phonon_effect=True)
+
+def _grid_optimum(min_bandgap):
+    comps, n_2d = np.meshgrid(np.linspace(0.5, 1, 101), np.linspace(1, 20, 96))
+    comps, n_2d = comps.ravel(), n_2d.ravel()
+    mob = Mobility2DCarrier(compositions=comps)
+    mob.set_integration_backend('fixed_node')
+    mobility = mob.calculate_sheet_mobility(n_2d=n_2d, return_dataframe=False, **EFFECTS)['TOT']
+    lfom = mob.calculate_figure_of_merit(n_2d, mobility)
+    lfom[mob.alloy_params_['bandgap'] < min_bandgap] = -np.inf
+    return lfom.max()
+
+def test_optimizer_respects_bandgap_constraint():
+    mob = Mobility2DCarrier(compositions=0.7)
+    optimum = mob.optimize_figure_of_merit({'comp': (0.5, 1), 'n_2d': (1, 20)},
+                                           constraints={'bandgap': (5.2, None)}, **EFFECTS)
+    assert optimum['success']
+    assert optimum['bandgap'] >= 5.2
+    assert 0.5 <= optimum['x']['comp'] <= 1 and 1 <= optimum['x']['n_2d'] <= 20
+    assert optimum['LFOM'] >= _grid_optimum(5.2)*(1 - 1e-3)
+    evaluations = optimum['evaluations']
+    feasible = evaluations['feasible'].astype(bool)
+    assert np.all(evaluations['bandgap'][feasible] >= 5.2)
+    # the mobility is only calculated at the points within the bandgap constraint
+    assert optimum['n_evaluations'] == np.isfinite(evaluations['mobility']).sum()
+
+def test_optimizer_sheet_resistance_upper_bound():
+    mob = Mobility2DCarrier(compositions=0.7)
+    optimum = mob.optimize_figure_of_merit({'comp': (0.5, 1), 'n_2d': (1, 20)},
+                                           objective='sheet_resistance',
+                                           constraints={'n_2d': (None, 12)}, **EFFECTS)
+    assert optimum['x']['n_2d'] <= 12
+    assert optimum['value'] == optimum['sheet_resistance']
+
+def test_optimizer_direct_bandgap_sets_lfom():
+    mob = Mobility2DCarrier(compositions=0.3)
+    optimum = mob.optimize_figure_of_merit({'n_2d': (1, 20)}, direct_bandgap=False,
+                                           n_coarse=8, max_iter=5, **EFFECTS)
+    lfom = mob.calculate_figure_of_merit(optimum['x']['n_2d'], optimum['mobility'],
+                                         direct_bandgap=False)
+    np.testing.assert_allclose(optimum['LFOM'], lfom, rtol=1e-12)
+
+def test_optimizer_unknown_names_list_allowed():
+    mob = Mobility2DCarrier(compositions=0.3)
+    for kwargs, allowed in (({'objective': 'BFOM'}, "'sheet_resistance'"),
+                            ({'constraints': {'gap': (5, None)}}, "'bandgap'")):
+        with pytest.raises(ValueError, match=allowed):
+            mob.optimize_figure_of_merit({'n_2d': (1, 20)}, **kwargs)
+    with pytest.raises(ValueError, match="'rms_roughness'"):
+        mob.optimize_figure_of_merit({'thickness': (1, 20)})
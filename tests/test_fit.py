@@ -0,0 +1,34 @@
+"""
+Least squares fit of the sheet mobility to measured mobilities.
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+
+EFFECTS = dict(interface_roughness_effect=True, dislocation_effect=True,
+               acoustic_phonon_effect=True, polar_optical_phonon_effect=True,
+               alloy_disordered_effect=True)
+
+def test_fit_recovers_known_parameters():
+    true_params = dict(rms_roughness=0.35, corr_len=2.5, n_dis=3.0)
+    n_2d = np.r_[np.linspace(2, 20, 8), np.full(8, 10.)]
+    T = np.r_[np.full(8, 300.), np.linspace(80, 500, 8)]
+    mob = Mobility2DCarrier(compositions=0.25)
+    mob.set_integration_backend('fixed_node')
+    mobility = np.array([mob.calculate_sheet_mobility(n_2d=n_2d[ii], T=T[ii], **true_params,
+                                                      **EFFECTS)['TOT'].iloc[0] 
+                         for ii in range(len(n_2d))])
+    fit = mob.fit_sheet_mobility(n_2d, T, mobility, {'rms_roughness': (0.1, 0.01, 2),
+                                                     'corr_len': (1, 0.1, 20),
+                                                     'n_dis': (1, 0.01, 100)}, **EFFECTS)
+    assert fit['success']
+    for name, value in true_params.items():
+        np.testing.assert_allclose(fit['params'][name], value, rtol=1e-3)
+        assert np.isfinite(fit['uncertainties'][name])
+
+def test_effect_flag_names_match_calculate_signatures():
+    import inspect
+    from mobilitypy import Mobility3DCarrier
+    for carrier, calculate in ((Mobility2DCarrier, 'calculate_sheet_mobility'),
+                               (Mobility3DCarrier, 'calculate_3D_mobility')):
+        params = inspect.signature(getattr(carrier, calculate)).parameters
+        assert set(carrier._effect_flag_names) <= set(params)
@@ -0,0 +1,70 @@
+"""
+Complex-step Jacobians of the sheet mobility against central finite differences.
+"""
+import numpy as np
+import pytest
+from mobilitypy import Mobility2DCarrier, Mobility3DCarrier
+from mobilitypy.src import _sheet_kernels
+
+EFFECTS = dict(interface_roughness_effect=True, dislocation_effect=True,
+               deformation_potential_effect=True, piezoelectric_effect=True,
+               acoustic_phonon_effect=True, polar_optical_phonon_effect=True,
+               alloy_disordered_effect=True)
+MECHANISMS = ['IFR', 'DIS', 'DP', 'PE', 'TOT']
+COMPS = np.array([0.2, 0.6])
+
+def _sheet_mobility(comps, n_2d=10.0, backend=None):
+    mob = Mobility2DCarrier(compositions=np.asarray(comps, dtype=float))
+    if backend is not None: mob.set_integration_backend(backend)
+    return mob.calculate_sheet_mobility(n_2d=n_2d, **EFFECTS)
+
+def _check_jacobian(backend=None):
+    mob = Mobility2DCarrier(compositions=COMPS)
+    if backend is not None: mob.set_integration_backend(backend)
+    jac = mob.calculate_sheet_mobility(n_2d=10.0, jacobian_params=['n_2d', 'comp'], **EFFECTS)
+    h = 1e-4
+    for name, lower, upper in (('n_2d', _sheet_mobility(COMPS, 10.0 - h*10, backend),
+                                _sheet_mobility(COMPS, 10.0 + h*10, backend)),
+                               ('comp', _sheet_mobility(COMPS - h, backend=backend),
+                                _sheet_mobility(COMPS + h, backend=backend))):
+        step = 2*h*10 if name == 'n_2d' else 2*h
+        for mechanism in MECHANISMS:
+            finite_difference = (upper[mechanism] - lower[mechanism]).to_numpy()/step
+            np.testing.assert_allclose(jac[f'd{mechanism}/d{name}'], finite_difference,
+                                       rtol=1e-4, err_msg=f'd{mechanism}/d{name}')
+
+@pytest.mark.parametrize('backend', ['quad', 'fixed_node'])
+def test_jacobian_numpy_kernels(monkeypatch, backend):
+    monkeypatch.setattr(_sheet_kernels, 'JIT_ENABLED', False)
+    _check_jacobian(backend)
+
+@pytest.mark.parametrize('backend', ['quad', 'fixed_node'])
+def test_jacobian_jit_kernels(backend):
+    pytest.importorskip('numba')
+    if not _sheet_kernels.JIT_ENABLED: pytest.skip('JIT backend disabled')
+    _check_jacobian(backend)
+
+def test_jacobian_interface_roughness_only():
+    # Complex-step inputs on the default backend with the JIT backend enabled
+    mob = Mobility2DCarrier(compositions=COMPS)
+    jac = mob.calculate_sheet_mobility(n_2d=10, interface_roughness_effect=True,
+                                       jacobian_params=['n_2d'])
+    assert np.all(np.isfinite(jac['dIFR/dn_2d']))
+
+def test_jacobian_3d_alloy_params_not_perturbed(monkeypatch):
+    # The finite-difference steps run on copies: a concurrent calculation on the
+    # instance never sees the perturbed parameters.
+    mob = Mobility3DCarrier(compositions=np.array([0.2, 0.6]))
+    mass = mob.alloy_params_['carrier_effective_mass'].copy()
+    seen = []
+    calculate = Mobility3DCarrier._calculate_3d_mobility
+    def recording(self, **kwargs):
+        seen.append(mob.alloy_params_['carrier_effective_mass'].copy())
+        return calculate(self, **kwargs)
+    monkeypatch.setattr(Mobility3DCarrier, '_calculate_3d_mobility', recording)
+    results = mob.calculate_3D_mobility(n_3d=np.array([0.5, 2.]), polar_optical_phonon_effect=True,
+                                        ionized_impurity_effect=True,
+                                        jacobian_params=['carrier_effective_mass', 'T'])
+    assert len(seen) == 5
+    for value in seen: np.testing.assert_array_equal(value, mass)
+    assert np.all(np.isfinite(results['dmu_TOT/dcarrier_effective_mass']))
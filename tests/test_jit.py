@@ -0,0 +1,29 @@
+"""
+Optional numba JIT backend: lazy numba import and compiled against python kernels.
+"""
+import sys
+import subprocess
+import numpy as np
+import pytest
+from mobilitypy.src import _jit, _sheet_kernels, _Fermi_Dirac_integration
+
+def test_import_does_not_load_numba():
+    code = 'import sys, mobilitypy; print("numba" in sys.modules)'
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == 'False'
+
+def test_compiled_kernels_match_python():
+    if not _jit.JIT_ENABLED: pytest.skip('JIT backend disabled or numba not installed')
+    rng = np.random.default_rng(0)
+    b, k_F, q_TF, corr_len = (rng.uniform(0.5, 2, 5) for _ in range(4))
+    x, w = np.polynomial.legendre.leggauss(16)
+    x, w = 0.5*(x + 1), 0.5*w
+    for mode in range(5):
+        compiled = _sheet_kernels._sc_integrals_jit(mode, False, b, k_F, q_TF, corr_len, x, w)
+        python = _sheet_kernels._sc_integrals_numpy(mode, False, b, k_F, q_TF, corr_len, x, w)
+        np.testing.assert_allclose(compiled, python, rtol=1e-12)
+    assert 'numba' in sys.modules and _sheet_kernels.prange is not range
+    nu = np.linspace(-5, 20, 11)
+    FermiDiracInt = _Fermi_Dirac_integration._FermiDiracInt
+    np.testing.assert_allclose(FermiDiracInt._map_scalar_kernel('_Fukushima_FD_one_half', nu),
+                               np.vectorize(FermiDiracInt._Fukushima_FD_one_half)(nu), rtol=1e-14)
@@ -0,0 +1,26 @@
+"""
+MobilityResults container.
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+from mobilitypy.src import MobilityResults
+
+def test_mobility_results_round_trip():
+    results = MobilityResults({'comp': np.array([0.1, 0.5]), 'TOT': np.array([300., 200.])},
+                              attrs={'model': 'v2'})
+    assert results.columns == ['comp', 'TOT'] and len(results) == 2
+    assert results['TOT'].dtype == np.float64 and results['TOT'].flags['C_CONTIGUOUS']
+    np.testing.assert_array_equal(results.to_numpy(['TOT', 'comp']), [[300., 0.1], [200., 0.5]])
+    dataframe = results.to_pandas()
+    assert list(dataframe.columns) == ['comp', 'TOT']
+    back = MobilityResults.from_pandas(dataframe)
+    np.testing.assert_array_equal(back['TOT'], results['TOT'])
+    both = MobilityResults.concatenate([results, back])
+    np.testing.assert_array_equal(both['comp'], [0.1, 0.5, 0.1, 0.5])
+
+def test_calculate_returns_mobility_results():
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    kwargs = dict(n_2d=10, interface_roughness_effect=True, alloy_disordered_effect=True)
+    results = mob.calculate_sheet_mobility(**kwargs, return_dataframe=False)
+    assert isinstance(results, MobilityResults)
+    np.testing.assert_array_equal(results.to_pandas(), mob.calculate_sheet_mobility(**kwargs))
@@ -0,0 +1,67 @@
+"""
+Local HTTP/JSON mobility query service: coalescing of concurrent requests.
+"""
+import sys
+import json
+import subprocess
+import urllib.request
+import urllib.error
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from mobilitypy import Mobility2DCarrier, MobilityService
+
+OPTIONS = {'alloy_disordered_effect': True, 'polar_optical_phonon_effect': True}
+
+def _post(url, body):
+    request = urllib.request.Request(url, data=json.dumps(body).encode(),
+                                     headers={'Content-Type': 'application/json'})
+    try:
+        with urllib.request.urlopen(request, timeout=60) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as error:
+        return error.code, json.loads(error.read())
+
+def _get(url):
+    with urllib.request.urlopen(url, timeout=60) as response:
+        return json.loads(response.read())
+
+def test_service_coalesces_concurrent_requests():
+    n_requests = 16
+    comps, temperatures = 0.5 + 0.01*np.arange(n_requests), 250. + np.arange(n_requests)
+    with MobilityService(port=0, batch_window=0.5) as service:
+        # Warm up the carrier, so the requests arrive within one batch window
+        assert _post(service.url + '/v1/mobility', {'carrier': {'type': '2d'}, 'points': {'comp': 0.5},
+                                                    'options': OPTIONS})[0] == 200
+        def query(ii):
+            return _post(service.url + '/v1/mobility',
+                         {'carrier': {'type': '2d'}, 'options': OPTIONS,
+                          'points': {'comp': comps[ii], 'n_2d': 10, 'T': temperatures[ii]}})
+        with ThreadPoolExecutor(n_requests) as executor:
+            responses = list(executor.map(query, range(n_requests)))
+        health = _get(service.url + '/v1/health')
+    assert all(status == 200 for status, _ in responses)
+    assert max(body['coalesced_requests'] for _, body in responses) > 1
+    assert health['requests'] == n_requests + 1 and health['engine_calls'] < n_requests + 1
+    reference = Mobility2DCarrier(compositions=comps).calculate_sheet_mobility(
+        n_2d=10, T=temperatures, **OPTIONS, return_dataframe=False)
+    np.testing.assert_allclose([body['columns']['TOT'][0] for _, body in responses],
+                               reference['TOT'], rtol=1e-12)
+    np.testing.assert_allclose([body['columns']['T'][0] for _, body in responses], temperatures)
+
+def test_service_errors():
+    with MobilityService(port=0, batch_window=0.001) as service:
+        status, body = _post(service.url + '/v1/mobility', {'carrier': {'type': '2d'},
+                                                           'points': {'comp': 0.5, 'foo': 1}})
+        assert status == 400 and 'error' in body
+        assert _post(service.url + '/v1/mobility', {'carrier': {'type': '4d'},
+                                                    'points': {'comp': 0.5}})[0] == 400
+        assert _post(service.url + '/v1/surrogate/missing', {'points': {'n_2d': 1}})[0] == 404
+        # A failing request does not stop the engine thread
+        assert _post(service.url + '/v1/mobility', {'carrier': {'type': '2d'}, 'points': {'comp': 0.5},
+                                                    'options': OPTIONS})[0] == 200
+
+def test_service_imported_on_first_access():
+    code = ('import sys, mobilitypy; loaded = "http.server" in sys.modules; '
+            'mobilitypy.MobilityService; print(loaded, "http.server" in sys.modules)')
+    out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True)
+    assert out.stdout.split() == ['False', 'True']
@@ -0,0 +1,42 @@
+"""
+Monte Carlo propagation of the material parameter uncertainties.
+"""
+import numpy as np
+from scipy import stats
+from mobilitypy import Mobility2DCarrier
+
+EFFECTS = dict(alloy_disordered_effect=True, acoustic_phonon_effect=True,
+               polar_optical_phonon_effect=True)
+
+def test_monte_carlo_statistics_against_loop():
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    distribution = stats.norm(0.322, 0.02)
+    results = mob.monte_carlo_uncertainty({'AlN': {'carrier_effective_mass': distribution}},
+                                          n_samples=300, chunk_size=100, seed=1,
+                                          figure_of_merit=False, return_dataframe=False,
+                                          **EFFECTS)
+    assert results.attrs['n_samples'] == 300
+    rng = np.random.default_rng(1)
+    carrier = mob._carrier_at_compositions(mob.comps_)
+    carrier._set_integration_backend('fixed_node')
+    samples = []
+    for _ in range(3):
+        for mass in distribution.rvs(size=100, random_state=rng):
+            sample = carrier._carrier_at_compositions(
+                mob.comps_, use_mat_params={'AlN': {'carrier_effective_mass': mass}})
+            samples.append(sample.calculate_sheet_mobility(n_2d=10, return_dataframe=False,
+                                                           **EFFECTS)['TOT'])
+    samples = np.array(samples)
+    np.testing.assert_allclose(results['TOT_mean'], samples.mean(axis=0), rtol=1e-10)
+    np.testing.assert_allclose(results['TOT_std'], samples.std(axis=0, ddof=1), rtol=1e-8)
+    for quantile in (0.025, 0.5, 0.975):
+        np.testing.assert_allclose(results[f'TOT_q{quantile:g}'],
+                                   np.quantile(samples, quantile, axis=0), rtol=5e-3)
+
+def test_monte_carlo_seed_reproducible():
+    mob = Mobility2DCarrier(compositions=0.3)
+    kwargs = dict(n_samples=64, chunk_size=32, seed=3, **EFFECTS)
+    distributions = {'GaN': {'CB_deformation_potential': stats.uniform(8, 2)}}
+    first = mob.monte_carlo_uncertainty(distributions, **kwargs)
+    np.testing.assert_array_equal(first, mob.monte_carlo_uncertainty(distributions, **kwargs))
+    assert 'LFOM_q0.975' in first.columns
@@ -0,0 +1,45 @@
+"""
+Non-dominated filter of the Pareto front explorer against brute force, and
+chunked against whole-table screening.
+"""
+import numpy as np
+import pytest
+from mobilitypy import Mobility2DCarrier, MobilityResults
+from mobilitypy.src._pareto import _non_dominated_mask
+
+def _brute_force_mask(values):
+    finite = np.all(np.isfinite(values), axis=1)
+    mask = np.zeros(len(values), dtype=bool)
+    for ii in np.flatnonzero(finite):
+        dominated = np.all(values >= values[ii], axis=1) & np.any(values > values[ii], axis=1) & finite
+        mask[ii] = not dominated.any()
+    return mask
+
+@pytest.mark.parametrize('k', [1, 2, 3, 4, 5])
+def test_non_dominated_mask_brute_force(k):
+    rng = np.random.default_rng(k)
+    for _ in range(20):
+        values = rng.integers(0, 6, (200, k)).astype(float) # ties and duplicates
+        values[rng.random(200) < 0.03, rng.integers(k)] = np.nan
+        np.testing.assert_array_equal(_non_dominated_mask(values), _brute_force_mask(values))
+    values = rng.random((500, k))
+    np.testing.assert_array_equal(_non_dominated_mask(values), _brute_force_mask(values))
+    np.testing.assert_array_equal(_non_dominated_mask(values, n_pivots=0), _brute_force_mask(values))
+
+def test_non_dominated_mask_edge_cases():
+    assert not _non_dominated_mask(np.empty((0, 3))).any()
+    assert not _non_dominated_mask(np.full((4, 2), np.nan)).any()
+    assert _non_dominated_mask(np.ones((5, 3))).all() # equal rows share their status
+
+def test_pareto_front_chunked():
+    mob = Mobility2DCarrier(compositions=np.array([0.6]))
+    results = mob.design_sweep({'comp': (0.5, 0.95), 'n_2d': (1, 20), 'rms_roughness': (0.1, 1)},
+                               n_points=256, alloy_disordered_effect=True,
+                               interface_roughness_effect=True, polar_optical_phonon_effect=True,
+                               return_dataframe=False)
+    front = mob.pareto_front(results, return_dataframe=False)
+    assert 0 < len(front) < len(results)
+    chunks = [MobilityResults({key: val[ii:ii+50] for key, val in results.items()})
+              for ii in range(0, len(results), 50)]
+    chunked = mob.pareto_front(chunks, return_dataframe=False)
+    np.testing.assert_allclose(np.sort(chunked['LFOM']), np.sort(front['LFOM']))
@@ -0,0 +1,44 @@
+"""
+print_log is a per carrier setting: it must not change the global logging state.
+"""
+import logging
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+
+def _unconfigure_logging(monkeypatch):
+    # pytest attaches its capture handlers to the root logger (also for the test
+    # call); print_log prints to stdout only if the logging is not configured.
+    monkeypatch.setattr(logging.getLogger(), 'handlers', [])
+
+def _calculate(mob):
+    mob.calculate_sheet_mobility(n_2d=10, interface_roughness_effect=True)
+
+def test_print_log_isolated_between_carriers(capsys, monkeypatch):
+    _unconfigure_logging(monkeypatch)
+    logger = logging.getLogger('mobilitypy')
+    state = (logger.level, logging.getLogger('mobilitypy.params').level, list(logger.handlers))
+    _calculate(Mobility2DCarrier(compositions=np.array([0.2, 0.5]), print_log='high'))
+    assert 'Composition=0.20000' in capsys.readouterr().out
+    assert state == (logger.level, logging.getLogger('mobilitypy.params').level, list(logger.handlers))
+    _calculate(Mobility2DCarrier(compositions=np.array([0.2, 0.5])))
+    assert capsys.readouterr().out == ''
+
+def test_print_log_levels(capsys, monkeypatch):
+    _unconfigure_logging(monkeypatch)
+    _calculate(Mobility2DCarrier(compositions=np.array([0.2]), print_log='low'))
+    out = capsys.readouterr().out
+    assert 'Sheet mobility' in out and 'Composition' not in out
+    _calculate(Mobility2DCarrier(compositions=np.array([0.2]), print_log='medium'))
+    out = capsys.readouterr().out
+    assert '- Composition: 0.20000' in out and 'Composition=' not in out
+
+def test_print_log_copies_keep_level(capsys, monkeypatch):
+    _unconfigure_logging(monkeypatch)
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.5]), print_log='low')
+    _calculate(mob._carrier_at_compositions(np.array([0.3])))
+    assert 'Sheet mobility' in capsys.readouterr().out
+
+def test_logging_configuration_without_print_log(caplog):
+    with caplog.at_level(logging.DEBUG, logger='mobilitypy'):
+        _calculate(Mobility2DCarrier(compositions=np.array([0.2])))
+    assert any('Sheet mobility' in record.getMessage() for record in caplog.records)
@@ -0,0 +1,31 @@
+"""
+Opt-in profiling of the engine stages.
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier, profile
+
+EFFECTS = dict(interface_roughness_effect=True, alloy_disordered_effect=True,
+               polar_optical_phonon_effect=True)
+
+def test_profile_report():
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    reference = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    with profile() as report:
+        profiled = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    np.testing.assert_array_equal(profiled, reference)
+    stages = report.to_dict()
+    assert stages['sheet_mobility']['calls'] == 1
+    assert stages['sheet_mobility/IFR']['quad_calls'] == 2
+    assert stages['sheet_mobility/IFR']['neval'] > 0
+    assert report.wall_time >= stages['sheet_mobility']['wall_time'] > 0
+    aggregated = report.to_dict(aggregate_by_name=True)
+    assert aggregated['IFR']['quad_calls'] == 2
+    assert list(report.to_pandas().index) == list(stages)
+    assert 'sheet_mobility/IFR' in str(report)
+
+def test_profile_off_records_nothing():
+    mob = Mobility2DCarrier(compositions=0.3)
+    with profile() as report:
+        pass
+    mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    assert report.stages == {}
@@ -0,0 +1,34 @@
+"""
+Rescaling of the sheet mobilities from the scattering rates.
+"""
+import numpy as np
+import pytest
+from mobilitypy import Mobility2DCarrier
+
+@pytest.mark.parametrize('mobility_model', ['v1', 'v2'])
+def test_rescale_equals_recalculation(mobility_model):
+    mob = Mobility2DCarrier(compositions=np.array([0.1, 0.5, 0.9]))
+    n_2d = np.linspace(1, 15, 3)
+    effects = dict(interface_roughness_effect=True, dislocation_effect=True,
+                   deformation_potential_effect=True, piezoelectric_effect=True,
+                   acoustic_phonon_effect=True, alloy_disordered_effect=True,
+                   mobility_model=mobility_model)
+    base = mob.calculate_sheet_mobility(n_2d=n_2d, return_sc_rates=True, **effects)
+    n_dis, T, rms_roughness = np.array([0.5, 3.]), np.array([200., 400.]), np.array([0.2, 0.3])
+    rescaled = mob.rescale(base, n_dis=n_dis, T=T, rms_roughness=rms_roughness, f_dis=0.3)
+    assert len(rescaled) == 2*len(base)
+    for kk in range(2):
+        reference = mob.calculate_sheet_mobility(n_2d=n_2d, return_sc_rates=True, n_dis=n_dis[kk],
+                                                 T=T[kk], rms_roughness=rms_roughness[kk],
+                                                 f_dis=0.3, **effects)
+        block = rescaled.iloc[kk*len(base):(kk+1)*len(base)]
+        for column in reference.columns:
+            np.testing.assert_allclose(block[column], reference[column], rtol=1e-12)
+        np.testing.assert_array_equal(block['n_dis'], n_dis[kk])
+
+def test_rescale_polar_optical_phonon_temperature():
+    mob = Mobility2DCarrier(compositions=0.3)
+    base = mob.calculate_sheet_mobility(n_2d=10, return_sc_rates=True,
+                                        polar_optical_phonon_effect=True)
+    with pytest.raises(ValueError):
+        mob.rescale(base, T=400)
@@ -0,0 +1,40 @@
+"""
+Resumable chunked ResultStore.
+"""
+import numpy as np
+import pytest
+from mobilitypy import Mobility2DCarrier
+from mobilitypy.src import MobilityResults, ResultStore
+
+def _sweep(store, evaluate):
+    return store.run(evaluate, ResultStore.parameter_grid(T=[200, 300, 400], n_2d=[5, 10]),
+                     chunk_size=2, sweep_spec={'effects': 'IFR'})
+
+def test_result_store_resume(tmp_path):
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    calls, interrupt = [], [True]
+    def evaluate(**params):
+        calls.append(params)
+        if interrupt[0] and len(calls) == 4: raise RuntimeError('interrupted') # in the 2nd chunk
+        return mob.calculate_sheet_mobility(**params, interface_roughness_effect=True,
+                                            return_dataframe=False)
+    with pytest.raises(RuntimeError):
+        _sweep(ResultStore(tmp_path), evaluate)
+    store = ResultStore(tmp_path)
+    assert store.completed_chunks() == [0]
+    calls.clear()
+    interrupt[0] = False
+    results = _sweep(store, evaluate)
+    assert len(calls) == 4 # only the missing chunks
+    assert len(results) == 12 and store.completed_chunks() == [0, 1, 2]
+    reference = MobilityResults.concatenate(
+        [mob.calculate_sheet_mobility(T=T, n_2d=n_2d, interface_roughness_effect=True, return_dataframe=False)
+         for T in [200, 300, 400] for n_2d in [5, 10]])
+    np.testing.assert_array_equal(results['TOT'], reference['TOT'])
+    np.testing.assert_array_equal(results['T'], np.repeat([200., 300., 400.], 4))
+
+def test_result_store_rejects_other_sweep(tmp_path):
+    store = ResultStore(tmp_path)
+    store.set_sweep_spec({'T': [300]})
+    with pytest.raises(ValueError):
+        ResultStore(tmp_path).set_sweep_spec({'T': [400]})
@@ -0,0 +1,27 @@
+"""
+Integration error estimates of the mobilities (return_errors=True).
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+
+EFFECTS = dict(interface_roughness_effect=True, dislocation_effect=True,
+               acoustic_phonon_effect=True, alloy_disordered_effect=True)
+
+def test_return_errors_columns():
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    reference = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    results = mob.calculate_sheet_mobility(n_2d=10, return_errors=True, **EFFECTS)
+    for column in reference.columns:
+        np.testing.assert_array_equal(results[column], reference[column])
+    for column in ('IFR', 'DIS', 'AP', 'TOT'):
+        errors = results[f'{column}_err'].to_numpy()
+        assert np.all(np.isfinite(errors)) and np.all(errors >= 0)
+        assert np.all(errors < 1e-3*results[column].to_numpy())
+
+def test_return_errors_bound_true_error():
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    accurate = mob.calculate_sheet_mobility(n_2d=10, **EFFECTS)
+    mob.set_integration_tolerance(epsrel=1e-3, epsabs=0)
+    coarse = mob.calculate_sheet_mobility(n_2d=10, return_errors=True, **EFFECTS)
+    true_error = np.abs(coarse['IFR'] - accurate['IFR']).to_numpy()
+    assert np.all(true_error <= 10*coarse['IFR_err'].to_numpy() + 1e-12)
@@ -0,0 +1,28 @@
+"""
+The incremental sheet mobility evaluator agrees with calculate_sheet_mobility.
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+
+EFFECTS = dict(alloy_disordered_effect=True, interface_roughness_effect=True, dislocation_effect=True,
+               acoustic_phonon_effect=True, polar_optical_phonon_effect=True)
+
+def test_per_composition_inputs():
+    mob = Mobility2DCarrier(compositions=np.array([0.1, 0.4, 0.8]),
+                            use_mat_params={'AlN': {'carrier_effective_mass': 0.35}})
+    evaluator = mob.sheet_mobility_evaluator(**EFFECTS)
+    inputs = dict(n_2d=np.array([5., 10., 15.]), rms_roughness=np.array([0.1, 0.2, 0.3]),
+                  T=np.array([300., 350., 400.]), n_dis=2)
+    np.testing.assert_allclose(evaluator.evaluate(**inputs),
+                               mob.calculate_sheet_mobility(**inputs, **EFFECTS), rtol=1e-12)
+    inputs['T'] = 300
+    mu = evaluator.evaluate(**inputs)
+    assert sorted(evaluator.last_recomputed) == ['DP', 'PE', 'POP']
+    np.testing.assert_allclose(mu, mob.calculate_sheet_mobility(**inputs, **EFFECTS), rtol=1e-12)
+
+def test_per_point_compositions():
+    mob = Mobility2DCarrier(compositions=np.array([0.5]))
+    points = mob._carrier_at_compositions(np.array([0.2, 0.3, 0.9]))
+    mu = points.sheet_mobility_evaluator(**EFFECTS).evaluate(n_2d=np.array([4., 8., 12.]))
+    np.testing.assert_allclose(mu['TOT'], points.calculate_sheet_mobility(n_2d=np.array([4., 8., 12.]),
+                                                                          **EFFECTS)['TOT'], rtol=1e-12)
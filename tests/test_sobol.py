@@ -0,0 +1,34 @@
+"""
+Sobol sensitivity indices of the sheet mobility.
+"""
+import numpy as np
+from mobilitypy import Mobility2DCarrier
+
+def test_sobol_indices_inactive_input():
+    mob = Mobility2DCarrier(compositions=np.array([0.2, 0.6]))
+    indices = mob.sobol_indices({'rms_roughness': (0.1, 0.5), 'n_dis': (0.1, 10)},
+                                n_samples=256, log_scale=['n_dis'], seed=1,
+                                interface_roughness_effect=True, alloy_disordered_effect=True)
+    # n_dis does not enter without dislocation scattering
+    np.testing.assert_allclose(indices['TOT_S1_n_dis'], 0, atol=1e-12)
+    np.testing.assert_allclose(indices['TOT_ST_n_dis'], 0, atol=1e-12)
+    # one active input: it causes all the variance
+    np.testing.assert_allclose(indices['TOT_S1_rms_roughness'], 1, atol=0.05)
+    np.testing.assert_allclose(indices['TOT_ST_rms_roughness'], 1, atol=0.05)
+
+def test_sobol_indices_additive_inputs():
+    mob = Mobility2DCarrier(compositions=0.3)
+    indices = mob.sobol_indices({'rms_roughness': (0.1, 0.5), 'n_dis': (0.1, 10),
+                                 'AlGaN:alloy_scattering_potential': (0.5, 2)},
+                                n_samples=512, log_scale=['n_dis'], seed=0, 
+                                return_dataframe=False, interface_roughness_effect=True,
+                                dislocation_effect=True, alloy_disordered_effect=True)
+    assert indices.attrs['n_evaluations'] == 512*(3+2)
+    names = ('rms_roughness', 'n_dis', 'AlGaN:alloy_scattering_potential')
+    first_order = np.array([indices[f'TOT_S1_{name}'][0] for name in names])
+    total_order = np.array([indices[f'TOT_ST_{name}'][0] for name in names])
+    assert np.all(first_order > 0) and np.all(total_order >= first_order - 0.02)
+    assert 0.7 < first_order.sum() <= 1.05
+    # single mechanism columns only depend on their own input
+    np.testing.assert_allclose(indices['IFR_ST_rms_roughness'], 1, atol=0.05)
+    np.testing.assert_allclose(indices['IFR_ST_n_dis'], 0, atol=1e-12)
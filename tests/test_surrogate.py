@@ -0,0 +1,36 @@
+"""
+Chebyshev surrogate of the sheet mobility.
+"""
+import pickle
+import numpy as np
+from mobilitypy import Mobility2DCarrier, MobilitySurrogate
+
+EFFECTS = dict(interface_roughness_effect=True, alloy_disordered_effect=True,
+               polar_optical_phonon_effect=True)
+
+def _surrogate():
+    mob = Mobility2DCarrier(compositions=0.3)
+    mob.set_integration_backend('fixed_node')
+    return mob.build_surrogate({'comp': (0.1, 0.6), 'n_2d': (1, 20)},
+                               target_rel_error=1e-3, **EFFECTS)
+
+def test_surrogate_held_out_error():
+    surrogate = _surrogate()
+    assert surrogate.metadata['converged'] and surrogate.max_rel_error < 1e-3
+    rng = np.random.default_rng(1)
+    comps, n_2d = rng.uniform(0.1, 0.6, 8), 10**rng.uniform(0, np.log10(20), 8)
+    for comp, density in zip(comps, n_2d):
+        mob = Mobility2DCarrier(compositions=comp)
+        mob.set_integration_backend('fixed_node')
+        reference = mob.calculate_sheet_mobility(n_2d=density, **EFFECTS)['TOT'].iloc[0]
+        assert abs(surrogate(comp=comp, n_2d=density)/reference - 1) < 2e-3
+    assert np.isnan(surrogate(comp=0.9, n_2d=5))
+
+def test_surrogate_save_load(tmp_path):
+    surrogate = _surrogate()
+    comps, n_2d = np.linspace(0.1, 0.6, 7), np.linspace(1, 20, 7)
+    surrogate.save(tmp_path/'surrogate.npz')
+    loaded = MobilitySurrogate.load(tmp_path/'surrogate.npz')
+    np.testing.assert_array_equal(loaded(comp=comps, n_2d=n_2d), surrogate(comp=comps, n_2d=n_2d))
+    unpickled = pickle.loads(pickle.dumps(surrogate))
+    np.testing.assert_array_equal(unpickled(comps, n_2d), surrogate(comps, n_2d))